@@ -0,0 +1,5 @@
+"""ベンチマークスイート
+
+KnowledgeBaseとストレージのホットパスを計測する。
+実行方法: ``python -m benchmarks.run --nodes 10000``
+"""
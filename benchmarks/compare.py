@@ -0,0 +1,81 @@
+"""Compare two benchmark result files.
+
+Usage::
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.10
+
+Exits with status 1 if any benchmark's p50 latency (or build throughput)
+regressed by more than the threshold.
+"""
+
+import argparse
+import json
+from pathlib import Path
+import sys
+
+
+def load(path: Path) -> dict:
+    """Read a result file written by ``benchmarks.run``."""
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list[dict]:
+    """Compute per-benchmark changes between two result sets.
+
+    Args:
+        baseline: Reference results
+        candidate: Results to check
+        threshold: Relative slowdown treated as a regression
+
+    Returns:
+        One row per benchmark present in both result sets
+    """
+    rows = []
+    for name, new in candidate["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        if "p50_us" in old and "p50_us" in new and old["p50_us"]:
+            # Latency: higher is worse
+            change = new["p50_us"] / old["p50_us"] - 1.0
+            metric = "p50_us"
+        else:
+            # Throughput: lower is worse
+            change = old["ops_per_sec"] / new["ops_per_sec"] - 1.0
+            metric = "ops_per_sec"
+        rows.append(
+            {
+                "name": name,
+                "metric": metric,
+                "baseline": old[metric],
+                "candidate": new[metric],
+                "slowdown": change,
+                "regression": change > threshold,
+            }
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Compare benchmark results")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    rows = compare(load(args.baseline), load(args.candidate), args.threshold)
+    print(
+        f"{'benchmark':<32}{'metric':>12}{'baseline':>14}{'candidate':>14}{'change':>10}"
+    )
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['name']:<32}{row['metric']:>12}{row['baseline']:>14.2f}"
+            f"{row['candidate']:>14.2f}{row['slowdown']:>+10.1%}{flag}"
+        )
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
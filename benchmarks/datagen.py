@@ -0,0 +1,156 @@
+"""Deterministic synthetic data for benchmarks."""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import random
+import uuid
+
+from star_tactics.models.knowledge_node import KnowledgeBase, KnowledgeNode
+
+ENGLISH_WORDS = (
+    "star tactics stream question answer build route boss patch meta guide "
+    "strategy timing combo skill item party raid speedrun glitch setup "
+    "damage defense healer tank support ranking season event update server "
+    "latency input frame cancel counter punish neutral zoning resource"
+).split()
+
+JAPANESE_WORDS = (
+    "星空 戦術 配信 質問 回答 攻略 編成 ボス 周回 素材 装備 スキル 立ち回り "
+    "初心者 上級者 イベント 環境 ランキング 火力 耐久 回復 タイミング 練習 "
+    "コンボ 対策 相性 育成 ガチャ 解説 検証 おすすめ まとめ 注意点 小技"
+).split()
+
+
+@dataclass
+class DatasetSpec:
+    """Parameters of a synthetic dataset.
+
+    Attributes:
+        nodes: Number of nodes to generate
+        seed: Random seed; equal specs always produce equal data
+        tag_vocabulary: Number of distinct tags
+        tag_skew: Zipf exponent of tag popularity (0 means uniform)
+        tags_per_node: Inclusive (min, max) number of tags per node
+        link_degree: Average number of outgoing links per node
+        broken_link_ratio: Fraction of links pointing to missing nodes
+        japanese_ratio: Fraction of nodes written in Japanese
+        content_words: Inclusive (min, max) number of words per content
+    """
+
+    nodes: int = 10_000
+    seed: int = 42
+    tag_vocabulary: int = 500
+    tag_skew: float = 1.1
+    tags_per_node: tuple[int, int] = (1, 5)
+    link_degree: float = 3.0
+    broken_link_ratio: float = 0.01
+    japanese_ratio: float = 0.5
+    content_words: tuple[int, int] = (20, 120)
+
+
+def _make_tags(rng: random.Random, spec: DatasetSpec) -> tuple[list[str], list[float]]:
+    """Build the tag vocabulary and its Zipf popularity weights."""
+    tags = []
+    for i in range(spec.tag_vocabulary):
+        if rng.random() < spec.japanese_ratio:
+            tags.append(f"{rng.choice(JAPANESE_WORDS)}{i}")
+        else:
+            tags.append(f"{rng.choice(ENGLISH_WORDS)}-{i}")
+    weights = [1.0 / (rank + 1) ** spec.tag_skew for rank in range(len(tags))]
+    return tags, weights
+
+
+def _make_text(rng: random.Random, words: list[str], count: int, japanese: bool) -> str:
+    """Join random words the way each language is usually written."""
+    chosen = rng.choices(words, k=count)
+    if japanese:
+        # Japanese runs words together and breaks on punctuation
+        return "".join(
+            word + ("。" if i % 8 == 7 else "") for i, word in enumerate(chosen)
+        )
+    return " ".join(chosen)
+
+
+def generate_nodes(spec: DatasetSpec) -> Iterator[KnowledgeNode]:
+    """Generate synthetic knowledge nodes.
+
+    Args:
+        spec: Dataset parameters
+
+    Returns:
+        Iterator over nodes with deterministic IDs, timestamps and links
+    """
+    rng = random.Random(spec.seed)
+    tags, weights = _make_tags(rng, spec)
+    ids = [
+        str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(spec.nodes)
+    ]
+    base_time = datetime(2025, 1, 1)
+
+    for i, node_id in enumerate(ids):
+        japanese = rng.random() < spec.japanese_ratio
+        words = JAPANESE_WORDS if japanese else ENGLISH_WORDS
+        title = _make_text(rng, words, rng.randint(2, 6), japanese)
+        content = _make_text(rng, words, rng.randint(*spec.content_words), japanese)
+        node_tags = list(
+            dict.fromkeys(
+                rng.choices(tags, weights, k=rng.randint(*spec.tags_per_node))
+            )
+        )
+
+        links = []
+        for _ in range(
+            int(rng.expovariate(1.0 / spec.link_degree)) if spec.link_degree else 0
+        ):
+            if rng.random() < spec.broken_link_ratio:
+                links.append(str(uuid.UUID(int=rng.getrandbits(128), version=4)))
+            else:
+                links.append(ids[rng.randrange(len(ids))])
+
+        created = base_time + timedelta(seconds=i * 30 + rng.randint(0, 29))
+        yield KnowledgeNode(
+            id=node_id,
+            title=title,
+            content=content,
+            tags=node_tags,
+            links=list(dict.fromkeys(links)),
+            created_at=created,
+            updated_at=created + timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+        )
+
+
+def build_knowledge_base(spec: DatasetSpec) -> KnowledgeBase:
+    """Build an in-memory knowledge base from a synthetic dataset.
+
+    Args:
+        spec: Dataset parameters
+
+    Returns:
+        The populated knowledge base (without storage)
+    """
+    kb = KnowledgeBase()
+    for node in generate_nodes(spec):
+        kb._add_node(node)
+    return kb
+
+
+def sample_queries(spec: DatasetSpec, count: int = 100) -> dict[str, list]:
+    """Draw query arguments that resemble real traffic for a dataset.
+
+    Args:
+        spec: Dataset parameters the knowledge base was built from
+        count: Number of queries per kind
+
+    Returns:
+        Mapping of query kind to argument lists
+    """
+    rng = random.Random(spec.seed + 1)
+    tags, weights = _make_tags(random.Random(spec.seed), spec)
+    words = ENGLISH_WORDS + JAPANESE_WORDS
+    return {
+        "tag": [[rng.choices(tags, weights)[0]] for _ in range(count)],
+        "tag_pair": [rng.choices(tags, weights, k=2) for _ in range(count)],
+        "text_hit": [rng.choice(words) for _ in range(count)],
+        "text_miss": [f"zz-missing-{i}" for i in range(count)],
+    }
@@ -0,0 +1,291 @@
+"""Load-test the HTTP API server on localhost.
+
+Usage::
+
+    python -m benchmarks.loadtest --nodes 10000 --connections 32 --duration 10
+    python -m benchmarks.loadtest --url 127.0.0.1:8080 --write-ratio 0.2
+
+Without ``--url`` a server is started in a child process on a free port,
+seeded with a synthetic dataset and saving to a temporary file, so that
+client and server do not compete for one interpreter lock.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+import json
+from pathlib import Path
+import platform
+import random
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+import time
+from urllib.parse import quote
+
+from star_tactics.storage import JSONStorage
+
+from .datagen import DatasetSpec, build_knowledge_base, sample_queries
+from .run import percentile
+
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple[int, int]:
+    """Read one response.
+
+    Returns:
+        (status, body size in bytes)
+    """
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    lowered = head.lower()
+    if b"transfer-encoding: chunked" in lowered:
+        size = 0
+        while True:
+            length = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(length + 2)
+            if length == 0:
+                return status, size
+            size += length
+    start = lowered.index(b"content-length:") + len(b"content-length:")
+    length = int(lowered[start : lowered.index(b"\r\n", start)])
+    await reader.readexactly(length)
+    return status, length
+
+
+class Workload:
+    """Draws a mix of read and write requests."""
+
+    def __init__(self, spec: DatasetSpec, write_ratio: float, seed: int):
+        """Initialize the workload.
+
+        Args:
+            spec: Dataset the server was seeded with, for realistic queries
+            write_ratio: Fraction of requests that mutate
+            seed: Random seed
+        """
+        self.rng = random.Random(seed)
+        self.write_ratio = write_ratio
+        queries = sample_queries(spec, 200)
+        self.tags = [tags[0] for tags in queries["tag"]]
+        self.words = queries["text_hit"]
+        self.node_ids: list[str] = []
+
+    def next(self) -> tuple[str, bytes]:
+        """Get the next request.
+
+        Returns:
+            (request kind, encoded request)
+        """
+        rng = self.rng
+        if rng.random() < self.write_ratio:
+            if self.node_ids and rng.random() < 0.5:
+                node_id = rng.choice(self.node_ids)
+                body = {"content": f"updated {rng.random()}"}
+                return "update", _encode("PATCH", f"/nodes/{node_id}", body)
+            body = {
+                "title": f"load {rng.random()}",
+                "content": " ".join(rng.choices(self.words, k=20)),
+                "tags": [rng.choice(self.tags)],
+            }
+            return "create", _encode("POST", "/nodes", body)
+        roll = rng.random()
+        if self.node_ids and roll < 0.5:
+            return "get", _encode("GET", f"/nodes/{rng.choice(self.node_ids)}")
+        if roll < 0.8:
+            tag = quote(rng.choice(self.tags))
+            return "search_tag", _encode("GET", f"/search?tags={tag}&limit=50")
+        word = quote(rng.choice(self.words))
+        return "search_text", _encode("GET", f"/search?q={word}&limit=50")
+
+
+def _encode(method: str, path: str, body: dict | None = None) -> bytes:
+    payload = json.dumps(body, ensure_ascii=False).encode() if body else b""
+    return (
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n"
+    ).encode() + payload
+
+
+async def _connection(
+    host: str,
+    port: int,
+    workload: Workload,
+    deadline: float,
+    pipeline: int,
+    latencies: dict[str, list[float]],
+    errors: list[int],
+) -> None:
+    """Send requests over one keep-alive connection until the deadline."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            batch = [workload.next() for _ in range(pipeline)]
+            start = time.perf_counter()
+            writer.write(b"".join(request for _, request in batch))
+            for kind, _ in batch:
+                status, _ = await _read_response(reader)
+                latencies.setdefault(kind, []).append(time.perf_counter() - start)
+                if status >= 400:
+                    errors.append(status)
+    finally:
+        writer.close()
+
+
+async def _fetch_ids(host: str, port: int, limit: int) -> list[str]:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(_encode("GET", "/nodes"))
+    head = await reader.readuntil(b"\r\n\r\n")
+    body = b""
+    while True:
+        length = int((await reader.readline()).strip(), 16)
+        chunk = await reader.readexactly(length + 2)
+        if length == 0:
+            break
+        body += chunk[:-2]
+    writer.close()
+    assert head.startswith(b"HTTP/1.1 200")
+    return [node["id"] for node in json.loads(body)[:limit]]
+
+
+async def run_load(
+    host: str,
+    port: int,
+    workload: Workload,
+    connections: int,
+    duration: float,
+    pipeline: int,
+) -> dict:
+    """Drive the server with concurrent connections.
+
+    Returns:
+        Throughput and latency percentiles per request kind
+    """
+    workload.node_ids = await _fetch_ids(host, port, 10_000)
+    latencies: dict[str, list[float]] = {}
+    errors: list[int] = []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(
+        *(
+            _connection(host, port, workload, deadline, pipeline, latencies, errors)
+            for _ in range(connections)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    results = {}
+    for kind, values in sorted(latencies.items()):
+        values.sort()
+        results[kind] = {
+            "requests": len(values),
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+        }
+    total = sum(len(values) for values in latencies.values())
+    return {
+        "requests": total,
+        "errors": len(errors),
+        "seconds": elapsed,
+        "requests_per_sec": total / elapsed if elapsed else 0.0,
+        "results": results,
+    }
+
+
+def _start_server(
+    spec: DatasetSpec, data_dir: Path
+) -> tuple[subprocess.Popen, str, int]:
+    """Start a seeded server in a child process.
+
+    Returns:
+        (process, host, port)
+    """
+    data = data_dir / "kb.json"
+    JSONStorage(data, indent=None).save(build_knowledge_base(spec))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "star_tactics.cli", "--data", str(data)]
+        + ["serve", "--port", "0"],
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    for line in process.stderr:
+        if line.startswith("listening on "):
+            host, _, port = line.split()[-1].rpartition(":")
+            return process, host, int(port)
+    raise RuntimeError("Server exited before listening")
+
+
+def format_table(report: dict) -> str:
+    """Format load-test results as a text table."""
+    lines = [f"{'request':<16}{'count':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for kind, r in report["results"].items():
+        lines.append(
+            f"{kind:<16}{r['requests']:>10}{r['p50_ms']:>10.2f}"
+            f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+        )
+    lines.append(
+        f"\n{report['requests']} requests, {report['errors']} errors, "
+        f"{report['requests_per_sec']:.1f} req/s"
+    )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="host:port of a running server")
+    parser.add_argument("--nodes", type=int, default=DatasetSpec.nodes)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument(
+        "--pipeline", type=int, default=1, help="requests in flight per connection"
+    )
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    spec = DatasetSpec(nodes=args.nodes, seed=args.seed)
+    workload = Workload(spec, args.write_ratio, args.seed)
+    with TemporaryDirectory() as tmpdir:
+        process = None
+        if args.url:
+            host, _, port = args.url.rpartition(":")
+            address = (host or "127.0.0.1", int(port))
+        else:
+            process, *address = _start_server(spec, Path(tmpdir))
+        try:
+            report = {
+                "meta": {
+                    "timestamp": datetime.now().isoformat(),
+                    "python": sys.version.split()[0],
+                    "platform": platform.platform(),
+                    "connections": args.connections,
+                    "pipeline": args.pipeline,
+                    "write_ratio": args.write_ratio,
+                    "nodes": args.nodes,
+                },
+                **asyncio.run(
+                    run_load(
+                        *address,
+                        workload,
+                        args.connections,
+                        args.duration,
+                        args.pipeline,
+                    )
+                ),
+            }
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(format_table(report))
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""Run the KnowledgeBase and storage benchmark suite.
+
+Usage::
+
+    python -m benchmarks.run --nodes 10000 --output benchmarks/results/mine.json
+    python -m benchmarks.compare old.json new.json
+"""
+
+import argparse
+from collections.abc import Callable, Sequence
+from dataclasses import asdict
+from datetime import datetime
+import gc
+import itertools
+import json
+from pathlib import Path
+import platform
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+import time
+import tracemalloc
+
+from star_tactics.storage import JSONStorage
+from star_tactics.models.knowledge_node import KnowledgeBase
+
+from .datagen import DatasetSpec, build_knowledge_base, sample_queries
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of pre-sorted values.
+
+    Args:
+        sorted_values: Values in ascending order
+        fraction: Percentile as a fraction in ``[0, 1]``
+
+    Returns:
+        The percentile value
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(
+        len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+def measure(
+    operation: Callable[[object], object],
+    arguments: Sequence[object],
+    repeat: int = 1,
+) -> dict[str, float]:
+    """Time an operation once per argument and summarize the latencies.
+
+    Args:
+        operation: Callable taking a single argument
+        arguments: Arguments to call the operation with, in order
+        repeat: Number of passes over the arguments
+
+    Returns:
+        Throughput and latency percentiles in microseconds
+    """
+    samples = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for argument in itertools.chain.from_iterable(
+            itertools.repeat(arguments, repeat)
+        ):
+            start = time.perf_counter_ns()
+            operation(argument)
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    samples.sort()
+    total_s = sum(samples) / 1e9
+    return {
+        "ops": len(samples),
+        "ops_per_sec": len(samples) / total_s if total_s else float("inf"),
+        "mean_us": sum(samples) / len(samples) / 1e3,
+        "p50_us": percentile(samples, 0.50) / 1e3,
+        "p90_us": percentile(samples, 0.90) / 1e3,
+        "p99_us": percentile(samples, 0.99) / 1e3,
+        "max_us": samples[-1] / 1e3,
+    }
+
+
+def measure_build(spec: DatasetSpec) -> tuple[KnowledgeBase, dict, dict]:
+    """Build the dataset while tracking time and allocated memory.
+
+    Args:
+        spec: Dataset parameters
+
+    Returns:
+        The knowledge base, its build timing and memory figures
+    """
+    # Time an untraced build first: tracemalloc slows allocation heavily
+    gc.collect()
+    start = time.perf_counter()
+    build_knowledge_base(spec)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    kb = build_knowledge_base(spec)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timing = {
+        "ops": spec.nodes,
+        "ops_per_sec": spec.nodes / elapsed if elapsed else float("inf"),
+        "total_s": elapsed,
+    }
+    memory = {
+        "kb_bytes": current,
+        "build_peak_bytes": peak,
+        "bytes_per_node": current / spec.nodes if spec.nodes else 0,
+    }
+    return kb, timing, memory
+
+
+def run_storage(kb: KnowledgeBase, repeat: int) -> dict[str, dict]:
+    """Benchmark JSONStorage save and load in a temporary directory.
+
+    Args:
+        kb: The knowledge base to save
+        repeat: Number of save/load rounds
+
+    Returns:
+        Results for save and load, including file size
+    """
+    with TemporaryDirectory() as tmpdir:
+        storage = JSONStorage(Path(tmpdir) / "bench.json")
+        save = measure(lambda _: storage.save(kb), range(repeat))
+        save["file_bytes"] = storage.filepath.stat().st_size
+        load = measure(lambda _: storage.load(KnowledgeBase()), range(repeat))
+
+        tracemalloc.start()
+        storage.load(KnowledgeBase())
+        load["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"storage.save": save, "storage.load": load}
+
+
+def run_suite(spec: DatasetSpec, queries: int, repeat: int) -> dict:
+    """Run every benchmark against one synthetic dataset.
+
+    Args:
+        spec: Dataset parameters
+        queries: Number of distinct query arguments per benchmark
+        repeat: Number of passes over the arguments
+
+    Returns:
+        Results keyed by benchmark name plus memory figures
+    """
+    kb, build, memory = measure_build(spec)
+    args = sample_queries(spec, queries)
+    node_ids = list(kb._nodes)[:queries]
+    pairs = list(zip(node_ids, reversed(node_ids)))
+
+    results = {"kb.build": build}
+    results["kb.search_by_tags"] = measure(kb.search_by_tags, args["tag"], repeat)
+    results["kb.search_by_tags.pair"] = measure(
+        kb.search_by_tags, args["tag_pair"], repeat
+    )
+    results["kb.search_by_text.hit"] = measure(
+        kb.search_by_text, args["text_hit"], repeat
+    )
+    results["kb.search_by_text.miss"] = measure(
+        kb.search_by_text, args["text_miss"], repeat
+    )
+    results["kb.query.tag_text"] = measure(
+        lambda a: kb.query().with_tags(a[0]).containing(a[1]).all(),
+        list(zip(args["tag"], args["text_hit"])),
+        repeat,
+    )
+    results["kb.page_nodes"] = measure(
+        lambda _: kb.page_nodes(limit=50), range(queries), repeat
+    )
+    results["kb.get_node"] = measure(kb.get_node, node_ids, repeat)
+    results["kb.validate_links"] = measure(kb.validate_links, node_ids, repeat)
+    results["kb.add_bidirectional_link"] = measure(
+        lambda p: kb.add_bidirectional_link(*p), pairs
+    )
+    results["kb.remove_bidirectional_link"] = measure(
+        lambda p: kb.remove_bidirectional_link(*p), pairs
+    )
+    results["kb.get_all_broken_links"] = measure(
+        lambda _: kb.get_all_broken_links(), range(max(1, repeat))
+    )
+    results["kb.update_node"] = measure(
+        lambda node_id: kb.update_node(node_id, content="updated"), node_ids
+    )
+    results.update(run_storage(kb, max(1, repeat)))
+    return {"results": results, "memory": memory}
+
+
+def git_revision() -> str | None:
+    """Get the current commit hash, if run inside a git checkout."""
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def format_table(results: dict[str, dict]) -> str:
+    """Render results as a fixed-width text table."""
+    lines = [f"{'benchmark':<32}{'ops/s':>14}{'p50 us':>12}{'p99 us':>12}"]
+    for name, r in results.items():
+        p50 = f"{r['p50_us']:.1f}" if "p50_us" in r else "-"
+        p99 = f"{r['p99_us']:.1f}" if "p99_us" in r else "-"
+        lines.append(f"{name:<32}{r['ops_per_sec']:>14.1f}{p50:>12}{p99:>12}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=DatasetSpec.nodes)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    parser.add_argument("--tags", type=int, default=DatasetSpec.tag_vocabulary)
+    parser.add_argument("--tag-skew", type=float, default=DatasetSpec.tag_skew)
+    parser.add_argument("--link-degree", type=float, default=DatasetSpec.link_degree)
+    parser.add_argument(
+        "--japanese-ratio", type=float, default=DatasetSpec.japanese_ratio
+    )
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Result file (default: benchmarks/results/<revision>.json)",
+    )
+    args = parser.parse_args(argv)
+
+    spec = DatasetSpec(
+        nodes=args.nodes,
+        seed=args.seed,
+        tag_vocabulary=args.tags,
+        tag_skew=args.tag_skew,
+        link_degree=args.link_degree,
+        japanese_ratio=args.japanese_ratio,
+    )
+    revision = git_revision()
+    report = {
+        "meta": {
+            "revision": revision,
+            "timestamp": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "queries": args.queries,
+            "repeat": args.repeat,
+            "dataset": asdict(spec),
+        },
+        **run_suite(spec, args.queries, args.repeat),
+    }
+
+    output = args.output or RESULTS_DIR / f"{revision or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8"
+    )
+
+    print(format_table(report["results"]))
+    print(f"\nmemory: {report['memory']}")
+    print(f"results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,462 @@
+"""Command-line interface for operating on a knowledge base file.
+
+Subsystems are imported inside the command handlers so that ``--help``
+and light commands start without loading everything.
+"""
+
+import argparse
+from collections.abc import Iterator
+from contextlib import contextmanager
+import json
+import os
+from pathlib import Path
+import sys
+import time
+
+DEFAULT_DATA_FILE = "knowledge_base.json"
+
+# Nodes read from an import before they are added to the knowledge base
+IMPORT_BATCH_SIZE = 1000
+
+
+class Profiler:
+    """Collects wall-clock time per phase for ``--profile``."""
+
+    def __init__(self, enabled: bool):
+        """Initialize the profiler.
+
+        Args:
+            enabled: Whether to record and report anything
+        """
+        self.enabled = enabled
+        self.metrics = None
+        self._start = time.perf_counter()
+        self._phases: list[tuple[str, float]] = []
+        if enabled:
+            from .utils.metrics import Metrics
+
+            self.metrics = Metrics()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a phase of the command.
+
+        Args:
+            name: Phase name shown in the report
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                self._phases.append((name, time.perf_counter() - start))
+
+    def report(self, stream) -> None:
+        """Write the timing breakdown.
+
+        Args:
+            stream: Text stream to write to
+        """
+        if not self.enabled:
+            return
+        total = time.perf_counter() - self._start
+        lines = ["profile:"]
+        lines.extend(
+            f"  {name:<28} {seconds * 1000:10.2f} ms" for name, seconds in self._phases
+        )
+        if self.metrics is not None:
+            operations = self.metrics.to_dict()["operations"]
+            for name, data in sorted(operations.items()):
+                label = f"{name} x{data['count']}"
+                lines.append(f"    {label:<26} {data['total_seconds'] * 1000:10.2f} ms")
+        lines.append(f"  {'total':<28} {total * 1000:10.2f} ms")
+        stream.write("\n".join(lines) + "\n")
+
+
+def _open_knowledge_base(args, profiler: Profiler):
+    """Load the data file into a knowledge base without auto-saving.
+
+    Args:
+        args: Parsed arguments
+        profiler: Active profiler
+
+    Returns:
+        (knowledge_base, storage)
+    """
+    with profiler.phase("import modules"):
+        from .models import KnowledgeBase
+        from .storage import JSONStorage, parallel_load
+
+    storage = JSONStorage(args.data)
+    with profiler.phase("load"):
+        kb = KnowledgeBase(metrics=profiler.metrics)
+        if storage.filepath.exists() and storage.filepath.stat().st_size > 0:
+            parallel_load(storage.filepath, kb, workers=args.workers)
+    return kb, storage
+
+
+def _save(kb, storage, profiler: Profiler) -> None:
+    with profiler.phase("save"):
+        storage.save(kb)
+
+
+def _iter_import_records(source: str, fmt: str) -> Iterator[dict]:
+    """Read node records from an import source.
+
+    JSON Lines are streamed; a JSON document (a JSONStorage file or a list
+    of node objects) has to be parsed as a whole.
+
+    Args:
+        source: Path, or ``-`` for standard input
+        fmt: ``"jsonl"``, ``"json"`` or ``"auto"``
+
+    Yields:
+        Node objects with ``title``, ``content`` and optional ``id``,
+        ``tags``, ``links``, ``created_at`` and ``updated_at``
+    """
+    if fmt == "auto":
+        fmt = "jsonl" if source == "-" or source.endswith(".jsonl") else "json"
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        if fmt == "jsonl":
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        data = json.load(stream)
+        if isinstance(data, list):
+            yield from data
+        else:
+            for node_id, record in data.get("nodes", {}).items():
+                yield {"id": node_id, **record}
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def cmd_import(args, profiler: Profiler) -> int:
+    """Add nodes from a JSON or JSON Lines file to the data file."""
+    kb, storage = _open_knowledge_base(args, profiler)
+    from .models import KnowledgeNode
+    from .models.compression import content_from_json
+    from .storage import parse_timestamp
+
+    imported = 0
+    with profiler.phase("import"):
+        batch: list = []
+
+        def flush() -> None:
+            existing = [node for node in batch if node.id in kb._nodes]
+            for node in existing:
+                kb.delete_node(node.id)
+            kb._add_nodes(batch)
+            batch.clear()
+
+        seen: set[str] = set()
+        for record in _iter_import_records(args.source, args.format):
+            node = KnowledgeNode(
+                id=record.get("id"),
+                title=record["title"],
+                content=content_from_json(record["content"], None),
+                tags=record.get("tags", []),
+                links=record.get("links", []),
+                created_at=parse_timestamp(record.get("created_at")),
+                updated_at=parse_timestamp(record.get("updated_at")),
+            )
+            if node.id in seen:
+                flush()
+                seen.clear()
+            seen.add(node.id)
+            batch.append(node)
+            imported += 1
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush()
+                seen.clear()
+        flush()
+
+    _save(kb, storage, profiler)
+    print(f"imported {imported} nodes into {storage.filepath}", file=sys.stderr)
+    return 0
+
+
+def cmd_sync_vault(args, profiler: Profiler) -> int:
+    """Bring the data file up to date with a directory of Markdown notes."""
+    kb, storage = _open_knowledge_base(args, profiler)
+    from .storage import sync_vault
+
+    with profiler.phase("sync"):
+        result = sync_vault(
+            args.vault, kb, manifest=args.manifest, workers=args.workers
+        )
+    if result.created or result.updated or result.deleted:
+        _save(kb, storage, profiler)
+    print(
+        f"{args.vault}: {len(result.created)} created, {len(result.updated)} updated, "
+        f"{len(result.deleted)} deleted, {result.unchanged} unchanged",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _write_lines(lines, dest: str | None) -> int:
+    """Write lines one at a time to a file or standard output.
+
+    Returns:
+        Number of lines written
+    """
+    stream = sys.stdout if dest in (None, "-") else open(dest, "w", encoding="utf-8")
+    count = 0
+    try:
+        for line in lines:
+            stream.write(line)
+            stream.write("\n")
+            count += 1
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return count
+
+
+def cmd_export(args, profiler: Profiler) -> int:
+    """Write all nodes as JSON Lines, or as a JSONStorage file."""
+    kb, _ = _open_knowledge_base(args, profiler)
+    with profiler.phase("export"):
+        if args.format == "json":
+            from .storage import JSONStorage
+
+            if args.dest in (None, "-"):
+                raise SystemExit("export --format json needs a destination file")
+            JSONStorage(args.dest, indent=args.indent).save(kb)
+            count = len(kb._nodes)
+        else:
+            count = _write_lines(
+                (
+                    json.dumps(node.to_dict(), ensure_ascii=False)
+                    for node in kb.iter_nodes()
+                ),
+                args.dest,
+            )
+    print(f"exported {count} nodes", file=sys.stderr)
+    return 0
+
+
+def cmd_search(args, profiler: Profiler) -> int:
+    """Print nodes matching a text query, tags or a fuzzy query."""
+    kb, _ = _open_knowledge_base(args, profiler)
+    with profiler.phase("search"):
+        if args.fuzzy:
+            nodes = (
+                match.node
+                for match in kb.fuzzy_search(args.query or "", limit=args.limit)
+            )
+        else:
+            query = kb.query()
+            if args.tags:
+                query = query.with_tags([tag for tag in args.tags.split(",") if tag])
+            if args.query:
+                query = query.containing(args.query)
+            nodes = query.limit(args.limit).all()
+
+        if args.json:
+            lines = (json.dumps(n.to_dict(), ensure_ascii=False) for n in nodes)
+        else:
+            lines = (f"{n.id}\t{n.title}\t{','.join(n.tags)}" for n in nodes)
+        _write_lines(lines, None)
+    return 0
+
+
+def cmd_check_links(args, profiler: Profiler) -> int:
+    """Report broken links; exit with status 1 if any remain."""
+    kb, storage = _open_knowledge_base(args, profiler)
+    with profiler.phase("check links"):
+        broken = kb.get_all_broken_links()
+        for node_id, targets in broken.items():
+            for target in targets:
+                print(f"{node_id}\t{target}")
+
+        if args.fix and broken:
+            fixed = sum(kb.fix_broken_links(node_id) for node_id in broken)
+            print(f"removed {fixed} broken links", file=sys.stderr)
+    if args.fix and broken:
+        _save(kb, storage, profiler)
+        return 0
+    return 1 if broken else 0
+
+
+def cmd_stats(args, profiler: Profiler) -> int:
+    """Print summary statistics of the data file."""
+    kb, storage = _open_knowledge_base(args, profiler)
+    with profiler.phase("stats"):
+        nodes = len(kb._nodes)
+        links = sum(len(node.links) for node in kb._nodes.values())
+        tags = kb._tag_index.tags()
+        top_tags = sorted(tags, key=lambda tag: (-kb._tag_index.count(tag), tag))
+        stats = {
+            "file": str(storage.filepath),
+            "file_bytes": (
+                storage.filepath.stat().st_size if storage.filepath.exists() else 0
+            ),
+            "nodes": nodes,
+            "links": links,
+            "broken_links": sum(
+                len(targets) for targets in kb.get_all_broken_links().values()
+            ),
+            "tags": len(tags),
+            "top_tags": {tag: kb._tag_index.count(tag) for tag in top_tags[:10]},
+            "content_chars": sum(len(node.content) for node in kb._nodes.values()),
+        }
+        compression = kb.compression_stats()
+        if compression is not None:
+            stats["compression"] = {
+                "nodes_compressed": compression.nodes_compressed,
+                "raw_bytes": compression.raw_bytes,
+                "compressed_bytes": compression.compressed_bytes,
+                "memory_saved_bytes": compression.memory_saved,
+            }
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    return 0
+
+
+def cmd_compact(args, profiler: Profiler) -> int:
+    """Rewrite the data file, optionally compressed and without indentation."""
+    kb, storage = _open_knowledge_base(args, profiler)
+    before = storage.filepath.stat().st_size if storage.filepath.exists() else 0
+    if args.compress and kb.compression_stats() is None:
+        with profiler.phase("compress"):
+            kb.enable_compression(threshold=args.threshold)
+    storage.indent = None if args.no_indent else 2
+    _save(kb, storage, profiler)
+    after = storage.filepath.stat().st_size
+    print(f"{storage.filepath}: {before} -> {after} bytes", file=sys.stderr)
+    return 0
+
+
+def cmd_serve(args, profiler: Profiler) -> int:
+    """Serve the data file over the HTTP/JSON API until interrupted."""
+    kb, storage = _open_knowledge_base(args, profiler)
+    from .services.server import serve
+
+    def ready(address: tuple[str, int]) -> None:
+        print(f"listening on {address[0]}:{address[1]}", file=sys.stderr, flush=True)
+
+    serve(
+        kb,
+        host=args.host,
+        port=args.port,
+        ready=ready,
+        storage=storage,
+        write_queue_size=args.write_queue,
+    )
+    return 0
+
+
+def _non_negative_int(value: str) -> int:
+    """Parse a count argument that may be zero but not negative."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be non-negative: {value}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser.
+
+    Returns:
+        The parser
+    """
+    parser = argparse.ArgumentParser(
+        prog="star-tactics", description="Operate on a star-tactics knowledge base."
+    )
+    parser.add_argument(
+        "--data",
+        default=os.environ.get("STAR_TACTICS_DATA", DEFAULT_DATA_FILE),
+        help="knowledge base file (default: $STAR_TACTICS_DATA or %(default)s)",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="print a timing breakdown to stderr"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes for loading large files"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("import", help="add nodes from a JSON/JSONL file")
+    p.add_argument("source", help="input file, or - for JSON Lines on stdin")
+    p.add_argument("--format", choices=("auto", "json", "jsonl"), default="auto")
+    p.set_defaults(handler=cmd_import)
+
+    p = commands.add_parser("sync-vault", help="sync a directory of Markdown notes")
+    p.add_argument("vault", help="directory of .md files")
+    p.add_argument("--manifest", help="manifest file (default: inside the vault)")
+    p.set_defaults(handler=cmd_sync_vault)
+
+    p = commands.add_parser("export", help="write all nodes")
+    p.add_argument("dest", nargs="?", help="output file (default: stdout)")
+    p.add_argument("--format", choices=("jsonl", "json"), default="jsonl")
+    p.add_argument(
+        "--indent", type=int, default=2, help="indentation for --format json"
+    )
+    p.set_defaults(handler=cmd_export)
+
+    p = commands.add_parser("search", help="search nodes")
+    p.add_argument("query", nargs="?", help="text to search for")
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument("--tags", help="comma-separated tags that must all match")
+    mode.add_argument("--fuzzy", action="store_true", help="typo-tolerant title search")
+    p.add_argument("--limit", type=_non_negative_int, default=20)
+    p.add_argument("--json", action="store_true", help="print JSON Lines")
+    p.set_defaults(handler=cmd_search)
+
+    p = commands.add_parser("check-links", help="list broken links")
+    p.add_argument("--fix", action="store_true", help="remove broken links")
+    p.set_defaults(handler=cmd_check_links)
+
+    p = commands.add_parser("stats", help="print statistics")
+    p.set_defaults(handler=cmd_stats)
+
+    p = commands.add_parser("compact", help="rewrite the data file compactly")
+    p.add_argument("--no-indent", action="store_true", help="write compact JSON")
+    p.add_argument("--compress", action="store_true", help="compress large node bodies")
+    p.add_argument(
+        "--threshold", type=int, default=4096, help="minimum body size to compress"
+    )
+    p.set_defaults(handler=cmd_compact)
+
+    p = commands.add_parser("serve", help="serve the HTTP/JSON API")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8080, help="0 picks a free port")
+    p.add_argument(
+        "--write-queue", type=int, default=1024, help="maximum queued mutations"
+    )
+    p.set_defaults(handler=cmd_serve)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the command-line interface.
+
+    Args:
+        argv: Arguments (defaults to ``sys.argv[1:]``)
+
+    Returns:
+        Exit status
+    """
+    args = build_parser().parse_args(argv)
+    args.data = Path(args.data)
+    profiler = Profiler(args.profile)
+    try:
+        status = args.handler(args, profiler)
+    except BrokenPipeError:
+        # Output piped into e.g. head; silence the error on interpreter exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    profiler.report(sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
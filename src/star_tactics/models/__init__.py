@@ -1,6 +1,53 @@
 """データモデルパッケージ"""
 
+import importlib
+
 from .knowledge_node import KnowledgeNode, KnowledgeBase
 from . import link_management as _link_management  # noqa: F401 - Import to register link management methods
+from .events import ChangeEvent, ChangeType
+
+# Exports of optional modules, imported on first access (PEP 562); their
+# KnowledgeBase methods are loaded the same way, see EXTENSION_METHODS
+_LAZY_EXPORTS = {
+    "Completion": "autocomplete",
+    "CompressionStats": "compression",
+    "FuzzyMatch": "fuzzy",
+    "LinkSuggestion": "suggest",
+    "Page": "query",
+    "Query": "query",
+    "RelatedNode": "vectors",
+    "RelatedTag": "cooccurrence",
+    "RevisionInfo": "history",
+    "SimilarNode": "dedup",
+    "Snippet": "highlight",
+    "TagMatrix": "cooccurrence",
+    "TextMatch": "highlight",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module}", __name__), name)
+
 
-__all__ = ["KnowledgeNode", "KnowledgeBase"]
+__all__ = [
+    "KnowledgeNode",
+    "KnowledgeBase",
+    "ChangeEvent",
+    "ChangeType",
+    "Completion",
+    "CompressionStats",
+    "FuzzyMatch",
+    "LinkSuggestion",
+    "Page",
+    "Query",
+    "RelatedNode",
+    "RelatedTag",
+    "RevisionInfo",
+    "SimilarNode",
+    "Snippet",
+    "TagMatrix",
+    "TextMatch",
+]
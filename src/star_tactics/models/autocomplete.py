@@ -0,0 +1,369 @@
+"""Prefix index for tag and title autocomplete."""
+
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+import heapq
+import re
+from typing import TYPE_CHECKING
+
+from .indexes import NodeIndex
+from .normalize import normalize
+
+if TYPE_CHECKING:
+    from .knowledge_node import KnowledgeNode
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Completions cached per trie node; larger k falls back to a subtree scan
+CACHE_SIZE = 10
+
+# Trie nodes exist for prefixes up to this many characters; deeper
+# prefixes filter the term bucket of the node at this depth
+TRIE_DEPTH = 4
+
+KINDS = ("tag", "title")
+
+
+def normalize_title(title: str) -> str:
+    """Collapse the whitespace of a normalized title for completion.
+
+    Args:
+        title: The title, already normalized for search
+
+    Returns:
+        Title with whitespace collapsed
+    """
+    return _WHITESPACE.sub(" ", title).strip()
+
+
+def _rank(counts: dict[str, int], term: str) -> tuple[int, str]:
+    return (-counts[term], term)
+
+
+class _PrefixNode:
+    """One trie node: children, local terms and cached top completions."""
+
+    __slots__ = ("children", "terms", "top", "dirty")
+
+    def __init__(self):
+        self.children: dict[str, _PrefixNode] = {}
+        # Terms ending at this node, or all terms below it at TRIE_DEPTH
+        self.terms: set[str] = set()
+        # Best CACHE_SIZE terms of the subtree by (count desc, term asc)
+        self.top: list[str] = []
+        self.dirty = False
+
+
+class PrefixTrie:
+    """Depth-limited trie over terms with per-node top-k caches.
+
+    Each clean node caches the ``CACHE_SIZE`` most frequent terms of its
+    subtree, so a completion query walks the prefix and slices the cache.
+    Frequency increases update caches on the path in place; a decrease
+    that may let an uncached term into a full cache only marks the node
+    dirty, and dirty nodes are rebuilt from their children on the next
+    query that reaches them.
+    """
+
+    def __init__(self):
+        """Initialize an empty trie."""
+        self.counts: dict[str, int] = {}
+        self._root = _PrefixNode()
+
+    def _path(self, term: str, create: bool) -> list[_PrefixNode]:
+        node = self._root
+        path = [node]
+        for char in term[:TRIE_DEPTH]:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    break
+                child = node.children[char] = _PrefixNode()
+            node = child
+            path.append(node)
+        return path
+
+    def increment(self, term: str) -> None:
+        """Add one use of a term.
+
+        Args:
+            term: The normalized term
+        """
+        counts = self.counts
+        counts[term] = counts.get(term, 0) + 1
+        path = self._path(term, create=True)
+        path[-1].terms.add(term)
+        rank = _rank(counts, term)
+        for node in path:
+            if node.dirty:
+                continue
+            top = node.top
+            if term in top:
+                top.remove(term)
+            elif len(top) >= CACHE_SIZE:
+                if rank >= _rank(counts, top[-1]):
+                    continue
+                top.pop()
+            top.insert(bisect_left(top, rank, key=lambda t: _rank(counts, t)), term)
+
+    def increment_many(self, terms: Iterable[str]) -> None:
+        """Add uses of many terms, deferring cache maintenance.
+
+        Caches on the touched paths are marked dirty and rebuilt bottom-up
+        on the next query instead of being updated once per use.
+
+        Args:
+            terms: Normalized terms, one entry per use
+        """
+        counts = self.counts
+        for term, added in Counter(terms).items():
+            counts[term] = counts.get(term, 0) + added
+            path = self._path(term, create=True)
+            path[-1].terms.add(term)
+            for node in path:
+                node.dirty = True
+
+    def decrement(self, term: str) -> None:
+        """Remove one use of a term.
+
+        Args:
+            term: The normalized term
+        """
+        counts = self.counts
+        count = counts.get(term)
+        if count is None:
+            return
+        path = self._path(term, create=False)
+        if count > 1:
+            counts[term] = count - 1
+        else:
+            del counts[term]
+            path[-1].terms.discard(term)
+
+        for node in path:
+            if node.dirty or term not in node.top:
+                continue
+            if len(node.top) < CACHE_SIZE:
+                # The cache holds the whole subtree, so it stays exact
+                node.top.remove(term)
+                if term in counts:
+                    node.top.append(term)
+                    node.top.sort(key=lambda t: _rank(counts, t))
+            else:
+                node.dirty = True
+
+        if term not in counts:
+            self._prune(term, path)
+
+    def _prune(self, term: str, path: list[_PrefixNode]) -> None:
+        for depth in range(len(path) - 1, 0, -1):
+            node = path[depth]
+            if node.terms or node.children:
+                break
+            del path[depth - 1].children[term[depth - 1]]
+
+    def _clean(self, node: _PrefixNode) -> None:
+        if not node.dirty:
+            return
+        candidates = list(node.terms)
+        for child in node.children.values():
+            self._clean(child)
+            candidates.extend(child.top)
+        node.top = heapq.nsmallest(
+            CACHE_SIZE, candidates, key=lambda t: _rank(self.counts, t)
+        )
+        node.dirty = False
+
+    def _subtree_terms(self, node: _PrefixNode):
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            yield from current.terms
+            stack.extend(current.children.values())
+
+    def complete(self, prefix: str, k: int) -> list[tuple[str, int]]:
+        """Get the most frequent terms starting with a prefix.
+
+        Args:
+            prefix: The normalized prefix
+            k: Maximum number of completions
+
+        Returns:
+            List of (term, count), most frequent first, ties alphabetical
+        """
+        path = self._path(prefix, create=False)
+        if len(path) <= min(len(prefix), TRIE_DEPTH):
+            return []
+        node = path[-1]
+        key = lambda t: _rank(self.counts, t)  # noqa: E731
+
+        if len(prefix) > TRIE_DEPTH:
+            terms = heapq.nsmallest(
+                k, (t for t in node.terms if t.startswith(prefix)), key=key
+            )
+        elif k > CACHE_SIZE:
+            terms = heapq.nsmallest(k, self._subtree_terms(node), key=key)
+        else:
+            self._clean(node)
+            terms = node.top[:k]
+        return [(term, self.counts[term]) for term in terms]
+
+    def clear(self) -> None:
+        """Remove all terms."""
+        self.counts.clear()
+        self._root = _PrefixNode()
+
+
+def _node_terms(node: "KnowledgeNode") -> tuple[list[str], str]:
+    keys = node._search_keys
+    tags = list(dict.fromkeys(tag.strip() for tag in keys.tags))
+    return [tag for tag in tags if tag], normalize_title(keys.title)
+
+
+class AutocompleteIndex(NodeIndex):
+    """Tag and title frequencies in one prefix trie per kind.
+
+    A tag's frequency is the number of nodes carrying it; a title's is the
+    number of nodes sharing that normalized title.
+    """
+
+    def __init__(self, normalize: Callable[[str], str] = normalize):
+        """Initialize an empty autocomplete index.
+
+        Args:
+            normalize: Normalizes prefixes like the nodes' cached search keys
+        """
+        self.tries = {kind: PrefixTrie() for kind in KINDS}
+        self._normalize = normalize
+
+    def _apply(self, terms: tuple[list[str], str], delta: int) -> None:
+        tags, title = terms
+        for kind, items in (("tag", tags), ("title", [title] if title else [])):
+            trie = self.tries[kind]
+            update = trie.increment if delta > 0 else trie.decrement
+            for term in items:
+                update(term)
+
+    def add(self, node: "KnowledgeNode") -> None:
+        """Count the tags and title of a node.
+
+        Args:
+            node: The node to index
+        """
+        self._apply(_node_terms(node), 1)
+
+    def add_many(self, nodes: Iterable["KnowledgeNode"]) -> None:
+        """Count the tags and titles of a batch of nodes.
+
+        Args:
+            nodes: The nodes to index
+        """
+        tags: list[str] = []
+        titles: list[str] = []
+        for node in nodes:
+            node_tags, title = _node_terms(node)
+            tags.extend(node_tags)
+            if title:
+                titles.append(title)
+        self.tries["tag"].increment_many(tags)
+        self.tries["title"].increment_many(titles)
+
+    def remove(self, node: "KnowledgeNode") -> None:
+        """Uncount the tags and title of a node.
+
+        Args:
+            node: The node to remove
+        """
+        self._apply(_node_terms(node), -1)
+
+    def update(self, old: "KnowledgeNode", new: "KnowledgeNode") -> None:
+        """Recount the tags and title of a changed node if they changed.
+
+        Args:
+            old: The node as it was indexed
+            new: The node after the change
+        """
+        old_terms, new_terms = _node_terms(old), _node_terms(new)
+        if old_terms != new_terms:
+            self._apply(old_terms, -1)
+            self._apply(new_terms, 1)
+
+    def clear(self) -> None:
+        """Remove all entries from the index."""
+        for trie in self.tries.values():
+            trie.clear()
+
+    def complete(self, prefix: str, k: int, kind: str | None = None):
+        """Get completions of a prefix.
+
+        Args:
+            prefix: The raw prefix
+            k: Maximum number of completions
+            kind: ``"tag"``, ``"title"`` or None for both
+
+        Returns:
+            List of (term, count, kind), most frequent first
+        """
+        normalized = normalize_title(self._normalize(prefix))
+        kinds = KINDS if kind is None else (kind,)
+        results = [
+            (term, count, name)
+            for name in kinds
+            for term, count in self.tries[name].complete(normalized, k)
+        ]
+        results.sort(key=lambda item: (-item[1], item[0], item[2]))
+        return results[:k]
+
+
+@dataclass
+class Completion:
+    """An autocomplete suggestion.
+
+    Attributes:
+        text: The normalized tag or title
+        count: Number of nodes using it
+        kind: ``"tag"`` or ``"title"``
+    """
+
+    text: str
+    count: int
+    kind: str
+
+
+def autocomplete(
+    self, prefix: str, k: int = 10, kind: str | None = None
+) -> list[Completion]:
+    """Suggest tags and titles starting with a prefix.
+
+    The prefix index is built on first use and then maintained on every
+    change. Prefixes of up to ``TRIE_DEPTH`` characters with
+    ``k <= CACHE_SIZE`` are answered from per-node caches in
+    O(len(prefix) + k).
+
+    Args:
+        prefix: Typed text (case- and width-insensitive)
+        k: Maximum number of suggestions
+        kind: ``"tag"`` or ``"title"`` to restrict suggestions, None for both
+
+    Returns:
+        List of completions, most frequent first
+    """
+    if kind is not None and kind not in KINDS:
+        raise ValueError(f"Unknown completion kind: {kind}")
+    if k <= 0:
+        return []
+    index = self._lazy_index(
+        "autocomplete", lambda: AutocompleteIndex(self._key_index.normalize)
+    )
+    return [
+        Completion(text, count, name)
+        for text, count, name in index.complete(prefix, k, kind)
+    ]
+
+
+# Import and extend KnowledgeBase with autocomplete
+from .knowledge_node import KnowledgeBase
+
+KnowledgeBase.autocomplete = autocomplete  # type: ignore[attr-defined]
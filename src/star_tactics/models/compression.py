@@ -0,0 +1,418 @@
+"""Transparent compression of large node bodies with a shared dictionary."""
+
+import base64
+from collections import Counter, OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+import threading
+from typing import TYPE_CHECKING
+import zlib
+
+from .indexes import NodeIndex
+
+if TYPE_CHECKING:
+    from .knowledge_node import KnowledgeNode
+
+# Raw DEFLATE streams: no zlib header or checksum per node
+_WBITS = -15
+
+# zlib only looks back 32 KiB, so larger dictionaries are useless
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+
+def train_dictionary(
+    samples: Iterable[str],
+    size: int = MAX_DICTIONARY_SIZE,
+    segment: int = 16,
+    max_sample_bytes: int = 4 << 20,
+) -> bytes:
+    """Build a zlib preset dictionary from representative texts.
+
+    Byte segments that occur in many samples are collected, most widespread
+    last because DEFLATE encodes nearer matches more cheaply. Working on
+    UTF-8 bytes rather than words makes this independent of the language.
+
+    Args:
+        samples: Texts representative of future contents
+        size: Maximum dictionary size in bytes
+        segment: Length of the counted byte segments
+        max_sample_bytes: Stop reading samples after this many bytes
+
+    Returns:
+        The dictionary (empty if no segment repeats across samples)
+    """
+    size = min(size, MAX_DICTIONARY_SIZE)
+    document_frequency: Counter[bytes] = Counter()
+    total = 0
+    for text in samples:
+        data = text.encode("utf-8")[: 64 * 1024]
+        document_frequency.update(
+            {data[i : i + segment] for i in range(0, len(data) - segment + 1, 4)}
+        )
+        total += len(data)
+        if total >= max_sample_bytes:
+            break
+
+    chosen: list[bytes] = []
+    joined = b""
+    for chunk, frequency in document_frequency.most_common():
+        if frequency < 2 or len(joined) + len(chunk) > size:
+            break
+        if chunk in joined:
+            continue
+        chosen.append(chunk)
+        joined += chunk
+    return b"".join(reversed(chosen))
+
+
+class CompressedText:
+    """A compressed node body, decompressed on access."""
+
+    __slots__ = ("data", "size", "codec")
+
+    def __init__(self, data: bytes, size: int, codec: "ContentCodec"):
+        """Wrap compressed bytes.
+
+        Args:
+            data: Raw DEFLATE stream
+            size: Length of the UTF-8 encoded text
+            codec: Codec holding the dictionary the stream was made with
+        """
+        self.data = data
+        self.size = size
+        self.codec = codec
+
+    def decode(self) -> str:
+        """Decompress the text, using the codec's cache.
+
+        Returns:
+            The original text
+        """
+        return self.codec.decompress(self)
+
+
+class ContentCodec:
+    """zlib compression with a preset dictionary and an LRU text cache."""
+
+    def __init__(self, dictionary: bytes = b"", level: int = 6, cache_size: int = 128):
+        """Initialize the codec.
+
+        Args:
+            dictionary: Preset dictionary shared by all nodes
+            level: zlib compression level
+            cache_size: Number of decompressed bodies kept for hot nodes
+        """
+        self.dictionary = dictionary
+        self.level = level
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[CompressedText, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compress(self, text: str) -> CompressedText | None:
+        """Compress a text.
+
+        Args:
+            text: The text
+
+        Returns:
+            The compressed text, or None if compression does not save space
+        """
+        raw = text.encode("utf-8")
+        if self.dictionary:
+            compressor = zlib.compressobj(
+                self.level, zlib.DEFLATED, _WBITS, zdict=self.dictionary
+            )
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS)
+        data = compressor.compress(raw) + compressor.flush()
+        if len(data) >= len(raw):
+            return None
+        return CompressedText(data, len(raw), self)
+
+    def decompress(self, blob: CompressedText) -> str:
+        """Decompress a text, serving repeated accesses from the cache.
+
+        Args:
+            blob: Text compressed by this codec
+
+        Returns:
+            The original text
+        """
+        with self._lock:
+            text = self._cache.get(blob)
+            if text is not None:
+                self._cache.move_to_end(blob)
+                self.hits += 1
+                return text
+            self.misses += 1
+
+        if self.dictionary:
+            decompressor = zlib.decompressobj(_WBITS, zdict=self.dictionary)
+        else:
+            decompressor = zlib.decompressobj(_WBITS)
+        text = (decompressor.decompress(blob.data) + decompressor.flush()).decode(
+            "utf-8"
+        )
+
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[blob] = text
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return text
+
+
+@dataclass(frozen=True)
+class CompressionStats:
+    """Space used by compressed node bodies.
+
+    Attributes:
+        nodes_compressed: Number of nodes whose body is stored compressed
+        raw_bytes: UTF-8 size of those bodies
+        compressed_bytes: Compressed size of those bodies
+        dictionary_bytes: Size of the shared dictionary
+        cache_hits: Accesses served from the decompression cache
+        cache_misses: Accesses that had to decompress
+    """
+
+    nodes_compressed: int
+    raw_bytes: int
+    compressed_bytes: int
+    dictionary_bytes: int
+    cache_hits: int
+    cache_misses: int
+
+    @property
+    def memory_saved(self) -> int:
+        """Bytes saved in memory, net of the dictionary."""
+        return self.raw_bytes - self.compressed_bytes - self.dictionary_bytes
+
+    @property
+    def disk_saved(self) -> int:
+        """Bytes saved on disk, accounting for base64 and the dictionary."""
+        encoded = 4 * -(-self.compressed_bytes // 3)
+        return self.raw_bytes - encoded - 4 * -(-self.dictionary_bytes // 3)
+
+    @property
+    def ratio(self) -> float:
+        """Compressed size as a fraction of the raw size."""
+        return self.compressed_bytes / self.raw_bytes if self.raw_bytes else 1.0
+
+
+class ContentCompressor(NodeIndex):
+    """Compresses node bodies at or above a size threshold as they are indexed.
+
+    Registered like an index so it sees every created, updated and loaded
+    node; bodies below the threshold stay plain strings.
+    """
+
+    def __init__(self, codec: ContentCodec, threshold: int = 4096):
+        """Initialize the compressor.
+
+        Args:
+            codec: Codec to compress with
+            threshold: Minimum body length in characters to compress
+        """
+        self.codec = codec
+        self.threshold = threshold
+        self.nodes_compressed = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+    def add(self, node: "KnowledgeNode") -> None:
+        """Compress the body of a node if it is large enough.
+
+        Args:
+            node: The node to process
+        """
+        content = node._content
+        if isinstance(content, CompressedText):
+            if content.codec is self.codec:
+                self._count(content, 1)
+                return
+            # Compressed with another dictionary, e.g. read from a file
+            content = node._content = content.decode()
+        if len(content) < self.threshold:
+            return
+        blob = self.codec.compress(content)
+        if blob is not None:
+            node._content = blob
+            self._count(blob, 1)
+
+    def remove(self, node: "KnowledgeNode") -> None:
+        """Forget the size of a node's compressed body.
+
+        Args:
+            node: The node to remove
+        """
+        content = node._content
+        if isinstance(content, CompressedText) and content.codec is self.codec:
+            self._count(content, -1)
+
+    def clear(self) -> None:
+        """Reset the size accounting."""
+        self.nodes_compressed = self.raw_bytes = self.compressed_bytes = 0
+
+    def _count(self, blob: CompressedText, sign: int) -> None:
+        self.nodes_compressed += sign
+        self.raw_bytes += sign * blob.size
+        self.compressed_bytes += sign * len(blob.data)
+
+
+def content_to_json(content: "str | CompressedText") -> str | dict:
+    """Serialize a node body for storage.
+
+    Args:
+        content: A plain or compressed body
+
+    Returns:
+        The text, or ``{"zlib": <base64>, "size": <bytes>}``
+    """
+    if isinstance(content, CompressedText):
+        return {
+            "zlib": base64.b64encode(content.data).decode("ascii"),
+            "size": content.size,
+        }
+    return content
+
+
+def content_from_json(
+    value: str | dict, codec: ContentCodec | None
+) -> "str | CompressedText":
+    """Deserialize a node body written by ``content_to_json``.
+
+    Args:
+        value: The stored value
+        codec: Codec of the file's dictionary
+
+    Returns:
+        A plain or compressed body
+    """
+    if isinstance(value, str):
+        return value
+    if codec is None:
+        raise ValueError("Compressed content without compression settings")
+    return CompressedText(base64.b64decode(value["zlib"]), value["size"], codec)
+
+
+def storage_settings(knowledge_base) -> dict | None:
+    """Get the compression settings to persist alongside the nodes.
+
+    Args:
+        knowledge_base: The knowledge base being saved
+
+    Returns:
+        The settings, or None if compression is not enabled
+    """
+    compressor = knowledge_base._lazy_indexes.get("compression")
+    if compressor is None:
+        return None
+    return {
+        "codec": "zlib",
+        "threshold": compressor.threshold,
+        "level": compressor.codec.level,
+        "dictionary": base64.b64encode(compressor.codec.dictionary).decode("ascii"),
+    }
+
+
+def codec_from_settings(knowledge_base, settings: dict | None) -> ContentCodec | None:
+    """Prepare a knowledge base for loading compressed bodies.
+
+    Enables compression with the stored settings unless it is already
+    enabled. Bodies compressed with a different dictionary than the
+    knowledge base's are recompressed when they are indexed.
+
+    Args:
+        knowledge_base: The knowledge base being loaded
+        settings: Settings written by ``storage_settings``
+
+    Returns:
+        Codec that decodes the stored bodies, or None without settings
+    """
+    if settings is None:
+        return None
+    if settings.get("codec", "zlib") != "zlib":
+        raise ValueError(f"Unsupported content codec: {settings['codec']}")
+    dictionary = base64.b64decode(settings.get("dictionary", ""))
+    compressor = knowledge_base._lazy_indexes.get("compression")
+    if compressor is None:
+        knowledge_base.enable_compression(
+            threshold=settings.get("threshold", 4096),
+            level=settings.get("level", 6),
+            dictionary=dictionary,
+        )
+        compressor = knowledge_base._lazy_indexes["compression"]
+    if compressor.codec.dictionary == dictionary:
+        return compressor.codec
+    return ContentCodec(dictionary, cache_size=0)
+
+
+def enable_compression(
+    self,
+    threshold: int = 4096,
+    level: int = 6,
+    cache_size: int = 128,
+    dictionary: bytes | None = None,
+    dictionary_size: int = MAX_DICTIONARY_SIZE,
+) -> None:
+    """Store node bodies at or above a size threshold compressed.
+
+    Compressed bodies are decompressed on each access of
+    ``KnowledgeNode.content`` unless they are in the LRU cache. Plain text
+    search has to decompress and normalize every compressed body it scans,
+    as no normalized copy is cached for them, so this trades search speed
+    for memory.
+
+    Args:
+        threshold: Minimum body length in characters to compress
+        level: zlib compression level
+        cache_size: Number of decompressed bodies to cache
+        dictionary: Preset dictionary; trained on the current bodies if
+            omitted
+        dictionary_size: Maximum size of a trained dictionary
+
+    Raises:
+        ValueError: If compression is already enabled
+    """
+    if "compression" in self._lazy_indexes:
+        raise ValueError("Compression is already enabled")
+    if dictionary is None:
+        dictionary = train_dictionary(
+            (node.content for node in self._nodes.values()), size=dictionary_size
+        )
+    codec = ContentCodec(dictionary, level, cache_size)
+    # Compress before the search keys are computed, so that compressed
+    # bodies do not also keep an uncompressed normalized copy
+    self._lazy_index(
+        "compression", lambda: ContentCompressor(codec, threshold), first=True
+    )
+    self._key_index.add_many(self._nodes.values())
+
+
+def compression_stats(self) -> CompressionStats | None:
+    """Report the memory and disk saved by compression.
+
+    Returns:
+        The statistics, or None if compression is not enabled
+    """
+    compressor = self._lazy_indexes.get("compression")
+    if compressor is None:
+        return None
+    codec = compressor.codec
+    return CompressionStats(
+        nodes_compressed=compressor.nodes_compressed,
+        raw_bytes=compressor.raw_bytes,
+        compressed_bytes=compressor.compressed_bytes,
+        dictionary_bytes=len(codec.dictionary),
+        cache_hits=codec.hits,
+        cache_misses=codec.misses,
+    )
+
+
+# Import and extend KnowledgeBase with content compression
+from .knowledge_node import KnowledgeBase
+
+KnowledgeBase.enable_compression = enable_compression  # type: ignore[attr-defined]
+KnowledgeBase.compression_stats = compression_stats  # type: ignore[attr-defined]
@@ -0,0 +1,296 @@
+"""Tag co-occurrence counts and related-tag recommendations.
+
+The sparse matrix export requires the optional ``numpy`` dependency
+(``pip install star-tactics-room[vector]``).
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+import heapq
+from itertools import combinations
+import math
+from typing import TYPE_CHECKING
+
+from .indexes import NodeIndex
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .knowledge_node import KnowledgeNode
+
+MEASURES = ("jaccard", "pmi")
+
+
+class TagCooccurrenceIndex(NodeIndex):
+    """Sparse symmetric matrix of how many nodes carry each pair of tags.
+
+    Tags are counted under their cached normalized keys, so the index has
+    to run after the ``SearchKeyIndex`` that computes them. Updating a node
+    costs O(T²) in its own tag count T and nothing when its tags did not
+    change.
+    """
+
+    def __init__(self):
+        """Initialize empty counts."""
+        # Number of nodes carrying each tag (the matrix diagonal)
+        self.counts: dict[str, int] = {}
+        # Off-diagonal entries, stored in both directions
+        self.pairs: dict[str, dict[str, int]] = {}
+        self.nodes = 0
+
+    def _apply(self, tags: tuple[str, ...], delta: int) -> None:
+        self.nodes += delta
+        counts, pairs = self.counts, self.pairs
+        for tag in tags:
+            count = counts.get(tag, 0) + delta
+            if count:
+                counts[tag] = count
+            else:
+                del counts[tag]
+        for a, b in combinations(tags, 2):
+            for x, y in ((a, b), (b, a)):
+                row = pairs.get(x)
+                if row is None:
+                    row = pairs[x] = {}
+                count = row.get(y, 0) + delta
+                if count:
+                    row[y] = count
+                else:
+                    del row[y]
+                    if not row:
+                        del pairs[x]
+
+    def add(self, node: "KnowledgeNode") -> None:
+        """Count the tags of a node.
+
+        Args:
+            node: The node to index
+        """
+        self._apply(node._search_keys.tags, 1)
+
+    def add_many(self, nodes: Iterable["KnowledgeNode"]) -> None:
+        """Count the tags of a batch of nodes.
+
+        Args:
+            nodes: The nodes to index
+        """
+        counts, pairs = self.counts, self.pairs
+        for node in nodes:
+            tags = node._search_keys.tags
+            self.nodes += 1
+            for tag in tags:
+                counts[tag] = counts.get(tag, 0) + 1
+            if len(tags) < 2:
+                continue
+            for a, b in combinations(tags, 2):
+                row = pairs.setdefault(a, {})
+                row[b] = row.get(b, 0) + 1
+                row = pairs.setdefault(b, {})
+                row[a] = row.get(a, 0) + 1
+
+    def remove(self, node: "KnowledgeNode") -> None:
+        """Uncount the tags of a node.
+
+        Args:
+            node: The node to remove
+        """
+        self._apply(node._search_keys.tags, -1)
+
+    def update(self, old: "KnowledgeNode", new: "KnowledgeNode") -> None:
+        """Recount the tags of a changed node if they changed.
+
+        Args:
+            old: The node as it was indexed
+            new: The node after the change
+        """
+        old_tags, new_tags = old._search_keys.tags, new._search_keys.tags
+        if old_tags != new_tags:
+            self._apply(old_tags, -1)
+            self._apply(new_tags, 1)
+
+    def clear(self) -> None:
+        """Remove all entries from the index."""
+        self.counts.clear()
+        self.pairs.clear()
+        self.nodes = 0
+
+    def related(
+        self, tag: str, k: int, measure: str, min_count: int
+    ) -> list[tuple[str, float, int]]:
+        """Rank the tags co-occurring with a tag.
+
+        Args:
+            tag: A normalized tag
+            k: Maximum number of results
+            measure: ``"jaccard"`` or ``"pmi"``
+            min_count: Minimum number of shared nodes
+
+        Returns:
+            List of (tag, score, shared node count), best first
+        """
+        row = self.pairs.get(tag)
+        if not row:
+            return []
+        counts = self.counts
+        total = counts[tag]
+        if measure == "jaccard":
+
+            def score(other: str, both: int) -> float:
+                return both / (total + counts[other] - both)
+
+        else:
+            scale = self.nodes / total
+
+            def score(other: str, both: int) -> float:
+                return math.log(both * scale / counts[other])
+
+        scored = (
+            (score(other, both), other, both)
+            for other, both in row.items()
+            if both >= min_count
+        )
+        # Ties go to the more frequent pair, then alphabetically
+        best = heapq.nsmallest(k, scored, key=lambda s: (-s[0], -s[2], s[1]))
+        return [(other, value, both) for value, other, both in best]
+
+
+@dataclass
+class RelatedTag:
+    """A tag that co-occurs with another.
+
+    Attributes:
+        tag: The related (normalized) tag
+        score: Jaccard similarity in (0, 1] or pointwise mutual information
+        count: Number of nodes carrying both tags
+    """
+
+    tag: str
+    score: float
+    count: int
+
+
+@dataclass
+class TagMatrix:
+    """Tag co-occurrence counts as a sparse matrix in CSR form.
+
+    ``scipy.sparse.csr_matrix((data, indices, indptr))`` turns it into a
+    SciPy matrix without copying.
+
+    Attributes:
+        tags: Tag of each row and column, sorted
+        indptr: Row ``i`` spans ``indices[indptr[i]:indptr[i + 1]]``
+        indices: Column indices, sorted within each row
+        data: Number of nodes carrying both tags; the diagonal holds the
+            number of nodes carrying the tag
+        nodes: Number of nodes counted
+    """
+
+    tags: list[str]
+    indptr: "np.ndarray"
+    indices: "np.ndarray"
+    data: "np.ndarray"
+    nodes: int
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Get the matrix shape."""
+        return (len(self.tags), len(self.tags))
+
+    def to_dense(self) -> "np.ndarray":
+        """Expand the matrix into a dense array.
+
+        Returns:
+            Integer array of shape ``shape``
+        """
+        import numpy as np
+
+        dense = np.zeros(self.shape, dtype=self.data.dtype)
+        rows = np.repeat(np.arange(len(self.tags)), np.diff(self.indptr))
+        dense[rows, self.indices] = self.data
+        return dense
+
+
+def _cooccurrence_index(kb) -> TagCooccurrenceIndex:
+    return kb._lazy_index("tag_cooccurrence", TagCooccurrenceIndex)
+
+
+def related_tags(
+    self,
+    tag: str,
+    k: int = 10,
+    measure: str = "jaccard",
+    min_count: int = 1,
+) -> list[RelatedTag]:
+    """Suggest tags often used together with a tag.
+
+    The co-occurrence counts are built on first use and then maintained on
+    every change. Jaccard similarity favors tags used on mostly the same
+    nodes; PMI favors rare tags that almost only appear together, so it is
+    best combined with a ``min_count`` above 1.
+
+    Args:
+        tag: The tag (case- and width-insensitive)
+        k: Maximum number of suggestions
+        measure: ``"jaccard"`` or ``"pmi"``
+        min_count: Minimum number of nodes carrying both tags
+
+    Returns:
+        List of related tags, best first
+    """
+    if measure not in MEASURES:
+        raise ValueError(f"Unknown measure: {measure}")
+    if k <= 0:
+        return []
+    index = _cooccurrence_index(self)
+    related = index.related(self._key_index.normalize(tag), k, measure, min_count)
+    return [RelatedTag(other, score, count) for other, score, count in related]
+
+
+def tag_matrix(self, min_count: int = 1) -> TagMatrix:
+    """Export the tag co-occurrence counts for clustering.
+
+    Args:
+        min_count: Leave out tags carried by fewer nodes
+
+    Returns:
+        The counts as a sparse matrix
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(
+            "Tag matrix export requires numpy: pip install star-tactics-room[vector]"
+        ) from None
+
+    index = _cooccurrence_index(self)
+    counts, pairs = index.counts, index.pairs
+    tags = sorted(tag for tag, count in counts.items() if count >= min_count)
+    position = {tag: i for i, tag in enumerate(tags)}
+    indptr = [0]
+    indices: list[int] = []
+    data: list[int] = []
+    for tag in tags:
+        row = [(position[tag], counts[tag])]
+        row.extend(
+            (position[other], both)
+            for other, both in pairs.get(tag, {}).items()
+            if other in position
+        )
+        row.sort()
+        indices.extend(column for column, _ in row)
+        data.extend(value for _, value in row)
+        indptr.append(len(indices))
+    return TagMatrix(
+        tags,
+        np.array(indptr, dtype=np.int64),
+        np.array(indices, dtype=np.int32),
+        np.array(data, dtype=np.int64),
+        index.nodes,
+    )
+
+
+# Import and extend KnowledgeBase with related-tag recommendations
+from .knowledge_node import KnowledgeBase
+
+KnowledgeBase.related_tags = related_tags  # type: ignore[attr-defined]
+KnowledgeBase.tag_matrix = tag_matrix  # type: ignore[attr-defined]
@@ -0,0 +1,393 @@
+"""Near-duplicate detection with MinHash signatures and banded LSH."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import operator
+import random
+import re
+from typing import TYPE_CHECKING
+import zlib
+
+from .indexes import NodeIndex
+from .normalize import SearchKeyIndex, normalize
+
+if TYPE_CHECKING:
+    from .knowledge_node import KnowledgeNode
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_EMPTY = _MERSENNE_PRIME
+_WHITESPACE = re.compile(r"\s+")
+
+
+def shingles(
+    text: str,
+    size: int = 3,
+    normalize: Callable[[str], str] | None = normalize,
+) -> set[str]:
+    """Get the character shingles of a text.
+
+    Character shingles need no word segmentation, so Japanese questions
+    are handled the same way as English ones.
+
+    Args:
+        text: The text
+        size: Shingle length in characters
+        normalize: Applied to the text first, so case and width variants
+            share shingles; None for text that is already normalized
+
+    Returns:
+        Set of shingles of the normalized, whitespace-collapsed text
+    """
+    if normalize is not None:
+        text = normalize(text)
+    normalized = _WHITESPACE.sub(" ", text).strip()
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i : i + size] for i in range(len(normalized) - size + 1)}
+
+
+class MinHasher:
+    """Computes MinHash signatures with one-permutation hashing.
+
+    Classic MinHash evaluates every hash function on every shingle. Here
+    each shingle is hashed once and the hash picks one of ``num_perm``
+    bins, keeping the minimum per bin; empty bins borrow from the next
+    filled bin (rotation densification). Signatures agree per position
+    with probability close to the Jaccard similarity, at a cost linear in
+    the number of shingles rather than ``shingles * num_perm``.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        """Initialize the hash function.
+
+        Args:
+            num_perm: Signature length
+            seed: Seed for the hash parameters
+        """
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._a = rng.randrange(1, _MERSENNE_PRIME)
+        self._b = rng.randrange(0, _MERSENNE_PRIME)
+
+    def signature(self, features: set[str]) -> tuple[int, ...] | None:
+        """Compute the MinHash signature of a feature set.
+
+        Args:
+            features: The shingles
+
+        Returns:
+            Signature tuple, or None for an empty set
+        """
+        if not features:
+            return None
+        size = self.num_perm
+        a, b = self._a, self._b
+        bins = [_EMPTY] * size
+        for feature in features:
+            value, slot = divmod(
+                (a * zlib.crc32(feature.encode("utf-8")) + b) % _MERSENNE_PRIME, size
+            )
+            if value < bins[slot]:
+                bins[slot] = value
+
+        signature = list(bins)
+        for slot in range(size):
+            if bins[slot] != _EMPTY:
+                continue
+            distance = 1
+            while bins[(slot + distance) % size] == _EMPTY:
+                distance += 1
+            # Offset by the distance so borrowed values only match values
+            # borrowed the same way
+            signature[slot] = bins[(slot + distance) % size] + distance * _EMPTY
+        return tuple(signature)
+
+
+class MinHashLSH(NodeIndex):
+    """Banded locality-sensitive hashing index over MinHash signatures.
+
+    A pair of nodes with Jaccard similarity ``s`` shares at least one
+    bucket with probability ``1 - (1 - s**rows)**bands``, so lookups only
+    inspect nodes that are likely to be similar.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        key_index: SearchKeyIndex | None = None,
+    ):
+        """Initialize an empty LSH index.
+
+        Args:
+            num_perm: Signature length; must be divisible by ``bands``
+            bands: Number of bands
+            shingle_size: Shingle length in characters
+            key_index: Search keys of the knowledge base; nodes are hashed
+                from their cached normalized title and content
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self._key_index = key_index if key_index is not None else SearchKeyIndex()
+        self._signatures: dict[str, tuple[int, ...]] = {}
+        self._buckets: dict[tuple[int, int], set[str]] = {}
+
+    def signature_of(self, text: str) -> tuple[int, ...] | None:
+        """Compute the signature of arbitrary text.
+
+        Args:
+            text: The text
+
+        Returns:
+            Signature tuple, or None if the text has no shingles
+        """
+        return self.hasher.signature(
+            shingles(text, self.shingle_size, self._key_index.normalize)
+        )
+
+    def _node_text(self, node: "KnowledgeNode") -> str:
+        """Get the normalized text a node is hashed from."""
+        return f"{node._search_keys.title}\n{self._key_index.content(node)}"
+
+    def _band_keys(self, signature: tuple[int, ...]) -> list[tuple[int, int]]:
+        rows = self.rows
+        return [
+            (band, hash(signature[band * rows : (band + 1) * rows]))
+            for band in range(self.bands)
+        ]
+
+    def add(self, node: "KnowledgeNode") -> None:
+        """Index the title and content of a node.
+
+        Args:
+            node: The node to index
+        """
+        text = self._node_text(node)
+        signature = self.hasher.signature(shingles(text, self.shingle_size, None))
+        if signature is not None:
+            self.insert(node.id, signature)
+
+    def insert(self, key: str, signature: tuple[int, ...]) -> None:
+        """Index a precomputed signature under an arbitrary key.
+
+        Args:
+            key: Entry key, e.g. a node ID
+            signature: Signature from ``signature_of``
+        """
+        self._signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, node: "KnowledgeNode") -> None:
+        """Remove a node from the index.
+
+        Args:
+            node: The node to remove
+        """
+        self.discard(node.id)
+
+    def update(self, old: "KnowledgeNode", new: "KnowledgeNode") -> None:
+        """Rehash a changed node only if its text changed.
+
+        Args:
+            old: The node as it was indexed
+            new: The node after the change
+        """
+        if self._key_index.text_changed(old, new):
+            self.remove(old)
+            self.add(new)
+
+    def discard(self, key: str) -> tuple[int, ...] | None:
+        """Remove an entry by key if present.
+
+        Args:
+            key: Entry key
+
+        Returns:
+            The removed signature, or None if the key was not indexed
+        """
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return None
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+        return signature
+
+    def clear(self) -> None:
+        """Remove all entries from the index."""
+        self._signatures.clear()
+        self._buckets.clear()
+
+    def signature(self, node_id: str) -> tuple[int, ...] | None:
+        """Get the stored signature of a node.
+
+        Args:
+            node_id: The node ID
+
+        Returns:
+            The signature, or None if the node has no indexed text
+        """
+        return self._signatures.get(node_id)
+
+    def query(
+        self, signature: tuple[int, ...], threshold: float
+    ) -> list[tuple[str, float]]:
+        """Find indexed nodes whose estimated similarity reaches a threshold.
+
+        Args:
+            signature: Signature to compare against
+            threshold: Minimum estimated Jaccard similarity
+
+        Returns:
+            List of (node_id, estimated similarity), most similar first
+        """
+        candidates: set[str] = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+
+        results = []
+        for node_id in candidates:
+            other = self._signatures[node_id]
+            agreement = sum(map(operator.eq, signature, other))
+            similarity = agreement / len(signature)
+            if similarity >= threshold:
+                results.append((node_id, similarity))
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results
+
+
+@dataclass
+class SimilarNode:
+    """A near-duplicate found by ``find_similar``.
+
+    Attributes:
+        node: The similar node
+        similarity: Estimated Jaccard similarity of character shingles
+    """
+
+    node: "KnowledgeNode"
+    similarity: float
+
+
+def _dedup_index(kb) -> MinHashLSH:
+    return kb._lazy_index("minhash", lambda: MinHashLSH(key_index=kb._key_index))
+
+
+def enable_dedup(
+    self,
+    num_perm: int = 64,
+    bands: int = 16,
+    merge_on_create: bool = False,
+    threshold: float = 0.8,
+) -> None:
+    """Configure near-duplicate detection.
+
+    Builds the LSH index if needed. With ``merge_on_create``,
+    ``create_node`` folds a new node into an existing near-duplicate
+    instead: missing tags and links are appended to the existing node and
+    its ID is returned.
+
+    Args:
+        num_perm: MinHash signature length
+        bands: Number of LSH bands (``num_perm / bands`` rows each)
+        merge_on_create: Whether create_node merges near-duplicates
+        threshold: Similarity at which a new node counts as a duplicate
+    """
+    index = self._lazy_index(
+        "minhash", lambda: MinHashLSH(num_perm, bands, key_index=self._key_index)
+    )
+    if index.hasher.num_perm != num_perm or index.bands != bands:
+        raise ValueError("Near-duplicate index already built with other parameters")
+    self._create_hook = (
+        (
+            lambda title, content, tags, links: _merge_duplicate(
+                self, title, content, tags, links, threshold
+            )
+        )
+        if merge_on_create
+        else None
+    )
+
+
+def _merge_duplicate(
+    kb,
+    title: str,
+    content: str,
+    tags: list[str] | None,
+    links: list[str] | None,
+    threshold: float,
+) -> str | None:
+    """Fold a node about to be created into an existing near-duplicate.
+
+    Returns:
+        The ID of the node merged into, or None to create the node normally
+    """
+    matches = kb.find_similar(f"{title}\n{content}", threshold=threshold, limit=1)
+    if not matches:
+        return None
+
+    existing = matches[0].node
+    # Tags match case- and width-insensitively, like the tag index
+    normalize = kb._key_index.normalize
+    seen = set(existing._search_keys.tags)
+    new_tags = []
+    for tag in tags or []:
+        key = normalize(tag)
+        if key not in seen:
+            seen.add(key)
+            new_tags.append(tag)
+    new_links = [link for link in links or [] if link not in existing.links]
+    if new_tags or new_links:
+        kb.update_node(
+            existing.id,
+            tags=existing.tags + new_tags if new_tags else None,
+            links=existing.links + new_links if new_links else None,
+        )
+    return existing.id
+
+
+def find_similar(
+    self, node_id_or_text: str, threshold: float = 0.8, limit: int | None = None
+) -> list[SimilarNode]:
+    """Find near-duplicates of a node or of arbitrary text.
+
+    Args:
+        node_id_or_text: ID of an existing node, or text to compare
+        threshold: Minimum estimated Jaccard similarity in [0, 1]
+        limit: Optional maximum number of results
+
+    Returns:
+        List of similar nodes, most similar first (excluding the node itself)
+    """
+    index = _dedup_index(self)
+    if node_id_or_text in self._nodes:
+        signature = index.signature(node_id_or_text)
+        exclude = node_id_or_text
+    else:
+        signature = index.signature_of(node_id_or_text)
+        exclude = None
+    if signature is None:
+        return []
+
+    results = [
+        SimilarNode(self._nodes[node_id], similarity)
+        for node_id, similarity in index.query(signature, threshold)
+        if node_id != exclude
+    ]
+    return results if limit is None else results[:limit]
+
+
+# Import and extend KnowledgeBase with near-duplicate detection
+from .knowledge_node import KnowledgeBase
+
+KnowledgeBase.enable_dedup = enable_dedup  # type: ignore[attr-defined]
+KnowledgeBase.find_similar = find_similar  # type: ignore[attr-defined]
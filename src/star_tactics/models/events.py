@@ -0,0 +1,385 @@
+"""Change feed of knowledge base mutations."""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Imported where needed: only async consumers pay for asyncio
+    import asyncio
+
+
+class ChangeType(str, Enum):
+    """Kinds of knowledge base mutations."""
+
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    LINK_ADDED = "link_added"
+    LINK_REMOVED = "link_removed"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """A single knowledge base mutation.
+
+    Attributes:
+        seq: Sequence number, strictly increasing per knowledge base
+        type: The kind of mutation
+        node_id: The node that was changed
+        timestamp: When the change was published
+        target_id: The link target for link events, None otherwise
+        fields: Names of the updated fields for update events
+    """
+
+    seq: int
+    type: ChangeType
+    node_id: str
+    timestamp: datetime
+    target_id: str | None = None
+    fields: tuple[str, ...] = ()
+
+
+class SubscriptionLagged(Exception):
+    """Raised when a subscriber fell too far behind and was disconnected.
+
+    Attributes:
+        last_seq: Sequence number of the last event delivered before the
+            disconnect; resynchronize with ``changes_since(last_seq)``
+    """
+
+    def __init__(self, last_seq: int):
+        super().__init__(f"Subscription lagged after sequence {last_seq}")
+        self.last_seq = last_seq
+
+
+class HistoryUnavailable(LookupError):
+    """Raised when requested events have already left the history buffer."""
+
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "disconnect")
+
+
+class Subscription:
+    """A bounded buffer of change events delivered to one consumer.
+
+    Events can be consumed with blocking ``get``, plain iteration or
+    ``async for``. When the buffer is full the overflow policy applies:
+
+    - ``"block"``: the publisher waits up to ``block_timeout`` seconds for
+      room, then disconnects the subscriber
+    - ``"drop_oldest"``: the oldest buffered event is discarded and counted
+      in ``dropped``; the gap is visible in the sequence numbers
+    - ``"disconnect"``: the subscriber is disconnected immediately
+
+    After a disconnect the buffered events can still be consumed, then
+    ``SubscriptionLagged`` is raised.
+    """
+
+    def __init__(
+        self,
+        feed: "ChangeFeed",
+        maxsize: int,
+        overflow: str,
+        block_timeout: float,
+    ):
+        """Initialize a subscription. Use ``ChangeFeed.subscribe`` instead.
+
+        Args:
+            feed: The feed this subscription belongs to
+            maxsize: Maximum number of buffered events
+            overflow: Overflow policy, one of ``OVERFLOW_POLICIES``
+            block_timeout: Seconds a publisher may block under ``"block"``
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self._feed = feed
+        self._buffer: deque[ChangeEvent] = deque()
+        self._cond = threading.Condition()
+        self._waiters: list[tuple["asyncio.AbstractEventLoop", "asyncio.Future"]] = []
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self.last_seq = 0
+        self.closed = False
+        self.lagged = False
+
+    def _offer(self, event: ChangeEvent) -> None:
+        """Deliver an event from the publisher side.
+
+        Args:
+            event: The event to buffer
+        """
+        with self._cond:
+            if self.closed:
+                return
+            if len(self._buffer) >= self.maxsize:
+                if self.overflow == "drop_oldest":
+                    self._buffer.popleft()
+                    self.dropped += 1
+                elif self.overflow == "block":
+                    deadline = time.monotonic() + self.block_timeout
+                    while len(self._buffer) >= self.maxsize and not self.closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    if self.closed:
+                        return
+
+                if len(self._buffer) >= self.maxsize:
+                    self._disconnect()
+                    return
+
+            self._buffer.append(event)
+            self._notify()
+
+    def _disconnect(self) -> None:
+        """Close the subscription because the consumer is too slow."""
+        self.lagged = True
+        self.closed = True
+        self._feed._unsubscribe(self)
+        self._notify()
+
+    def _notify(self) -> None:
+        """Wake blocked threads and pending async consumers."""
+        self._cond.notify_all()
+        waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def _pop(self) -> ChangeEvent:
+        """Take the oldest buffered event. Caller must hold the lock."""
+        event = self._buffer.popleft()
+        self.last_seq = event.seq
+        self._cond.notify_all()
+        return event
+
+    def _raise_if_finished(self) -> None:
+        """Signal the end of an empty, closed subscription."""
+        if self.lagged:
+            raise SubscriptionLagged(self.last_seq)
+
+    def get(self, timeout: float | None = None) -> ChangeEvent | None:
+        """Wait for the next event.
+
+        Args:
+            timeout: Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            The next event, or None on timeout or when the subscription was
+            closed and fully drained
+
+        Raises:
+            SubscriptionLagged: If the subscriber was disconnected for
+                falling behind and all buffered events were consumed
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._buffer or self.closed, timeout=timeout
+            ):
+                return None
+            if self._buffer:
+                return self._pop()
+            self._raise_if_finished()
+            return None
+
+    def drain(self, max_items: int | None = None) -> list[ChangeEvent]:
+        """Take all currently buffered events without waiting.
+
+        Args:
+            max_items: Optional maximum number of events to take
+
+        Returns:
+            List of events in sequence order
+        """
+        with self._cond:
+            count = len(self._buffer)
+            if max_items is not None:
+                count = min(count, max_items)
+            return [self._pop() for _ in range(count)]
+
+    def close(self) -> None:
+        """Stop receiving events. Buffered events can still be consumed."""
+        with self._cond:
+            if not self.closed:
+                self.closed = True
+                self._feed._unsubscribe(self)
+                self._notify()
+
+    def __iter__(self) -> Iterator[ChangeEvent]:
+        """Iterate events, blocking until the subscription is closed."""
+        while True:
+            event = self.get()
+            if event is None:
+                return
+            yield event
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> ChangeEvent:
+        """Wait for the next event without blocking the event loop."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._buffer:
+                    return self._pop()
+                if self.closed:
+                    self._raise_if_finished()
+                    raise StopAsyncIteration
+                future = loop.create_future()
+                self._waiters.append((loop, future))
+            await future
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _resolve(future: "asyncio.Future") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ChangeFeed:
+    """Publishes change events to subscribers and keeps a short history."""
+
+    def __init__(self, history: int = 1024):
+        """Initialize an empty feed.
+
+        Args:
+            history: Number of recent events retained for ``changes_since``
+        """
+        self._history: deque[ChangeEvent] = deque(maxlen=history)
+        self._subscribers: list[Subscription] = []
+        # Reentrant: replaying history into a new subscriber may disconnect it
+        self._lock = threading.RLock()
+        self.last_seq = 0
+
+    def publish(
+        self,
+        type: ChangeType,
+        node_id: str,
+        target_id: str | None = None,
+        fields: tuple[str, ...] = (),
+    ) -> ChangeEvent:
+        """Assign the next sequence number to a change and deliver it.
+
+        Args:
+            type: The kind of mutation
+            node_id: The node that was changed
+            target_id: The link target for link events
+            fields: Names of the updated fields for update events
+
+        Returns:
+            The published event
+        """
+        with self._lock:
+            self.last_seq += 1
+            event = ChangeEvent(
+                seq=self.last_seq,
+                type=type,
+                node_id=node_id,
+                timestamp=datetime.now(),
+                target_id=target_id,
+                fields=fields,
+            )
+            self._history.append(event)
+            subscribers = list(self._subscribers) if self._subscribers else ()
+
+        for subscription in subscribers:
+            subscription._offer(event)
+        return event
+
+    def subscribe(
+        self,
+        maxsize: int = 1024,
+        overflow: str = "block",
+        block_timeout: float = 1.0,
+        since: int | None = None,
+    ) -> Subscription:
+        """Create a new subscription.
+
+        Args:
+            maxsize: Maximum number of buffered events
+            overflow: ``"block"``, ``"drop_oldest"`` or ``"disconnect"``
+            block_timeout: Seconds a publisher may block under ``"block"``
+            since: Optional sequence number to replay history after
+
+        Returns:
+            The new subscription
+
+        Raises:
+            HistoryUnavailable: If ``since`` is older than the history buffer
+            ValueError: If the replay would not fit into ``maxsize`` under
+                ``"block"``, where nobody can consume it yet
+        """
+        subscription = Subscription(self, maxsize, overflow, block_timeout)
+        with self._lock:
+            if since is not None:
+                backlog = self._changes_since(since)
+                if overflow == "block" and len(backlog) > maxsize:
+                    raise ValueError(
+                        f"Replay of {len(backlog)} events exceeds maxsize {maxsize}"
+                    )
+                # Fits the empty buffer or is handled by a non-waiting policy,
+                # so publishers are never held up by the replay
+                for event in backlog:
+                    subscription._offer(event)
+                subscription.last_seq = since
+            self._subscribers.append(subscription)
+        return subscription
+
+    def changes_since(self, seq: int) -> list[ChangeEvent]:
+        """Get retained events with a sequence number greater than ``seq``.
+
+        Args:
+            seq: The last sequence number the caller has seen
+
+        Returns:
+            List of events in sequence order
+
+        Raises:
+            HistoryUnavailable: If events after ``seq`` were already evicted
+        """
+        with self._lock:
+            return self._changes_since(seq)
+
+    def _changes_since(self, seq: int) -> list[ChangeEvent]:
+        if seq >= self.last_seq:
+            return []
+        oldest = self._history[0].seq if self._history else self.last_seq + 1
+        if seq + 1 < oldest:
+            raise HistoryUnavailable(
+                f"Events after sequence {seq} are no longer retained"
+            )
+        return [event for event in self._history if event.seq > seq]
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+
+__all__ = [
+    "ChangeType",
+    "ChangeEvent",
+    "ChangeFeed",
+    "Subscription",
+    "SubscriptionLagged",
+    "HistoryUnavailable",
+]
@@ -0,0 +1,254 @@
+"""Typo-tolerant title and tag search backed by a trigram index."""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+import math
+import re
+from typing import TYPE_CHECKING
+
+from .indexes import NodeIndex
+
+if TYPE_CHECKING:
+    from .knowledge_node import KnowledgeNode
+
+_WORD = re.compile(r"\w+")
+
+
+def trigrams(term: str) -> set[str]:
+    """Get the padded character trigrams of a term.
+
+    Two leading and one trailing space make short terms (including
+    two-character Japanese words) produce useful trigrams and weight
+    matching prefixes.
+
+    Args:
+        term: A normalized term
+
+    Returns:
+        Set of trigrams
+    """
+    padded = f"  {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, max_distance: int | None = None) -> int:
+    """Levenshtein distance, optionally bounded.
+
+    Args:
+        a: First string
+        b: Second string
+        max_distance: Stop early and return ``max_distance + 1`` once the
+            distance is known to exceed this bound
+
+    Returns:
+        The edit distance (or ``max_distance + 1`` if it exceeds the bound)
+    """
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b),
+                )
+            )
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def node_terms(node: "KnowledgeNode") -> set[str]:
+    """Get the fuzzy-searchable vocabulary of a node.
+
+    Args:
+        node: The node
+
+    Returns:
+        The normalized title words (whole runs for unspaced Japanese), the
+        whole title with whitespace collapsed, and the tags, taken from the
+        node's cached search keys
+    """
+    keys = node._search_keys
+    terms = set(_WORD.findall(keys.title))
+    title = " ".join(keys.title.split())
+    if title:
+        terms.add(title)
+    terms.update(keys.tags)
+    return terms
+
+
+class TrigramIndex(NodeIndex):
+    """Trigram inverted index over title, title word and tag vocabulary.
+
+    Distinct terms are indexed once no matter how many nodes use them, so
+    candidate generation cost depends on vocabulary, not node count.
+    """
+
+    def __init__(self):
+        """Initialize an empty trigram index."""
+        self._term_nodes: dict[str, set[str]] = {}
+        self._term_sizes: dict[str, int] = {}
+        self._trigram_terms: dict[str, set[str]] = {}
+
+    def add(self, node: "KnowledgeNode") -> None:
+        """Index the title and tag terms of a node.
+
+        Args:
+            node: The node to index
+        """
+        for term in node_terms(node):
+            ids = self._term_nodes.get(term)
+            if ids is None:
+                ids = self._term_nodes[term] = set()
+                grams = trigrams(term)
+                self._term_sizes[term] = len(grams)
+                for gram in grams:
+                    self._trigram_terms.setdefault(gram, set()).add(term)
+            ids.add(node.id)
+
+    def remove(self, node: "KnowledgeNode") -> None:
+        """Remove the title and tag terms of a node.
+
+        Args:
+            node: The node to remove
+        """
+        for term in node_terms(node):
+            ids = self._term_nodes.get(term)
+            if ids is None:
+                continue
+            ids.discard(node.id)
+            if ids:
+                continue
+            del self._term_nodes[term]
+            del self._term_sizes[term]
+            for gram in trigrams(term):
+                terms = self._trigram_terms.get(gram)
+                if terms is not None:
+                    terms.discard(term)
+                    if not terms:
+                        del self._trigram_terms[gram]
+
+    def clear(self) -> None:
+        """Remove all entries from the index."""
+        self._term_nodes.clear()
+        self._term_sizes.clear()
+        self._trigram_terms.clear()
+
+    def similar_terms(self, query: str, threshold: float) -> list[tuple[str, float]]:
+        """Find vocabulary terms similar to a query.
+
+        Uses prefix filtering: a term with Jaccard similarity of at least
+        ``threshold`` must share ``ceil(threshold * |Q|)`` of the query's
+        ``|Q|`` trigrams, so it must contain at least one of the
+        ``|Q| - ceil(threshold * |Q|) + 1`` rarest ones. Only postings of
+        those rare trigrams are read.
+
+        Args:
+            query: The normalized query
+            threshold: Minimum Jaccard similarity of trigram sets in (0, 1]
+
+        Returns:
+            List of (term, similarity) pairs, most similar first
+        """
+        empty: set[str] = set()
+        postings = sorted(
+            (self._trigram_terms.get(gram, empty) for gram in trigrams(query)),
+            key=len,
+        )
+        size = len(postings)
+        required = max(1, math.ceil(threshold * size))
+
+        candidates: set[str] = set()
+        for posting in postings[: size - required + 1]:
+            candidates.update(posting)
+
+        results = []
+        for term in candidates:
+            overlap = sum(1 for posting in postings if term in posting)
+            similarity = overlap / (size + self._term_sizes[term] - overlap)
+            if similarity >= threshold:
+                results.append((term, similarity))
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results
+
+    def nodes_for(self, term: str) -> Iterable[str]:
+        """Get the IDs of nodes using a term.
+
+        Args:
+            term: A vocabulary term
+
+        Returns:
+            Node IDs
+        """
+        return self._term_nodes.get(term, ())
+
+
+@dataclass
+class FuzzyMatch:
+    """A node found by fuzzy search.
+
+    Attributes:
+        node: The matching node
+        score: Trigram similarity of the best matching term in (0, 1]
+        term: The title word, title or tag that matched
+    """
+
+    node: "KnowledgeNode"
+    score: float
+    term: str
+
+
+def fuzzy_search(
+    self,
+    query: str,
+    limit: int = 10,
+    threshold: float = 0.25,
+    max_edits: int | None = None,
+) -> list[FuzzyMatch]:
+    """Search titles and tags tolerating typos.
+
+    The trigram index is built on first use and then maintained on every
+    change.
+
+    Args:
+        query: Text to search for (case- and width-insensitive)
+        limit: Maximum number of results
+        threshold: Minimum trigram similarity in (0, 1]
+        max_edits: Optional maximum Levenshtein distance between the query
+            and the matched term
+
+    Returns:
+        List of matches, most similar first
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError("threshold must be in (0, 1]")
+    normalized = " ".join(self._key_index.normalize(query).split())
+    if not normalized or limit <= 0:
+        return []
+
+    index = self._lazy_index("fuzzy", TrigramIndex)
+    results: list[FuzzyMatch] = []
+    seen: set[str] = set()
+    for term, score in index.similar_terms(normalized, threshold):
+        if max_edits is not None:
+            if edit_distance(normalized, term, max_edits) > max_edits:
+                continue
+        for node_id in index.nodes_for(term):
+            if node_id in seen:
+                continue
+            seen.add(node_id)
+            results.append(FuzzyMatch(self._nodes[node_id], score, term))
+            if len(results) >= limit:
+                return results
+    return results
+
+
+# Import and extend KnowledgeBase with fuzzy search
+from .knowledge_node import KnowledgeBase
+
+KnowledgeBase.fuzzy_search = fuzzy_search  # type: ignore[attr-defined]
@@ -0,0 +1,265 @@
+"""Dense integer node handles and time-sortable node IDs."""
+
+from array import array
+from collections.abc import Iterable
+from datetime import datetime, timezone
+import os
+import threading
+import time
+
+# Crockford's base32 alphabet, as used by ULIDs
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {char: value for value, char in enumerate(_ALPHABET)}
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+ID_SCHEMES = ("uuid", "ulid")
+
+
+class UlidGenerator:
+    """Generates ULID-style IDs that sort by creation time.
+
+    An ID is a 48-bit millisecond Unix timestamp followed by 80 random
+    bits, written as 26 base32 characters so that string order equals
+    numeric order. Within one millisecond the random part is incremented
+    instead of redrawn, so IDs from one generator for the same millisecond
+    are strictly increasing. Explicit timestamps are always encoded as
+    given, even when they are older than earlier IDs.
+    """
+
+    # Milliseconds whose last random part is remembered
+    TRACKED_MS = 1024
+
+    def __init__(self):
+        """Initialize the generator."""
+        self._last_random: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def new(self, timestamp: datetime | None = None) -> str:
+        """Generate an ID.
+
+        Args:
+            timestamp: Creation time to encode (defaults to now)
+
+        Returns:
+            The 26-character ID
+        """
+        ms = int((timestamp.timestamp() if timestamp else time.time()) * 1000)
+        with self._lock:
+            last = self._last_random.pop(ms, None)
+            if last is not None and last < _RANDOM_MAX:
+                random_part = last + 1
+            else:
+                random_part = int.from_bytes(os.urandom(10), "big")
+            self._last_random[ms] = random_part
+            if len(self._last_random) > self.TRACKED_MS:
+                # Dicts keep insertion order; forget the least recently used
+                del self._last_random[next(iter(self._last_random))]
+        return encode_ulid(ms, random_part)
+
+
+def encode_ulid(ms: int, random_part: int) -> str:
+    """Encode a timestamp and random bits as a ULID string.
+
+    Args:
+        ms: Milliseconds since the Unix epoch (48 bits)
+        random_part: Random bits (80 bits)
+
+    Returns:
+        The 26-character ID
+    """
+    value = (ms << _RANDOM_BITS) | random_part
+    chars = []
+    for _ in range(26):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def ulid_timestamp(node_id: str) -> datetime | None:
+    """Get the creation time encoded in a ULID.
+
+    Args:
+        node_id: A node ID
+
+    Returns:
+        The encoded time (UTC), or None if the ID is not a ULID
+    """
+    if len(node_id) != 26:
+        return None
+    ms = 0
+    for char in node_id[:10]:
+        value = _DECODE.get(char)
+        if value is None:
+            return None
+        ms = (ms << 5) | value
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+_default_generator = UlidGenerator()
+
+
+def new_ulid(timestamp: datetime | None = None) -> str:
+    """Generate a time-sortable node ID with the shared generator.
+
+    Args:
+        timestamp: Creation time to encode (defaults to now)
+
+    Returns:
+        The 26-character ID
+    """
+    return _default_generator.new(timestamp)
+
+
+class HandleTable:
+    """Bidirectional mapping between node IDs and dense integer handles.
+
+    Handles index compact arrays instead of hashing ID strings. Handles of
+    deleted nodes are reused, so they stay below the peak node count; a
+    node keeps its handle for as long as it exists.
+    """
+
+    def __init__(self):
+        """Initialize an empty table."""
+        self._ids: list[str | None] = []
+        self._handles: dict[str, int] = {}
+        self._free: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._handles
+
+    @property
+    def capacity(self) -> int:
+        """One more than the largest handle ever assigned."""
+        return len(self._ids)
+
+    def assign(self, node_id: str) -> int:
+        """Get the handle of a node, assigning one if it has none.
+
+        Args:
+            node_id: The node ID
+
+        Returns:
+            The handle
+        """
+        handle = self._handles.get(node_id)
+        if handle is None:
+            if self._free:
+                handle = self._free.pop()
+                self._ids[handle] = node_id
+            else:
+                handle = len(self._ids)
+                self._ids.append(node_id)
+            self._handles[node_id] = handle
+        return handle
+
+    def assign_many(self, node_ids: Iterable[str]) -> None:
+        """Assign handles to a batch of nodes.
+
+        Args:
+            node_ids: The node IDs
+        """
+        for node_id in node_ids:
+            self.assign(node_id)
+
+    def release(self, node_id: str) -> None:
+        """Free the handle of a deleted node.
+
+        Args:
+            node_id: The node ID
+        """
+        handle = self._handles.pop(node_id, None)
+        if handle is not None:
+            self._ids[handle] = None
+            self._free.append(handle)
+
+    def copy(self) -> "HandleTable":
+        """Copy the table, e.g. to pair it with a snapshot.
+
+        Returns:
+            An independent table with the same handles
+        """
+        table = HandleTable()
+        table._ids = list(self._ids)
+        table._handles = dict(self._handles)
+        table._free = list(self._free)
+        return table
+
+    def clear(self) -> None:
+        """Remove all handles."""
+        self._ids.clear()
+        self._handles.clear()
+        self._free.clear()
+
+    def handle(self, node_id: str) -> int | None:
+        """Look up the handle of a node.
+
+        Args:
+            node_id: The node ID
+
+        Returns:
+            The handle, or None if the node has none
+        """
+        return self._handles.get(node_id)
+
+    def node_id(self, handle: int) -> str | None:
+        """Look up the node ID of a handle.
+
+        Args:
+            handle: The handle
+
+        Returns:
+            The node ID, or None if the handle is free or out of range
+        """
+        return self._ids[handle] if 0 <= handle < len(self._ids) else None
+
+
+class LinkGraph:
+    """Snapshot of the links between existing nodes in CSR form.
+
+    The targets of the node with handle ``h`` are
+    ``indices[indptr[h]:indptr[h + 1]]``. Links to missing nodes are left
+    out. Both arrays hold unsigned machine integers, a few bytes per link
+    instead of a list of ID strings.
+    """
+
+    def __init__(self, handles: HandleTable, indptr: array, indices: array):
+        """Wrap prebuilt arrays. Use ``KnowledgeBase.link_graph`` instead.
+
+        Args:
+            handles: Table translating handles to node IDs, not modified
+                afterwards
+            indptr: Row offsets, ``capacity + 1`` entries
+            indices: Target handles of all rows, concatenated
+        """
+        self.handles = handles
+        self.indptr = indptr
+        self.indices = indices
+
+    def targets(self, handle: int) -> array:
+        """Get the target handles of a node.
+
+        Args:
+            handle: The source handle
+
+        Returns:
+            Array of target handles
+        """
+        return self.indices[self.indptr[handle] : self.indptr[handle + 1]]
+
+    def neighbors(self, node_id: str) -> list[str]:
+        """Get the IDs of the existing nodes a node links to.
+
+        Args:
+            node_id: The source node ID
+
+        Returns:
+            Target node IDs in link order
+        """
+        handle = self.handles.handle(node_id)
+        if handle is None or handle + 1 >= len(self.indptr):
+            return []
+        return [self.handles.node_id(target) for target in self.targets(handle)]
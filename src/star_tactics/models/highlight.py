@@ -0,0 +1,191 @@
+"""Match positions and highlighted snippets for text search results.
+
+Matches are found in the cached normalized keys, so titles and bodies are
+not lowercased or copied per search. Positions are mapped back to the
+original text through each node's ``OffsetMap``, and a snippet slices only
+its window out of the content.
+"""
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from .normalize import OffsetMap, SearchKeyIndex
+
+if TYPE_CHECKING:
+    from .knowledge_node import KnowledgeNode
+
+
+def _find_all(
+    text: str, query: str, start: int = 0, stop: int | None = None
+) -> list[tuple[int, int]]:
+    """Get the spans of non-overlapping occurrences within text[start:stop]."""
+    stop = len(text) if stop is None else stop
+    spans = []
+    position = text.find(query, start, stop)
+    while position != -1:
+        spans.append((position, position + len(query)))
+        position = text.find(query, position + len(query), stop)
+    return spans
+
+
+@dataclass
+class TextMatch:
+    """A text search result with where the query occurs.
+
+    Offsets refer to the node's original title and content.
+
+    Attributes:
+        node: The matching node
+        title: Spans of every occurrence in the title
+        content: Span of the first occurrence in the content, or None
+    """
+
+    node: "KnowledgeNode"
+    title: list[tuple[int, int]]
+    content: tuple[int, int] | None
+
+
+@dataclass
+class Snippet:
+    """An excerpt of a node's content around a match.
+
+    Attributes:
+        text: The excerpt
+        start: Offset of the excerpt in the content
+        highlights: Spans of the query within ``text``
+        truncated_start: Whether content precedes the excerpt
+        truncated_end: Whether content follows the excerpt
+    """
+
+    text: str
+    start: int
+    highlights: list[tuple[int, int]] = field(default_factory=list)
+    truncated_start: bool = False
+    truncated_end: bool = False
+
+    def render(
+        self, before: str = "<mark>", after: str = "</mark>", ellipsis: str = "…"
+    ) -> str:
+        """Render the excerpt with highlight markers.
+
+        Args:
+            before: Inserted before each highlight
+            after: Inserted after each highlight
+            ellipsis: Added where the excerpt cuts the content
+
+        Returns:
+            The marked-up excerpt
+        """
+        parts = [ellipsis] if self.truncated_start else []
+        position = 0
+        for start, end in self.highlights:
+            parts += [self.text[position:start], before, self.text[start:end], after]
+            position = end
+        parts.append(self.text[position:])
+        if self.truncated_end:
+            parts.append(ellipsis)
+        return "".join(parts)
+
+
+def _title_spans(
+    key_index: SearchKeyIndex, node: "KnowledgeNode", query: str
+) -> list[tuple[int, int]]:
+    title = node._search_keys.title
+    spans = _find_all(title, query)
+    if not spans:
+        return []
+    offsets = OffsetMap(node.title, key_index.fold_kana)
+    return [(offsets.original(s), offsets.original(e, end=True)) for s, e in spans]
+
+
+def search_matches(self, text: str, limit: int | None = None) -> list[TextMatch]:
+    """Search nodes by text and report where the text occurs.
+
+    Args:
+        text: Text to search for (case- and width-insensitive)
+        limit: Maximum number of results
+
+    Returns:
+        List of matches in node order
+    """
+    if not text or limit == 0:
+        return []
+    key_index = self._key_index
+    query = key_index.normalize(text)
+    matches = []
+    for node in self._nodes.values():
+        title = _title_spans(key_index, node, query)
+        position = key_index.content(node).find(query)
+        if position == -1 and not title:
+            continue
+        content = None
+        if position != -1:
+            offsets = key_index.offsets(node)
+            content = (
+                offsets.original(position),
+                offsets.original(position + len(query), end=True),
+            )
+        matches.append(TextMatch(node, title, content))
+        if len(matches) == limit:
+            break
+    return matches
+
+
+def snippet(self, node: "KnowledgeNode", query: str, width: int = 160) -> Snippet:
+    """Build a highlighted excerpt of a node's content around a query.
+
+    The excerpt is centered on the first occurrence in the content and
+    highlights every occurrence inside it. Without an occurrence it is the
+    start of the content. Only the excerpt is copied out of the content.
+
+    Args:
+        node: The node
+        query: The searched text (case- and width-insensitive)
+        width: Length of the excerpt in normalized characters
+
+    Returns:
+        The excerpt
+    """
+    if width <= 0:
+        raise ValueError("width must be positive")
+    key_index = self._key_index
+    if node._search_keys is None:
+        # A node outside the knowledge base, e.g. from get_node_at
+        key_index.add(node)
+    key = key_index.content(node)
+    normalized = key_index.normalize(query) if query else ""
+    position = key.find(normalized) if normalized else -1
+
+    if position == -1:
+        start, stop = 0, min(width, len(key))
+        spans = []
+    else:
+        start = max(0, position - max(0, width - len(normalized)) // 2)
+        stop = min(len(key), start + width)
+        start = max(0, min(start, stop - width))
+        spans = _find_all(key, normalized, position, stop)
+
+    offsets = key_index.offsets(node)
+    content = node.content
+    original_start = offsets.original(start)
+    original_stop = offsets.original(stop, end=True)
+    return Snippet(
+        content[original_start:original_stop],
+        original_start,
+        [
+            (
+                offsets.original(s) - original_start,
+                offsets.original(e, end=True) - original_start,
+            )
+            for s, e in spans
+        ],
+        original_start > 0,
+        original_stop < len(content),
+    )
+
+
+# Import and extend KnowledgeBase with match positions and snippets
+from .knowledge_node import KnowledgeBase
+
+KnowledgeBase.search_matches = search_matches  # type: ignore[attr-defined]
+KnowledgeBase.snippet = snippet  # type: ignore[attr-defined]
@@ -0,0 +1,603 @@
+"""Per-node revision history stored as reversible text deltas."""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import TYPE_CHECKING
+
+from .compression import CompressedText, content_from_json, content_to_json
+from .indexes import NodeIndex
+
+if TYPE_CHECKING:
+    from .compression import ContentCodec
+    from .knowledge_node import KnowledgeNode
+
+FIELDS = ("title", "content", "tags", "links")
+
+
+def _common_prefix(a: str, b: str) -> int:
+    """Length of the common prefix, by binary search over slice compares."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    """Length of the common suffix, at most ``limit``."""
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid : len(a) - lo] == b[len(b) - mid : len(b) - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class TextDelta:
+    """A reversible difference between two texts.
+
+    Each operation replaces ``old[a1:a2]`` with ``new[b1:b2]`` and keeps
+    both segments, so the delta turns the old text into the new one and
+    back. Unchanged text is not stored.
+    """
+
+    __slots__ = ("ops",)
+
+    def __init__(self, ops: list[tuple[int, int, int, int, str, str]]):
+        """Wrap delta operations.
+
+        Args:
+            ops: ``(a1, a2, b1, b2, old_segment, new_segment)`` tuples in
+                ascending order
+        """
+        self.ops = ops
+
+    @classmethod
+    def between(cls, old: str, new: str) -> "TextDelta":
+        """Compute the delta between two texts.
+
+        The common prefix and suffix are cut off first, so a local edit
+        costs time proportional to the edited region; the rest is diffed
+        line by line with ``difflib``.
+
+        Args:
+            old: The earlier text
+            new: The later text
+
+        Returns:
+            The delta
+        """
+        prefix = _common_prefix(old, new)
+        suffix = _common_suffix(old, new, min(len(old), len(new)) - prefix)
+        old_mid = old[prefix : len(old) - suffix]
+        new_mid = new[prefix : len(new) - suffix]
+        if not old_mid or not new_mid or "\n" not in old_mid + new_mid:
+            if not old_mid and not new_mid:
+                return cls([])
+            return cls(
+                [
+                    (
+                        prefix,
+                        prefix + len(old_mid),
+                        prefix,
+                        prefix + len(new_mid),
+                        old_mid,
+                        new_mid,
+                    )
+                ]
+            )
+
+        old_lines = old_mid.splitlines(keepends=True)
+        new_lines = new_mid.splitlines(keepends=True)
+        old_offsets = [prefix]
+        for line in old_lines:
+            old_offsets.append(old_offsets[-1] + len(line))
+        new_offsets = [prefix]
+        for line in new_lines:
+            new_offsets.append(new_offsets[-1] + len(line))
+
+        matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+        ops = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            a1, a2 = old_offsets[i1], old_offsets[i2]
+            b1, b2 = new_offsets[j1], new_offsets[j2]
+            ops.append((a1, a2, b1, b2, old[a1:a2], new[b1:b2]))
+        return cls(ops)
+
+    def forward(self, old: str) -> str:
+        """Turn the old text into the new one.
+
+        Args:
+            old: The earlier text
+
+        Returns:
+            The later text
+        """
+        parts = []
+        pos = 0
+        for a1, a2, _, _, _, segment in self.ops:
+            parts.append(old[pos:a1])
+            parts.append(segment)
+            pos = a2
+        parts.append(old[pos:])
+        return "".join(parts)
+
+    def backward(self, new: str) -> str:
+        """Turn the new text into the old one.
+
+        Args:
+            new: The later text
+
+        Returns:
+            The earlier text
+        """
+        parts = []
+        pos = 0
+        for _, _, b1, b2, segment, _ in self.ops:
+            parts.append(new[pos:b1])
+            parts.append(segment)
+            pos = b2
+        parts.append(new[pos:])
+        return "".join(parts)
+
+    @property
+    def size(self) -> int:
+        """Number of characters stored in the delta."""
+        return sum(len(op[4]) + len(op[5]) for op in self.ops)
+
+
+@dataclass(frozen=True)
+class RevisionInfo:
+    """Summary of one revision of a node.
+
+    Attributes:
+        revision: Revision number, 0 for the first recorded state
+        timestamp: The node's ``updated_at`` after the change
+        fields: Names of the fields changed by this revision
+        checkpoint: Whether the full state is kept for this revision
+        delta_size: Characters stored for the content change
+    """
+
+    revision: int
+    timestamp: datetime
+    fields: tuple[str, ...]
+    checkpoint: bool
+    delta_size: int
+
+
+# Node state: (title, content, tags, links); content may still be compressed
+_State = tuple[str, "str | CompressedText", tuple[str, ...], tuple[str, ...]]
+
+
+def _text(content: "str | CompressedText") -> str:
+    return content if isinstance(content, str) else content.decode()
+
+
+def _state_of(node: "KnowledgeNode") -> _State:
+    return (node.title, node._content, tuple(node.tags), tuple(node.links))
+
+
+class _Revision:
+    """One recorded change: old/new values, a content delta, a checkpoint."""
+
+    __slots__ = ("timestamp", "changes", "snapshot")
+
+    def __init__(self, timestamp: datetime, changes: dict, snapshot: _State | None):
+        self.timestamp = timestamp
+        # field -> (old, new) for title/tags/links, TextDelta for content
+        self.changes = changes
+        self.snapshot = snapshot
+
+    def forward(self, state: list) -> None:
+        for field, change in self.changes.items():
+            index = FIELDS.index(field)
+            if field == "content":
+                state[index] = change.forward(_text(state[index]))
+            else:
+                state[index] = change[1]
+
+    def backward(self, state: list) -> None:
+        for field, change in self.changes.items():
+            index = FIELDS.index(field)
+            if field == "content":
+                state[index] = change.backward(_text(state[index]))
+            else:
+                state[index] = change[0]
+
+
+class NodeHistory:
+    """All revisions of one node.
+
+    Every revision stores its changes as reversible deltas. Every
+    ``checkpoint_interval``-th revision additionally keeps the full state,
+    and the latest state is always kept, so reconstructing any revision
+    applies at most about ``checkpoint_interval / 2`` deltas.
+    """
+
+    __slots__ = ("created_at", "revisions", "timestamps", "current", "interval")
+
+    def __init__(
+        self,
+        created_at: datetime,
+        interval: int,
+        current: _State,
+        revisions: list[_Revision],
+    ):
+        """Wrap recorded revisions. Use ``start`` for a new history.
+
+        Args:
+            created_at: Creation time of the node
+            interval: Revisions between checkpoints
+            current: State of the latest revision
+            revisions: Recorded revisions, oldest first
+        """
+        self.created_at = created_at
+        self.interval = interval
+        self.current = current
+        self.revisions = revisions
+        self.timestamps = [entry.timestamp for entry in revisions]
+
+    @classmethod
+    def start(cls, node: "KnowledgeNode", interval: int) -> "NodeHistory":
+        """Start the history of a node with its current state as revision 0.
+
+        Args:
+            node: The node
+            interval: Revisions between checkpoints
+
+        Returns:
+            The history
+        """
+        current = _state_of(node)
+        return cls(
+            node.created_at,
+            interval,
+            current,
+            [_Revision(node.updated_at, {}, current)],
+        )
+
+    def __len__(self) -> int:
+        return len(self.revisions)
+
+    def record(self, node: "KnowledgeNode") -> bool:
+        """Append a revision if the node differs from the latest one.
+
+        Args:
+            node: The node after a change
+
+        Returns:
+            Whether a revision was added
+        """
+        state = _state_of(node)
+        changes: dict = {}
+        for index, field in enumerate(FIELDS):
+            old, new = self.current[index], state[index]
+            if old is new:
+                continue
+            if field == "content":
+                old_text, new_text = _text(old), _text(new)
+                if old_text != new_text:
+                    changes[field] = TextDelta.between(old_text, new_text)
+            elif old != new:
+                changes[field] = (old, new)
+        if not changes:
+            return False
+
+        number = len(self.revisions)
+        snapshot = state if number % self.interval == 0 else None
+        self.revisions.append(_Revision(node.updated_at, changes, snapshot))
+        self.timestamps.append(node.updated_at)
+        self.current = state
+        return True
+
+    def revision_at(self, timestamp: datetime) -> int | None:
+        """Find the revision that was current at a point in time.
+
+        Args:
+            timestamp: The point in time
+
+        Returns:
+            The revision number, or None if the node had no revision yet
+        """
+        index = bisect_right(self.timestamps, timestamp) - 1
+        return index if index >= 0 else None
+
+    def state(self, revision: int) -> _State:
+        """Reconstruct the state of a revision.
+
+        Starts from the nearest checkpoint or the latest state and applies
+        the deltas in between, forwards or backwards.
+
+        Args:
+            revision: Revision number in ``[0, len(self))``
+
+        Returns:
+            (title, content, tags, links) with plain-text content
+        """
+        last = len(self.revisions) - 1
+        base = revision - revision % self.interval
+        following = base + self.interval
+        if last - revision <= min(revision - base, following - revision):
+            state = list(self.current)
+            for number in range(last, revision, -1):
+                self.revisions[number].backward(state)
+        elif following <= last and following - revision < revision - base:
+            state = list(self.revisions[following].snapshot)
+            for number in range(following, revision, -1):
+                self.revisions[number].backward(state)
+        else:
+            state = list(self.revisions[base].snapshot)
+            for number in range(base + 1, revision + 1):
+                self.revisions[number].forward(state)
+        state[1] = _text(state[1])
+        return tuple(state)
+
+    def info(self) -> list[RevisionInfo]:
+        """Summarize all revisions.
+
+        Returns:
+            One entry per revision, oldest first
+        """
+        return [
+            RevisionInfo(
+                revision=number,
+                timestamp=entry.timestamp,
+                fields=tuple(entry.changes),
+                checkpoint=entry.snapshot is not None,
+                delta_size=(
+                    entry.changes["content"].size if "content" in entry.changes else 0
+                ),
+            )
+            for number, entry in enumerate(self.revisions)
+        ]
+
+    def rebuild_checkpoints(self) -> None:
+        """Recreate checkpoint states from the latest state and the deltas."""
+        state = list(self.current)
+        for number in range(len(self.revisions) - 1, -1, -1):
+            entry = self.revisions[number]
+            if number % self.interval == 0:
+                entry.snapshot = tuple(state)
+            entry.backward(state)
+
+
+class HistoryIndex(NodeIndex):
+    """Records a revision each time a node is indexed with changed fields.
+
+    Registered like an index so it sees every created, updated and loaded
+    node. Removing a node keeps its history, so deleted nodes stay
+    auditable.
+    """
+
+    def __init__(self, checkpoint_interval: int = 16):
+        """Initialize an empty history.
+
+        Args:
+            checkpoint_interval: Revisions between full checkpoints
+        """
+        self.checkpoint_interval = checkpoint_interval
+        self.histories: dict[str, NodeHistory] = {}
+
+    def add(self, node: "KnowledgeNode") -> None:
+        """Record the state of a created or changed node.
+
+        Args:
+            node: The node after the change
+        """
+        history = self.histories.get(node.id)
+        if history is None:
+            self.histories[node.id] = NodeHistory.start(node, self.checkpoint_interval)
+        else:
+            history.record(node)
+
+    def remove(self, node: "KnowledgeNode") -> None:
+        """Keep the history; the next ``add`` is diffed against it.
+
+        Args:
+            node: The node about to change or be deleted
+        """
+
+    def clear(self) -> None:
+        """Forget all histories."""
+        self.histories.clear()
+
+
+def history_to_json(knowledge_base) -> dict | None:
+    """Serialize the revision history for storage.
+
+    Only deltas are written; checkpoints are rebuilt from the stored
+    nodes on load. Nodes that were deleted also get their final state.
+
+    Args:
+        knowledge_base: The knowledge base being saved
+
+    Returns:
+        The history, or None if history is not enabled
+    """
+    index = knowledge_base._lazy_indexes.get("history")
+    if index is None:
+        return None
+    nodes = {}
+    for node_id, history in index.histories.items():
+        revisions = []
+        for entry in history.revisions:
+            changes = {}
+            for field, change in entry.changes.items():
+                if field == "content":
+                    changes[field] = [list(op) for op in change.ops]
+                elif field == "title":
+                    changes[field] = list(change)
+                else:
+                    changes[field] = [list(change[0]), list(change[1])]
+            revisions.append({"t": entry.timestamp.isoformat(), "changes": changes})
+        data = {"created_at": history.created_at.isoformat(), "revisions": revisions}
+        if node_id not in knowledge_base._nodes:
+            title, content, tags, links = history.current
+            data["state"] = {
+                "title": title,
+                "content": content_to_json(content),
+                "tags": list(tags),
+                "links": list(links),
+            }
+        nodes[node_id] = data
+    return {"checkpoint_interval": index.checkpoint_interval, "nodes": nodes}
+
+
+def history_from_json(
+    knowledge_base, data: dict | None, codec: "ContentCodec | None"
+) -> None:
+    """Restore a history written by ``history_to_json``.
+
+    Enables history with the stored checkpoint interval unless it is
+    already enabled. Call after the nodes are loaded.
+
+    Args:
+        knowledge_base: The knowledge base being loaded
+        data: The stored history
+        codec: Codec for compressed final states of deleted nodes
+    """
+    if data is None:
+        return
+    index = knowledge_base._lazy_indexes.get("history")
+    if index is None:
+        knowledge_base.enable_history(data.get("checkpoint_interval", 16))
+        index = knowledge_base._lazy_indexes["history"]
+
+    for node_id, stored in data["nodes"].items():
+        node = knowledge_base._nodes.get(node_id)
+        if node is not None:
+            current = _state_of(node)
+        elif "state" in stored:
+            state = stored["state"]
+            current = (
+                state["title"],
+                content_from_json(state["content"], codec),
+                tuple(state["tags"]),
+                tuple(state["links"]),
+            )
+        else:
+            continue
+
+        revisions = []
+        for entry in stored["revisions"]:
+            changes = {}
+            for field, change in entry["changes"].items():
+                if field == "content":
+                    changes[field] = TextDelta([tuple(op) for op in change])
+                elif field == "title":
+                    changes[field] = tuple(change)
+                else:
+                    changes[field] = (tuple(change[0]), tuple(change[1]))
+            revisions.append(
+                _Revision(datetime.fromisoformat(entry["t"]), changes, None)
+            )
+        history = NodeHistory(
+            datetime.fromisoformat(stored["created_at"]),
+            index.checkpoint_interval,
+            current,
+            revisions,
+        )
+        history.rebuild_checkpoints()
+        index.histories[node_id] = history
+
+
+def enable_history(self, checkpoint_interval: int = 16) -> None:
+    """Record a revision of a node every time it changes.
+
+    The current state of every existing node becomes its revision 0.
+
+    Args:
+        checkpoint_interval: Revisions between full copies; higher values
+            use less memory and make reconstruction slower
+
+    Raises:
+        ValueError: If history is already enabled or the interval is not
+            positive
+    """
+    if checkpoint_interval < 1:
+        raise ValueError("checkpoint_interval must be positive")
+    if "history" in self._lazy_indexes:
+        raise ValueError("History is already enabled")
+    self._lazy_index("history", lambda: HistoryIndex(checkpoint_interval))
+
+
+def _history_index(self) -> HistoryIndex:
+    index = self._lazy_indexes.get("history")
+    if index is None:
+        raise ValueError("History is not enabled; call enable_history() first")
+    return index
+
+
+def get_node_at(self, node_id: str, at: int | datetime) -> "KnowledgeNode | None":
+    """Reconstruct a node as it was at a revision or point in time.
+
+    Works for deleted nodes too.
+
+    Args:
+        node_id: The node ID
+        at: Revision number (negative counts from the latest), or a
+            datetime to get the revision current at that time
+
+    Returns:
+        A detached copy of the node, or None if the node or revision is
+        unknown
+
+    Raises:
+        ValueError: If history is not enabled
+    """
+    from .knowledge_node import KnowledgeNode
+
+    history = _history_index(self).histories.get(node_id)
+    if history is None:
+        return None
+    if isinstance(at, datetime):
+        revision = history.revision_at(at)
+        if revision is None:
+            return None
+    else:
+        revision = at + len(history) if at < 0 else at
+        if not 0 <= revision < len(history):
+            return None
+    title, content, tags, links = history.state(revision)
+    return KnowledgeNode(
+        id=node_id,
+        title=title,
+        content=content,
+        tags=list(tags),
+        links=list(links),
+        created_at=history.created_at,
+        updated_at=history.timestamps[revision],
+    )
+
+
+def node_history(self, node_id: str) -> list[RevisionInfo]:
+    """List the revisions of a node.
+
+    Args:
+        node_id: The node ID
+
+    Returns:
+        Revisions oldest first, empty if the node has no history
+
+    Raises:
+        ValueError: If history is not enabled
+    """
+    history = _history_index(self).histories.get(node_id)
+    return history.info() if history is not None else []
+
+
+# Import and extend KnowledgeBase with revision history
+from .knowledge_node import KnowledgeBase
+
+KnowledgeBase.enable_history = enable_history  # type: ignore[attr-defined]
+KnowledgeBase.get_node_at = get_node_at  # type: ignore[attr-defined]
+KnowledgeBase.node_history = node_history  # type: ignore[attr-defined]
@@ -0,0 +1,381 @@
+"""Secondary indexes maintained by KnowledgeBase."""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .knowledge_node import KnowledgeNode
+
+
+class NodeIndex(ABC):
+    """Abstract base class for indexes kept in sync with the node collection.
+
+    KnowledgeBase calls ``add`` for new nodes, ``remove`` for deleted ones
+    and ``update`` with a snapshot of the old state and the live node after
+    a mutation, so an index only ever has to reason about whole-node
+    snapshots.
+    """
+
+    @abstractmethod
+    def add(self, node: "KnowledgeNode") -> None:
+        """Index a node.
+
+        Args:
+            node: The node to index
+        """
+        pass
+
+    @abstractmethod
+    def remove(self, node: "KnowledgeNode") -> None:
+        """Remove a previously indexed node.
+
+        Args:
+            node: The node to remove, in the state it was indexed with
+        """
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries from the index."""
+        pass
+
+    def update(self, old: "KnowledgeNode", new: "KnowledgeNode") -> None:
+        """Re-index a changed node.
+
+        Indexes that can tell cheaply that nothing they index has changed
+        override this to skip the work.
+
+        Args:
+            old: Snapshot of the node in the state it was indexed with
+            new: The node after the change
+        """
+        self.remove(old)
+        self.add(new)
+
+    def add_many(self, nodes: Iterable["KnowledgeNode"]) -> None:
+        """Index a batch of nodes.
+
+        Indexes that can build faster in bulk override this.
+
+        Args:
+            nodes: The nodes to index
+        """
+        for node in nodes:
+            self.add(node)
+
+
+class TagIndex(NodeIndex):
+    """Inverted index from normalized tag to the IDs of nodes carrying it.
+
+    Nodes are indexed under their cached search keys, so the index has to
+    run after the ``SearchKeyIndex`` that computes them.
+    """
+
+    def __init__(self, normalize: Callable[[str], str] = str.lower):
+        """Initialize an empty tag index.
+
+        Args:
+            normalize: Normalizes looked-up tags like the cached keys
+        """
+        self._postings: dict[str, set[str]] = {}
+        self._normalize = normalize
+
+    def add(self, node: "KnowledgeNode") -> None:
+        """Index the tags of a node.
+
+        Args:
+            node: The node to index
+        """
+        for tag in node._search_keys.tags:
+            self._postings.setdefault(tag, set()).add(node.id)
+
+    def remove(self, node: "KnowledgeNode") -> None:
+        """Remove the tags of a node from the index.
+
+        Args:
+            node: The node to remove
+        """
+        for tag in node._search_keys.tags:
+            posting = self._postings.get(tag)
+            if posting is None:
+                continue
+            posting.discard(node.id)
+            if not posting:
+                del self._postings[tag]
+
+    def clear(self) -> None:
+        """Remove all entries from the index."""
+        self._postings.clear()
+
+    def merge(self, postings: dict[str, Iterable[str]]) -> None:
+        """Merge prebuilt postings, e.g. partial indexes from ingest workers.
+
+        Args:
+            postings: Mapping of normalized tag to node IDs
+        """
+        for tag, node_ids in postings.items():
+            posting = self._postings.get(tag)
+            if posting is None:
+                self._postings[tag] = set(node_ids)
+            else:
+                posting.update(node_ids)
+
+    def get(self, tag: str) -> set[str]:
+        """Get the IDs of nodes carrying a tag.
+
+        Args:
+            tag: The tag to look up (case- and width-insensitive)
+
+        Returns:
+            Set of node IDs (must not be mutated by the caller)
+        """
+        return self._postings.get(self._normalize(tag), set())
+
+    def count(self, tag: str) -> int:
+        """Get the number of nodes carrying a tag.
+
+        Args:
+            tag: The tag to look up (case- and width-insensitive)
+
+        Returns:
+            Number of nodes with the tag
+        """
+        return len(self._postings.get(self._normalize(tag), ()))
+
+    def tags(self) -> list[str]:
+        """Get all indexed (normalized) tags.
+
+        Returns:
+            List of tags
+        """
+        return list(self._postings)
+
+
+class LinkIndex(NodeIndex):
+    """Reverse index from link target to the IDs of nodes linking to it.
+
+    The index also tracks which targets do not exist in the knowledge base,
+    so nodes with broken links can be found without scanning every node.
+    """
+
+    def __init__(self, nodes: dict[str, "KnowledgeNode"]):
+        """Initialize an empty link index.
+
+        Args:
+            nodes: The live node mapping of the owning knowledge base
+        """
+        self._nodes = nodes
+        self._backlinks: dict[str, set[str]] = {}
+        self._dangling: set[str] = set()
+
+    def add(self, node: "KnowledgeNode") -> None:
+        """Index the outgoing links of a node.
+
+        Args:
+            node: The node to index
+        """
+        self._dangling.discard(node.id)
+
+        for target in node.links:
+            self._backlinks.setdefault(target, set()).add(node.id)
+            if target not in self._nodes:
+                self._dangling.add(target)
+
+    def remove(self, node: "KnowledgeNode") -> None:
+        """Remove the outgoing links of a node from the index.
+
+        Args:
+            node: The node to remove
+        """
+        for target in node.links:
+            sources = self._backlinks.get(target)
+            if sources is None:
+                continue
+            sources.discard(node.id)
+            if not sources:
+                del self._backlinks[target]
+                self._dangling.discard(target)
+
+        if node.id not in self._nodes and node.id in self._backlinks:
+            self._dangling.add(node.id)
+
+    def clear(self) -> None:
+        """Remove all entries from the index."""
+        self._backlinks.clear()
+        self._dangling.clear()
+
+    def backlinks(self, node_id: str) -> set[str]:
+        """Get the IDs of nodes linking to a node.
+
+        Args:
+            node_id: The link target
+
+        Returns:
+            Set of source node IDs (must not be mutated by the caller)
+        """
+        return self._backlinks.get(node_id, set())
+
+    def broken_sources(self) -> set[str]:
+        """Get the IDs of nodes that have at least one broken link.
+
+        Returns:
+            Set of node IDs
+        """
+        sources: set[str] = set()
+        for target in self._dangling:
+            sources |= self._backlinks[target]
+        return sources
+
+    def broken_source_estimate(self) -> int:
+        """Estimate the number of nodes with broken links without merging sets.
+
+        Returns:
+            Upper bound on the number of nodes with broken links
+        """
+        return sum(len(self._backlinks[target]) for target in self._dangling)
+
+
+def _timestamp(entry: tuple[datetime, str]) -> datetime:
+    return entry[0]
+
+
+class TimestampIndex(NodeIndex):
+    """Sorted index over ``created_at`` and ``updated_at``.
+
+    Each field is kept as a list of ``(timestamp, node_id)`` pairs in
+    ascending order, so range scans and "latest N" lookups cost
+    O(log n + k) via bisection.
+    """
+
+    FIELDS = ("created_at", "updated_at")
+
+    def __init__(self):
+        """Initialize an empty timestamp index."""
+        self._entries: dict[str, list[tuple[datetime, str]]] = {
+            field: [] for field in self.FIELDS
+        }
+
+    def add(self, node: "KnowledgeNode") -> None:
+        """Index the timestamps of a node.
+
+        Args:
+            node: The node to index
+        """
+        for field, entries in self._entries.items():
+            insort(entries, (getattr(node, field), node.id))
+
+    def remove(self, node: "KnowledgeNode") -> None:
+        """Remove the timestamps of a node from the index.
+
+        Args:
+            node: The node to remove
+        """
+        for field, entries in self._entries.items():
+            key = (getattr(node, field), node.id)
+            pos = bisect_left(entries, key)
+            if pos < len(entries) and entries[pos] == key:
+                del entries[pos]
+
+    def clear(self) -> None:
+        """Remove all entries from the index."""
+        for entries in self._entries.values():
+            entries.clear()
+
+    def add_many(self, nodes: Iterable["KnowledgeNode"]) -> None:
+        """Index a batch of nodes with one sort per field.
+
+        Args:
+            nodes: The nodes to index
+        """
+        nodes = list(nodes)
+        for field, entries in self._entries.items():
+            entries.extend((getattr(node, field), node.id) for node in nodes)
+            entries.sort()
+
+    def _bounds(
+        self, field: str, start: datetime | None, end: datetime | None
+    ) -> tuple[int, int]:
+        """Locate the slice of entries within ``[start, end]``.
+
+        Args:
+            field: ``created_at`` or ``updated_at``
+            start: Inclusive lower bound, or None for no bound
+            end: Inclusive upper bound, or None for no bound
+
+        Returns:
+            Half-open ``(lo, hi)`` positions into the sorted entries
+        """
+        entries = self._entries[field]
+        lo = 0 if start is None else bisect_left(entries, start, key=_timestamp)
+        hi = len(entries) if end is None else bisect_right(entries, end, key=_timestamp)
+        return lo, max(lo, hi)
+
+    def range(
+        self, field: str, start: datetime | None = None, end: datetime | None = None
+    ) -> Iterator[str]:
+        """Iterate node IDs whose timestamp lies within ``[start, end]``.
+
+        Args:
+            field: ``created_at`` or ``updated_at``
+            start: Inclusive lower bound, or None for no bound
+            end: Inclusive upper bound, or None for no bound
+
+        Returns:
+            Iterator over node IDs in ascending timestamp order
+        """
+        lo, hi = self._bounds(field, start, end)
+        entries = self._entries[field]
+        return (entries[i][1] for i in range(lo, hi))
+
+    def count(
+        self, field: str, start: datetime | None = None, end: datetime | None = None
+    ) -> int:
+        """Count nodes whose timestamp lies within ``[start, end]``.
+
+        Args:
+            field: ``created_at`` or ``updated_at``
+            start: Inclusive lower bound, or None for no bound
+            end: Inclusive upper bound, or None for no bound
+
+        Returns:
+            Number of matching nodes
+        """
+        lo, hi = self._bounds(field, start, end)
+        return hi - lo
+
+    def after(
+        self, field: str, key: tuple[datetime, str] | None = None
+    ) -> Iterator[str]:
+        """Iterate node IDs ordered after a ``(timestamp, node_id)`` key.
+
+        Args:
+            field: ``created_at`` or ``updated_at``
+            key: Exclusive starting key, or None to start from the oldest
+
+        Returns:
+            Iterator over node IDs in ascending ``(timestamp, node_id)`` order
+        """
+        entries = self._entries[field]
+        start = 0 if key is None else bisect_right(entries, key)
+        return (entries[i][1] for i in range(start, len(entries)))
+
+    def latest(self, field: str, count: int) -> list[str]:
+        """Get the IDs of the nodes with the newest timestamps.
+
+        Args:
+            field: ``created_at`` or ``updated_at``
+            count: Maximum number of IDs to return
+
+        Returns:
+            List of node IDs, newest first
+        """
+        if count <= 0:
+            return []
+        entries = self._entries[field]
+        return [node_id for _, node_id in reversed(entries[-count:])]
+
+
+__all__ = ["NodeIndex", "TagIndex", "LinkIndex", "TimestampIndex"]
@@ -1,8 +1,63 @@
 """Knowledge Node model and CRUD operations for the knowledge base."""
 
+from collections.abc import Callable, Iterable, Iterator
+import copy
 from datetime import datetime
+import importlib
+import itertools
+from typing import TYPE_CHECKING
 import uuid
 
+from .events import ChangeEvent, ChangeFeed, ChangeType, Subscription
+from .handles import ID_SCHEMES, HandleTable, new_ulid
+from .indexes import LinkIndex, NodeIndex, TagIndex, TimestampIndex
+from .normalize import SearchKeyIndex
+
+if TYPE_CHECKING:
+    from ..utils.metrics import Metrics
+    from .compression import CompressedText
+    from .normalize import SearchKeys
+    from .query import Page
+
+# Methods timed when a KnowledgeBase is created with metrics enabled
+INSTRUMENTED_OPERATIONS = (
+    "create_node",
+    "get_node",
+    "update_node",
+    "delete_node",
+    "search_by_tags",
+    "search_by_text",
+    "validate_links",
+    "get_broken_links",
+    "add_bidirectional_link",
+    "remove_bidirectional_link",
+    "get_all_broken_links",
+    "fix_broken_links",
+)
+
+# KnowledgeBase methods added by optional modules of this package, which
+# are imported on first access so that loading the model stays cheap
+EXTENSION_METHODS = {
+    "query": "query",
+    "autocomplete": "autocomplete",
+    "enable_compression": "compression",
+    "compression_stats": "compression",
+    "related_tags": "cooccurrence",
+    "tag_matrix": "cooccurrence",
+    "enable_dedup": "dedup",
+    "find_similar": "dedup",
+    "fuzzy_search": "fuzzy",
+    "search_matches": "highlight",
+    "snippet": "highlight",
+    "enable_history": "history",
+    "get_node_at": "history",
+    "node_history": "history",
+    "suggest_links": "suggest",
+    "suggest_all_links": "suggest",
+    "enable_vectors": "vectors",
+    "find_related": "vectors",
+}
+
 
 class KnowledgeNode:
     """Represents a node in the knowledge base."""
@@ -10,46 +65,137 @@ class KnowledgeNode:
     def __init__(
         self,
         title: str,
-        content: str,
+        content: "str | CompressedText",
         tags: list[str] | None = None,
         links: list[str] | None = None,
         id: str | None = None,
+        created_at: datetime | None = None,
+        updated_at: datetime | None = None,
     ):
         """Initialize a KnowledgeNode.
 
         Args:
             title: The title of the node
-            content: The content of the node
+            content: The content of the node, plain or already compressed
             tags: Optional list of tags
             links: Optional list of linked node IDs
             id: Optional ID (generated if not provided)
+            created_at: Optional creation time (defaults to now)
+            updated_at: Optional last update time (defaults to created_at)
         """
         self.id = id or str(uuid.uuid4())
         self.title = title
         self.content = content
         self.tags = tags or []
         self.links = links or []
-        now = datetime.now()
-        self.created_at = now
-        self.updated_at = now
+        self.created_at = created_at or datetime.now()
+        self.updated_at = updated_at or self.created_at
+        # Normalized search keys, set when the node is indexed
+        self._search_keys: "SearchKeys | None" = None
+
+    @property
+    def content(self) -> str:
+        """The content of the node, decompressed on access if compressed."""
+        content = self._content
+        return content if isinstance(content, str) else content.decode()
+
+    @content.setter
+    def content(self, value: "str | CompressedText") -> None:
+        self._content = value
+
+    def to_dict(self) -> dict:
+        """Convert the node to JSON-compatible data.
+
+        Returns:
+            Dictionary with the ID, fields and ISO 8601 timestamps
+        """
+        return {
+            "id": self.id,
+            "title": self.title,
+            "content": self.content,
+            "tags": self.tags,
+            "links": self.links,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
 
 
 class KnowledgeBase:
     """Manages a collection of knowledge nodes."""
 
-    def __init__(self, storage=None):
+    def __init__(
+        self,
+        storage=None,
+        metrics: "Metrics | None" = None,
+        id_scheme: str = "uuid",
+    ):
         """Initialize an empty knowledge base.
 
         Args:
             storage: Optional storage backend for persistence
+            metrics: Optional metrics collector; when omitted no
+                instrumentation is installed at all
+            id_scheme: ``"uuid"`` for random IDs or ``"ulid"`` for IDs of
+                new nodes that sort by creation time
         """
+        if id_scheme not in ID_SCHEMES:
+            raise ValueError(f"Unknown ID scheme: {id_scheme}")
         self._nodes: dict[str, KnowledgeNode] = {}
+        self._id_scheme = id_scheme
+        # Dense integer handle per node for compact internal structures
+        self._handles = HandleTable()
+        # Insertion position per node, to yield index lookups in _nodes order
+        self._positions: dict[str, int] = {}
+        self._position_counter = itertools.count()
         self._storage = storage
+        self._metrics = metrics
+        # Computes the normalized keys the other indexes read, so runs first
+        self._key_index = SearchKeyIndex()
+        self._tag_index = TagIndex(self._key_index.normalize)
+        self._link_index = LinkIndex(self._nodes)
+        self._time_index = TimestampIndex()
+        self._indexes: list[NodeIndex] = [
+            self._key_index,
+            self._tag_index,
+            self._link_index,
+            self._time_index,
+        ]
+        # Optional indexes built on first use, keyed by name
+        self._lazy_indexes: dict[str, NodeIndex] = {}
+        # Optional callable consulted before creating a node; returning an
+        # existing node ID makes create_node return it instead
+        self._create_hook: (
+            Callable[[str, str, list[str] | None, list[str] | None], str | None] | None
+        ) = None
+        self._changes = ChangeFeed()
+
+        if metrics is not None:
+            metrics.instrument(self, INSTRUMENTED_OPERATIONS)
 
         # Load from storage if provided
         if self._storage:
             self._storage.load(self)
 
+    def __getattr__(self, name: str):
+        """Import the optional module providing a method on first access.
+
+        Args:
+            name: The attribute name
+
+        Returns:
+            The method, once its module has attached it to the class
+
+        Raises:
+            AttributeError: If no module provides the attribute
+        """
+        module = EXTENSION_METHODS.get(name)
+        if module is None:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            )
+        importlib.import_module(f"{__package__}.{module}")
+        return object.__getattribute__(self, name)
+
     def create_node(
         self,
         title: str,
@@ -66,15 +212,33 @@ class KnowledgeBase:
             links: Optional list of linked node IDs
 
         Returns:
-            The ID of the created node
+            The ID of the created node (or of the existing node it was
+            merged into when merge-on-create deduplication is enabled)
         """
-        node = KnowledgeNode(title=title, content=content, tags=tags, links=links)
-        self._nodes[node.id] = node
+        if self._create_hook is not None:
+            existing_id = self._create_hook(title, content, tags, links)
+            if existing_id is not None:
+                return existing_id
+
+        if self._id_scheme == "ulid":
+            now = datetime.now()
+            node = KnowledgeNode(
+                title=title,
+                content=content,
+                tags=tags,
+                links=links,
+                id=new_ulid(now),
+                created_at=now,
+            )
+        else:
+            node = KnowledgeNode(title=title, content=content, tags=tags, links=links)
+        self._add_node(node)
 
         # Save to storage if available
         if self._storage:
             self._storage.save(self)
 
+        self._changes.publish(ChangeType.CREATED, node.id)
         return node.id
 
     def get_node(self, node_id: str) -> KnowledgeNode | None:
@@ -112,6 +276,8 @@ class KnowledgeBase:
         if not node:
             return False
 
+        old = self._snapshot_node(node)
+
         if title is not None:
             node.title = title
         if content is not None:
@@ -122,11 +288,26 @@ class KnowledgeBase:
             node.links = links
 
         node.updated_at = datetime.now()
+        self._reindex_node(old, node)
 
         # Save to storage if available
         if self._storage:
             self._storage.save(self)
 
+        fields = tuple(
+            name
+            for name, value in (
+                ("title", title),
+                ("content", content),
+                ("tags", tags),
+                ("links", links),
+            )
+            if value is not None
+        )
+        self._changes.publish(ChangeType.UPDATED, node_id, fields=fields)
+        if links is not None:
+            self._publish_link_diff(node_id, old.links, links)
+
         return True
 
     def delete_node(self, node_id: str) -> bool:
@@ -139,12 +320,16 @@ class KnowledgeBase:
             True if the node was deleted, False if not found
         """
         if node_id in self._nodes:
-            del self._nodes[node_id]
+            node = self._nodes.pop(node_id)
+            self._unindex_node(node)
+            self._handles.release(node_id)
+            del self._positions[node_id]
 
             # Save to storage if available
             if self._storage:
                 self._storage.save(self)
 
+            self._changes.publish(ChangeType.DELETED, node_id)
             return True
         return False
 
@@ -157,44 +342,76 @@ class KnowledgeBase:
         Returns:
             List of nodes that have all specified tags
         """
-        if not tags:
-            return list(self._nodes.values())
-
-        # Convert search tags to lowercase for case-insensitive search
-        search_tags = [tag.lower() for tag in tags]
+        if self._metrics is not None:
+            scanned = (
+                min(self._tag_index.count(tag) for tag in tags)
+                if tags
+                else len(self._nodes)
+            )
+            self._metrics.increment("nodes_scanned", "search_by_tags", scanned)
+        return list(self.iter_search_by_tags(tags))
+
+    def iter_search_by_tags(self, tags: list[str]) -> Iterator[KnowledgeNode]:
+        """Lazily search nodes by tags (AND search) using the tag index.
 
-        results = []
-        for node in self._nodes.values():
-            # Convert node tags to lowercase for comparison
-            node_tags_lower = [tag.lower() for tag in node.tags]
-            # Check if all search tags are in node tags
-            if all(tag in node_tags_lower for tag in search_tags):
-                results.append(node)
+        Args:
+            tags: List of tags to search for (case- and width-insensitive)
 
-        return results
+        Returns:
+            Iterator over nodes that have all specified tags
+        """
+        return iter(self.query().with_tags(tags))
 
     def search_by_text(self, text: str) -> list[KnowledgeNode]:
         """Search nodes by text in title or content.
 
         Args:
-            text: Text to search for (case-insensitive)
+            text: Text to search for (case- and width-insensitive)
 
         Returns:
             List of nodes that contain the text in title or content
         """
+        if self._metrics is not None:
+            self._metrics.increment("nodes_scanned", "search_by_text", len(self._nodes))
+        return list(self.iter_search_by_text(text))
+
+    def iter_search_by_text(self, text: str) -> Iterator[KnowledgeNode]:
+        """Lazily search nodes by text in title or content.
+
+        Args:
+            text: Text to search for (case- and width-insensitive)
+
+        Returns:
+            Iterator over nodes that contain the text in title or content
+        """
         if not text:
-            return list(self._nodes.values())
+            yield from self._nodes.values()
+            return
 
-        # Convert search text to lowercase for case-insensitive search
-        search_text = text.lower()
+        # Only the query is normalized here; node keys are cached
+        search_text = self._key_index.normalize(text)
+        contains = self._key_index.contains
 
-        results = []
         for node in self._nodes.values():
-            # Check if text is in title or content (case-insensitive)
-            if search_text in node.title.lower() or search_text in node.content.lower():
-                results.append(node)
+            if contains(node, search_text):
+                yield node
+
+    def set_kana_folding(self, enabled: bool = True) -> None:
+        """Choose whether searches treat katakana and hiragana as equal.
+
+        Recomputes the search keys of every node and the indexes built
+        from them.
 
-        return results
+        Args:
+            enabled: Whether to fold katakana to hiragana
+        """
+        if enabled == self._key_index.fold_kana:
+            return
+        self._key_index.fold_kana = enabled
+        for node in self._nodes.values():
+            self._unindex_node(node)
+            node._search_keys = None
+            self._index_node(node)
 
     def get_all_nodes(self) -> list[KnowledgeNode]:
         """Get all nodes in the knowledge base.
@@ -203,3 +420,344 @@ class KnowledgeBase:
             List of all nodes
         """
         return list(self._nodes.values())
+
+    def iter_nodes(self) -> Iterator[KnowledgeNode]:
+        """Iterate over all nodes without copying the collection.
+
+        The knowledge base must not be mutated during iteration.
+
+        Returns:
+            Iterator over all nodes
+        """
+        return iter(self._nodes.values())
+
+    def page_nodes(self, limit: int = 50, cursor: str | None = None) -> "Page":
+        """Get one page of all nodes in stable creation order.
+
+        Args:
+            limit: Maximum number of nodes on the page
+            cursor: Cursor returned with the previous page, or None
+
+        Returns:
+            The page of nodes and the cursor for the next page
+        """
+        return self.query().page(limit, cursor)
+
+    def page_search_by_tags(
+        self, tags: list[str], limit: int = 50, cursor: str | None = None
+    ) -> "Page":
+        """Get one page of a tag search (AND) in stable creation order.
+
+        Args:
+            tags: List of tags to search for
+            limit: Maximum number of nodes on the page
+            cursor: Cursor returned with the previous page, or None
+
+        Returns:
+            The page of nodes and the cursor for the next page
+        """
+        return self.query().with_tags(tags).page(limit, cursor)
+
+    def page_search_by_text(
+        self, text: str, limit: int = 50, cursor: str | None = None
+    ) -> "Page":
+        """Get one page of a text search in stable creation order.
+
+        Args:
+            text: Text to search for (case- and width-insensitive)
+            limit: Maximum number of nodes on the page
+            cursor: Cursor returned with the previous page, or None
+
+        Returns:
+            The page of nodes and the cursor for the next page
+        """
+        return self.query().containing(text).page(limit, cursor)
+
+    def get_recently_updated(self, count: int) -> list[KnowledgeNode]:
+        """Get the most recently updated nodes.
+
+        Args:
+            count: Maximum number of nodes to return
+
+        Returns:
+            List of nodes, most recently updated first
+        """
+        return [
+            self._nodes[node_id]
+            for node_id in self._time_index.latest("updated_at", count)
+        ]
+
+    def get_recently_created(self, count: int) -> list[KnowledgeNode]:
+        """Get the most recently created nodes.
+
+        Args:
+            count: Maximum number of nodes to return
+
+        Returns:
+            List of nodes, most recently created first
+        """
+        return [
+            self._nodes[node_id]
+            for node_id in self._time_index.latest("created_at", count)
+        ]
+
+    def get_nodes_created_between(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> list[KnowledgeNode]:
+        """Get nodes created within a time range.
+
+        Args:
+            start: Inclusive lower bound, or None for no bound
+            end: Inclusive upper bound, or None for no bound
+
+        Returns:
+            List of nodes, oldest first
+        """
+        return [
+            self._nodes[node_id]
+            for node_id in self._time_index.range("created_at", start, end)
+        ]
+
+    def get_nodes_updated_between(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> list[KnowledgeNode]:
+        """Get nodes last updated within a time range.
+
+        Args:
+            start: Inclusive lower bound, or None for no bound
+            end: Inclusive upper bound, or None for no bound
+
+        Returns:
+            List of nodes, least recently updated first
+        """
+        return [
+            self._nodes[node_id]
+            for node_id in self._time_index.range("updated_at", start, end)
+        ]
+
+    def subscribe(
+        self,
+        maxsize: int = 1024,
+        overflow: str = "block",
+        block_timeout: float = 1.0,
+        since: int | None = None,
+    ) -> Subscription:
+        """Subscribe to the stream of changes to this knowledge base.
+
+        Args:
+            maxsize: Maximum number of buffered events
+            overflow: ``"block"``, ``"drop_oldest"`` or ``"disconnect"``
+            block_timeout: Seconds a mutation may block under ``"block"``
+            since: Optional sequence number to replay retained history after
+
+        Returns:
+            A subscription usable with ``get``, ``for`` or ``async for``
+        """
+        return self._changes.subscribe(
+            maxsize=maxsize,
+            overflow=overflow,
+            block_timeout=block_timeout,
+            since=since,
+        )
+
+    def changes_since(self, seq: int) -> list[ChangeEvent]:
+        """Get retained change events after a sequence number.
+
+        Args:
+            seq: The last sequence number the caller has seen
+
+        Returns:
+            List of events in sequence order
+
+        Raises:
+            HistoryUnavailable: If the events were already evicted and the
+                caller has to resynchronize from a full snapshot
+        """
+        return self._changes.changes_since(seq)
+
+    @property
+    def metrics(self) -> "Metrics | None":
+        """The metrics collector, or None if instrumentation is disabled."""
+        return self._metrics
+
+    def handle_of(self, node_id: str) -> int | None:
+        """Get the dense integer handle of a node.
+
+        Handles are stable while the node exists and are reused after it
+        is deleted.
+
+        Args:
+            node_id: The node ID
+
+        Returns:
+            The handle, or None if the node does not exist
+        """
+        return self._handles.handle(node_id)
+
+    def node_id_of(self, handle: int) -> str | None:
+        """Get the ID of the node holding a handle.
+
+        Args:
+            handle: The handle
+
+        Returns:
+            The node ID, or None if no node holds the handle
+        """
+        return self._handles.node_id(handle)
+
+    @property
+    def change_seq(self) -> int:
+        """Sequence number of the most recent change."""
+        return self._changes.last_seq
+
+    def _publish_link_diff(
+        self, node_id: str, old_links: list[str], new_links: list[str]
+    ) -> None:
+        """Publish link events for the difference between two link lists.
+
+        Args:
+            node_id: The node whose outgoing links changed
+            old_links: Links before the change
+            new_links: Links after the change
+        """
+        old_set, new_set = set(old_links), set(new_links)
+        for target in dict.fromkeys(old_links):
+            if target not in new_set:
+                self._changes.publish(ChangeType.LINK_REMOVED, node_id, target)
+        for target in dict.fromkeys(new_links):
+            if target not in old_set:
+                self._changes.publish(ChangeType.LINK_ADDED, node_id, target)
+
+    def _add_node(self, node: KnowledgeNode) -> None:
+        """Insert a node into internal storage and all indexes.
+
+        Args:
+            node: The node to insert
+        """
+        self._nodes[node.id] = node
+        self._handles.assign(node.id)
+        self._positions[node.id] = next(self._position_counter)
+        self._index_node(node)
+
+    def _in_node_order(self, node_ids: Iterable[str]) -> list[str]:
+        """Sort node IDs from an index into insertion order.
+
+        Args:
+            node_ids: Node IDs; IDs of nonexistent nodes are dropped
+
+        Returns:
+            The existing node IDs in the order a scan of all nodes yields them
+        """
+        positions = self._positions
+        return sorted(
+            (node_id for node_id in node_ids if node_id in positions),
+            key=positions.__getitem__,
+        )
+
+    def _lazy_index(
+        self, name: str, factory: Callable[[], NodeIndex], first: bool = False
+    ) -> NodeIndex:
+        """Get an optional index, building it from all nodes on first use.
+
+        Once built the index is kept in sync like the built-in ones.
+
+        Args:
+            name: Unique name of the index
+            factory: Callable creating an empty index
+            first: Run before all other indexes, for indexes that change
+                the stored node itself
+
+        Returns:
+            The index
+        """
+        index = self._lazy_indexes.get(name)
+        if index is None:
+            index = factory()
+            index.add_many(self._nodes.values())
+            if first:
+                self._indexes.insert(0, index)
+            else:
+                self._indexes.append(index)
+            self._lazy_indexes[name] = index
+        return index
+
+    def _add_nodes(
+        self,
+        nodes: list[KnowledgeNode],
+        tag_postings: dict[str, list[str]] | None = None,
+    ) -> None:
+        """Insert a batch of new nodes, building indexes in bulk.
+
+        Publishes a created event per node, without auto-saving.
+
+        Args:
+            nodes: Nodes whose IDs are not yet in the knowledge base
+            tag_postings: Optional prebuilt lowercase tag postings for
+                exactly these nodes, merged instead of re-deriving them
+        """
+        for node in nodes:
+            self._nodes[node.id] = node
+            self._positions[node.id] = next(self._position_counter)
+        self._handles.assign_many(node.id for node in nodes)
+        for index in self._indexes:
+            if index is self._tag_index and tag_postings is not None:
+                self._tag_index.merge(tag_postings)
+            else:
+                index.add_many(nodes)
+        for node in nodes:
+            self._changes.publish(ChangeType.CREATED, node.id)
+
+    def _clear_nodes(self) -> None:
+        """Remove all nodes and reset every index, without auto-saving."""
+        node_ids = list(self._nodes)
+        self._nodes.clear()
+        self._handles.clear()
+        self._positions.clear()
+        for index in self._indexes:
+            index.clear()
+        for node_id in node_ids:
+            self._changes.publish(ChangeType.DELETED, node_id)
+
+    def _index_node(self, node: KnowledgeNode) -> None:
+        """Add a node's current state to all indexes.
+
+        Args:
+            node: The node to index
+        """
+        for index in self._indexes:
+            index.add(node)
+
+    def _unindex_node(self, node: KnowledgeNode) -> None:
+        """Remove a node's current state from all indexes.
+
+        Args:
+            node: The node to unindex
+        """
+        for index in self._indexes:
+            index.remove(node)
+
+    def _snapshot_node(self, node: KnowledgeNode) -> KnowledgeNode:
+        """Copy the indexed state of a node before mutating it.
+
+        Pass the copy to ``_reindex_node`` once the node has changed.
+
+        Args:
+            node: The node about to change
+
+        Returns:
+            A detached copy with its own tag and link lists
+        """
+        old = copy.copy(node)
+        old.tags = list(node.tags)
+        old.links = list(node.links)
+        return old
+
+    def _reindex_node(self, old: KnowledgeNode, node: KnowledgeNode) -> None:
+        """Bring all indexes up to date with a changed node.
+
+        Args:
+            old: Snapshot taken with ``_snapshot_node`` before the change
+            node: The node after the change
+        """
+        for index in self._indexes:
+            index.update(old, node)
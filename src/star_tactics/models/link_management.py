@@ -1,7 +1,11 @@
 """Link management functionality for KnowledgeBase."""
 
+from array import array
 from datetime import datetime
 
+from .events import ChangeType
+from .handles import LinkGraph
+
 
 def validate_links(self, node_id: str) -> bool:
     """Validate that all links in a node point to existing nodes.
@@ -63,13 +67,19 @@ def add_bidirectional_link(self, node1_id: str, node2_id: str) -> bool:
     
     # Add link from node1 to node2 if not already present
     if node2_id not in node1.links:
+        old = self._snapshot_node(node1)
         node1.links.append(node2_id)
         node1.updated_at = datetime.now()
+        self._reindex_node(old, node1)
+        self._changes.publish(ChangeType.LINK_ADDED, node1_id, node2_id)
     
     # Add link from node2 to node1 if not already present
     if node1_id not in node2.links:
+        old = self._snapshot_node(node2)
         node2.links.append(node1_id)
         node2.updated_at = datetime.now()
+        self._reindex_node(old, node2)
+        self._changes.publish(ChangeType.LINK_ADDED, node2_id, node1_id)
     
     return True
 
@@ -92,13 +102,19 @@ def remove_bidirectional_link(self, node1_id: str, node2_id: str) -> bool:
     
     # Remove link from node1 to node2
     if node2_id in node1.links:
+        old = self._snapshot_node(node1)
         node1.links.remove(node2_id)
         node1.updated_at = datetime.now()
+        self._reindex_node(old, node1)
+        self._changes.publish(ChangeType.LINK_REMOVED, node1_id, node2_id)
     
     # Remove link from node2 to node1
     if node1_id in node2.links:
+        old = self._snapshot_node(node2)
         node2.links.remove(node1_id)
         node2.updated_at = datetime.now()
+        self._reindex_node(old, node2)
+        self._changes.publish(ChangeType.LINK_REMOVED, node2_id, node1_id)
     
     return True
 
@@ -137,13 +153,40 @@ def fix_broken_links(self, node_id: str) -> int:
         return 0
     
     # Remove broken links
+    old = self._snapshot_node(node)
     for broken_id in broken_links:
         node.links.remove(broken_id)
     
     node.updated_at = datetime.now()
+    self._reindex_node(old, node)
+    for broken_id in dict.fromkeys(broken_links):
+        self._changes.publish(ChangeType.LINK_REMOVED, node_id, broken_id)
     return len(broken_links)
 
 
+def link_graph(self) -> LinkGraph:
+    """Build a compact snapshot of the link graph keyed by node handles.
+
+    Returns:
+        The graph in CSR form; it does not follow later changes
+    """
+    handles = self._handles.copy()
+    rows: list[list[int]] = [[] for _ in range(handles.capacity)]
+    for node in self._nodes.values():
+        row = rows[handles.handle(node.id)]
+        for target in node.links:
+            target_handle = handles.handle(target)
+            if target_handle is not None:
+                row.append(target_handle)
+
+    indptr = array("L", [0])
+    indices = array("L")
+    for row in rows:
+        indices.extend(row)
+        indptr.append(len(indices))
+    return LinkGraph(handles, indptr, indices)
+
+
 # Import and extend KnowledgeBase with link management methods
 from .knowledge_node import KnowledgeBase
 
@@ -153,4 +196,5 @@ KnowledgeBase.get_broken_links = get_broken_links  # type: ignore[attr-defined]
 KnowledgeBase.add_bidirectional_link = add_bidirectional_link  # type: ignore[attr-defined]
 KnowledgeBase.remove_bidirectional_link = remove_bidirectional_link  # type: ignore[attr-defined]
 KnowledgeBase.get_all_broken_links = get_all_broken_links  # type: ignore[attr-defined]
-KnowledgeBase.fix_broken_links = fix_broken_links  # type: ignore[attr-defined]
\ No newline at end of file
+KnowledgeBase.fix_broken_links = fix_broken_links  # type: ignore[attr-defined]
+KnowledgeBase.link_graph = link_graph  # type: ignore[attr-defined]
\ No newline at end of file
@@ -0,0 +1,307 @@
+"""Unicode normalization of search keys.
+
+Text is compared in NFKC form, case-folded, so that full-width and
+half-width forms (``ＡＢＣ``/``ABC``, ``ｶﾀｶﾅ``/``カタカナ``) and case variants
+match. Optionally katakana are folded to hiragana as well.
+
+Keys are computed once when a node is written and cached on the node;
+searches only normalize the query.
+"""
+
+from bisect import bisect_right
+import re
+from typing import TYPE_CHECKING
+import unicodedata
+
+from .indexes import NodeIndex
+
+if TYPE_CHECKING:
+    from .knowledge_node import KnowledgeNode
+
+# Katakana ァ..ヶ map onto hiragana ぁ..ゖ at a fixed distance; ヽヾ likewise
+_KANA_FOLD = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+_KANA_FOLD.update({0x30FD: 0x309D, 0x30FE: 0x309E})
+
+# Characters that normalize to exactly one character on their own and never
+# compose with a preceding one: ASCII, CJK symbols, kana, unified ideographs
+# and full-width ASCII. Runs of anything else, with the character before
+# them, are normalized separately to map positions back to the original.
+_STABLE = (
+    "\x00-\x7f\u3000-\u3029\u3030-\u303f\u3041-\u3096\u30a1-\u30fa"
+    "\u30fc-\u30fe\u4e00-\u9fff\uff01-\uff5e"
+)
+_UNSTABLE_RUN = re.compile(f"(?s).?[^{_STABLE}]+")
+
+
+def normalize(text: str, fold_kana: bool = False) -> str:
+    """Normalize text for matching.
+
+    Args:
+        text: The text
+        fold_kana: Whether to fold katakana to hiragana
+
+    Returns:
+        NFKC-normalized, case-folded text
+    """
+    if text.isascii():
+        folded = text.lower()
+    else:
+        folded = unicodedata.normalize("NFKC", text).casefold()
+        # Case folding can leave text that NFKC would still change
+        if not unicodedata.is_normalized("NFKC", folded):
+            folded = unicodedata.normalize("NFKC", folded)
+    return folded.translate(_KANA_FOLD) if fold_kana else folded
+
+
+def _joins_previous(char: str) -> bool:
+    """Check whether a character combines with the one before it."""
+    return (
+        unicodedata.combining(char) > 0
+        or char in "\u3099\u309a\uff9e\uff9f"
+        or "\u1160" <= char <= "\u11ff"
+    )
+
+
+class OffsetMap:
+    """Maps positions in normalized text back to the original text.
+
+    Only the character groups that do not normalize to a single character
+    (for example ``ｶﾞ`` becoming ``ガ``) are stored; positions elsewhere
+    shift by the accumulated difference.
+    """
+
+    __slots__ = ("_starts", "_groups")
+
+    def __init__(self, text: str, fold_kana: bool = False):
+        """Scan text for groups that change length or merge characters.
+
+        Args:
+            text: The original text
+            fold_kana: Whether the normalized text folds katakana
+        """
+        # Normalized start, normalized end, original start and original end
+        # of each stored group
+        self._starts: list[int] = []
+        self._groups: list[tuple[int, int, int, int]] = []
+        if text.isascii():
+            return
+        shift = 0
+        for match in _UNSTABLE_RUN.finditer(text):
+            run = match.group()
+            if normalize(run, fold_kana) == run:
+                continue
+            # Split the run into base characters with their combining marks
+            groups: list[str] = []
+            for char in run:
+                if groups and _joins_previous(char):
+                    groups[-1] += char
+                else:
+                    groups.append(char)
+            position = match.start()
+            for group in groups:
+                length = len(normalize(group, fold_kana))
+                if length != 1 or len(group) != 1:
+                    start = position + shift
+                    self._starts.append(start)
+                    self._groups.append(
+                        (start, start + length, position, position + len(group))
+                    )
+                    shift += length - len(group)
+                position += len(group)
+
+    def original(self, position: int, end: bool = False) -> int:
+        """Map a position in the normalized text to the original text.
+
+        Args:
+            position: Offset into the normalized text
+            end: Whether the position ends a span; positions inside a
+                changed group then map to its end instead of its start
+
+        Returns:
+            Offset into the original text
+        """
+        i = bisect_right(self._starts, position) - 1
+        if i < 0:
+            return position
+        start, stop, original_start, original_stop = self._groups[i]
+        if position >= stop:
+            return original_stop + position - stop
+        if end and position > start:
+            return original_stop
+        return original_start
+
+
+class SearchKeys:
+    """Normalized keys of one node, cached as ``node._search_keys``.
+
+    Attributes:
+        title: Normalized title
+        content: Normalized content, or None while the body is stored
+            compressed (it is then normalized when searched)
+        tags: Distinct normalized tags
+        offsets: Position map of the content key, built on first use
+    """
+
+    __slots__ = (
+        "title",
+        "content",
+        "tags",
+        "offsets",
+        "_title_source",
+        "_content_source",
+        "_tags_source",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        content: str | None,
+        tags: tuple[str, ...],
+        title_source: str,
+        content_source: object,
+        tags_source: list[str],
+    ):
+        self.title = title
+        self.content = content
+        self.tags = tags
+        self.offsets: OffsetMap | None = None
+        # The values the keys were computed from, to skip recomputing them
+        # when a node is re-indexed for a change to other fields, or to
+        # attach keys computed elsewhere (e.g. by ingest workers)
+        self._title_source = title_source
+        self._content_source = content_source
+        self._tags_source = tags_source
+
+
+class SearchKeyIndex(NodeIndex):
+    """Computes and caches the search keys of every indexed node.
+
+    KnowledgeBase runs it before the indexes that read the keys. Bodies
+    that are compressed by the time it runs get no cached content key,
+    so compression keeps saving memory.
+    """
+
+    def __init__(self, fold_kana: bool = False):
+        """Initialize the index.
+
+        Args:
+            fold_kana: Whether keys fold katakana to hiragana
+        """
+        self.fold_kana = fold_kana
+
+    def normalize(self, text: str) -> str:
+        """Normalize a query the same way as the cached keys.
+
+        Args:
+            text: The query text
+
+        Returns:
+            The normalized text
+        """
+        return normalize(text, self.fold_kana)
+
+    def add(self, node: "KnowledgeNode") -> None:
+        """Compute the keys of a node.
+
+        Args:
+            node: The node to index
+        """
+        fold_kana = self.fold_kana
+        title, content = node.title, node._content
+        keys = node._search_keys
+        if keys is not None and keys._title_source is title:
+            title_key = keys.title
+        else:
+            title_key = normalize(title, fold_kana)
+        if keys is not None and keys._content_source is content:
+            content_key = keys.content
+        elif isinstance(content, str):
+            content_key = normalize(content, fold_kana)
+        else:
+            content_key = None
+        # Tag lists are mutable, so they are compared by value
+        tags_source = list(node.tags)
+        if keys is not None and keys._tags_source == tags_source:
+            tags = keys.tags
+        else:
+            tags = tuple(
+                dict.fromkeys(normalize(tag, fold_kana) for tag in tags_source)
+            )
+        new_keys = SearchKeys(title_key, content_key, tags, title, content, tags_source)
+        if keys is not None and content_key is keys.content is not None:
+            new_keys.offsets = keys.offsets
+        node._search_keys = new_keys
+
+    def remove(self, node: "KnowledgeNode") -> None:
+        """Keep the keys: later indexes still need them to unindex the node.
+
+        Args:
+            node: The node to remove
+        """
+
+    def clear(self) -> None:
+        """Nothing to clear; keys live on the nodes."""
+
+    def content(self, node: "KnowledgeNode") -> str:
+        """Get the normalized content of a node.
+
+        Args:
+            node: An indexed node
+
+        Returns:
+            The cached key, or the content normalized now if compressed
+        """
+        key = node._search_keys.content
+        return key if key is not None else normalize(node.content, self.fold_kana)
+
+    def text_changed(self, old: "KnowledgeNode", new: "KnowledgeNode") -> bool:
+        """Check whether a re-indexed node's normalized text changed.
+
+        Args:
+            old: The node as it was indexed
+            new: The node after re-indexing
+
+        Returns:
+            True unless the title and content keys are known to be equal
+        """
+        old_keys, new_keys = old._search_keys, new._search_keys
+        if old_keys.title != new_keys.title or old_keys.content != new_keys.content:
+            return True
+        # Compressed bodies have no cached key to compare
+        return new_keys.content is None and old._content is not new._content
+
+    def offsets(self, node: "KnowledgeNode") -> OffsetMap:
+        """Get the map from the normalized content of a node to its content.
+
+        Args:
+            node: An indexed node
+
+        Returns:
+            The map, cached with the content key unless the body is
+            compressed
+        """
+        keys = node._search_keys
+        if keys.offsets is not None:
+            return keys.offsets
+        offsets = OffsetMap(node.content, self.fold_kana)
+        if keys.content is not None:
+            keys.offsets = offsets
+        return offsets
+
+    def contains(self, node: "KnowledgeNode", query: str) -> bool:
+        """Check whether a normalized query occurs in a node's title or content.
+
+        Args:
+            node: An indexed node
+            query: Normalized query text
+
+        Returns:
+            True if the title or content contains the query
+        """
+        keys = node._search_keys
+        if query in keys.title:
+            return True
+        content = keys.content
+        if content is None:
+            content = normalize(node.content, self.fold_kana)
+        return query in content
@@ -0,0 +1,587 @@
+"""Composable query planner for KnowledgeBase."""
+
+from abc import ABC, abstractmethod
+import base64
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+import heapq
+from itertools import islice
+import json
+from typing import TYPE_CHECKING
+
+from .normalize import normalize
+
+if TYPE_CHECKING:
+    from .knowledge_node import KnowledgeBase, KnowledgeNode
+
+
+class Predicate(ABC):
+    """A single filter condition of a query."""
+
+    #: Whether ``candidates`` can produce matching IDs from an index
+    indexed = False
+
+    @abstractmethod
+    def estimate(self, kb: "KnowledgeBase") -> int:
+        """Estimate how many nodes satisfy the predicate.
+
+        Args:
+            kb: The knowledge base being queried
+
+        Returns:
+            Estimated (upper bound) number of matching nodes
+        """
+        pass
+
+    def candidates(self, kb: "KnowledgeBase") -> Iterable[str] | None:
+        """Get candidate node IDs from an index.
+
+        Args:
+            kb: The knowledge base being queried
+
+        Returns:
+            Iterable of node IDs that may match, or None if the predicate
+            cannot be answered from an index
+        """
+        return None
+
+    @abstractmethod
+    def matches(self, node: "KnowledgeNode") -> bool:
+        """Check a single node against the predicate.
+
+        Args:
+            node: The node to check
+
+        Returns:
+            True if the node satisfies the predicate
+        """
+        pass
+
+
+class TagsAll(Predicate):
+    """Nodes carrying all of the given tags."""
+
+    indexed = True
+
+    def __init__(self, tags: list[str], normalize: Callable[[str], str] = normalize):
+        if not tags:
+            raise ValueError("TagsAll requires at least one tag")
+        self.tags = [normalize(tag) for tag in tags]
+
+    def estimate(self, kb: "KnowledgeBase") -> int:
+        return min(kb._tag_index.count(tag) for tag in self.tags)
+
+    def candidates(self, kb: "KnowledgeBase") -> Iterable[str]:
+        postings = sorted((kb._tag_index.get(tag) for tag in self.tags), key=len)
+        smallest, others = postings[0], postings[1:]
+        return tuple(
+            node_id
+            for node_id in smallest
+            if all(node_id in posting for posting in others)
+        )
+
+    def matches(self, node: "KnowledgeNode") -> bool:
+        node_tags = node._search_keys.tags
+        return all(tag in node_tags for tag in self.tags)
+
+    def __repr__(self) -> str:
+        return f"TagsAll({self.tags!r})"
+
+
+class TagsAny(Predicate):
+    """Nodes carrying at least one of the given tags."""
+
+    indexed = True
+
+    def __init__(self, tags: list[str], normalize: Callable[[str], str] = normalize):
+        self.tags = [normalize(tag) for tag in tags]
+
+    def estimate(self, kb: "KnowledgeBase") -> int:
+        return sum(kb._tag_index.count(tag) for tag in self.tags)
+
+    def candidates(self, kb: "KnowledgeBase") -> Iterable[str]:
+        ids: set[str] = set()
+        for tag in self.tags:
+            ids |= kb._tag_index.get(tag)
+        return ids
+
+    def matches(self, node: "KnowledgeNode") -> bool:
+        return any(tag in self.tags for tag in node._search_keys.tags)
+
+    def __repr__(self) -> str:
+        return f"TagsAny({self.tags!r})"
+
+
+class TextContains(Predicate):
+    """Nodes whose title or content contains the given text."""
+
+    def __init__(self, text: str, normalize: Callable[[str], str] = normalize):
+        self.text = normalize(text)
+        self._normalize = normalize
+
+    def estimate(self, kb: "KnowledgeBase") -> int:
+        # No text index: every node has to be inspected
+        return len(kb._nodes)
+
+    def matches(self, node: "KnowledgeNode") -> bool:
+        keys = node._search_keys
+        if self.text in keys.title:
+            return True
+        # Compressed bodies have no cached key
+        content = keys.content
+        if content is None:
+            content = self._normalize(node.content)
+        return self.text in content
+
+    def __repr__(self) -> str:
+        return f"TextContains({self.text!r})"
+
+
+class TimeRange(Predicate):
+    """Nodes whose ``created_at`` or ``updated_at`` lies in a closed range."""
+
+    indexed = True
+
+    def __init__(self, field: str, start: datetime | None, end: datetime | None):
+        if field not in ("created_at", "updated_at"):
+            raise ValueError(f"Unsupported timestamp field: {field}")
+        self.field = field
+        self.start = start
+        self.end = end
+
+    def estimate(self, kb: "KnowledgeBase") -> int:
+        return kb._time_index.count(self.field, self.start, self.end)
+
+    def candidates(self, kb: "KnowledgeBase") -> Iterable[str]:
+        return tuple(kb._time_index.range(self.field, self.start, self.end))
+
+    def matches(self, node: "KnowledgeNode") -> bool:
+        value = getattr(node, self.field)
+        if self.start is not None and value < self.start:
+            return False
+        if self.end is not None and value > self.end:
+            return False
+        return True
+
+    def __repr__(self) -> str:
+        return f"TimeRange({self.field!r}, {self.start!r}, {self.end!r})"
+
+
+class LinksTo(Predicate):
+    """Nodes with a link to the given node ID."""
+
+    indexed = True
+
+    def __init__(self, node_id: str):
+        self.node_id = node_id
+
+    def estimate(self, kb: "KnowledgeBase") -> int:
+        return len(kb._link_index.backlinks(self.node_id))
+
+    def candidates(self, kb: "KnowledgeBase") -> Iterable[str]:
+        return tuple(kb._link_index.backlinks(self.node_id))
+
+    def matches(self, node: "KnowledgeNode") -> bool:
+        return self.node_id in node.links
+
+    def __repr__(self) -> str:
+        return f"LinksTo({self.node_id!r})"
+
+
+class HasBrokenLinks(Predicate):
+    """Nodes with at least one link to a nonexistent node."""
+
+    indexed = True
+
+    def __init__(self, kb: "KnowledgeBase"):
+        self._nodes = kb._nodes
+
+    def estimate(self, kb: "KnowledgeBase") -> int:
+        return kb._link_index.broken_source_estimate()
+
+    def candidates(self, kb: "KnowledgeBase") -> Iterable[str]:
+        return kb._link_index.broken_sources()
+
+    def matches(self, node: "KnowledgeNode") -> bool:
+        return any(link_id not in self._nodes for link_id in node.links)
+
+    def __repr__(self) -> str:
+        return "HasBrokenLinks()"
+
+
+@dataclass
+class Page:
+    """One page of query results.
+
+    Attributes:
+        items: The nodes on this page
+        next_cursor: Opaque cursor for the following page, or None if this
+            is the last page
+    """
+
+    items: list["KnowledgeNode"]
+    next_cursor: str | None
+
+
+def _order_key(node: "KnowledgeNode") -> tuple[datetime, str]:
+    """Stable pagination order: creation time, then ID."""
+    return (node.created_at, node.id)
+
+
+def encode_cursor(node: "KnowledgeNode") -> str:
+    """Encode the position just after a node as an opaque cursor.
+
+    Args:
+        node: The last node of a page
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([node.created_at.isoformat(), node.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor: The cursor string
+
+    Returns:
+        The ``(created_at, node_id)`` position it encodes
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, node_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(created_at), str(node_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+class Query:
+    """Lazily evaluated, composable query over a KnowledgeBase.
+
+    Predicates are combined with AND. When the query is iterated, each
+    predicate's selectivity is estimated from index statistics, the most
+    selective index-backed predicate produces the candidate IDs and the
+    remaining predicates are applied as filters, most selective first.
+
+    Results are yielded in insertion order, like a scan of all nodes; use
+    ``page`` for stable, cursor-based pagination. The knowledge base must
+    not be mutated while a full-scan query is being consumed.
+    """
+
+    def __init__(self, knowledge_base: "KnowledgeBase"):
+        """Initialize an empty query matching every node.
+
+        Args:
+            knowledge_base: The knowledge base to query
+        """
+        self._kb = knowledge_base
+        self._predicates: list[Predicate] = []
+        self._limit: int | None = None
+        self._offset = 0
+
+    def where(self, predicate: Predicate) -> "Query":
+        """Add an arbitrary predicate.
+
+        Args:
+            predicate: The predicate to add
+
+        Returns:
+            This query, for chaining
+        """
+        self._predicates.append(predicate)
+        return self
+
+    def with_tags(self, tags: list[str]) -> "Query":
+        """Require all of the given tags (case- and width-insensitive).
+
+        Args:
+            tags: Tags that must all be present
+
+        Returns:
+            This query, for chaining
+        """
+        if tags:
+            self.where(TagsAll(tags, self._kb._key_index.normalize))
+        return self
+
+    def with_any_tags(self, tags: list[str]) -> "Query":
+        """Require at least one of the given tags (case- and width-insensitive).
+
+        Args:
+            tags: Tags of which at least one must be present
+
+        Returns:
+            This query, for chaining
+        """
+        if tags:
+            self.where(TagsAny(tags, self._kb._key_index.normalize))
+        return self
+
+    def containing(self, text: str) -> "Query":
+        """Require text in the title or content (case- and width-insensitive).
+
+        Args:
+            text: Text to search for
+
+        Returns:
+            This query, for chaining
+        """
+        if text:
+            self.where(TextContains(text, self._kb._key_index.normalize))
+        return self
+
+    def created_between(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> "Query":
+        """Require ``created_at`` to lie within ``[start, end]``.
+
+        Args:
+            start: Inclusive lower bound, or None for no bound
+            end: Inclusive upper bound, or None for no bound
+
+        Returns:
+            This query, for chaining
+        """
+        return self.where(TimeRange("created_at", start, end))
+
+    def updated_between(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> "Query":
+        """Require ``updated_at`` to lie within ``[start, end]``.
+
+        Args:
+            start: Inclusive lower bound, or None for no bound
+            end: Inclusive upper bound, or None for no bound
+
+        Returns:
+            This query, for chaining
+        """
+        return self.where(TimeRange("updated_at", start, end))
+
+    def links_to(self, node_id: str) -> "Query":
+        """Require a link to the given node.
+
+        Args:
+            node_id: The link target
+
+        Returns:
+            This query, for chaining
+        """
+        return self.where(LinksTo(node_id))
+
+    def has_broken_links(self) -> "Query":
+        """Require at least one link to a nonexistent node.
+
+        Returns:
+            This query, for chaining
+        """
+        return self.where(HasBrokenLinks(self._kb))
+
+    def limit(self, count: int | None) -> "Query":
+        """Limit the number of results.
+
+        Args:
+            count: Maximum number of results, or None for no limit
+
+        Returns:
+            This query, for chaining
+        """
+        if count is not None and count < 0:
+            raise ValueError("limit must be non-negative")
+        self._limit = count
+        return self
+
+    def offset(self, count: int) -> "Query":
+        """Skip a number of results.
+
+        Args:
+            count: Number of results to skip
+
+        Returns:
+            This query, for chaining
+        """
+        if count < 0:
+            raise ValueError("offset must be non-negative")
+        self._offset = count
+        return self
+
+    def plan(self) -> list[tuple[Predicate, int]]:
+        """Order predicates by estimated selectivity.
+
+        Returns:
+            List of (predicate, estimated match count) pairs, most
+            selective first; on ties indexed predicates come first since
+            they are cheaper to check
+        """
+        estimates = [(pred, pred.estimate(self._kb)) for pred in self._predicates]
+        return sorted(estimates, key=lambda item: (item[1], not item[0].indexed))
+
+    def explain(self) -> list[str]:
+        """Describe how the query will be executed.
+
+        Returns:
+            One line per step, the driving step first
+        """
+        driver, filters = self._split_plan()
+        if driver is None:
+            lines = [f"scan all nodes ~{len(self._kb._nodes)}"]
+        else:
+            lines = [f"index {driver[0]!r} ~{driver[1]}"]
+        lines.extend(f"filter {pred!r} ~{estimate}" for pred, estimate in filters)
+        return lines
+
+    def __iter__(self) -> Iterator["KnowledgeNode"]:
+        """Execute the query lazily.
+
+        Returns:
+            Generator over matching nodes
+        """
+        stop = None if self._limit is None else self._offset + self._limit
+        return islice(self._execute(), self._offset, stop)
+
+    def all(self) -> list["KnowledgeNode"]:
+        """Execute the query and collect the results.
+
+        Returns:
+            List of matching nodes
+        """
+        return list(self)
+
+    def first(self) -> "KnowledgeNode | None":
+        """Execute the query and return the first result.
+
+        Returns:
+            The first matching node, or None if nothing matches
+        """
+        return next(iter(self), None)
+
+    def page(self, size: int = 50, cursor: str | None = None) -> Page:
+        """Fetch one page of results in stable ``(created_at, id)`` order.
+
+        When the matches are dense, or there is no indexed predicate, the
+        creation-time index is walked from the cursor position, so a page
+        costs O(log n + scanned). When the driving index yields few
+        candidates, the next ``size`` of them after the cursor are selected
+        directly in O(k log size). Either way following all cursors costs
+        O(n) overall rather than sorting every candidate on every page.
+        ``limit`` and ``offset`` are ignored.
+
+        Args:
+            size: Maximum number of nodes on the page
+            cursor: Cursor returned with the previous page, or None for
+                the first page
+
+        Returns:
+            The page of results
+
+        Raises:
+            ValueError: If size is not positive or the cursor is malformed
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        after = decode_cursor(cursor) if cursor else None
+
+        driver, filters = self._split_plan()
+        checks = [pred.matches for pred, _ in filters]
+        nodes = self._kb._nodes
+
+        # A page walk scans about size * n / k entries, selecting from the
+        # candidates costs about k: walk unless the candidates are few
+        if driver is None or driver[1] * driver[1] > size * len(nodes):
+            if driver is not None:
+                checks.insert(0, driver[0].matches)
+            matching = (
+                nodes[node_id]
+                for node_id in self._kb._time_index.after("created_at", after)
+            )
+            items = list(
+                islice(
+                    (node for node in matching if all(c(node) for c in checks)),
+                    size + 1,
+                )
+            )
+        else:
+            candidates = (
+                nodes[node_id]
+                for node_id in driver[0].candidates(self._kb)
+                if node_id in nodes
+            )
+            items = heapq.nsmallest(
+                size + 1,
+                (
+                    node
+                    for node in candidates
+                    if (after is None or _order_key(node) > after)
+                    and all(c(node) for c in checks)
+                ),
+                key=_order_key,
+            )
+        has_more = len(items) > size
+        items = items[:size]
+
+        next_cursor = encode_cursor(items[-1]) if has_more else None
+        return Page(items=items, next_cursor=next_cursor)
+
+    def _split_plan(
+        self,
+    ) -> tuple[tuple[Predicate, int] | None, list[tuple[Predicate, int]]]:
+        """Pick the driving predicate and order the remaining filters.
+
+        Returns:
+            The driving (predicate, estimate) pair, or None for a full scan,
+            and the remaining filters, most selective first
+        """
+        planned = self.plan()
+        for i, (pred, estimate) in enumerate(planned):
+            if pred.indexed:
+                return (pred, estimate), planned[:i] + planned[i + 1 :]
+        return None, planned
+
+    def _execute(self) -> Iterator["KnowledgeNode"]:
+        """Generate matching nodes according to the plan."""
+        driver, filters = self._split_plan()
+        checks = [pred.matches for pred, _ in filters]
+        nodes = self._kb._nodes
+
+        if driver is None:
+            source: Iterable[KnowledgeNode] = nodes.values()
+        else:
+            ids = self._kb._in_node_order(driver[0].candidates(self._kb))
+            source = (nodes[node_id] for node_id in ids)
+
+        metrics = self._kb._metrics
+        if metrics is None:
+            for node in source:
+                if all(check(node) for check in checks):
+                    yield node
+            return
+
+        scanned = 0
+        try:
+            for node in source:
+                scanned += 1
+                if all(check(node) for check in checks):
+                    yield node
+        finally:
+            metrics.increment("nodes_scanned", "query", scanned)
+
+
+def query(self) -> Query:
+    """Start a composable query over this knowledge base.
+
+    Returns:
+        An empty Query matching every node
+    """
+    return Query(self)
+
+
+# Import and extend KnowledgeBase with the query builder
+from .knowledge_node import KnowledgeBase
+
+KnowledgeBase.query = query  # type: ignore[attr-defined]
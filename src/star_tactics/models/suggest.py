@@ -0,0 +1,399 @@
+"""Link suggestions from shared rare tags, shared terms and 2-hop neighbors.
+
+Candidates for a node are gathered from inverted indexes only: the nodes
+sharing one of its rarer tags, the nodes sharing one of its most
+distinctive content terms and the neighbors of its neighbors. Postings
+longer than ``max_postings`` (common tags and terms, hub nodes) are
+skipped, so suggesting links for every node costs O(N·candidates) rather
+than O(N²).
+"""
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+import heapq
+import math
+import os
+import re
+from typing import TYPE_CHECKING
+
+from .indexes import NodeIndex
+
+if TYPE_CHECKING:
+    from .knowledge_node import KnowledgeNode
+    from .normalize import SearchKeyIndex
+
+_WORD = re.compile(r"\w+")
+
+# Most distinctive content terms of a node used to find candidates
+MAX_TERMS = 32
+# Knowledge bases smaller than this are processed in the calling process
+MIN_PARALLEL_NODES = 20_000
+
+
+def terms(text: str) -> set[str]:
+    """Split normalized text into content terms.
+
+    ASCII words of three or more letters are terms as they are; other word
+    runs, such as Japanese without spaces, are split into character
+    bigrams.
+
+    Args:
+        text: Normalized text
+
+    Returns:
+        Set of terms
+    """
+    found: set[str] = set()
+    for word in _WORD.findall(text):
+        if word.isascii():
+            if len(word) >= 3 and not word.isdigit():
+                found.add(word)
+        elif len(word) == 1:
+            found.add(word)
+        else:
+            found.update(word[i : i + 2] for i in range(len(word) - 1))
+    return found
+
+
+class TermIndex(NodeIndex):
+    """Inverted index from content term to the IDs of nodes containing it.
+
+    Terms are read from the cached search keys, so the index has to run
+    after the ``SearchKeyIndex`` that computes them.
+    """
+
+    def __init__(self, key_index: "SearchKeyIndex"):
+        """Initialize an empty term index.
+
+        Args:
+            key_index: The knowledge base's search key index
+        """
+        self._key_index = key_index
+        self.postings: dict[str, set[str]] = {}
+        self.node_terms: dict[str, frozenset[str]] = {}
+
+    def _apply(self, node_id: str, node_terms: frozenset[str], delta: int) -> None:
+        postings = self.postings
+        if delta > 0:
+            self.node_terms[node_id] = node_terms
+            for term in node_terms:
+                posting = postings.get(term)
+                if posting is None:
+                    postings[term] = {node_id}
+                else:
+                    posting.add(node_id)
+            return
+        del self.node_terms[node_id]
+        for term in node_terms:
+            posting = postings[term]
+            posting.discard(node_id)
+            if not posting:
+                del postings[term]
+
+    def add(self, node: "KnowledgeNode") -> None:
+        """Index the terms of a node's title and content.
+
+        Args:
+            node: The node to index
+        """
+        text = node._search_keys.title + "\n" + self._key_index.content(node)
+        self._apply(node.id, frozenset(terms(text)), 1)
+
+    def remove(self, node: "KnowledgeNode") -> None:
+        """Remove the terms of a node from the index.
+
+        Args:
+            node: The node to remove
+        """
+        self._apply(node.id, self.node_terms[node.id], -1)
+
+    def update(self, old: "KnowledgeNode", new: "KnowledgeNode") -> None:
+        """Re-split a changed node's text only if its keys changed.
+
+        Args:
+            old: The node as it was indexed
+            new: The node after the change
+        """
+        if self._key_index.text_changed(old, new):
+            self.remove(old)
+            self.add(new)
+
+    def clear(self) -> None:
+        """Remove all entries from the index."""
+        self.postings.clear()
+        self.node_terms.clear()
+
+
+@dataclass
+class LinkSuggestion:
+    """A node proposed as a link target.
+
+    Attributes:
+        node_id: The suggested node
+        score: Sum of the tag, content and neighbor scores, each in [0, 1]
+        tags: Shared tags that contributed, rarest first
+        content: Share of the source's distinctive terms found in the target
+        neighbors: Number of nodes linked with both
+    """
+
+    node_id: str
+    score: float
+    tags: list[str]
+    content: float
+    neighbors: int
+
+
+def _rare(
+    items: Iterable[str], postings: dict[str, set[str]], max_postings: int
+) -> list[tuple[str, set[str]]]:
+    """Keep the items shared with other nodes but with at most max_postings."""
+    found = []
+    for item in items:
+        posting = postings.get(item)
+        if posting is not None and 2 <= len(posting) <= max_postings:
+            found.append((item, posting))
+    return found
+
+
+class _Candidates:
+    """What scoring needs, as lookups on a live knowledge base or as plain
+    dicts that can be sent to worker processes."""
+
+    def __init__(
+        self,
+        total: int,
+        tag_postings: dict[str, set[str]],
+        term_postings: dict[str, set[str]],
+        tags_of: Callable[[str], Iterable[str]],
+        terms_of: Callable[[str], Iterable[str]],
+        neighbors_of: Callable[[str], set[str]],
+        max_postings: int,
+    ):
+        self.total = total
+        self.tag_postings = tag_postings
+        self.term_postings = term_postings
+        self.tags_of = tags_of
+        self.terms_of = terms_of
+        self.neighbors_of = neighbors_of
+        self.max_postings = max_postings
+
+    def distinctive_terms(self, node_id: str) -> list[tuple[str, set[str]]]:
+        """Get the node's rarest shared terms with their postings."""
+        found = _rare(self.terms_of(node_id), self.term_postings, self.max_postings)
+        if len(found) > MAX_TERMS:
+            found = heapq.nsmallest(MAX_TERMS, found, key=lambda t: (len(t[1]), t[0]))
+        return found
+
+    def suggest(self, node_id: str, k: int) -> list[LinkSuggestion]:
+        """Rank link candidates for one node."""
+        total, max_postings = self.total, self.max_postings
+        linked = self.neighbors_of(node_id)
+
+        # Tag and content scores are summed into one dict, the content
+        # share of the few best candidates is recomputed at the end
+        scores: dict[str, float] = {}
+        get = scores.get
+        tags = _rare(self.tags_of(node_id), self.tag_postings, max_postings)
+        found = self.distinctive_terms(node_id)
+        # Each signal's IDF weights are scaled to sum to 1
+        weighted = []
+        for signal in (tags, found):
+            idfs = [math.log(1 + total / len(posting)) for _, posting in signal]
+            weight = sum(idfs)
+            weighted.append([(idf / weight, p) for idf, (_, p) in zip(idfs, signal)])
+        for share, posting in weighted[0] + weighted[1]:
+            for other in posting:
+                scores[other] = get(other, 0.0) + share
+
+        # Adamic-Adar: common neighbors count less the more links they have
+        adamic_adar: dict[str, float] = {}
+        common: dict[str, int] = {}
+        for middle in linked:
+            second = self.neighbors_of(middle)
+            if not 2 <= len(second) <= max_postings:
+                continue
+            share = 1 / math.log(len(second))
+            for other in second:
+                adamic_adar[other] = adamic_adar.get(other, 0.0) + share
+                common[other] = common.get(other, 0) + 1
+        for other, value in adamic_adar.items():
+            scores[other] = get(other, 0.0) + value / (1 + value)
+
+        scores.pop(node_id, None)
+        for other in linked:
+            scores.pop(other, None)
+        if not scores:
+            return []
+        # Ties at the cut-off are broken by node ID, for stable results
+        cutoff = heapq.nlargest(k, scores.values())[-1]
+        best = sorted(
+            (-score, other) for other, score in scores.items() if score >= cutoff
+        )
+
+        own = dict(tags)
+        suggestions = []
+        for score, other in best[:k]:
+            shared = [tag for tag in self.tags_of(other) if tag in own]
+            shared.sort(key=lambda tag: (len(own[tag]), tag))
+            content = math.fsum(s for s, posting in weighted[1] if other in posting)
+            suggestions.append(
+                LinkSuggestion(other, -score, shared, content, common.get(other, 0))
+            )
+        return suggestions
+
+
+def _neighbors(kb, node_id: str) -> set[str]:
+    """Get the existing nodes linked with a node in either direction."""
+    nodes = kb._nodes
+    linked = {target for target in nodes[node_id].links if target in nodes}
+    linked |= kb._link_index.backlinks(node_id)
+    linked.discard(node_id)
+    return linked
+
+
+def _live_candidates(kb, max_postings: int) -> _Candidates:
+    term_index = kb._lazy_index("terms", lambda: TermIndex(kb._key_index))
+    nodes = kb._nodes
+    return _Candidates(
+        len(nodes),
+        kb._tag_index._postings,
+        term_index.postings,
+        lambda node_id: nodes[node_id]._search_keys.tags,
+        term_index.node_terms.__getitem__,
+        lambda node_id: _neighbors(kb, node_id),
+        max_postings,
+    )
+
+
+def _snapshot(live: _Candidates, node_ids: list[str]) -> _Candidates:
+    """Copy what scoring reads into plain dicts for worker processes."""
+    max_postings = live.max_postings
+
+    def usable(postings: dict[str, set[str]]) -> dict[str, set[str]]:
+        return {
+            item: posting
+            for item, posting in postings.items()
+            if 2 <= len(posting) <= max_postings
+        }
+
+    tag_postings = usable(live.tag_postings)
+    tags = {
+        node_id: [tag for tag in live.tags_of(node_id) if tag in tag_postings]
+        for node_id in node_ids
+    }
+    node_terms = {
+        node_id: [term for term, _ in live.distinctive_terms(node_id)]
+        for node_id in node_ids
+    }
+    term_postings = usable(live.term_postings)
+    used = set().union(*node_terms.values()) if node_terms else set()
+    term_postings = {term: term_postings[term] for term in used}
+    neighbors = {node_id: live.neighbors_of(node_id) for node_id in node_ids}
+    return _Candidates(
+        live.total,
+        tag_postings,
+        term_postings,
+        tags.__getitem__,
+        node_terms.__getitem__,
+        neighbors.__getitem__,
+        max_postings,
+    )
+
+
+_worker_candidates: _Candidates | None = None
+
+
+def _init_worker(candidates: _Candidates) -> None:
+    global _worker_candidates
+    _worker_candidates = candidates
+
+
+def _suggest_chunk(node_ids: list[str], k: int) -> list[list[LinkSuggestion]]:
+    return [_worker_candidates.suggest(node_id, k) for node_id in node_ids]
+
+
+def suggest_links(
+    self, node_id: str, k: int = 10, max_postings: int = 200
+) -> list[LinkSuggestion]:
+    """Propose nodes a node could link to.
+
+    Candidates share a rare tag, share one of the node's most distinctive
+    content terms or are linked with a node it is linked with. Nodes it is
+    already linked with in either direction are left out. The term index
+    is built on first use and then maintained on every change.
+
+    Args:
+        node_id: The source node
+        k: Maximum number of suggestions
+        max_postings: Tags, terms and neighbor nodes shared by more nodes
+            than this are too common to suggest anything
+
+    Returns:
+        List of suggestions, best first; empty if the node does not exist
+    """
+    if node_id not in self._nodes or k <= 0:
+        return []
+    return _live_candidates(self, max_postings).suggest(node_id, k)
+
+
+def suggest_all_links(
+    self,
+    k: int = 5,
+    max_postings: int = 200,
+    workers: int | None = None,
+    chunks_per_worker: int = 4,
+    min_parallel_nodes: int = MIN_PARALLEL_NODES,
+) -> dict[str, list[LinkSuggestion]]:
+    """Propose links for every node.
+
+    With several workers, the indexes are copied into plain dicts once,
+    sent to each worker process and the nodes are scored in chunks.
+
+    Args:
+        k: Maximum number of suggestions per node
+        max_postings: Tags, terms and neighbor nodes shared by more nodes
+            than this are too common to suggest anything
+        workers: Number of worker processes (defaults to the CPU count);
+            1 scores in the calling process
+        chunks_per_worker: Chunks per worker, for load balancing
+        min_parallel_nodes: Knowledge bases with fewer nodes are scored in
+            the calling process
+
+    Returns:
+        Mapping of node ID to its suggestions, for nodes with any
+    """
+    if k <= 0:
+        return {}
+    node_ids = list(self._nodes)
+    live = _live_candidates(self, max_postings)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(node_ids) < min_parallel_nodes:
+        results = [live.suggest(node_id, k) for node_id in node_ids]
+    else:
+        # Imported here: multiprocessing is slow to import
+        from concurrent.futures import ProcessPoolExecutor
+
+        size = -(-len(node_ids) // (workers * chunks_per_worker))
+        chunks = [node_ids[i : i + size] for i in range(0, len(node_ids), size)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(_snapshot(live, node_ids),),
+        ) as pool:
+            results = [
+                suggestions
+                for chunk in pool.map(_suggest_chunk, chunks, [k] * len(chunks))
+                for suggestions in chunk
+            ]
+    return {
+        node_id: suggestions
+        for node_id, suggestions in zip(node_ids, results)
+        if suggestions
+    }
+
+
+# Import and extend KnowledgeBase with link suggestions
+from .knowledge_node import KnowledgeBase
+
+KnowledgeBase.suggest_links = suggest_links  # type: ignore[attr-defined]
+KnowledgeBase.suggest_all_links = suggest_all_links  # type: ignore[attr-defined]
@@ -0,0 +1,509 @@
+"""Local vector similarity search over node text.
+
+Requires the optional ``numpy`` dependency
+(``pip install star-tactics-room[vector]``).
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+import re
+from typing import TYPE_CHECKING, Protocol
+
+from .indexes import NodeIndex
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .knowledge_node import KnowledgeNode
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _require_numpy() -> None:
+    """Import numpy on first use; it noticeably slows down startup."""
+    global np, _ROLL, _MIX
+    if "np" in globals():
+        return
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "Vector search requires numpy: pip install star-tactics-room[vector]"
+        ) from None
+    np = numpy
+    # Multipliers for rolling n-gram hashes and for mixing their bits
+    _ROLL = numpy.uint64(1_000_003)
+    _MIX = numpy.uint64(0x9E3779B97F4A7C15)
+
+
+class Embedder(Protocol):
+    """Turns texts into fixed-size vectors.
+
+    Attributes:
+        dim: Length of the produced vectors
+    """
+
+    dim: int
+
+    def embed(self, texts: list[str]) -> "np.ndarray":
+        """Embed a batch of texts.
+
+        Args:
+            texts: The texts
+
+        Returns:
+            Float array of shape ``(len(texts), dim)``
+        """
+        ...
+
+
+class HashingEmbedder:
+    """Hashed character n-gram embedding that needs no trained model.
+
+    Each n-gram is hashed into one of ``dim`` buckets with a hash-derived
+    sign, counts are damped with ``1 + log(tf)`` and rows are L2
+    normalized, so dot products are cosine similarities. Character
+    n-grams work for Japanese without segmentation.
+    """
+
+    def __init__(self, dim: int = 256, ngram_range: tuple[int, int] = (2, 4)):
+        """Initialize the embedder.
+
+        Args:
+            dim: Vector length
+            ngram_range: Smallest and largest n-gram length
+        """
+        _require_numpy()
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def embed(self, texts: list[str]) -> "np.ndarray":
+        """Embed a batch of texts.
+
+        All texts are hashed together: their code points are concatenated
+        and n-gram hashes are rolled over the whole array, so the cost per
+        text is a handful of array operations rather than a Python loop
+        over its n-grams.
+
+        Args:
+            texts: The texts
+
+        Returns:
+            Array of shape ``(len(texts), dim)`` with unit-length rows
+            (all-zero rows for texts without n-grams)
+        """
+        normalized = [_WHITESPACE.sub(" ", text.lower()).strip() for text in texts]
+        lengths = np.fromiter(map(len, normalized), dtype=np.int64, count=len(texts))
+        # One separator position after each text keeps n-grams from spanning two
+        codes = np.frombuffer(
+            "\0".join(normalized).encode("utf-32-le"), dtype=np.uint32
+        ).astype(np.uint64)
+        owner = np.repeat(np.arange(len(texts), dtype=np.int64), lengths + 1)[
+            : len(codes)
+        ]
+        separator = np.zeros(len(codes), dtype=bool)
+        separator[np.cumsum(lengths + 1)[:-1] - 1] = True
+
+        low, high = self.ngram_range
+        keys = []
+        signs = []
+        rolling = codes
+        for n in range(1, high + 1):
+            if n > 1:
+                rolling = rolling[:-1] * _ROLL + codes[n - 1 :]
+            if n < low or not len(rolling):
+                continue
+            valid = (owner[: len(rolling)] == owner[n - 1 :]) & ~separator[n - 1 :]
+            mixed = ((rolling + np.uint64(n)) * _MIX)[valid] >> np.uint64(32)
+            keys.append(
+                owner[: len(rolling)][valid] * self.dim
+                + (mixed % np.uint64(self.dim)).astype(np.int64)
+            )
+            signs.append(((mixed >> np.uint64(31)) & np.uint64(1)).astype(np.int8))
+
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if keys:
+            counts = np.bincount(
+                np.concatenate(keys),
+                weights=np.concatenate(signs) * 2.0 - 1.0,
+                minlength=len(texts) * self.dim,
+            ).reshape(len(texts), self.dim)
+            nonzero = counts != 0
+            matrix[nonzero] = np.sign(counts[nonzero]) * (
+                1 + np.log(np.abs(counts[nonzero]))
+            )
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+class RandomProjectionLSH:
+    """Approximate nearest-neighbour buckets from random hyperplanes.
+
+    Each of ``tables`` tables keys a vector by the signs of its
+    projections onto ``bits`` random hyperplanes; vectors at a small angle
+    agree on most signs and collide in at least one table with high
+    probability.
+    """
+
+    def __init__(self, dim: int, tables: int = 16, bits: int = 10, seed: int = 0):
+        """Initialize empty tables.
+
+        Args:
+            dim: Vector length
+            tables: Number of hash tables
+            bits: Hyperplanes per table
+            seed: Seed for the hyperplanes
+        """
+        _require_numpy()
+        rng = np.random.default_rng(seed)
+        self.tables = tables
+        self.bits = bits
+        self._planes = rng.standard_normal((tables * bits, dim)).astype(np.float32)
+        self._weights = 1 << np.arange(bits, dtype=np.int64)
+        self._buckets: list[dict[int, set[str]]] = [{} for _ in range(tables)]
+        self._keys: dict[str, tuple[int, ...]] = {}
+
+    def keys(self, vectors: "np.ndarray") -> "np.ndarray":
+        """Compute the bucket keys of a batch of vectors.
+
+        Args:
+            vectors: Array of shape ``(n, dim)``
+
+        Returns:
+            Integer array of shape ``(n, tables)``
+        """
+        signs = (vectors @ self._planes.T) > 0
+        return signs.reshape(len(vectors), self.tables, self.bits) @ self._weights
+
+    def add_many(self, ids: list[str], vectors: "np.ndarray") -> None:
+        """Insert vectors into the tables.
+
+        Args:
+            ids: Node IDs
+            vectors: Matching array of shape ``(len(ids), dim)``
+        """
+        for node_id, row in zip(ids, self.keys(vectors).tolist()):
+            self._keys[node_id] = tuple(row)
+            for table, key in zip(self._buckets, row):
+                table.setdefault(key, set()).add(node_id)
+
+    def remove(self, node_id: str) -> None:
+        """Remove a node from the tables.
+
+        Args:
+            node_id: The node ID
+        """
+        for table, key in zip(self._buckets, self._keys.pop(node_id, ())):
+            bucket = table[key]
+            bucket.discard(node_id)
+            if not bucket:
+                del table[key]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        for table in self._buckets:
+            table.clear()
+        self._keys.clear()
+
+    def candidates(self, vector: "np.ndarray") -> set[str]:
+        """Get the IDs colliding with a vector in any table.
+
+        Args:
+            vector: Query vector of shape ``(dim,)``
+
+        Returns:
+            Set of candidate node IDs
+        """
+        result: set[str] = set()
+        for table, key in zip(self._buckets, self.keys(vector[None, :])[0].tolist()):
+            result.update(table.get(key, ()))
+        return result
+
+
+def _node_text(node: "KnowledgeNode") -> str:
+    return f"{node.title}\n{node.content}"
+
+
+class VectorIndex(NodeIndex):
+    """Embeddings of all nodes in one contiguous matrix.
+
+    Row ``i`` of the matrix belongs to ``ids[i]``; removals move the last
+    row into the freed slot so the live rows stay contiguous and a query
+    is a single matrix-vector product.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder | None = None,
+        approximate: bool = False,
+        tables: int = 16,
+        bits: int = 10,
+    ):
+        """Initialize an empty index.
+
+        Args:
+            embedder: Embedding to use (defaults to HashingEmbedder)
+            approximate: Whether to maintain random-projection LSH tables
+            tables: LSH tables when approximate
+            bits: Hyperplanes per LSH table when approximate
+        """
+        _require_numpy()
+        self.embedder = embedder or HashingEmbedder()
+        self.dim = self.embedder.dim
+        self._matrix = np.zeros((16, self.dim), dtype=np.float32)
+        self._ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self.lsh = RandomProjectionLSH(self.dim, tables, bits) if approximate else None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def matrix(self) -> "np.ndarray":
+        """Live rows of the embedding matrix (a view, do not modify)."""
+        return self._matrix[: len(self._ids)]
+
+    def embed(self, text: str) -> "np.ndarray":
+        """Embed a single text.
+
+        Args:
+            text: The text
+
+        Returns:
+            Vector of shape ``(dim,)``
+        """
+        return self.embedder.embed([text])[0]
+
+    def vector(self, node_id: str) -> "np.ndarray | None":
+        """Get the stored vector of a node.
+
+        Args:
+            node_id: The node ID
+
+        Returns:
+            The vector, or None if the node is not indexed
+        """
+        row = self._rows.get(node_id)
+        return None if row is None else self._matrix[row]
+
+    def _reserve(self, extra: int) -> None:
+        needed = len(self._ids) + extra
+        if needed > len(self._matrix):
+            grown = np.zeros(
+                (max(needed, 2 * len(self._matrix)), self.dim), dtype=np.float32
+            )
+            grown[: len(self._ids)] = self.matrix
+            self._matrix = grown
+
+    def _append(self, ids: list[str], vectors: "np.ndarray") -> None:
+        self._reserve(len(ids))
+        start = len(self._ids)
+        self._matrix[start : start + len(ids)] = vectors
+        for offset, node_id in enumerate(ids):
+            self._rows[node_id] = start + offset
+        self._ids.extend(ids)
+        if self.lsh is not None:
+            self.lsh.add_many(ids, vectors)
+
+    def add(self, node: "KnowledgeNode") -> None:
+        """Embed and index a node.
+
+        Args:
+            node: The node to index
+        """
+        self._append([node.id], self.embed(_node_text(node))[None, :])
+
+    def add_many(self, nodes: Iterable["KnowledgeNode"]) -> None:
+        """Embed and index a batch of nodes with one embedding call.
+
+        Args:
+            nodes: The nodes to index
+        """
+        nodes = list(nodes)
+        if nodes:
+            vectors = self.embedder.embed([_node_text(node) for node in nodes])
+            self._append([node.id for node in nodes], vectors)
+
+    def remove(self, node: "KnowledgeNode") -> None:
+        """Remove a node, moving the last row into its slot.
+
+        Args:
+            node: The node to remove
+        """
+        row = self._rows.pop(node.id, None)
+        if row is None:
+            return
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = moved
+            self._rows[moved] = row
+        self._ids.pop()
+        if self.lsh is not None:
+            self.lsh.remove(node.id)
+
+    def update(self, old: "KnowledgeNode", new: "KnowledgeNode") -> None:
+        """Re-embed a changed node only if its text changed.
+
+        Args:
+            old: The node as it was indexed
+            new: The node after the change
+        """
+        if old.title != new.title or old._content != new._content:
+            self.remove(old)
+            self.add(new)
+
+    def clear(self) -> None:
+        """Remove all entries from the index."""
+        self._ids.clear()
+        self._rows.clear()
+        if self.lsh is not None:
+            self.lsh.clear()
+
+    def search(
+        self,
+        vector: "np.ndarray",
+        k: int,
+        exclude: str | None = None,
+        approximate: bool = False,
+    ) -> list[tuple[str, float]]:
+        """Find the nodes with the highest cosine similarity to a vector.
+
+        Args:
+            vector: Query vector of shape ``(dim,)``
+            k: Number of results
+            exclude: Optional node ID to leave out
+            approximate: Score only LSH candidates instead of every row
+
+        Returns:
+            List of (node_id, similarity), most similar first
+        """
+        if approximate and self.lsh is not None:
+            ids = list(self.lsh.candidates(vector))
+            rows = np.fromiter(
+                (self._rows[node_id] for node_id in ids), dtype=np.intp, count=len(ids)
+            )
+            scores = self._matrix[rows] @ vector
+        else:
+            ids = self._ids
+            scores = self.matrix @ vector
+        return _top_k(ids, scores, k, exclude)
+
+    def search_many(
+        self, vectors: "np.ndarray", k: int
+    ) -> list[list[tuple[str, float]]]:
+        """Answer several queries with one matrix product.
+
+        Args:
+            vectors: Query vectors of shape ``(n, dim)``
+            k: Number of results per query
+
+        Returns:
+            One result list per query, most similar first
+        """
+        scores = vectors @ self.matrix.T
+        return [_top_k(self._ids, row, k, None) for row in scores]
+
+
+def _top_k(
+    ids: list[str], scores: "np.ndarray", k: int, exclude: str | None
+) -> list[tuple[str, float]]:
+    """Select the k best scores without sorting all of them."""
+    wanted = k + (exclude is not None)
+    if wanted < len(scores):
+        top = np.argpartition(-scores, wanted - 1)[:wanted]
+    else:
+        top = np.arange(len(scores))
+    top = top[np.argsort(-scores[top], kind="stable")]
+    results = [(ids[i], float(scores[i])) for i in top.tolist() if ids[i] != exclude]
+    return results[:k]
+
+
+@dataclass
+class RelatedNode:
+    """A node found by ``find_related``.
+
+    Attributes:
+        node: The related node
+        score: Cosine similarity of the embeddings in [-1, 1]
+    """
+
+    node: "KnowledgeNode"
+    score: float
+
+
+def enable_vectors(
+    self,
+    embedder: Embedder | None = None,
+    approximate: bool = False,
+    tables: int = 16,
+    bits: int = 10,
+) -> None:
+    """Build the vector index with a custom configuration.
+
+    Without this call ``find_related`` builds an exact index with the
+    default embedder on first use.
+
+    Args:
+        embedder: Embedding to use (defaults to HashingEmbedder)
+        approximate: Whether to maintain random-projection LSH tables for
+            approximate queries on large knowledge bases
+        tables: LSH tables when approximate; more tables raise recall
+        bits: Hyperplanes per LSH table when approximate; more bits make
+            buckets smaller, so queries score fewer candidates but miss
+            more moderately similar nodes
+
+    Raises:
+        ValueError: If the index was already built with another configuration
+    """
+    index = self._lazy_index(
+        "vectors", lambda: VectorIndex(embedder, approximate, tables, bits)
+    )
+    if (embedder is not None and index.embedder is not embedder) or (
+        approximate != (index.lsh is not None)
+    ):
+        raise ValueError("Vector index already built with another configuration")
+
+
+def find_related(
+    self,
+    node_id_or_text: str,
+    k: int = 10,
+    approximate: bool | None = None,
+) -> list[RelatedNode]:
+    """Find the nodes whose text is most similar to a node or to free text.
+
+    Args:
+        node_id_or_text: ID of an existing node, or text to compare
+        k: Maximum number of results
+        approximate: Use the LSH tables (defaults to True when the index
+            was enabled with ``approximate=True``)
+
+    Returns:
+        List of related nodes, most similar first (excluding the node itself)
+    """
+    index = self._lazy_index("vectors", VectorIndex)
+    if k <= 0 or not len(index):
+        return []
+    if node_id_or_text in self._nodes:
+        vector = index.vector(node_id_or_text)
+        exclude = node_id_or_text
+    else:
+        vector = index.embed(node_id_or_text)
+        exclude = None
+    if approximate is None:
+        approximate = index.lsh is not None
+
+    return [
+        RelatedNode(self._nodes[node_id], score)
+        for node_id, score in index.search(vector, k, exclude, approximate)
+    ]
+
+
+# Import and extend KnowledgeBase with vector search
+from .knowledge_node import KnowledgeBase
+
+KnowledgeBase.enable_vectors = enable_vectors  # type: ignore[attr-defined]
+KnowledgeBase.find_related = find_related  # type: ignore[attr-defined]
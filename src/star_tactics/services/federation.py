@@ -0,0 +1,271 @@
+"""Search across several KnowledgeBase instances as one.
+
+Each registered base is searched on its own worker thread and returns its
+best hits already ranked; the per-base lists are combined with a k-way
+heap merge, so only ``limit`` hits are ever taken from each base.
+
+Links may point into other bases, either with a qualified reference
+``"<base>:<node id>"`` or with a bare node ID that is not in the node's
+own base (node IDs are unique across bases).
+"""
+
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import heapq
+import itertools
+
+from ..models.knowledge_node import KnowledgeBase, KnowledgeNode
+
+REFERENCE_SEPARATOR = ":"
+# A title occurrence counts for more than the body containing the text
+TITLE_WEIGHT = 2.0
+CONTENT_WEIGHT = 1.0
+
+
+@dataclass
+class FederatedNode:
+    """A node together with the base it lives in.
+
+    Attributes:
+        base: Name of the knowledge base
+        node: The node
+    """
+
+    base: str
+    node: KnowledgeNode
+
+    @property
+    def reference(self) -> str:
+        """Get the qualified reference to the node."""
+        return f"{self.base}{REFERENCE_SEPARATOR}{self.node.id}"
+
+
+@dataclass
+class FederatedHit(FederatedNode):
+    """A federated search result.
+
+    Attributes:
+        score: Title occurrences times ``TITLE_WEIGHT`` plus
+            ``CONTENT_WEIGHT`` if the body contains the text; 0 for
+            tag-only searches
+    """
+
+    score: float = 0.0
+
+
+def _rank(
+    order: int,
+    name: str,
+    kb: KnowledgeBase,
+    text: str | None,
+    tags: list[str] | None,
+    limit: int,
+) -> list[tuple[tuple, FederatedHit]]:
+    """Search one base and rank its hits.
+
+    Returns:
+        Up to ``limit`` (sort key, hit) pairs, best first
+    """
+    query = kb.query()
+    if tags:
+        query = query.with_tags(tags)
+    if not text:
+        nodes = query.all()
+        scored = ((0.0, node) for node in nodes)
+    else:
+        key_index = kb._key_index
+        normalized = key_index.normalize(text)
+        candidates = query.all() if tags else kb.iter_nodes()
+        scored = (
+            (
+                TITLE_WEIGHT * node._search_keys.title.count(normalized)
+                + (CONTENT_WEIGHT if normalized in key_index.content(node) else 0.0),
+                node,
+            )
+            for node in candidates
+        )
+    # Best score first, then most recently updated, then registration order
+    ranked = heapq.nsmallest(
+        limit,
+        (
+            ((-score, -node.updated_at.timestamp(), order, node.id), score, node)
+            for score, node in scored
+            if score or not text
+        ),
+        key=lambda entry: entry[0],
+    )
+    return [(key, FederatedHit(name, node, score)) for key, score, node in ranked]
+
+
+class Federation:
+    """A set of named knowledge bases searched and linked as one.
+
+    Bases must not be mutated while a search over them is running.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        """Initialize an empty federation.
+
+        Args:
+            max_workers: Threads used to search bases concurrently
+                (defaults to the ThreadPoolExecutor default)
+        """
+        self._bases: dict[str, KnowledgeBase] = {}
+        self._max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+
+    def __enter__(self) -> "Federation":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._bases)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._bases
+
+    def __getitem__(self, name: str) -> KnowledgeBase:
+        return self._bases[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._bases)
+
+    def close(self) -> None:
+        """Shut down the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def register(self, name: str, knowledge_base: KnowledgeBase) -> None:
+        """Add a knowledge base.
+
+        Args:
+            name: Unique name, used in qualified references
+            knowledge_base: The knowledge base
+
+        Raises:
+            ValueError: If the name is empty, taken or contains the
+                reference separator
+        """
+        if not name or REFERENCE_SEPARATOR in name:
+            raise ValueError(f"Invalid knowledge base name: {name!r}")
+        if name in self._bases:
+            raise ValueError(f"Knowledge base already registered: {name}")
+        self._bases[name] = knowledge_base
+
+    def unregister(self, name: str) -> bool:
+        """Remove a knowledge base.
+
+        Args:
+            name: Name of the knowledge base
+
+        Returns:
+            True if it was registered
+        """
+        return self._bases.pop(name, None) is not None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="federation"
+            )
+        return self._executor
+
+    def search(
+        self,
+        text: str | None = None,
+        tags: list[str] | None = None,
+        limit: int = 20,
+    ) -> list[FederatedHit]:
+        """Search all bases by text and/or tags.
+
+        Args:
+            text: Text to search for in titles and content (case- and
+                width-insensitive)
+            tags: Tags that must all be present
+            limit: Maximum number of results
+
+        Returns:
+            Hits from all bases, best first: higher score, then more
+            recently updated, then earlier registered base
+        """
+        if limit <= 0 or not self._bases:
+            return []
+        jobs = [
+            (order, name, kb, text, tags, limit)
+            for order, (name, kb) in enumerate(self._bases.items())
+        ]
+        if len(jobs) == 1:
+            ranked = [_rank(*jobs[0])]
+        else:
+            ranked = list(self._pool().map(lambda job: _rank(*job), jobs))
+        merged = heapq.merge(*ranked, key=lambda entry: entry[0])
+        return [hit for _, hit in itertools.islice(merged, limit)]
+
+    def get(self, reference: str, base: str | None = None) -> FederatedNode | None:
+        """Resolve a node reference.
+
+        Args:
+            reference: A qualified ``"<base>:<node id>"`` reference or a
+                bare node ID; references naming no registered base are
+                treated as bare IDs
+            base: Base to look in first for a bare node ID
+
+        Returns:
+            The node and its base, or None if it does not exist
+        """
+        name, _, node_id = reference.rpartition(REFERENCE_SEPARATOR)
+        if name in self._bases:
+            node = self._bases[name].get_node(node_id)
+            return FederatedNode(name, node) if node is not None else None
+
+        if base is not None and base in self._bases:
+            node = self._bases[base].get_node(reference)
+            if node is not None:
+                return FederatedNode(base, node)
+        for name, kb in self._bases.items():
+            if name != base:
+                node = kb.get_node(reference)
+                if node is not None:
+                    return FederatedNode(name, node)
+        return None
+
+    def resolve_links(self, base: str, node_id: str) -> dict[str, FederatedNode | None]:
+        """Resolve the links of a node across all bases.
+
+        Args:
+            base: Name of the node's base
+            node_id: The node
+
+        Returns:
+            Mapping of each link to its target, or None if it is broken
+            everywhere; empty if the node does not exist
+        """
+        kb = self._bases.get(base)
+        node = kb.get_node(node_id) if kb is not None else None
+        if node is None:
+            return {}
+        return {link: self.get(link, base) for link in dict.fromkeys(node.links)}
+
+    def broken_links(self) -> dict[str, dict[str, list[str]]]:
+        """Find links that resolve in no base.
+
+        Only links broken within their own base are looked up elsewhere.
+
+        Returns:
+            Mapping of base name to node ID to its broken links
+        """
+        broken: dict[str, dict[str, list[str]]] = {}
+        for name, kb in self._bases.items():
+            for node_id in kb._link_index.broken_sources():
+                unresolved = [
+                    link
+                    for link in dict.fromkeys(kb.get_broken_links(node_id))
+                    if self.get(link, name) is None
+                ]
+                if unresolved:
+                    broken.setdefault(name, {})[node_id] = unresolved
+        return broken
@@ -0,0 +1,554 @@
+"""Live-stream question queue feeding answered questions into a KnowledgeBase.
+
+Questions arrive far faster than they are answered, so the queue keeps
+open questions in an indexed max-heap ordered by support (votes plus
+folded duplicates) and recency. Re-asking a question that is already
+open folds into it instead of adding a new entry: exact repeats are
+matched on normalized text in O(1), near-duplicates through the MinHash
+LSH index also used for node deduplication.
+
+Answered questions are held until ``promote_answered`` turns a batch of
+them into knowledge nodes at once, with a single storage save.
+"""
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+import heapq
+import itertools
+import math
+import re
+import time
+import uuid
+
+from ..models.dedup import MinHashLSH
+from ..models.handles import new_ulid
+from ..models.knowledge_node import KnowledgeBase, KnowledgeNode
+from ..models.normalize import normalize
+
+QUESTION_TAG = "question"
+# Distinct phrasings kept per question; further duplicates are only counted
+MAX_VARIANTS = 8
+# Eight bands of eight rows instead of the sixteen of four used for node
+# deduplication: short questions share many common shingles, and short
+# bands would make most of the queue a candidate for every lookup
+LSH_BANDS = 8
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING = "?？!！。.、, "
+
+
+def normalize_question(text: str, normalize: Callable[[str], str] = normalize) -> str:
+    """Get the key under which exact repeats of a question are folded.
+
+    Args:
+        text: Question text
+        normalize: Folds case and width variants, like search keys
+
+    Returns:
+        Normalized text with whitespace collapsed and trailing
+        punctuation removed
+    """
+    return _WHITESPACE.sub(" ", normalize(text)).strip().rstrip(_TRAILING)
+
+
+class IndexedHeap:
+    """Binary max-heap with a position index for keyed updates.
+
+    ``push``, ``update``, ``remove`` and ``pop`` are O(log n); ``top``
+    reads the k highest entries in O(k log k) without modifying the heap.
+    Equal priorities come out in insertion order.
+    """
+
+    def __init__(self):
+        """Initialize an empty heap."""
+        # Entries are [priority, sequence, key]
+        self._entries: list[list] = []
+        self._positions: dict[str, int] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._positions
+
+    def priority(self, key: str) -> float | None:
+        """Get the priority of a key.
+
+        Args:
+            key: Entry key
+
+        Returns:
+            The priority, or None if the key is not in the heap
+        """
+        position = self._positions.get(key)
+        return None if position is None else self._entries[position][0]
+
+    def push(self, key: str, priority: float) -> None:
+        """Insert a key, or change its priority if already present.
+
+        Args:
+            key: Entry key
+            priority: Higher priorities are popped first
+        """
+        if key in self._positions:
+            self.update(key, priority)
+            return
+        self._entries.append([priority, next(self._sequence), key])
+        self._positions[key] = len(self._entries) - 1
+        self._sift_up(len(self._entries) - 1)
+
+    def update(self, key: str, priority: float) -> None:
+        """Change the priority of a key already in the heap.
+
+        Args:
+            key: Entry key
+            priority: New priority
+
+        Raises:
+            KeyError: If the key is not in the heap
+        """
+        position = self._positions[key]
+        entry = self._entries[position]
+        previous, entry[0] = entry[0], priority
+        if priority > previous:
+            self._sift_up(position)
+        elif priority < previous:
+            self._sift_down(position)
+
+    def remove(self, key: str) -> bool:
+        """Remove a key.
+
+        Args:
+            key: Entry key
+
+        Returns:
+            True if the key was in the heap
+        """
+        position = self._positions.pop(key, None)
+        if position is None:
+            return False
+        last = self._entries.pop()
+        if position < len(self._entries):
+            self._entries[position] = last
+            self._positions[last[2]] = position
+            self._sift_up(position)
+            self._sift_down(self._positions[last[2]])
+        return True
+
+    def peek(self) -> tuple[str, float] | None:
+        """Get the highest entry without removing it.
+
+        Returns:
+            (key, priority), or None if the heap is empty
+        """
+        if not self._entries:
+            return None
+        priority, _, key = self._entries[0]
+        return key, priority
+
+    def pop(self) -> tuple[str, float] | None:
+        """Remove and return the highest entry.
+
+        Returns:
+            (key, priority), or None if the heap is empty
+        """
+        top = self.peek()
+        if top is not None:
+            self.remove(top[0])
+        return top
+
+    def top(self, k: int) -> list[tuple[str, float]]:
+        """Get the k highest entries, highest first.
+
+        Args:
+            k: Number of entries
+
+        Returns:
+            List of (key, priority)
+        """
+        entries = self._entries
+        results: list[tuple[str, float]] = []
+        if not entries or k <= 0:
+            return results
+        # Expand heap positions best-first; children never outrank parents
+        frontier = [(-entries[0][0], entries[0][1], 0)]
+        while frontier and len(results) < k:
+            _, _, position = heapq.heappop(frontier)
+            priority, _, key = entries[position]
+            results.append((key, priority))
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(entries):
+                    entry = entries[child]
+                    heapq.heappush(frontier, (-entry[0], entry[1], child))
+        return results
+
+    def _higher(self, i: int, j: int) -> bool:
+        a, b = self._entries[i], self._entries[j]
+        return a[0] > b[0] or (a[0] == b[0] and a[1] < b[1])
+
+    def _swap(self, i: int, j: int) -> None:
+        entries = self._entries
+        entries[i], entries[j] = entries[j], entries[i]
+        self._positions[entries[i][2]] = i
+        self._positions[entries[j][2]] = j
+
+    def _sift_up(self, position: int) -> None:
+        while position:
+            parent = (position - 1) // 2
+            if not self._higher(position, parent):
+                break
+            self._swap(position, parent)
+            position = parent
+
+    def _sift_down(self, position: int) -> None:
+        size = len(self._entries)
+        while True:
+            best = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < size and self._higher(child, best):
+                    best = child
+            if best == position:
+                return
+            self._swap(position, best)
+            position = best
+
+
+@dataclass
+class Question:
+    """A question in the queue.
+
+    Attributes:
+        id: Question ID
+        text: Text of the first asking
+        asked_at: Unix time of the first asking
+        author: Who asked first
+        tags: Tags from every folded asking
+        votes: Net votes
+        duplicates: Number of repeats folded into this question
+        variants: Distinct phrasings of folded repeats
+        links: Node IDs to link from the promoted node
+        answer: Answer text once answered
+        answered_at: Unix time of the answer
+        node_id: ID of the knowledge node once promoted
+    """
+
+    id: str
+    text: str
+    asked_at: float
+    author: str | None = None
+    tags: list[str] = field(default_factory=list)
+    votes: int = 0
+    duplicates: int = 0
+    variants: list[str] = field(default_factory=list)
+    links: list[str] = field(default_factory=list)
+    answer: str | None = None
+    answered_at: float | None = None
+    node_id: str | None = None
+
+    @property
+    def support(self) -> int:
+        """The asking itself plus repeats and net votes, at least 1."""
+        return max(1 + self.duplicates + self.votes, 1)
+
+
+class QuestionQueue:
+    """Prioritized, duplicate-folding queue of open questions.
+
+    A question's priority is ``log(support) + ln 2 * age / half_life``
+    measured from a fixed epoch, which orders questions exactly like
+    ``support * 2 ** (-age / half_life)`` decayed to the present but
+    never changes as time passes. Only votes and folded repeats move a
+    question, each in O(log n).
+    """
+
+    def __init__(
+        self,
+        knowledge_base: KnowledgeBase,
+        half_life: float = 600.0,
+        near_duplicate_threshold: float | None = 0.7,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize an empty queue.
+
+        Args:
+            knowledge_base: Knowledge base answered questions are promoted to
+            half_life: Seconds after which a question needs twice the
+                support to rank level with a new one
+            near_duplicate_threshold: Minimum estimated similarity of
+                character shingles for folding a rephrased question, or
+                None to fold exact repeats only
+            clock: Source of Unix timestamps
+        """
+        if half_life <= 0:
+            raise ValueError("half_life must be positive")
+        self.knowledge_base = knowledge_base
+        self.half_life = half_life
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self._clock = clock
+        self._epoch = clock()
+        self._normalize = knowledge_base._key_index.normalize
+        self._heap = IndexedHeap()
+        # Unanswered questions, whether queued or taken with pop()
+        self._questions: dict[str, Question] = {}
+        self._by_key: dict[str, str] = {}
+        self._keys: dict[str, str] = {}
+        self._lsh = None
+        if near_duplicate_threshold is not None:
+            self._lsh = MinHashLSH(bands=LSH_BANDS, key_index=knowledge_base._key_index)
+        self._answered: list[Question] = []
+        # Normalized text -> node ID of promoted answers, for linking repeats
+        self._promoted: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        """Number of queued questions."""
+        return len(self._heap)
+
+    @property
+    def pending_promotion(self) -> int:
+        """Number of answered questions not yet promoted."""
+        return len(self._answered)
+
+    def get(self, question_id: str) -> Question | None:
+        """Get an unanswered question by ID.
+
+        Args:
+            question_id: Question ID
+
+        Returns:
+            The question, or None if unknown, answered or dismissed
+        """
+        return self._questions.get(question_id)
+
+    def priority(self, question: Question) -> float:
+        """Compute the heap priority of a question.
+
+        Args:
+            question: The question
+
+        Returns:
+            Time-invariant priority; higher is asked first
+        """
+        age = question.asked_at - self._epoch
+        return math.log(question.support) + age * math.log(2) / self.half_life
+
+    def ask(
+        self,
+        text: str,
+        author: str | None = None,
+        tags: list[str] | None = None,
+        asked_at: float | None = None,
+    ) -> str:
+        """Add a question, folding it into an open duplicate if there is one.
+
+        Args:
+            text: Question text
+            author: Who asked
+            tags: Optional tags for the promoted node
+            asked_at: Unix time; defaults to now
+
+        Returns:
+            ID of the new question or of the question it was folded into
+
+        Raises:
+            ValueError: If the text is empty
+        """
+        key = normalize_question(text, self._normalize)
+        if not key:
+            raise ValueError("Question text is empty")
+
+        question_id = self._by_key.get(key)
+        signature = None
+        if question_id is None and self._lsh is not None:
+            signature = self._lsh.signature_of(key)
+            if signature is not None:
+                matches = self._lsh.query(signature, self.near_duplicate_threshold)
+                if matches:
+                    question_id = matches[0][0]
+        if question_id is not None:
+            self._fold(self._questions[question_id], text, key, tags)
+            return question_id
+
+        question = Question(
+            id=str(uuid.uuid4()),
+            text=text,
+            asked_at=self._clock() if asked_at is None else asked_at,
+            author=author,
+            tags=list(dict.fromkeys(tags or [])),
+        )
+        self._questions[question.id] = question
+        self._by_key[key] = question.id
+        self._keys[question.id] = key
+        if signature is not None:
+            self._lsh.insert(question.id, signature)
+        self._heap.push(question.id, self.priority(question))
+        return question.id
+
+    def ask_many(self, questions: Iterable[str | dict]) -> list[str]:
+        """Add many questions.
+
+        Args:
+            questions: Question texts, or dicts of ``ask`` keyword arguments
+
+        Returns:
+            Question IDs in input order
+        """
+        ask = self.ask
+        return [
+            ask(item) if isinstance(item, str) else ask(**item) for item in questions
+        ]
+
+    def _fold(
+        self, question: Question, text: str, key: str, tags: list[str] | None
+    ) -> None:
+        question.duplicates += 1
+        if (
+            len(question.variants) < MAX_VARIANTS
+            and key != self._keys[question.id]
+            and text not in question.variants
+        ):
+            question.variants.append(text)
+        for tag in tags or ():
+            if tag not in question.tags:
+                question.tags.append(tag)
+        if question.id in self._heap:
+            self._heap.update(question.id, self.priority(question))
+
+    def vote(self, question_id: str, delta: int = 1) -> bool:
+        """Up- or down-vote an unanswered question.
+
+        Args:
+            question_id: Question ID
+            delta: Vote change; support never drops below 1
+
+        Returns:
+            True if the question was found
+        """
+        question = self._questions.get(question_id)
+        if question is None:
+            return False
+        question.votes = max(question.votes + delta, -question.duplicates)
+        if question_id in self._heap:
+            self._heap.update(question_id, self.priority(question))
+        return True
+
+    def top(self, k: int = 10) -> list[Question]:
+        """Get the highest-priority queued questions without removing them.
+
+        Args:
+            k: Number of questions
+
+        Returns:
+            Questions, highest priority first
+        """
+        return [self._questions[key] for key, _ in self._heap.top(k)]
+
+    def pop(self) -> Question | None:
+        """Take the highest-priority question off the queue.
+
+        The question stays known until answered or dismissed, so repeats
+        asked while it is being answered still fold into it.
+
+        Returns:
+            The question, or None if the queue is empty
+        """
+        entry = self._heap.pop()
+        return None if entry is None else self._questions[entry[0]]
+
+    def answer(
+        self,
+        question_id: str,
+        answer: str,
+        links: list[str] | None = None,
+        answered_at: float | None = None,
+    ) -> bool:
+        """Record the answer to a question and hold it for promotion.
+
+        Args:
+            question_id: Question ID
+            answer: Answer text
+            links: Node IDs the promoted node should link to
+            answered_at: Unix time; defaults to now
+
+        Returns:
+            True if the question was found and not yet answered
+        """
+        question = self._forget(question_id)
+        if question is None:
+            return False
+        question.answer = answer
+        question.answered_at = self._clock() if answered_at is None else answered_at
+        for link in links or ():
+            if link not in question.links:
+                question.links.append(link)
+        self._answered.append(question)
+        return True
+
+    def dismiss(self, question_id: str) -> bool:
+        """Drop a question without answering it.
+
+        Args:
+            question_id: Question ID
+
+        Returns:
+            True if the question was found
+        """
+        return self._forget(question_id) is not None
+
+    def _forget(self, question_id: str) -> Question | None:
+        question = self._questions.pop(question_id, None)
+        if question is None:
+            return None
+        self._heap.remove(question_id)
+        del self._by_key[self._keys.pop(question_id)]
+        if self._lsh is not None:
+            self._lsh.discard(question_id)
+        return question
+
+    def promote_answered(self, batch_size: int | None = None) -> list[str]:
+        """Turn answered questions into knowledge nodes.
+
+        Each node is titled with the question, holds the answer, is
+        tagged ``question`` plus the question's tags and links to the
+        requested nodes and to the node of an earlier answer to the same
+        question. The batch is indexed in bulk and saved once.
+
+        Args:
+            batch_size: Maximum number of questions to promote; all by default
+
+        Returns:
+            IDs of the created nodes, in answer order
+        """
+        batch = self._answered[:batch_size]
+        if not batch:
+            return []
+        del self._answered[: len(batch)]
+
+        kb = self.knowledge_base
+        ulid = kb._id_scheme == "ulid"
+        nodes = []
+        for question in batch:
+            key = normalize_question(question.text, self._normalize)
+            links = list(question.links)
+            earlier = self._promoted.get(key)
+            if earlier is not None and earlier not in links:
+                links.append(earlier)
+            answered = datetime.fromtimestamp(question.answered_at)
+            node = KnowledgeNode(
+                title=question.text,
+                content=question.answer,
+                tags=[QUESTION_TAG]
+                + [tag for tag in question.tags if tag != QUESTION_TAG],
+                links=links,
+                id=new_ulid(answered) if ulid else None,
+                created_at=answered,
+            )
+            question.node_id = node.id
+            self._promoted[key] = node.id
+            nodes.append(node)
+
+        kb._add_nodes(nodes)
+        if kb._storage:
+            kb._storage.save(kb)
+        return [node.id for node in nodes]
@@ -0,0 +1,683 @@
+"""Local asyncio HTTP/JSON API server over a KnowledgeBase.
+
+Endpoints (all bodies are JSON)::
+
+    GET    /nodes                  all nodes, streamed
+    POST   /nodes                  create  {"title", "content", "tags", "links"}
+    GET    /nodes/{id}             one node
+    PATCH  /nodes/{id}             update any of the fields above
+    DELETE /nodes/{id}             delete
+    GET    /nodes/{id}/links       links, backlinks and broken links
+    POST   /links                  add a bidirectional link {"source", "target"}
+    DELETE /links                  remove a bidirectional link
+    GET    /search?q=&tags=&limit= query results, streamed; with &snippet=
+                                   WIDTH each carries a highlighted excerpt
+    GET    /changes?since=         change events as JSON Lines, kept open
+    GET    /stats                  node count, change sequence, write stats
+
+Reads are answered on the event loop directly. Mutations go through a
+bounded queue to a single writer task, which applies whatever is queued
+and then saves once, so many concurrent writes share one storage write.
+A mutation is answered after the save that includes it has finished.
+"""
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+import json
+import logging
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from ..models.events import ChangeEvent, HistoryUnavailable, SubscriptionLagged
+from ..models.knowledge_node import KnowledgeBase, KnowledgeNode
+
+logger = logging.getLogger(__name__)
+
+_REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    410: "Gone",
+    411: "Length Required",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """An error answered with a JSON error body.
+
+    Attributes:
+        status: HTTP status code
+        message: Error description sent to the client
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class _Request:
+    method: str
+    path: str
+    query: dict[str, list[str]]
+    version: str
+    headers: dict[str, str]
+    body: bytes
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def param(self, name: str, default: str | None = None) -> str | None:
+        values = self.query.get(name)
+        return values[0] if values else default
+
+    def int_param(self, name: str, default: int | None = None) -> int | None:
+        value = self.param(name)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise HTTPError(400, f"{name} must be an integer") from None
+
+    def json(self) -> dict:
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON") from None
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return data
+
+
+def _event_to_dict(event: ChangeEvent) -> dict:
+    return {
+        "seq": event.seq,
+        "type": event.type.value,
+        "node_id": event.node_id,
+        "timestamp": event.timestamp.isoformat(),
+        "target_id": event.target_id,
+        "fields": list(event.fields),
+    }
+
+
+def _string_list(data: dict, key: str) -> list[str] | None:
+    value = data.get(key)
+    if value is None:
+        return None
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise HTTPError(400, f"{key} must be a list of strings")
+    return value
+
+
+def _string(data: dict, key: str, required: bool = False) -> str | None:
+    value = data.get(key)
+    if value is None and not required:
+        return None
+    if not isinstance(value, str):
+        raise HTTPError(400, f"{key} must be a string")
+    return value
+
+
+class KnowledgeServer:
+    """HTTP/1.1 server exposing a knowledge base as a JSON API.
+
+    Connections are kept alive and pipelined requests are answered in
+    order. Large result sets are sent with chunked transfer encoding in
+    batches, so the first results go out before the last are serialized.
+
+    While the server runs it owns persistence: the knowledge base's own
+    storage (or the ``storage`` argument) is detached so that mutations do
+    not save synchronously, and the writer task saves instead.
+    """
+
+    def __init__(
+        self,
+        knowledge_base: KnowledgeBase,
+        storage=None,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        write_queue_size: int = 1024,
+        stream_batch_size: int = 256,
+        idle_timeout: float = 30.0,
+        heartbeat_interval: float = 15.0,
+        max_body_size: int = 16 * 1024 * 1024,
+    ):
+        """Initialize the server.
+
+        Args:
+            knowledge_base: The knowledge base to serve
+            storage: Storage backend to save to (defaults to the knowledge
+                base's own, if any)
+            host: Interface to listen on
+            port: Port to listen on; 0 picks a free port
+            write_queue_size: Maximum number of mutations waiting for the
+                writer; further mutations wait for room
+            stream_batch_size: Results serialized per chunk of a streamed
+                response
+            idle_timeout: Seconds a keep-alive connection may stay idle
+            heartbeat_interval: Seconds between keep-alive lines on an idle
+                change stream
+            max_body_size: Largest accepted request body in bytes
+        """
+        self.knowledge_base = knowledge_base
+        self.storage = storage if storage is not None else knowledge_base._storage
+        self.host = host
+        self.port = port
+        self.stream_batch_size = stream_batch_size
+        self.idle_timeout = idle_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.max_body_size = max_body_size
+        self.write_queue_size = write_queue_size
+        self.saves = 0
+        self.writes = 0
+        self._original_storage = knowledge_base._storage
+        self._server: asyncio.Server | None = None
+        self._writer_task: asyncio.Task | None = None
+        self._writes: asyncio.Queue | None = None
+        self._connections: set[asyncio.Task] = set()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Host and port the server is listening on."""
+        if self._server is None:
+            return self.host, self.port
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start(self) -> None:
+        """Start listening and start the writer task."""
+        self.knowledge_base._storage = None
+        self._writes = asyncio.Queue(maxsize=self.write_queue_size)
+        self._writer_task = asyncio.create_task(self._write_loop())
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+
+    async def serve_forever(self) -> None:
+        """Start the server if needed and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop accepting connections, finish queued writes and shut down."""
+        if self._server is None:
+            return
+        self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._writes.join()
+        self._writer_task.cancel()
+        await asyncio.gather(self._writer_task, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+        self.knowledge_base._storage = self._original_storage
+
+    async def __aenter__(self) -> "KnowledgeServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    # -- writes ---------------------------------------------------------------
+
+    async def _mutate(self, operation: Callable, *args):
+        """Queue a mutation and wait until it is applied and saved.
+
+        Args:
+            operation: Knowledge base method to call
+            *args: Its arguments
+
+        Returns:
+            The method's return value
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((operation, args, future))
+        return await future
+
+    async def _write_loop(self) -> None:
+        """Apply queued mutations in batches, saving once per batch."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._writes.get()]
+            while not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+
+            results = []
+            for operation, args, future in batch:
+                try:
+                    results.append((future, operation(*args), None))
+                except Exception as exc:
+                    results.append((future, None, exc))
+            self.writes += len(batch)
+
+            if self.storage is not None:
+                # Nothing else mutates the knowledge base until this returns
+                try:
+                    await loop.run_in_executor(
+                        None, self.storage.save, self.knowledge_base
+                    )
+                    self.saves += 1
+                except Exception as exc:
+                    logger.exception("Saving the knowledge base failed")
+                    results = [(future, None, exc) for future, _, _ in results]
+
+            for future, result, error in results:
+                if not future.done():
+                    if error is None:
+                        future.set_result(result)
+                    else:
+                        future.set_exception(error)
+                self._writes.task_done()
+
+    # -- connections ----------------------------------------------------------
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as exc:
+                    await self._send_json(
+                        writer, exc.status, {"error": exc.message}, False
+                    )
+                    return
+                if request is None:
+                    return
+                keep_alive = await self._dispatch(request, writer)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> _Request | None:
+        """Read one request; pipelined requests stay buffered in the reader.
+
+        Returns:
+            The request, or None when the client closed or went idle
+        """
+        try:
+            head = await asyncio.wait_for(
+                reader.readuntil(b"\r\n\r\n"), self.idle_timeout
+            )
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "Request header is too large") from None
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise HTTPError(400, "Malformed request line") from None
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(411, "Chunked request bodies are not supported")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length") from None
+        if length > self.max_body_size:
+            raise HTTPError(413, "Request body is too large")
+        try:
+            body = await reader.readexactly(length) if length else b""
+        except asyncio.IncompleteReadError:
+            return None
+
+        url = urlsplit(target)
+        return _Request(
+            method=method.upper(),
+            path=unquote(url.path),
+            query=parse_qs(url.query),
+            version=version,
+            headers=headers,
+            body=body,
+        )
+
+    async def _dispatch(self, request: _Request, writer: asyncio.StreamWriter) -> bool:
+        """Route a request and write its response.
+
+        Returns:
+            Whether the connection can take another request
+        """
+        keep_alive = request.keep_alive
+        try:
+            segments = [s for s in request.path.split("/") if s]
+            handler, args = self._route(request.method, segments)
+            response = await handler(request, *args)
+        except HTTPError as exc:
+            await self._send_json(
+                writer, exc.status, {"error": exc.message}, keep_alive
+            )
+            return keep_alive
+        except Exception:
+            logger.exception("Error handling %s %s", request.method, request.path)
+            await self._send_json(
+                writer, 500, {"error": "Internal server error"}, keep_alive
+            )
+            return keep_alive
+
+        if isinstance(response, _Stream):
+            return await self._send_stream(writer, request, response) and keep_alive
+        status, body = response
+        await self._send_json(writer, status, body, keep_alive)
+        return keep_alive
+
+    def _route(self, method: str, segments: list[str]) -> tuple[Callable, tuple]:
+        routes: dict[str, Callable]
+        args: tuple = ()
+        if segments == ["nodes"]:
+            routes = {"GET": self._list_nodes, "POST": self._create_node}
+        elif len(segments) == 2 and segments[0] == "nodes":
+            routes = {
+                "GET": self._get_node,
+                "PATCH": self._update_node,
+                "DELETE": self._delete_node,
+            }
+            args = (segments[1],)
+        elif len(segments) == 3 and segments[0] == "nodes" and segments[2] == "links":
+            routes = {"GET": self._get_links}
+            args = (segments[1],)
+        elif segments == ["links"]:
+            routes = {"POST": self._add_link, "DELETE": self._remove_link}
+        elif segments == ["search"]:
+            routes = {"GET": self._search}
+        elif segments == ["changes"]:
+            routes = {"GET": self._changes}
+        elif segments == ["stats"]:
+            routes = {"GET": self._stats}
+        else:
+            raise HTTPError(404, "No such endpoint")
+        handler = routes.get(method)
+        if handler is None:
+            raise HTTPError(405, f"{method} is not allowed here")
+        return handler, args
+
+    # -- responses ------------------------------------------------------------
+
+    async def _send_json(
+        self, writer: asyncio.StreamWriter, status: int, body, keep_alive: bool
+    ) -> None:
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            self._head(status, "application/json", keep_alive)
+            + f"Content-Length: {len(payload)}\r\n\r\n".encode("ascii")
+            + payload
+        )
+        await writer.drain()
+
+    def _head(self, status: int, content_type: str, keep_alive: bool) -> bytes:
+        return (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        ).encode("ascii")
+
+    async def _send_stream(
+        self, writer: asyncio.StreamWriter, request: _Request, stream: "_Stream"
+    ) -> bool:
+        """Write a streamed response.
+
+        HTTP/1.0 clients get the body unframed, ended by closing the
+        connection.
+
+        Returns:
+            Whether the connection can take another request
+        """
+        chunked = request.version != "HTTP/1.0"
+        head = self._head(200, stream.content_type, chunked and request.keep_alive)
+        if chunked:
+            head += b"Transfer-Encoding: chunked\r\n"
+        writer.write(head + b"\r\n")
+        try:
+            async for data in stream.chunks:
+                if chunked:
+                    writer.write(b"%x\r\n%b\r\n" % (len(data), data))
+                else:
+                    writer.write(data)
+                await writer.drain()
+        finally:
+            # Closes the change subscription when the client goes away
+            await stream.chunks.aclose()
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        return chunked
+
+    async def _json_array(
+        self,
+        nodes: list[KnowledgeNode],
+        extra: Callable[[KnowledgeNode], dict] | None = None,
+    ):
+        """Serialize nodes as a JSON array, one batch per chunk.
+
+        ``extra`` adds fields to each node's object as it is serialized.
+        """
+        step = self.stream_batch_size
+        for start in range(0, max(len(nodes), 1), step):
+            parts = [
+                json.dumps(
+                    node.to_dict() | extra(node) if extra else node.to_dict(),
+                    ensure_ascii=False,
+                )
+                for node in nodes[start : start + step]
+            ]
+            prefix = "[" if start == 0 else ","
+            suffix = "]" if start + step >= len(nodes) else ""
+            yield (prefix + ",".join(parts) + suffix).encode("utf-8")
+            # Let other connections run between batches
+            await asyncio.sleep(0)
+
+    # -- handlers -------------------------------------------------------------
+
+    def _node_or_404(self, node_id: str) -> KnowledgeNode:
+        node = self.knowledge_base.get_node(node_id)
+        if node is None:
+            raise HTTPError(404, f"Node not found: {node_id}")
+        return node
+
+    async def _list_nodes(self, request: _Request) -> "_Stream":
+        nodes = list(self.knowledge_base.iter_nodes())
+        return _Stream(self._json_array(nodes))
+
+    async def _search(self, request: _Request) -> "_Stream":
+        query = self.knowledge_base.query()
+        tags = [tag for tag in (request.param("tags") or "").split(",") if tag]
+        if tags:
+            query = query.with_tags(tags)
+        text = request.param("q")
+        if text:
+            query = query.containing(text)
+        limit = request.int_param("limit")
+        if limit is not None and limit < 0:
+            raise HTTPError(400, "limit must be non-negative")
+        query = query.limit(limit)
+        width = request.int_param("snippet")
+        extra = None
+        if text and width is not None:
+            if width <= 0:
+                raise HTTPError(400, "snippet must be positive")
+
+            def extra(node: KnowledgeNode) -> dict:
+                snippet = self.knowledge_base.snippet(node, text, width)
+                return {"snippet": asdict(snippet)}
+
+        # Collected up front: mutations between batches must not change the
+        # result set while it is being sent
+        return _Stream(self._json_array(query.all(), extra))
+
+    async def _get_node(self, request: _Request, node_id: str):
+        return 200, self._node_or_404(node_id).to_dict()
+
+    def _create_and_get(self, *args) -> dict:
+        # Runs in the write batch, before a queued delete can remove the node
+        kb = self.knowledge_base
+        return kb.get_node(kb.create_node(*args)).to_dict()
+
+    def _update_and_get(self, node_id: str, *args) -> dict | None:
+        kb = self.knowledge_base
+        return (
+            kb.get_node(node_id).to_dict() if kb.update_node(node_id, *args) else None
+        )
+
+    async def _create_node(self, request: _Request):
+        data = request.json()
+        node = await self._mutate(
+            self._create_and_get,
+            _string(data, "title", required=True),
+            _string(data, "content", required=True),
+            _string_list(data, "tags"),
+            _string_list(data, "links"),
+        )
+        return 201, node
+
+    async def _update_node(self, request: _Request, node_id: str):
+        data = request.json()
+        node = await self._mutate(
+            self._update_and_get,
+            node_id,
+            _string(data, "title"),
+            _string(data, "content"),
+            _string_list(data, "tags"),
+            _string_list(data, "links"),
+        )
+        if node is None:
+            raise HTTPError(404, f"Node not found: {node_id}")
+        return 200, node
+
+    async def _delete_node(self, request: _Request, node_id: str):
+        if not await self._mutate(self.knowledge_base.delete_node, node_id):
+            raise HTTPError(404, f"Node not found: {node_id}")
+        return 200, {"deleted": node_id}
+
+    async def _get_links(self, request: _Request, node_id: str):
+        node = self._node_or_404(node_id)
+        return 200, {
+            "links": node.links,
+            "backlinks": sorted(self.knowledge_base._link_index.backlinks(node_id)),
+            "broken": self.knowledge_base.get_broken_links(node_id),
+        }
+
+    async def _link_request(self, request: _Request, operation: Callable):
+        data = request.json()
+        source = _string(data, "source", required=True)
+        target = _string(data, "target", required=True)
+        if not await self._mutate(operation, source, target):
+            raise HTTPError(404, "Both nodes must exist")
+        return 200, {"source": source, "target": target}
+
+    async def _add_link(self, request: _Request):
+        return await self._link_request(
+            request, self.knowledge_base.add_bidirectional_link
+        )
+
+    async def _remove_link(self, request: _Request):
+        return await self._link_request(
+            request, self.knowledge_base.remove_bidirectional_link
+        )
+
+    async def _stats(self, request: _Request):
+        return 200, {
+            "nodes": len(self.knowledge_base._nodes),
+            "change_seq": self.knowledge_base.change_seq,
+            "writes": self.writes,
+            "saves": self.saves,
+            "queued_writes": self._writes.qsize(),
+            "connections": len(self._connections),
+        }
+
+    async def _changes(self, request: _Request) -> "_Stream":
+        since = request.int_param("since")
+        try:
+            # A slow client must not stall mutations on the event loop
+            subscription = self.knowledge_base.subscribe(
+                overflow="disconnect", since=since
+            )
+        except HistoryUnavailable as exc:
+            raise HTTPError(410, str(exc)) from None
+        return _Stream(self._event_lines(subscription), "application/x-ndjson")
+
+    async def _event_lines(self, subscription):
+        """Yield change events as JSON Lines, with blank heartbeat lines."""
+        with subscription:
+            events = subscription.__aiter__()
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        events.__anext__(), self.heartbeat_interval
+                    )
+                except asyncio.TimeoutError:
+                    yield b"\n"
+                    continue
+                except StopAsyncIteration:
+                    return
+                except SubscriptionLagged as exc:
+                    line = {"error": "lagged", "last_seq": exc.last_seq}
+                    yield json.dumps(line).encode("utf-8") + b"\n"
+                    return
+                yield json.dumps(_event_to_dict(event)).encode("utf-8") + b"\n"
+
+
+class _Stream:
+    """A response body produced incrementally."""
+
+    def __init__(self, chunks, content_type: str = "application/json"):
+        self.chunks = chunks
+        self.content_type = content_type
+
+
+def serve(
+    knowledge_base: KnowledgeBase,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    ready: Callable[[tuple[str, int]], None] | None = None,
+    **options,
+) -> None:
+    """Run a server until interrupted.
+
+    Args:
+        knowledge_base: The knowledge base to serve
+        host: Interface to listen on
+        port: Port to listen on
+        ready: Optional callback receiving the bound address
+        **options: Further ``KnowledgeServer`` arguments
+    """
+
+    async def run() -> None:
+        server = KnowledgeServer(knowledge_base, host=host, port=port, **options)
+        await server.start()
+        if ready is not None:
+            ready(server.address)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -3,9 +3,30 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
 import json
+import time
+from datetime import datetime
+from ..models.compression import (
+    codec_from_settings,
+    content_from_json,
+    content_to_json,
+    storage_settings,
+)
+from ..models.history import history_from_json, history_to_json
 from ..models.knowledge_node import KnowledgeBase, KnowledgeNode
 
 
+def parse_timestamp(value: str | None) -> datetime | None:
+    """Parse an ISO 8601 timestamp as written by storage and exports.
+
+    Args:
+        value: The serialized timestamp, or None if it was not stored
+
+    Returns:
+        The parsed datetime, or None if no timestamp was stored
+    """
+    return datetime.fromisoformat(value) if value else None
+
+
 class StorageBackend(ABC):
     """Abstract base class for storage backends."""
 
@@ -31,13 +52,17 @@ class StorageBackend(ABC):
 class JSONStorage(StorageBackend):
     """JSON file storage backend."""
 
-    def __init__(self, filepath: Path | str):
+    def __init__(self, filepath: Path | str, indent: int | None = 2):
         """Initialize JSON storage with file path.
 
         Args:
             filepath: Path to the JSON file
+            indent: Indentation for pretty-printing, or None for compact
+                output. ``parallel_load`` can only split indented files;
+                compact ones are parsed in a single process.
         """
         self.filepath = Path(filepath)
+        self.indent = indent
 
     def save(self, knowledge_base: KnowledgeBase) -> None:
         """Save the knowledge base to a JSON file.
@@ -45,25 +70,50 @@ class JSONStorage(StorageBackend):
         Args:
             knowledge_base: The knowledge base to save
         """
+        metrics = knowledge_base._metrics
+        start = time.perf_counter()
+
         # Convert nodes to serializable format
         data: dict[str, dict] = {"nodes": {}}
 
-        for node in knowledge_base.get_all_nodes():
+        for node in knowledge_base.iter_nodes():
             data["nodes"][node.id] = {
                 "title": node.title,
-                "content": node.content,
+                "content": content_to_json(node._content),
                 "tags": node.tags,
                 "links": node.links,
                 "created_at": node.created_at.isoformat(),
                 "updated_at": node.updated_at.isoformat(),
             }
 
+        # Written after the nodes so parallel_load can still split the file
+        compression = storage_settings(knowledge_base)
+        if compression is not None:
+            data["compression"] = compression
+        history = history_to_json(knowledge_base)
+        if history is not None:
+            data["history"] = history
+
+        if self.indent is None:
+            text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        else:
+            text = json.dumps(data, indent=self.indent, ensure_ascii=False)
+        encoded = text.encode("utf-8")
+        serialized = time.perf_counter()
+
         # Ensure parent directory exists
         self.filepath.parent.mkdir(parents=True, exist_ok=True)
 
         # Write to file
-        with open(self.filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(self.filepath, "wb") as f:
+            f.write(encoded)
+
+        if metrics is not None:
+            end = time.perf_counter()
+            metrics.observe("storage.serialize", serialized - start)
+            metrics.observe("storage.write", end - serialized)
+            metrics.observe("storage.save", end - start)
+            metrics.increment("bytes_written", "storage.save", len(encoded))
 
     def load(self, knowledge_base: KnowledgeBase) -> None:
         """Load data from JSON file into the knowledge base.
@@ -75,27 +125,64 @@ class JSONStorage(StorageBackend):
             # No file to load from
             return
 
-        with open(self.filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        metrics = knowledge_base._metrics
+        start = time.perf_counter()
+
+        with open(self.filepath, "rb") as f:
+            raw = f.read()
+        read = time.perf_counter()
+        data = json.loads(raw.decode("utf-8"))
+        parsed = time.perf_counter()
 
-        # Clear existing nodes
-        for node in knowledge_base.get_all_nodes():
-            knowledge_base.delete_node(node.id)
+        # Clear existing nodes without re-saving the file being loaded
+        knowledge_base._clear_nodes()
 
         # Load nodes
         nodes_data = data.get("nodes", {})
+        codec = codec_from_settings(knowledge_base, data.get("compression"))
 
         # Create all nodes - reuse original IDs to maintain links
+        nodes = []
         for node_id, node_data in nodes_data.items():
             node = KnowledgeNode(
                 id=node_id,
                 title=node_data["title"],
-                content=node_data["content"],
+                content=content_from_json(node_data["content"], codec),
                 tags=node_data.get("tags", []),
                 links=node_data.get("links", []),
+                created_at=parse_timestamp(node_data.get("created_at")),
+                updated_at=parse_timestamp(node_data.get("updated_at")),
             )
-            # Directly add to knowledge base's internal storage
-            knowledge_base._nodes[node_id] = node
+            nodes.append(node)
+
+        # Add directly to internal storage, bypassing auto-save
+        knowledge_base._add_nodes(nodes)
+        history_from_json(knowledge_base, data.get("history"), codec)
+
+        if metrics is not None:
+            end = time.perf_counter()
+            metrics.observe("storage.read", read - start)
+            metrics.observe("storage.parse", parsed - read)
+            metrics.observe("storage.load", end - start)
+            metrics.increment("bytes_read", "storage.load", len(raw))
+
+
+from .ingest import parallel_load  # noqa: E402 - needs the classes above
+
+
+def __getattr__(name: str):
+    # Vault sync is imported on first use, like the optional model modules
+    if name == "sync_vault":
+        from .vault import sync_vault
+
+        return sync_vault
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-__all__ = ["StorageBackend", "JSONStorage"]
+__all__ = [
+    "StorageBackend",
+    "JSONStorage",
+    "parse_timestamp",
+    "parallel_load",
+    "sync_vault",
+]
@@ -0,0 +1,562 @@
+"""Read-only knowledge base replicas in shared memory.
+
+One writer process publishes immutable snapshots of its knowledge base
+(nodes, tag postings, backlinks and a normalized text column) into
+``multiprocessing.shared_memory`` segments. Any number of reader
+processes map the current segment without copying it and answer lookups
+and searches straight from the mapped bytes, so memory does not grow with
+the number of workers.
+
+Each publish creates a new generation in its own segment and then bumps
+the generation number in a small control segment. Readers notice the new
+number, map the new generation and swap to it with a single assignment;
+snapshots already handed out stay valid until they are dropped.
+"""
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterator
+import base64
+import json
+import re
+import secrets
+import struct
+import sys
+import threading
+from multiprocessing import shared_memory
+
+from ..models.compression import (
+    ContentCodec,
+    content_from_json,
+    content_to_json,
+    storage_settings,
+)
+from ..models.knowledge_node import KnowledgeBase, KnowledgeNode
+from ..models.normalize import normalize
+from . import parse_timestamp
+
+_MAGIC = b"STSNAP01"
+# Control segment: generation (u64), change sequence (u64)
+_CONTROL = struct.Struct("<QQ")
+_HEADER_LENGTH = struct.Struct("<I")
+# Separates title and content (and records) in the text column
+_SEPARATOR = b"\x00"
+
+
+_attach_lock = threading.Lock()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Map an existing segment without registering it for cleanup.
+
+    The resource tracker would otherwise unlink segments the writer owns
+    when a reader exits.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    from multiprocessing import resource_tracker
+
+    with _attach_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _offsets(lengths) -> array:
+    """Prefix sums as a u64 array, starting at 0."""
+    offsets = array("Q", [0])
+    total = 0
+    for length in lengths:
+        total += length
+        offsets.append(total)
+    return offsets
+
+
+def encode_snapshot(knowledge_base: KnowledgeBase, generation: int = 0) -> list[bytes]:
+    """Serialize a knowledge base into the snapshot layout.
+
+    Args:
+        knowledge_base: The knowledge base
+        generation: Generation number to record in the header
+
+    Returns:
+        Byte strings to concatenate, header first
+    """
+    nodes = list(knowledge_base.iter_nodes())
+    ordinal = {node.id: i for i, node in enumerate(nodes)}
+
+    ids = [node.id.encode("utf-8") for node in nodes]
+    records = [
+        json.dumps(
+            [
+                node.title,
+                content_to_json(node._content),
+                node.tags,
+                node.links,
+                node.created_at.isoformat(),
+                node.updated_at.isoformat(),
+            ],
+            ensure_ascii=False,
+        ).encode("utf-8")
+        for node in nodes
+    ]
+    key_index = knowledge_base._key_index
+    texts = [
+        node._search_keys.title.encode("utf-8")
+        + _SEPARATOR
+        + key_index.content(node).encode("utf-8")
+        + _SEPARATOR
+        for node in nodes
+    ]
+
+    tag_index = knowledge_base._tag_index
+    tags = sorted(tag_index.tags())
+    postings = [
+        sorted(ordinal[node_id] for node_id in tag_index.get(tag)) for tag in tags
+    ]
+
+    backlinks: list[list[int]] = [[] for _ in nodes]
+    for source, node in enumerate(nodes):
+        for target in dict.fromkeys(node.links):
+            target_ordinal = ordinal.get(target)
+            if target_ordinal is not None:
+                backlinks[target_ordinal].append(source)
+
+    encoded_tags = [tag.encode("utf-8") for tag in tags]
+    sections = {
+        "ids": b"".join(ids),
+        "id_offsets": _offsets(map(len, ids)).tobytes(),
+        "id_order": array(
+            "I", sorted(range(len(nodes)), key=ids.__getitem__)
+        ).tobytes(),
+        "records": b"".join(records),
+        "record_offsets": _offsets(map(len, records)).tobytes(),
+        "text": b"".join(texts),
+        "text_offsets": _offsets(map(len, texts)).tobytes(),
+        "tags": b"".join(encoded_tags),
+        "tag_offsets": _offsets(map(len, encoded_tags)).tobytes(),
+        "postings": array("I", [i for p in postings for i in p]).tobytes(),
+        "posting_offsets": _offsets(map(len, postings)).tobytes(),
+        "backlinks": array("I", [i for b in backlinks for i in b]).tobytes(),
+        "backlink_offsets": _offsets(map(len, backlinks)).tobytes(),
+    }
+
+    layout = {}
+    position = 0
+    for name, data in sections.items():
+        layout[name] = [position, len(data)]
+        # Keep integer arrays aligned for casting
+        position += len(data) + (-len(data) % 8)
+    header = json.dumps(
+        {
+            "generation": generation,
+            "change_seq": knowledge_base.change_seq,
+            "nodes": len(nodes),
+            "compression": storage_settings(knowledge_base),
+            "fold_kana": key_index.fold_kana,
+            "sections": layout,
+        }
+    ).encode("utf-8")
+    header += b" " * (-(len(_MAGIC) + _HEADER_LENGTH.size + len(header)) % 8)
+
+    parts = [_MAGIC, _HEADER_LENGTH.pack(len(header)), header]
+    for data in sections.values():
+        parts.append(data)
+        parts.append(b"\x00" * (-len(data) % 8))
+    return parts
+
+
+class Snapshot:
+    """An immutable, read-only view of a knowledge base in a byte buffer.
+
+    Nodes are decoded on access into detached ``KnowledgeNode`` objects;
+    modifying them does not change the snapshot.
+    """
+
+    def __init__(
+        self, buffer: memoryview, segment: shared_memory.SharedMemory | None = None
+    ):
+        """Map a snapshot written by ``encode_snapshot``.
+
+        Args:
+            buffer: The snapshot bytes
+            segment: Shared memory segment backing the buffer, closed with
+                the snapshot
+        """
+        if bytes(buffer[: len(_MAGIC)]) != _MAGIC:
+            raise ValueError("Not a knowledge base snapshot")
+        start = len(_MAGIC) + _HEADER_LENGTH.size
+        (length,) = _HEADER_LENGTH.unpack_from(buffer, len(_MAGIC))
+        header = json.loads(bytes(buffer[start : start + length]))
+        self.generation: int = header["generation"]
+        self.change_seq: int = header["change_seq"]
+        self._count: int = header["nodes"]
+        self._fold_kana: bool = header["fold_kana"]
+        self._segment = segment
+        self._views: list[memoryview] = []
+        compression = header["compression"]
+        self._codec = (
+            ContentCodec(base64.b64decode(compression["dictionary"]))
+            if compression is not None
+            else None
+        )
+
+        base = start + length
+
+        def section(name: str, fmt: str | None = None) -> memoryview:
+            offset, size = header["sections"][name]
+            view = buffer[base + offset : base + offset + size]
+            if fmt is not None:
+                self._views.append(view)
+                view = view.cast(fmt)
+            self._views.append(view)
+            return view
+
+        self._ids = section("ids")
+        self._id_offsets = section("id_offsets", "Q")
+        self._id_order = section("id_order", "I")
+        self._records = section("records")
+        self._record_offsets = section("record_offsets", "Q")
+        self._text = section("text")
+        self._text_offsets = section("text_offsets", "Q")
+        self._tags = section("tags")
+        self._tag_offsets = section("tag_offsets", "Q")
+        self._postings = section("postings", "I")
+        self._posting_offsets = section("posting_offsets", "Q")
+        self._backlinks = section("backlinks", "I")
+        self._backlink_offsets = section("backlink_offsets", "Q")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, node_id: str) -> bool:
+        return self._ordinal(node_id) is not None
+
+    def close(self) -> None:
+        """Release the mapping. The snapshot must not be used afterwards."""
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except (BufferError, AttributeError):
+            pass
+
+    # -- decoding -------------------------------------------------------------
+
+    def _id(self, ordinal: int) -> str:
+        offsets = self._id_offsets
+        return str(self._ids[offsets[ordinal] : offsets[ordinal + 1]], "utf-8")
+
+    def _ordinal(self, node_id: str) -> int | None:
+        order = self._id_order
+        key = node_id.encode("utf-8")
+        offsets = self._id_offsets
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            ordinal = order[mid]
+            current = self._ids[offsets[ordinal] : offsets[ordinal + 1]]
+            if current == key:
+                return ordinal
+            if bytes(current) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def _node(self, ordinal: int) -> KnowledgeNode:
+        offsets = self._record_offsets
+        record = self._records[offsets[ordinal] : offsets[ordinal + 1]]
+        title, content, tags, links, created_at, updated_at = json.loads(
+            str(record, "utf-8")
+        )
+        return KnowledgeNode(
+            id=self._id(ordinal),
+            title=title,
+            content=content_from_json(content, self._codec),
+            tags=tags,
+            links=links,
+            created_at=parse_timestamp(created_at),
+            updated_at=parse_timestamp(updated_at),
+        )
+
+    def _tag_ordinals(self, tag: str) -> memoryview:
+        offsets = self._tag_offsets
+        key = normalize(tag, self._fold_kana).encode("utf-8")
+        lo, hi = 0, len(offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(self._tags[offsets[mid] : offsets[mid + 1]]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(offsets) - 1 and self._tags[offsets[lo] : offsets[lo + 1]] == key:
+            postings = self._posting_offsets
+            return self._postings[postings[lo] : postings[lo + 1]]
+        return self._postings[0:0]
+
+    # -- queries --------------------------------------------------------------
+
+    def get_node(self, node_id: str) -> KnowledgeNode | None:
+        """Retrieve a node by ID.
+
+        Args:
+            node_id: The ID of the node to retrieve
+
+        Returns:
+            The node if found, None otherwise
+        """
+        ordinal = self._ordinal(node_id)
+        return self._node(ordinal) if ordinal is not None else None
+
+    def iter_nodes(self) -> Iterator[KnowledgeNode]:
+        """Iterate all nodes in the writer's insertion order."""
+        for ordinal in range(self._count):
+            yield self._node(ordinal)
+
+    def node_ids(self) -> list[str]:
+        """Get the IDs of all nodes without decoding the nodes."""
+        return [self._id(ordinal) for ordinal in range(self._count)]
+
+    def tags(self) -> list[str]:
+        """Get all (normalized) tags in sorted order."""
+        offsets = self._tag_offsets
+        return [
+            str(self._tags[offsets[i] : offsets[i + 1]], "utf-8")
+            for i in range(len(offsets) - 1)
+        ]
+
+    def search_by_tags(self, tags: list[str]) -> list[KnowledgeNode]:
+        """Search nodes by tags (AND search).
+
+        Args:
+            tags: List of tags to search for (case- and width-insensitive)
+
+        Returns:
+            List of nodes that have all specified tags
+        """
+        if not tags:
+            return list(self.iter_nodes())
+        postings = sorted((self._tag_ordinals(tag) for tag in tags), key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result.intersection_update(posting)
+        return [self._node(ordinal) for ordinal in sorted(result)]
+
+    def search_by_text(self, text: str) -> list[KnowledgeNode]:
+        """Search nodes by text in title or content.
+
+        Scans the normalized text column in place with the regex engine;
+        only matching nodes are decoded.
+
+        Args:
+            text: Text to search for (case- and width-insensitive)
+
+        Returns:
+            List of nodes that contain the text in title or content
+        """
+        if not text:
+            return list(self.iter_nodes())
+        pattern = re.compile(
+            re.escape(normalize(text, self._fold_kana).encode("utf-8"))
+        )
+        offsets = self._text_offsets
+        ordinals = []
+        position = 0
+        while True:
+            match = pattern.search(self._text, position)
+            if match is None:
+                break
+            ordinal = bisect_right(offsets, match.start()) - 1
+            ordinals.append(ordinal)
+            position = offsets[ordinal + 1]
+        return [self._node(ordinal) for ordinal in ordinals]
+
+    def backlinks(self, node_id: str) -> list[str]:
+        """Get the IDs of existing nodes linking to a node.
+
+        Args:
+            node_id: The target node ID
+
+        Returns:
+            Source node IDs in insertion order
+        """
+        ordinal = self._ordinal(node_id)
+        if ordinal is None:
+            return []
+        offsets = self._backlink_offsets
+        return [
+            self._id(source)
+            for source in self._backlinks[offsets[ordinal] : offsets[ordinal + 1]]
+        ]
+
+
+def _segment_name(name: str, generation: int) -> str:
+    return f"{name}-{generation}"
+
+
+class SnapshotPublisher:
+    """Publishes snapshots of a knowledge base for reader processes.
+
+    Only the process owning the knowledge base publishes. Superseded
+    generations are unlinked right away; readers that already mapped them
+    keep a valid mapping until they swap.
+    """
+
+    def __init__(self, knowledge_base: KnowledgeBase, name: str | None = None):
+        """Create the control segment and publish the first generation.
+
+        Args:
+            knowledge_base: The knowledge base to publish
+            name: Name readers attach to (random if omitted)
+        """
+        self.knowledge_base = knowledge_base
+        self.name = name or f"st-{secrets.token_hex(6)}"
+        self.generation = 0
+        self.published_seq = -1
+        self._control = shared_memory.SharedMemory(
+            name=self.name, create=True, size=_CONTROL.size
+        )
+        self._segment: shared_memory.SharedMemory | None = None
+        self.publish()
+
+    def publish(self) -> int:
+        """Publish the current state as a new generation.
+
+        Returns:
+            The new generation number
+        """
+        generation = self.generation + 1
+        parts = encode_snapshot(self.knowledge_base, generation)
+        size = sum(len(part) for part in parts)
+        segment = shared_memory.SharedMemory(
+            name=_segment_name(self.name, generation), create=True, size=max(size, 1)
+        )
+        position = 0
+        for part in parts:
+            segment.buf[position : position + len(part)] = part
+            position += len(part)
+
+        _CONTROL.pack_into(
+            self._control.buf, 0, generation, self.knowledge_base.change_seq
+        )
+        previous, self._segment = self._segment, segment
+        self.generation = generation
+        self.published_seq = self.knowledge_base.change_seq
+        if previous is not None:
+            previous.close()
+            previous.unlink()
+        return generation
+
+    def publish_if_changed(self) -> bool:
+        """Publish a new generation if the knowledge base changed since the last.
+
+        Returns:
+            Whether a generation was published
+        """
+        if self.knowledge_base.change_seq == self.published_seq:
+            return False
+        self.publish()
+        return True
+
+    def close(self) -> None:
+        """Unlink all segments. Mapped snapshots stay readable."""
+        if self._segment is not None:
+            self._segment.close()
+            self._segment.unlink()
+            self._segment = None
+        self._control.close()
+        self._control.unlink()
+
+    def __enter__(self) -> "SnapshotPublisher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class SnapshotReader:
+    """Maps the snapshots published under a name.
+
+    Take one snapshot per unit of work (e.g. per request) with
+    ``current()`` for a consistent view; it is refreshed to the latest
+    generation first.
+    """
+
+    def __init__(self, name: str):
+        """Attach to a publisher.
+
+        Args:
+            name: Name of the publisher's control segment
+        """
+        self.name = name
+        self._control = _attach(name)
+        self._snapshot: Snapshot | None = None
+        self.refresh()
+
+    @property
+    def generation(self) -> int:
+        """Generation of the snapshot currently in use."""
+        return self._snapshot.generation if self._snapshot is not None else 0
+
+    def refresh(self) -> bool:
+        """Swap to the latest published generation if there is a newer one.
+
+        Once the publisher has closed, the current snapshot is kept.
+
+        Returns:
+            Whether the snapshot was swapped
+
+        Raises:
+            FileNotFoundError: If the publisher closed before any snapshot
+                could be mapped
+        """
+        while True:
+            generation, _ = _CONTROL.unpack_from(self._control.buf, 0)
+            if self._snapshot is not None and generation == self._snapshot.generation:
+                return False
+            try:
+                segment = _attach(_segment_name(self.name, generation))
+            except FileNotFoundError:
+                if _CONTROL.unpack_from(self._control.buf, 0)[0] != generation:
+                    # Superseded between reading the number and mapping it
+                    continue
+                # Still the latest number, so the publisher has closed
+                if self._snapshot is None:
+                    raise
+                return False
+            # Swapping the reference is atomic; holders of the previous
+            # snapshot keep using it until they drop it
+            self._snapshot = Snapshot(segment.buf, segment)
+            return True
+
+    def current(self) -> Snapshot:
+        """Get the latest snapshot.
+
+        Returns:
+            The snapshot
+        """
+        self.refresh()
+        return self._snapshot
+
+    def close(self) -> None:
+        """Detach from the publisher."""
+        self._snapshot = None
+        self._control.close()
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,435 @@
+"""Incremental sync of a directory of Markdown files into a knowledge base.
+
+Each ``.md`` file becomes one node: the body is the content, front-matter
+``tags`` become tags, ``[[wikilinks]]`` become links and the file's
+modification time becomes ``updated_at``. The title is the front-matter
+``title`` or else the file name. A checkout or a copy preserving times can
+backdate a file, so an update never moves ``updated_at`` backwards;
+revision history relies on increasing timestamps.
+
+A manifest next to the files records path, mtime, size, content hash,
+node ID and raw wikilink targets of every synced file. A re-sync only
+reads files whose mtime or size changed, only parses those whose hash
+changed, and applies the resulting creates, updates and deletes in one
+batch with a single storage save. Wikilinks are re-resolved from the
+manifest on every sync, so a link to a note that did not exist yet is
+filled in once the note appears, without re-reading the linking file.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+import hashlib
+import json
+import os
+from pathlib import Path, PurePosixPath
+import re
+import time
+import uuid
+
+from ..models.events import ChangeType
+from ..models.handles import new_ulid
+from ..models.knowledge_node import KnowledgeBase, KnowledgeNode
+from .ingest import MIN_PARALLEL_BYTES
+
+MANIFEST_NAME = ".star-tactics-manifest.json"
+MANIFEST_VERSION = 1
+
+_WIKILINK = re.compile(r"\[\[([^\[\]|#]*)(?:#[^\[\]|]*)?(?:\|[^\[\]]*)?\]\]")
+_FRONT_MATTER_END = re.compile(r"^---[ \t]*\r?$\n?", re.MULTILINE)
+_FENCED_CODE = re.compile(r"^(```|~~~).*?^\1", re.MULTILINE | re.DOTALL)
+
+
+@dataclass
+class VaultDocument:
+    """A parsed Markdown file.
+
+    Attributes:
+        title: Front-matter title, or None to use the file name
+        content: Body after the front matter
+        tags: Front-matter tags
+        targets: Wikilink targets in order of first appearance
+    """
+
+    title: str | None
+    content: str
+    tags: list[str]
+    targets: list[str]
+
+
+@dataclass
+class VaultSyncResult:
+    """What a sync changed.
+
+    Attributes:
+        created: IDs of created nodes
+        updated: IDs of updated nodes, including renamed files and link
+            changes from notes appearing or disappearing
+        deleted: IDs of deleted nodes
+        parsed: Number of files parsed
+        unchanged: Number of files whose node was left as it was
+    """
+
+    created: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    parsed: int = 0
+    unchanged: int = 0
+
+
+def _parse_value(value: str) -> str | list[str]:
+    value = value.strip()
+    if value.startswith("[") and value.endswith("]"):
+        return [item for item in map(_unquote, value[1:-1].split(",")) if item]
+    return _unquote(value)
+
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def _front_matter(block: str) -> dict[str, str | list[str]]:
+    """Parse the simple YAML subset used in note front matter.
+
+    Supports ``key: value``, flow lists (``key: [a, b]``) and block lists
+    (``key:`` followed by ``- item`` lines); anything else is ignored.
+
+    Args:
+        block: Text between the ``---`` fences
+
+    Returns:
+        Mapping of key to string or list of strings
+    """
+    data: dict[str, str | list[str]] = {}
+    key = None
+    for line in block.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and key is not None:
+            items = data.setdefault(key, [])
+            if isinstance(items, list):
+                items.append(_unquote(stripped[2:]))
+            continue
+        name, sep, value = stripped.partition(":")
+        if not sep:
+            key = None
+            continue
+        key = name.strip()
+        data[key] = _parse_value(value) if value.strip() else []
+    return data
+
+
+def parse_markdown(text: str) -> VaultDocument:
+    """Parse a Markdown note.
+
+    Args:
+        text: File contents
+
+    Returns:
+        The parsed document
+    """
+    meta: dict[str, str | list[str]] = {}
+    body = text
+    if text.startswith(("---\n", "---\r\n")):
+        start = text.index("\n") + 1
+        end = _FRONT_MATTER_END.search(text, start)
+        if end is not None:
+            meta = _front_matter(text[start : end.start()])
+            body = text[end.end() :]
+
+    tags = meta.get("tags", [])
+    if isinstance(tags, str):
+        tags = [tag for tag in re.split(r"[,\s]+", tags) if tag]
+    tags = list(dict.fromkeys(tag.lstrip("#") for tag in tags if tag.lstrip("#")))
+    title = meta.get("title")
+
+    targets = []
+    for match in _WIKILINK.finditer(_FENCED_CODE.sub("", body)):
+        target = match.group(1).strip()
+        if target:
+            targets.append(target)
+    return VaultDocument(
+        title=title if isinstance(title, str) and title else None,
+        content=body,
+        tags=tags,
+        targets=list(dict.fromkeys(targets)),
+    )
+
+
+def _read_document(
+    path: str, known_hash: str | None
+) -> tuple[str, VaultDocument | None]:
+    """Hash a file and parse it unless its content is already known.
+
+    Args:
+        path: Path to the file
+        known_hash: Hash recorded by the previous sync, if any
+
+    Returns:
+        (content hash, document or None if the hash matched)
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    if digest == known_hash:
+        return digest, None
+    return digest, parse_markdown(raw.decode("utf-8"))
+
+
+def _scan(root: Path) -> dict[str, tuple[int, int]]:
+    """List the Markdown files of a vault, skipping hidden entries.
+
+    Returns:
+        Mapping of POSIX relative path to (mtime in ns, size), sorted by path
+    """
+    files = {}
+    pending = [("", str(root))]
+    while pending:
+        prefix, directory = pending.pop()
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    pending.append((f"{prefix}{entry.name}/", entry.path))
+                elif entry.name.lower().endswith(".md"):
+                    stat = entry.stat()
+                    files[prefix + entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return dict(sorted(files.items()))
+
+
+def _note_key(path: str) -> str:
+    """Get the lookup key of a vault path or wikilink target."""
+    return path.strip().replace("\\", "/").lower().removesuffix(".md")
+
+
+class _LinkResolver:
+    """Resolves wikilink targets like Obsidian does.
+
+    A target matches a note by relative path, or else by file name; when
+    several notes share the name, the one with the shortest path wins.
+    """
+
+    def __init__(self, entries: dict[str, dict]):
+        self._by_path: dict[str, str] = {}
+        self._by_name: dict[str, str] = {}
+        for path in sorted(entries, key=lambda p: (p.count("/"), len(p), p)):
+            key = _note_key(path)
+            node_id = entries[path]["node_id"]
+            self._by_path[key] = node_id
+            self._by_name.setdefault(key.rpartition("/")[2], node_id)
+
+    def links(self, targets: list[str], own_id: str) -> list[str]:
+        links = []
+        for target in targets:
+            key = _note_key(target)
+            node_id = self._by_path.get(key) or self._by_name.get(
+                key.rpartition("/")[2]
+            )
+            if node_id is not None and node_id != own_id and node_id not in links:
+                links.append(node_id)
+        return links
+
+
+def _load_manifest(path: Path) -> dict[str, dict]:
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data["files"]
+
+
+def _save_manifest(path: Path, entries: dict[str, dict]) -> None:
+    data = {"version": MANIFEST_VERSION, "files": entries}
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+    os.replace(tmp, path)
+
+
+def _read_all(
+    root: Path,
+    jobs: list[tuple[str, str | None]],
+    workers: int,
+    min_parallel_bytes: int,
+    files: dict[str, tuple[int, int]],
+) -> list[tuple[str, VaultDocument | None]]:
+    paths = [str(root / rel) for rel, _ in jobs]
+    hashes = [known for _, known in jobs]
+    total = sum(files[rel][1] for rel, _ in jobs)
+    if workers == 1 or total < min_parallel_bytes:
+        return list(map(_read_document, paths, hashes))
+
+    # Imported here: multiprocessing is slow to import
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_read_document, paths, hashes, chunksize=chunksize))
+
+
+def sync_vault(
+    vault: Path | str,
+    knowledge_base: KnowledgeBase,
+    manifest: Path | str | None = None,
+    workers: int | None = None,
+    min_parallel_bytes: int = MIN_PARALLEL_BYTES,
+) -> VaultSyncResult:
+    """Bring a knowledge base up to date with a Markdown vault.
+
+    Nodes that did not come from the vault are left alone. A file that
+    disappears while a new file with the same content appears is treated
+    as a rename and keeps its node.
+
+    Args:
+        vault: Directory of Markdown files
+        knowledge_base: The knowledge base to update
+        manifest: Manifest path (defaults to a hidden file in the vault)
+        workers: Number of worker processes for parsing (defaults to the
+            CPU count); 1 parses in the calling process
+        min_parallel_bytes: Changed files totalling less than this are
+            parsed in the calling process
+
+    Returns:
+        What was created, updated and deleted
+    """
+    root = Path(vault)
+    manifest_path = Path(manifest) if manifest else root / MANIFEST_NAME
+    kb = knowledge_base
+    metrics = kb._metrics
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    result = VaultSyncResult()
+
+    old_entries = _load_manifest(manifest_path)
+    files = _scan(root)
+    entries: dict[str, dict] = {}
+    jobs: list[tuple[str, str | None]] = []
+    for rel, (mtime_ns, size) in files.items():
+        entry = old_entries.get(rel)
+        known = entry is not None and entry["node_id"] in kb._nodes
+        if known and (entry["mtime_ns"], entry["size"]) == (mtime_ns, size):
+            entries[rel] = entry
+        else:
+            jobs.append((rel, entry["hash"] if known else None))
+
+    # Content hashes of vanished files, to recognize renames
+    vanished: dict[str, list[str]] = {}
+    for rel, entry in old_entries.items():
+        if rel not in files:
+            vanished.setdefault(entry["hash"], []).append(rel)
+
+    parsed: dict[str, VaultDocument] = {}
+    for (rel, _), (digest, document) in zip(
+        jobs, _read_all(root, jobs, workers, min_parallel_bytes, files)
+    ):
+        mtime_ns, size = files[rel]
+        entry = old_entries.get(rel)
+        if entry is None and vanished.get(digest):
+            entry = old_entries.pop(vanished[digest].pop(0))
+        if document is None:
+            entries[rel] = {**entry, "mtime_ns": mtime_ns, "size": size}
+            continue
+        if entry is not None:
+            node_id = entry["node_id"]
+        elif kb._id_scheme == "ulid":
+            node_id = new_ulid(datetime.fromtimestamp(mtime_ns / 1e9))
+        else:
+            node_id = str(uuid.uuid4())
+        entries[rel] = {
+            "node_id": node_id,
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "hash": digest,
+            "targets": document.targets,
+        }
+        parsed[rel] = document
+    result.parsed = len(parsed)
+
+    deleted = [
+        entry["node_id"] for rel, entry in old_entries.items() if rel not in files
+    ]
+    entries = dict(sorted(entries.items()))
+    resolver = _LinkResolver(entries)
+
+    storage = kb._storage
+    kb._storage = None
+    try:
+        for node_id in deleted:
+            if kb.delete_node(node_id):
+                result.deleted.append(node_id)
+
+        created = []
+        for rel, entry in entries.items():
+            node_id = entry["node_id"]
+            links = resolver.links(entry["targets"], node_id)
+            document = parsed.get(rel)
+            node = kb._nodes.get(node_id)
+            if document is None:
+                if node.links == links:
+                    result.unchanged += 1
+                else:
+                    _update(kb, node, {"links": links}, node.updated_at)
+                    result.updated.append(node_id)
+                continue
+
+            updated_at = datetime.fromtimestamp(entry["mtime_ns"] / 1e9)
+            fields = {
+                "title": document.title or PurePosixPath(rel).stem,
+                "content": document.content,
+                "tags": document.tags,
+                "links": links,
+            }
+            if node is None:
+                created.append(
+                    KnowledgeNode(
+                        id=node_id,
+                        created_at=updated_at,
+                        updated_at=updated_at,
+                        **fields,
+                    )
+                )
+                continue
+            changed = {
+                name: value
+                for name, value in fields.items()
+                if getattr(node, name) != value
+            }
+            if changed:
+                _update(kb, node, changed, max(updated_at, node.updated_at))
+                result.updated.append(node_id)
+            else:
+                result.unchanged += 1
+
+        kb._add_nodes(created)
+        result.created = [node.id for node in created]
+    finally:
+        kb._storage = storage
+
+    if storage and (result.created or result.updated or result.deleted):
+        storage.save(kb)
+    if jobs or len(entries) != len(old_entries):
+        _save_manifest(manifest_path, entries)
+
+    if metrics is not None:
+        metrics.observe("storage.sync_vault", time.perf_counter() - start)
+    return result
+
+
+def _update(
+    kb: KnowledgeBase, node: KnowledgeNode, fields: dict, updated_at: datetime
+) -> None:
+    """Apply changed fields to a node, keeping indexes and subscribers in sync."""
+    old = kb._snapshot_node(node)
+    for name, value in fields.items():
+        setattr(node, name, value)
+    node.updated_at = updated_at
+    kb._reindex_node(old, node)
+    kb._changes.publish(ChangeType.UPDATED, node.id, fields=tuple(fields))
+    if "links" in fields:
+        kb._publish_link_diff(node.id, old.links, node.links)
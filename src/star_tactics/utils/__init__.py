@@ -1 +1,5 @@
 """ユーティリティパッケージ"""
+
+from .metrics import Metrics
+
+__all__ = ["Metrics"]
@@ -0,0 +1,289 @@
+"""Opt-in metrics for KnowledgeBase and storage hot paths."""
+
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+import functools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+)
+
+
+@dataclass(frozen=True)
+class SlowOperation:
+    """An operation that exceeded the slow-operation threshold.
+
+    Attributes:
+        operation: Name of the operation
+        seconds: How long it took
+        timestamp: When it finished
+    """
+
+    operation: str
+    seconds: float
+    timestamp: datetime
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus style."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """Initialize an empty histogram.
+
+        Args:
+            buckets: Ascending bucket upper bounds in seconds
+        """
+        self.buckets = buckets
+        # One extra slot for observations above the largest bound (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one observation.
+
+        Args:
+            value: The observed value in seconds
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Get cumulative counts per bucket bound, ending with +Inf.
+
+        Returns:
+            List of (upper bound, observations at or below it) pairs
+        """
+        total = 0
+        result = []
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Metrics:
+    """Per-operation counters, latency histograms and a slow-operation log.
+
+    Nothing is recorded unless a Metrics instance is passed to
+    ``KnowledgeBase(metrics=...)``; instrumentation wraps the instance's
+    methods at that point, so a knowledge base without metrics runs the
+    plain methods with no added cost.
+    """
+
+    def __init__(
+        self,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        slow_threshold: float | None = None,
+        slow_log_size: int = 100,
+    ):
+        """Initialize empty metrics.
+
+        Args:
+            buckets: Latency histogram bucket upper bounds in seconds
+            slow_threshold: Seconds above which an operation is logged as
+                slow, or None to disable the slow-operation log
+            slow_log_size: Number of slow operations to retain
+        """
+        self.buckets = buckets
+        self.slow_threshold = slow_threshold
+        self.slow_log: deque[SlowOperation] = deque(maxlen=slow_log_size)
+        self._counters: dict[tuple[str, str], float] = {}
+        self._histograms: dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, operation: str, value: float = 1) -> None:
+        """Add to a counter.
+
+        Args:
+            name: Counter name, e.g. ``"nodes_scanned"``
+            operation: Operation label
+            value: Amount to add
+        """
+        key = (name, operation)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, operation: str, seconds: float) -> None:
+        """Record the latency of one operation.
+
+        Args:
+            operation: Operation name
+            seconds: Elapsed wall-clock time
+        """
+        with self._lock:
+            histogram = self._histograms.get(operation)
+            if histogram is None:
+                histogram = self._histograms[operation] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+        if self.slow_threshold is not None and seconds >= self.slow_threshold:
+            self.slow_log.append(SlowOperation(operation, seconds, datetime.now()))
+            logger.warning("Slow operation %s took %.3f s", operation, seconds)
+
+    def timed(self, operation: str, func: Callable) -> Callable:
+        """Wrap a callable so each call records its latency.
+
+        Args:
+            operation: Operation name to record under
+            func: The callable to wrap
+
+        Returns:
+            The wrapped callable
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.observe(operation, time.perf_counter() - start)
+
+        return wrapper
+
+    def instrument(self, obj: object, operations: Iterable[str]) -> None:
+        """Replace methods on an instance with timed wrappers.
+
+        Args:
+            obj: The instance to instrument
+            operations: Names of the methods to wrap
+        """
+        for name in operations:
+            setattr(obj, name, self.timed(name, getattr(obj, name)))
+
+    def get_counter(self, name: str, operation: str) -> float:
+        """Get the current value of a counter.
+
+        Args:
+            name: Counter name
+            operation: Operation label
+
+        Returns:
+            The counter value (0 if never incremented)
+        """
+        return self._counters.get((name, operation), 0)
+
+    def get_histogram(self, operation: str) -> Histogram | None:
+        """Get the latency histogram of an operation.
+
+        Args:
+            operation: Operation name
+
+        Returns:
+            The histogram, or None if the operation was never observed
+        """
+        return self._histograms.get(operation)
+
+    def reset(self) -> None:
+        """Discard all recorded values."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.slow_log.clear()
+
+    def to_dict(self) -> dict:
+        """Export all metrics as plain data.
+
+        Returns:
+            Dictionary with ``operations`` (count, total and mean seconds,
+            bucket counts), ``counters`` and ``slow_operations``
+        """
+        with self._lock:
+            operations = {
+                name: {
+                    "count": h.count,
+                    "total_seconds": h.sum,
+                    "mean_seconds": h.sum / h.count if h.count else 0.0,
+                    "buckets": {
+                        ("+Inf" if bound == float("inf") else repr(bound)): count
+                        for bound, count in h.cumulative()
+                    },
+                }
+                for name, h in self._histograms.items()
+            }
+            counters: dict[str, dict[str, float]] = {}
+            for (name, operation), value in self._counters.items():
+                counters.setdefault(name, {})[operation] = value
+
+        return {
+            "operations": operations,
+            "counters": counters,
+            "slow_operations": [
+                {
+                    "operation": slow.operation,
+                    "seconds": slow.seconds,
+                    "timestamp": slow.timestamp.isoformat(),
+                }
+                for slow in self.slow_log
+            ],
+        }
+
+    def to_prometheus(self, prefix: str = "star_tactics") -> str:
+        """Export all metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            The exposition text
+        """
+        lines = []
+        with self._lock:
+            if self._histograms:
+                name = f"{prefix}_operation_duration_seconds"
+                lines.append(f"# TYPE {name} histogram")
+                for operation, h in sorted(self._histograms.items()):
+                    label = f'operation="{_escape(operation)}"'
+                    for bound, count in h.cumulative():
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{name}_bucket{{{label},le="{le}"}} {count}')
+                    lines.append(f"{name}_sum{{{label}}} {h.sum!r}")
+                    lines.append(f"{name}_count{{{label}}} {h.count}")
+
+            by_name: dict[str, list[tuple[str, float]]] = {}
+            for (counter, operation), value in sorted(self._counters.items()):
+                by_name.setdefault(counter, []).append((operation, value))
+            for counter, values in by_name.items():
+                name = f"{prefix}_{counter}_total"
+                lines.append(f"# TYPE {name} counter")
+                for operation, value in values:
+                    lines.append(
+                        f'{name}{{operation="{_escape(operation)}"}} {_number(value)}'
+                    )
+
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    """Format a sample value, keeping integers free of a decimal point."""
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+__all__ = ["Metrics", "Histogram", "SlowOperation", "DEFAULT_BUCKETS"]
@@ -0,0 +1,126 @@
+"""Tests for tag and title autocomplete."""
+
+import random
+
+import pytest
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.models.autocomplete import CACHE_SIZE, PrefixTrie
+
+
+def brute_force(counts, prefix, k):
+    """Reference completion by scanning all terms."""
+    matches = [(t, c) for t, c in counts.items() if t.startswith(prefix)]
+    return sorted(matches, key=lambda item: (-item[1], item[0]))[:k]
+
+
+class TestPrefixTrie:
+    """Test the trie and its cached completions."""
+
+    def test_random_updates_match_brute_force(self):
+        """Test caches against a reference under random increments/decrements."""
+        rng = random.Random(7)
+        terms = ["".join(rng.choices("abc", k=rng.randint(1, 7))) for _ in range(80)]
+        trie = PrefixTrie()
+        counts: dict[str, int] = {}
+        for _ in range(3000):
+            term = rng.choice(terms)
+            if rng.random() < 0.6:
+                trie.increment(term)
+                counts[term] = counts.get(term, 0) + 1
+            elif counts.get(term):
+                trie.decrement(term)
+                counts[term] -= 1
+                if not counts[term]:
+                    del counts[term]
+            if rng.random() < 0.1:
+                prefix = rng.choice(terms)[: rng.randint(0, 6)]
+                k = rng.randint(1, CACHE_SIZE + 3)
+                assert trie.complete(prefix, k) == brute_force(counts, prefix, k)
+
+        assert trie.counts == counts
+
+    def test_removed_terms_are_pruned(self):
+        """Test that trie nodes of vanished terms are deleted."""
+        trie = PrefixTrie()
+        trie.increment("star")
+        trie.decrement("star")
+        assert trie.complete("s", 5) == []
+        assert trie._root.children == {}
+
+    def test_bulk_build_matches_incremental(self):
+        """Test that a batch build gives the same completions."""
+        rng = random.Random(3)
+        terms = ["".join(rng.choices("abcd", k=rng.randint(1, 6))) for _ in range(200)]
+        uses = [rng.choice(terms) for _ in range(1000)]
+        bulk, incremental = PrefixTrie(), PrefixTrie()
+        bulk.increment_many(uses)
+        for term in uses:
+            incremental.increment(term)
+        for prefix in ["", "a", "ab", "abc", "abcd", "dcba"]:
+            assert bulk.complete(prefix, 5) == incremental.complete(prefix, 5)
+
+
+class TestAutocomplete:
+    """Test KnowledgeBase.autocomplete."""
+
+    @pytest.fixture
+    def knowledge_base(self):
+        """Provide a KnowledgeBase with sample data."""
+        kb = KnowledgeBase()
+        self.first = kb.create_node(
+            title="Python Basics", content="...", tags=["python", "programming"]
+        )
+        self.second = kb.create_node(
+            title="Python  advanced", content="...", tags=["Python", "pygame"]
+        )
+        self.third = kb.create_node(
+            title="星空観測ガイド", content="...", tags=["星空", "星座"]
+        )
+        return kb
+
+    def test_ranks_by_frequency(self, knowledge_base):
+        """Test that frequent entries come first, ties alphabetically."""
+        results = knowledge_base.autocomplete("Py")
+        assert [(r.text, r.count, r.kind) for r in results] == [
+            ("python", 2, "tag"),
+            ("pygame", 1, "tag"),
+            ("python advanced", 1, "title"),
+            ("python basics", 1, "title"),
+        ]
+
+    def test_kind_filter_and_limit(self, knowledge_base):
+        """Test restricting completions to one kind and to k results."""
+        assert [r.text for r in knowledge_base.autocomplete("p", kind="tag")] == [
+            "python",
+            "programming",
+            "pygame",
+        ]
+        assert len(knowledge_base.autocomplete("p", k=2)) == 2
+        assert knowledge_base.autocomplete("p", k=0) == []
+        with pytest.raises(ValueError):
+            knowledge_base.autocomplete("p", kind="content")
+
+    def test_japanese_and_long_prefixes(self, knowledge_base):
+        """Test Japanese prefixes and prefixes deeper than the trie."""
+        assert [r.text for r in knowledge_base.autocomplete("星", kind="tag")] == [
+            "星座",
+            "星空",
+        ]
+        assert [r.text for r in knowledge_base.autocomplete("python b")] == [
+            "python basics"
+        ]
+        assert knowledge_base.autocomplete("pythonista") == []
+
+    def test_stays_current(self, knowledge_base):
+        """Test that updates and deletes are reflected."""
+        knowledge_base.autocomplete("p")
+        knowledge_base.update_node(self.first, tags=["pygame"], title="Pygame intro")
+        knowledge_base.delete_node(self.second)
+        knowledge_base.create_node(title="Physics", content="...", tags=["physics"])
+
+        assert [(r.text, r.count) for r in knowledge_base.autocomplete("p")] == [
+            ("physics", 1),
+            ("physics", 1),
+            ("pygame", 1),
+            ("pygame intro", 1),
+        ]
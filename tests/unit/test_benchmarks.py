@@ -0,0 +1,62 @@
+"""Smoke tests for the benchmark suite and its data generator."""
+
+from benchmarks.compare import compare
+from benchmarks.datagen import DatasetSpec, build_knowledge_base, generate_nodes
+from benchmarks.run import percentile, run_suite
+
+
+class TestDataGenerator:
+    """Test the synthetic dataset generator."""
+
+    def test_generator_is_deterministic(self):
+        """Test that equal specs produce identical data."""
+        spec = DatasetSpec(nodes=50, seed=7)
+
+        first = [(n.id, n.title, n.tags, n.links) for n in generate_nodes(spec)]
+        second = [(n.id, n.title, n.tags, n.links) for n in generate_nodes(spec)]
+
+        assert first == second
+        assert len(first) == 50
+
+    def test_generator_respects_spec(self):
+        """Test tag counts, link targets and language mix."""
+        spec = DatasetSpec(
+            nodes=200, tags_per_node=(2, 3), broken_link_ratio=0.0, japanese_ratio=1.0
+        )
+        kb = build_knowledge_base(spec)
+
+        nodes = kb.get_all_nodes()
+        assert len(nodes) == 200
+        assert all(1 <= len(n.tags) <= 3 for n in nodes)
+        assert kb.get_all_broken_links() == {}
+        assert all(not n.title.isascii() for n in nodes)
+
+
+class TestBenchmarkRunner:
+    """Test the benchmark runner end to end on a tiny dataset."""
+
+    def test_run_suite_smoke(self):
+        """Test that every benchmark produces throughput figures."""
+        report = run_suite(DatasetSpec(nodes=100), queries=5, repeat=1)
+
+        assert "storage.save" in report["results"]
+        assert report["results"]["storage.save"]["file_bytes"] > 0
+        assert all(r["ops_per_sec"] > 0 for r in report["results"].values())
+        assert report["memory"]["kb_bytes"] > 0
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+
+        assert percentile(values, 0.5) == 50
+        assert percentile(values, 0.99) == 99
+        assert percentile([], 0.5) == 0.0
+
+    def test_compare_flags_regressions(self):
+        """Test that slower p50 latencies are reported as regressions."""
+        baseline = {"results": {"op": {"p50_us": 10.0, "ops_per_sec": 100.0}}}
+        candidate = {"results": {"op": {"p50_us": 15.0, "ops_per_sec": 66.0}}}
+
+        (row,) = compare(baseline, candidate, threshold=0.1)
+        assert row["regression"] is True
+        assert row["slowdown"] == 0.5
@@ -0,0 +1,175 @@
+"""Tests for the command-line interface."""
+
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+from star_tactics.cli import main
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.storage import JSONStorage
+
+
+def write_jsonl(path, records):
+    """Write records as JSON Lines."""
+    path.write_text(
+        "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records),
+        encoding="utf-8",
+    )
+
+
+class TestCli:
+    """Test the subcommands against a data file."""
+
+    @pytest.fixture
+    def data_file(self, tmp_path):
+        """Provide a data file with three nodes and a broken link."""
+        source = tmp_path / "nodes.jsonl"
+        write_jsonl(
+            source,
+            [
+                {"id": "a", "title": "Fleet plan", "content": "hold", "tags": ["ops"]},
+                {"id": "b", "title": "艦隊編成", "content": "...", "tags": ["ops"]},
+                {"id": "c", "title": "Notes", "content": "x", "links": ["a", "gone"]},
+            ],
+        )
+        data = tmp_path / "kb.json"
+        assert main(["--data", str(data), "import", str(source)]) == 0
+        return data
+
+    def test_import(self, data_file, tmp_path, capsys):
+        """Test that imported nodes are saved and re-imports replace them."""
+        kb = KnowledgeBase(storage=JSONStorage(data_file))
+        assert {node.id for node in kb.get_all_nodes()} == {"a", "b", "c"}
+        assert kb.get_node("c").links == ["a", "gone"]
+
+        source = tmp_path / "more.jsonl"
+        write_jsonl(
+            source,
+            [
+                {"id": "a", "title": "Fleet plan v2", "content": "go"},
+                {"title": "No ID", "content": "..."},
+            ],
+        )
+        assert main(["--data", str(data_file), "import", str(source)]) == 0
+        kb = KnowledgeBase(storage=JSONStorage(data_file))
+        assert len(kb.get_all_nodes()) == 4
+        assert kb.get_node("a").title == "Fleet plan v2"
+        assert "imported 2 nodes" in capsys.readouterr().err
+
+    def test_export_round_trip(self, data_file, tmp_path):
+        """Test that a JSON Lines export imports into an identical base."""
+        export = tmp_path / "out.jsonl"
+        assert main(["--data", str(data_file), "export", str(export)]) == 0
+        records = [json.loads(line) for line in export.read_text().splitlines()]
+        assert [record["id"] for record in records] == ["a", "b", "c"]
+
+        copy = tmp_path / "copy.json"
+        assert main(["--data", str(copy), "import", str(export)]) == 0
+        original = KnowledgeBase(storage=JSONStorage(data_file))
+        copied = KnowledgeBase(storage=JSONStorage(copy))
+        for node in original.get_all_nodes():
+            other = copied.get_node(node.id)
+            assert (other.title, other.tags, other.created_at) == (
+                node.title,
+                node.tags,
+                node.created_at,
+            )
+
+    def test_search(self, data_file, capsys):
+        """Test text, tag and fuzzy search output."""
+        main(["--data", str(data_file), "search", "fleet", "--tags", "ops"])
+        assert capsys.readouterr().out == "a\tFleet plan\tops\n"
+
+        main(["--data", str(data_file), "search", "--tags", "ops", "--json"])
+        lines = capsys.readouterr().out.splitlines()
+        assert sorted(json.loads(line)["id"] for line in lines) == ["a", "b"]
+
+        main(["--data", str(data_file), "search", "flet", "--fuzzy"])
+        assert capsys.readouterr().out.startswith("a\t")
+
+    @pytest.mark.parametrize(
+        "options", [["--limit", "-1"], ["--limit", "x"], ["--fuzzy", "--tags", "ops"]]
+    )
+    def test_search_rejects_bad_options(self, data_file, capsys, options):
+        """Test that invalid search options are usage errors, not tracebacks."""
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--data", str(data_file), "search", "fleet", *options])
+        assert exc_info.value.code == 2
+        assert "error:" in capsys.readouterr().err
+
+    def test_check_links(self, data_file, capsys):
+        """Test the exit status before and after fixing broken links."""
+        assert main(["--data", str(data_file), "check-links"]) == 1
+        assert capsys.readouterr().out == "c\tgone\n"
+        assert main(["--data", str(data_file), "check-links", "--fix"]) == 0
+        assert main(["--data", str(data_file), "check-links"]) == 0
+
+    def test_stats_and_profile(self, data_file, capsys):
+        """Test the statistics and the timing breakdown."""
+        assert main(["--profile", "--data", str(data_file), "stats"]) == 0
+        captured = capsys.readouterr()
+        stats = json.loads(captured.out)
+        assert (stats["nodes"], stats["links"], stats["broken_links"]) == (3, 2, 1)
+        assert stats["top_tags"] == {"ops": 2}
+        assert "load" in captured.err
+        assert "total" in captured.err
+
+    def test_compact(self, data_file, capsys):
+        """Test rewriting the file without indentation."""
+        before = data_file.stat().st_size
+        assert main(["--data", str(data_file), "compact", "--no-indent"]) == 0
+        assert data_file.stat().st_size < before
+        assert "\n " not in data_file.read_text(encoding="utf-8")
+        kb = KnowledgeBase(storage=JSONStorage(data_file))
+        assert len(kb.get_all_nodes()) == 3
+
+    def test_help_does_not_import_subsystems(self):
+        """Test that parsing arguments alone stays lightweight."""
+        code = (
+            "import sys\n"
+            "from star_tactics import cli\n"
+            "cli.build_parser().parse_args(['stats'])\n"
+            "print('star_tactics.models' in sys.modules)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={"PYTHONPATH": str(Path(__file__).parents[2] / "src")},
+        )
+        assert result.stdout.strip() == "False"
+
+    def test_light_command_skips_optional_modules(self, data_file):
+        """Test that a command not using them leaves optional modules unloaded."""
+        code = (
+            "import sys\n"
+            "from star_tactics.cli import main\n"
+            f"main(['--data', {str(data_file)!r}, 'stats'])\n"
+            "print(' '.join(sorted(sys.modules)))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={"PYTHONPATH": str(Path(__file__).parents[2] / "src")},
+        )
+        loaded = set(result.stdout.split())
+        assert "star_tactics.models.knowledge_node" in loaded
+        heavy = {
+            f"star_tactics.models.{name}"
+            for name in (
+                "autocomplete",
+                "cooccurrence",
+                "dedup",
+                "fuzzy",
+                "highlight",
+                "query",
+                "suggest",
+                "vectors",
+            )
+        } | {"star_tactics.storage.vault", "star_tactics.services"}
+        assert not heavy & loaded
@@ -0,0 +1,175 @@
+"""Tests for transparent content compression."""
+
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.models.compression import (
+    CompressedText,
+    ContentCodec,
+    train_dictionary,
+)
+from star_tactics.storage import JSONStorage, parallel_load
+
+TRANSCRIPT = (
+    "司会: 本日の作戦会議を始めます。前回の議題について確認してください。\n"
+    "Commander: The fleet will hold position near the outer ring until dawn.\n"
+)
+
+
+def transcript(i: int) -> str:
+    """Build a long transcript sharing phrases with the others."""
+    return "".join(f"[{i}-{line}] {TRANSCRIPT}" for line in range(60))
+
+
+class TestCodec:
+    """Test dictionary training and the codec."""
+
+    def test_dictionary_helps_small_texts(self):
+        """Test that a trained dictionary compresses better than none."""
+        dictionary = train_dictionary(transcript(i) for i in range(5))
+        assert 0 < len(dictionary) <= 32 * 1024
+        text = TRANSCRIPT * 2
+        plain = ContentCodec().compress(text)
+        trained = ContentCodec(dictionary).compress(text)
+        assert len(trained.data) < len(plain.data)
+        assert trained.decode() == text
+
+    def test_incompressible_text_is_left_alone(self):
+        """Test that compression is skipped when it does not save space."""
+        assert ContentCodec().compress("ab") is None
+
+    def test_cache(self):
+        """Test LRU caching of decompressed bodies."""
+        codec = ContentCodec(cache_size=1)
+        first = codec.compress(transcript(1))
+        second = codec.compress(transcript(2))
+        first.decode()
+        first.decode()
+        second.decode()
+        first.decode()
+        assert (codec.hits, codec.misses) == (1, 3)
+
+
+class TestKnowledgeBaseCompression:
+    """Test compression through the KnowledgeBase API."""
+
+    @pytest.fixture
+    def knowledge_base(self):
+        """Provide a KnowledgeBase with long and short nodes."""
+        kb = KnowledgeBase()
+        self.long_ids = [
+            kb.create_node(title=f"Meeting {i}", content=transcript(i), tags=["log"])
+            for i in range(5)
+        ]
+        self.short_id = kb.create_node(title="Note", content="short")
+        kb.enable_compression(threshold=1000)
+        return kb
+
+    def test_large_bodies_are_compressed(self, knowledge_base):
+        """Test that only bodies above the threshold are compressed."""
+        for node_id in self.long_ids:
+            node = knowledge_base.get_node(node_id)
+            assert isinstance(node._content, CompressedText)
+            assert node.content.startswith(f"[{self.long_ids.index(node_id)}-0]")
+        assert knowledge_base.get_node(self.short_id)._content == "short"
+
+    def test_stats_report_savings(self, knowledge_base):
+        """Test that statistics track compressed nodes and savings."""
+        stats = knowledge_base.compression_stats()
+        assert stats.nodes_compressed == 5
+        assert stats.raw_bytes == sum(
+            len(transcript(i).encode("utf-8")) for i in range(5)
+        )
+        assert stats.memory_saved > 0
+        assert stats.disk_saved > 0
+        assert stats.ratio < 0.5
+
+        knowledge_base.delete_node(self.long_ids[0])
+        assert knowledge_base.compression_stats().nodes_compressed == 4
+        assert KnowledgeBase().compression_stats() is None
+
+    def test_new_and_updated_nodes(self, knowledge_base):
+        """Test that created and updated bodies are compressed and searchable."""
+        node_id = knowledge_base.create_node(title="New", content=transcript(9))
+        assert isinstance(knowledge_base.get_node(node_id)._content, CompressedText)
+
+        knowledge_base.update_node(self.long_ids[1], content="now short")
+        assert knowledge_base.get_node(self.long_ids[1])._content == "now short"
+        assert knowledge_base.compression_stats().nodes_compressed == 5
+
+        results = knowledge_base.search_by_text("outer ring")
+        assert node_id in [node.id for node in results]
+
+    def test_enable_twice(self, knowledge_base):
+        """Test that compression cannot be enabled twice."""
+        with pytest.raises(ValueError):
+            knowledge_base.enable_compression()
+
+
+class TestCompressedStorage:
+    """Test persisting compressed bodies."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Provide a temporary directory for testing."""
+        with TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    @pytest.fixture
+    def source_kb(self):
+        """Provide a KnowledgeBase with compression enabled."""
+        kb = KnowledgeBase()
+        for i in range(5):
+            kb.create_node(title=f"Meeting {i}", content=transcript(i))
+        kb.create_node(title="Note", content="short")
+        kb.enable_compression(threshold=1000)
+        return kb
+
+    @pytest.mark.parametrize("indent", [2, None])
+    def test_round_trip(self, temp_dir, source_kb, indent):
+        """Test that compressed bodies and the dictionary survive a reload."""
+        storage = JSONStorage(temp_dir / "kb.json", indent=indent)
+        storage.save(source_kb)
+
+        data = json.loads((temp_dir / "kb.json").read_text(encoding="utf-8"))
+        assert data["compression"]["codec"] == "zlib"
+        assert sum(isinstance(n["content"], dict) for n in data["nodes"].values()) == 5
+
+        loaded = KnowledgeBase(storage=storage)
+        for node in source_kb.get_all_nodes():
+            assert loaded.get_node(node.id).content == node.content
+        assert loaded.compression_stats().nodes_compressed == 5
+
+    def test_compressed_file_is_smaller(self, temp_dir, source_kb):
+        """Test the on-disk saving against an uncompressed save."""
+        JSONStorage(temp_dir / "compressed.json").save(source_kb)
+        plain = KnowledgeBase()
+        for node in source_kb.get_all_nodes():
+            plain.create_node(title=node.title, content=node.content)
+        JSONStorage(temp_dir / "plain.json").save(plain)
+
+        compressed_size = (temp_dir / "compressed.json").stat().st_size
+        assert compressed_size < (temp_dir / "plain.json").stat().st_size / 2
+
+    def test_parallel_load(self, temp_dir, source_kb):
+        """Test that parallel_load restores compressed bodies."""
+        JSONStorage(temp_dir / "kb.json").save(source_kb)
+        loaded = KnowledgeBase()
+        assert parallel_load(temp_dir / "kb.json", loaded, workers=1) == 6
+        for node in source_kb.get_all_nodes():
+            assert loaded.get_node(node.id).content == node.content
+
+    def test_load_with_other_dictionary(self, temp_dir, source_kb):
+        """Test loading into a knowledge base with its own dictionary."""
+        JSONStorage(temp_dir / "kb.json").save(source_kb)
+        target = KnowledgeBase()
+        target.enable_compression(threshold=1000, dictionary=b"")
+        JSONStorage(temp_dir / "kb.json").load(target)
+        for node in source_kb.get_all_nodes():
+            loaded = target.get_node(node.id)
+            assert loaded.content == node.content
+            if isinstance(loaded._content, CompressedText):
+                assert loaded._content.codec.dictionary == b""
@@ -0,0 +1,113 @@
+"""Tests for tag co-occurrence and related tags."""
+
+from collections import Counter
+from itertools import combinations
+import math
+import random
+
+import pytest
+from star_tactics.models.knowledge_node import KnowledgeBase
+
+
+def brute_force(kb):
+    """Count tags and tag pairs with a full pass over the nodes."""
+    counts, pairs = Counter(), Counter()
+    for node in kb.get_all_nodes():
+        tags = sorted({kb._key_index.normalize(tag) for tag in node.tags})
+        counts.update(tags)
+        pairs.update(combinations(tags, 2))
+    return counts, pairs
+
+
+class TestRelatedTags:
+    """Test related-tag ranking."""
+
+    @pytest.fixture
+    def kb(self):
+        """Provide a knowledge base with overlapping tags."""
+        kb = KnowledgeBase()
+        for _ in range(4):
+            kb.create_node("Fleet", "...", tags=["fleet", "ops"])
+        kb.create_node("Fleet roster", "...", tags=["fleet", "roster"])
+        kb.create_node("Rare", "...", tags=["fleet", "rare", "RARER"])
+        kb.create_node("Rare again", "...", tags=["rare", "rarer"])
+        for _ in range(3):
+            kb.create_node("Ops only", "...", tags=["ops"])
+        return kb
+
+    def test_jaccard(self, kb):
+        """Test ranking by shared node share."""
+        related = kb.related_tags("FLEET")
+        assert [(r.tag, r.count) for r in related] == [
+            ("ops", 4),
+            ("roster", 1),
+            ("rare", 1),
+            ("rarer", 1),
+        ]
+        assert related[0].score == pytest.approx(4 / 9)
+        assert related[1].score == pytest.approx(1 / 6)
+        assert [r.tag for r in kb.related_tags("fleet", k=1)] == ["ops"]
+
+    def test_pmi(self, kb):
+        """Test ranking by pointwise mutual information."""
+        related = kb.related_tags("rare", measure="pmi")
+        assert [r.tag for r in related] == ["rarer", "fleet"]
+        assert related[0].score == pytest.approx(math.log(2 * 10 / (2 * 2)))
+        assert [r.tag for r in kb.related_tags("rare", measure="pmi", min_count=2)] == [
+            "rarer"
+        ]
+
+    def test_unknown(self, kb):
+        """Test unknown tags and measures."""
+        assert kb.related_tags("missing") == []
+        with pytest.raises(ValueError):
+            kb.related_tags("fleet", measure="cosine")
+
+    def test_incremental_updates(self):
+        """Test counts against a full recount under random changes."""
+        rng = random.Random(5)
+        kb = KnowledgeBase()
+        vocabulary = [f"t{i}" for i in range(12)] + ["T1", "Ｔ2"]
+        ids = [
+            kb.create_node(str(i), "...", tags=rng.sample(vocabulary, 3))
+            for i in range(30)
+        ]
+        kb.related_tags("t0")
+        index = kb._lazy_indexes["tag_cooccurrence"]
+        for step in range(300):
+            node_id = rng.choice(ids)
+            action = rng.random()
+            if action < 0.4:
+                kb.update_node(node_id, tags=rng.sample(vocabulary, rng.randrange(5)))
+            elif action < 0.6:
+                kb.update_node(node_id, content=f"edit {step}")
+            elif action < 0.8 and kb.delete_node(node_id):
+                ids.remove(node_id)
+            else:
+                ids.append(kb.create_node("new", "...", tags=rng.sample(vocabulary, 2)))
+        kb.related_tags("t0")
+        counts, pairs = brute_force(kb)
+        assert index.counts == counts
+        assert index.nodes == len(ids)
+        for (a, b), both in pairs.items():
+            assert index.pairs[a][b] == index.pairs[b][a] == both
+        assert sum(map(len, index.pairs.values())) == 2 * len(pairs)
+
+
+class TestTagMatrix:
+    """Test the sparse matrix export."""
+
+    def test_export(self):
+        """Test CSR structure and the dense expansion."""
+        np = pytest.importorskip("numpy")
+        kb = KnowledgeBase()
+        kb.create_node("a", "...", tags=["b", "a"])
+        kb.create_node("b", "...", tags=["a", "c"])
+        kb.create_node("c", "...", tags=["a"])
+        matrix = kb.tag_matrix()
+        assert (matrix.tags, matrix.shape, matrix.nodes) == (["a", "b", "c"], (3, 3), 3)
+        assert matrix.indptr.tolist() == [0, 3, 5, 7]
+        assert np.array_equal(
+            matrix.to_dense(), np.array([[3, 1, 1], [1, 1, 0], [1, 0, 1]])
+        )
+        assert kb.tag_matrix(min_count=2).to_dense().tolist() == [[3]]
@@ -0,0 +1,176 @@
+"""Tests for MinHash/LSH near-duplicate detection."""
+
+import pytest
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.models.dedup import MinHashLSH, shingles
+
+
+class TestShingles:
+    """Test character shingling."""
+
+    def test_shingles_normalize_case_and_whitespace(self):
+        """Test that shingles ignore case and repeated whitespace."""
+        assert shingles("Ab  C", size=3) == shingles("ab c", size=3)
+        assert shingles("ab c", size=3) == {"ab ", "b c"}
+
+    def test_short_and_empty_text(self):
+        """Test shingling of texts shorter than the shingle size."""
+        assert shingles("星", size=3) == {"星"}
+        assert shingles("   ") == set()
+
+
+class TestFindSimilar:
+    """Test near-duplicate lookup."""
+
+    @pytest.fixture
+    def knowledge_base(self):
+        """Provide a KnowledgeBase with near-duplicate questions."""
+        kb = KnowledgeBase()
+        self.q1 = kb.create_node(
+            title="How do I defeat the fire dragon boss?",
+            content="I keep dying in the second phase of the fire dragon fight.",
+        )
+        self.q2 = kb.create_node(
+            title="How do I defeat the fire dragon boss",
+            content="I keep dying in the second phase of the fire dragon fight!",
+        )
+        self.ja1 = kb.create_node(
+            title="炎のドラゴンの倒し方を教えてください",
+            content="第二形態でいつも負けてしまいます。",
+        )
+        self.ja2 = kb.create_node(
+            title="炎のドラゴンの倒し方を教えて下さい",
+            content="第二形態でいつも負けてしまいます。",
+        )
+        self.other = kb.create_node(
+            title="Best early game farming route",
+            content="Where should I farm gold before chapter three?",
+        )
+        return kb
+
+    def test_find_similar_by_node_id(self, knowledge_base):
+        """Test that a node finds its near-duplicate but not itself."""
+        results = knowledge_base.find_similar(self.q1, threshold=0.7)
+        assert [r.node.id for r in results] == [self.q2]
+        assert 0.7 <= results[0].similarity <= 1.0
+
+    def test_find_similar_japanese(self, knowledge_base):
+        """Test that character shingles work without word segmentation."""
+        results = knowledge_base.find_similar(self.ja1, threshold=0.6)
+        assert [r.node.id for r in results] == [self.ja2]
+
+    def test_find_similar_width_variants(self, knowledge_base):
+        """Test that full-width and half-width variants are near-duplicates."""
+        wide = knowledge_base.create_node(
+            title="ＦＬＥＥＴ ｶﾞｲﾄﾞ ＦＯＲ ＲＯＯＫＩＥＳ", content="ｼｰﾙﾄﾞを先に"
+        )
+        narrow = knowledge_base.create_node(
+            title="fleet ガイド for rookies", content="シールドを先に"
+        )
+        results = knowledge_base.find_similar(wide, threshold=0.9)
+        assert [r.node.id for r in results] == [narrow]
+        assert shingles("ＦＬＥＥＴ") == shingles("fleet")
+
+    def test_find_similar_by_text(self, knowledge_base):
+        """Test lookup with text that is not a node ID."""
+        results = knowledge_base.find_similar(
+            "Best early game farming route\n"
+            "Where should I farm gold before chapter three??",
+            threshold=0.7,
+        )
+        assert [r.node.id for r in results] == [self.other]
+
+    def test_unrelated_text_has_no_matches(self, knowledge_base):
+        """Test that dissimilar text is not reported."""
+        assert knowledge_base.find_similar("Crafting recipes for potions") == []
+        assert knowledge_base.find_similar("") == []
+
+    def test_limit(self, knowledge_base):
+        """Test limiting the number of results."""
+        knowledge_base.create_node(
+            title="How do I defeat the fire dragon boss?",
+            content="I keep dying in the second phase of the fire dragon fight.",
+        )
+        assert len(knowledge_base.find_similar(self.q1, threshold=0.7)) == 2
+        assert len(knowledge_base.find_similar(self.q1, threshold=0.7, limit=1)) == 1
+
+    def test_index_follows_updates_and_deletes(self, knowledge_base):
+        """Test that the LSH buckets are maintained incrementally."""
+        knowledge_base.find_similar(self.q1)
+        knowledge_base.update_node(
+            self.q2, title="Completely different", content="Nothing alike"
+        )
+        assert knowledge_base.find_similar(self.q1, threshold=0.7) == []
+
+        knowledge_base.update_node(
+            self.q2,
+            title="How do I defeat the fire dragon boss?",
+            content="I keep dying in the second phase of the fire dragon fight.",
+        )
+        assert [r.node.id for r in knowledge_base.find_similar(self.q1)] == [self.q2]
+
+        knowledge_base.delete_node(self.q2)
+        assert knowledge_base.find_similar(self.q1) == []
+
+    def test_tag_change_reuses_signature(self, knowledge_base):
+        """Test that re-indexing unchanged text keeps the same signature."""
+        index = knowledge_base._lazy_index("minhash", MinHashLSH)
+        before = index.signature(self.q1)
+        knowledge_base.update_node(self.q1, tags=["boss"])
+        assert index.signature(self.q1) is before
+        knowledge_base.update_node(self.q1, content="Something else entirely")
+        assert index.signature(self.q1) != before
+
+
+class TestMergeOnCreate:
+    """Test the optional merge-on-create mode."""
+
+    def test_duplicate_is_merged(self):
+        """Test that creating a near-duplicate folds it into the original."""
+        kb = KnowledgeBase()
+        kb.enable_dedup(merge_on_create=True, threshold=0.7)
+        original = kb.create_node(
+            title="Where is the hidden shop?",
+            content="I heard there is a hidden shop in the desert town.",
+            tags=["shop"],
+        )
+        target = kb.create_node(title="Desert town", content="Map notes")
+
+        merged = kb.create_node(
+            title="Where is the hidden shop",
+            content="I heard there is a hidden shop in the desert town!",
+            tags=["SHOP", "desert", "Ｄｅｓｅｒｔ"],
+            links=[target],
+        )
+
+        assert merged == original
+        assert len(kb.get_all_nodes()) == 2
+        node = kb.get_node(original)
+        assert node.tags == ["shop", "desert"]
+        assert node.links == [target]
+
+    def test_distinct_node_is_created(self):
+        """Test that dissimilar nodes are created normally."""
+        kb = KnowledgeBase()
+        kb.enable_dedup(merge_on_create=True)
+        first = kb.create_node(title="Shop locations", content="Desert town")
+        second = kb.create_node(title="Boss strategies", content="Fire dragon")
+        assert first != second
+
+    def test_disable_merge(self):
+        """Test that merging can be turned off again."""
+        kb = KnowledgeBase()
+        kb.enable_dedup(merge_on_create=True)
+        first = kb.create_node(title="Same question", content="Same body text")
+        kb.enable_dedup(merge_on_create=False)
+        second = kb.create_node(title="Same question", content="Same body text")
+        assert first != second
+
+    def test_conflicting_parameters(self):
+        """Test that an already built index cannot be reconfigured."""
+        kb = KnowledgeBase()
+        kb.enable_dedup(num_perm=64, bands=16)
+        with pytest.raises(ValueError):
+            kb.enable_dedup(num_perm=128, bands=32)
+        with pytest.raises(ValueError):
+            MinHashLSH(num_perm=64, bands=10)
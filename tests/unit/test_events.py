@@ -0,0 +1,228 @@
+"""Tests for the knowledge base change feed."""
+
+import asyncio
+import threading
+import pytest
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.models.events import (
+    ChangeType,
+    HistoryUnavailable,
+    SubscriptionLagged,
+)
+from star_tactics.storage import JSONStorage
+
+
+class TestChangeFeed:
+    """Test change events emitted by KnowledgeBase mutations."""
+
+    @pytest.fixture
+    def knowledge_base(self):
+        """Provide a fresh KnowledgeBase instance."""
+        return KnowledgeBase()
+
+    def kinds(self, events):
+        return [event.type for event in events]
+
+    def test_crud_events(self, knowledge_base):
+        """Test created/updated/deleted events with increasing sequence."""
+        sub = knowledge_base.subscribe()
+
+        node_id = knowledge_base.create_node(title="Node", content="Content")
+        knowledge_base.update_node(node_id, title="Renamed", tags=["x"])
+        knowledge_base.delete_node(node_id)
+
+        events = sub.drain()
+        assert self.kinds(events) == [
+            ChangeType.CREATED,
+            ChangeType.UPDATED,
+            ChangeType.DELETED,
+        ]
+        assert [event.seq for event in events] == [1, 2, 3]
+        assert all(event.node_id == node_id for event in events)
+        assert events[1].fields == ("title", "tags")
+        assert knowledge_base.change_seq == 3
+
+    def test_link_events(self, knowledge_base):
+        """Test link-added and link-removed events."""
+        node1_id = knowledge_base.create_node(title="Node 1", content="Content 1")
+        node2_id = knowledge_base.create_node(title="Node 2", content="Content 2")
+        sub = knowledge_base.subscribe()
+
+        knowledge_base.add_bidirectional_link(node1_id, node2_id)
+        knowledge_base.remove_bidirectional_link(node1_id, node2_id)
+
+        events = sub.drain()
+        assert [(e.type, e.node_id, e.target_id) for e in events] == [
+            (ChangeType.LINK_ADDED, node1_id, node2_id),
+            (ChangeType.LINK_ADDED, node2_id, node1_id),
+            (ChangeType.LINK_REMOVED, node1_id, node2_id),
+            (ChangeType.LINK_REMOVED, node2_id, node1_id),
+        ]
+
+    def test_update_links_emits_diff(self, knowledge_base):
+        """Test that replacing links emits one event per changed link."""
+        node_id = knowledge_base.create_node(
+            title="Node", content="Content", links=["a", "b"]
+        )
+        sub = knowledge_base.subscribe()
+
+        knowledge_base.update_node(node_id, links=["b", "c"])
+
+        events = sub.drain()
+        assert [(e.type, e.target_id) for e in events] == [
+            (ChangeType.UPDATED, None),
+            (ChangeType.LINK_REMOVED, "a"),
+            (ChangeType.LINK_ADDED, "c"),
+        ]
+
+    def test_fix_broken_links_emits_removals(self, knowledge_base):
+        """Test that fixing broken links reports each removed link."""
+        node_id = knowledge_base.create_node(
+            title="Node", content="Content", links=["gone"]
+        )
+        sub = knowledge_base.subscribe()
+
+        knowledge_base.fix_broken_links(node_id)
+
+        assert [(e.type, e.target_id) for e in sub.drain()] == [
+            (ChangeType.LINK_REMOVED, "gone")
+        ]
+
+    def test_changes_since(self, knowledge_base):
+        """Test incremental sync from a known sequence number."""
+        knowledge_base.create_node(title="A", content="A")
+        seq = knowledge_base.change_seq
+        knowledge_base.create_node(title="B", content="B")
+        knowledge_base.create_node(title="C", content="C")
+
+        events = knowledge_base.changes_since(seq)
+        assert [event.seq for event in events] == [seq + 1, seq + 2]
+        assert knowledge_base.changes_since(knowledge_base.change_seq) == []
+
+    def test_changes_since_evicted_history(self):
+        """Test that evicted history is reported instead of silently skipped."""
+        kb = KnowledgeBase()
+        kb._changes._history = type(kb._changes._history)(maxlen=2)
+        for i in range(5):
+            kb.create_node(title=f"N{i}", content="C")
+
+        with pytest.raises(HistoryUnavailable):
+            kb.changes_since(1)
+        assert len(kb.changes_since(3)) == 2
+
+    def test_subscribe_since_replays_history(self, knowledge_base):
+        """Test that a subscription can start from a past sequence number."""
+        knowledge_base.create_node(title="A", content="A")
+        knowledge_base.create_node(title="B", content="B")
+
+        sub = knowledge_base.subscribe(since=1)
+        knowledge_base.create_node(title="C", content="C")
+
+        assert [event.seq for event in sub.drain()] == [2, 3]
+
+    def test_subscribe_since_rejects_blocking_overflow(self, knowledge_base):
+        """Test that a blocking replay larger than the buffer is refused."""
+        for i in range(3):
+            knowledge_base.create_node(title=f"N{i}", content="C")
+
+        with pytest.raises(ValueError):
+            knowledge_base.subscribe(maxsize=2, since=0)
+        sub = knowledge_base.subscribe(maxsize=2, overflow="drop_oldest", since=0)
+        assert [event.seq for event in sub.drain()] == [2, 3]
+        knowledge_base.create_node(title="N3", content="C")
+        assert knowledge_base.change_seq == 4
+
+    def test_reload_publishes_new_state(self, knowledge_base, tmp_path):
+        """Test that loading from storage replaces old nodes with new ones."""
+        saved = KnowledgeBase(storage=JSONStorage(tmp_path / "kb.json"))
+        loaded_id = saved.create_node(title="Saved", content="C")
+        old_id = knowledge_base.create_node(title="Old", content="C")
+        sub = knowledge_base.subscribe()
+
+        JSONStorage(tmp_path / "kb.json").load(knowledge_base)
+
+        assert [(e.type, e.node_id) for e in sub.drain()] == [
+            (ChangeType.DELETED, old_id),
+            (ChangeType.CREATED, loaded_id),
+        ]
+
+    def test_drop_oldest_overflow(self, knowledge_base):
+        """Test that drop_oldest keeps the newest events."""
+        sub = knowledge_base.subscribe(maxsize=2, overflow="drop_oldest")
+        for i in range(5):
+            knowledge_base.create_node(title=f"N{i}", content="C")
+
+        assert [event.seq for event in sub.drain()] == [4, 5]
+        assert sub.dropped == 3
+
+    def test_disconnect_overflow(self, knowledge_base):
+        """Test that a lagging subscriber is disconnected."""
+        sub = knowledge_base.subscribe(maxsize=2, overflow="disconnect")
+        for i in range(3):
+            knowledge_base.create_node(title=f"N{i}", content="C")
+
+        assert sub.lagged is True
+        assert sub.get(timeout=0).seq == 1
+        assert sub.get(timeout=0).seq == 2
+        with pytest.raises(SubscriptionLagged) as exc_info:
+            sub.get(timeout=0)
+        assert exc_info.value.last_seq == 2
+
+    def test_block_overflow_waits_for_consumer(self, knowledge_base):
+        """Test that block policy applies backpressure until room is made."""
+        sub = knowledge_base.subscribe(maxsize=1, overflow="block", block_timeout=5)
+        knowledge_base.create_node(title="First", content="C")
+
+        received = []
+
+        def consume():
+            received.append(sub.get(timeout=5))
+            received.append(sub.get(timeout=5))
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        knowledge_base.create_node(title="Second", content="C")
+        consumer.join(timeout=5)
+
+        assert [event.seq for event in received] == [1, 2]
+        assert sub.lagged is False
+
+    def test_block_overflow_times_out(self, knowledge_base):
+        """Test that a blocked publisher eventually disconnects the consumer."""
+        sub = knowledge_base.subscribe(maxsize=1, overflow="block", block_timeout=0)
+        knowledge_base.create_node(title="First", content="C")
+        knowledge_base.create_node(title="Second", content="C")
+
+        assert sub.lagged is True
+
+    def test_close_ends_iteration(self, knowledge_base):
+        """Test that closing stops delivery after buffered events."""
+        sub = knowledge_base.subscribe()
+        knowledge_base.create_node(title="A", content="A")
+        sub.close()
+        knowledge_base.create_node(title="B", content="B")
+
+        assert [event.seq for event in sub] == [1]
+
+    def test_async_iteration(self, knowledge_base):
+        """Test consuming events with async for."""
+
+        async def consume():
+            sub = knowledge_base.subscribe()
+            received = []
+
+            async def reader():
+                async for event in sub:
+                    received.append(event.type)
+                    if len(received) == 2:
+                        break
+
+            task = asyncio.create_task(reader())
+            await asyncio.sleep(0)
+            node_id = knowledge_base.create_node(title="A", content="A")
+            await asyncio.sleep(0)
+            knowledge_base.delete_node(node_id)
+            await asyncio.wait_for(task, timeout=5)
+            return received
+
+        assert asyncio.run(consume()) == [ChangeType.CREATED, ChangeType.DELETED]
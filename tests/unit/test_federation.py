@@ -0,0 +1,91 @@
+"""Tests for federated search across knowledge bases."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.services.federation import Federation
+from star_tactics.storage import JSONStorage
+
+
+def touch(kb, node_id, minutes):
+    """Set a node's update time relative to a fixed point."""
+    kb.get_node(node_id).updated_at = datetime(2025, 1, 1) + timedelta(minutes=minutes)
+
+
+class TestFederation:
+    """Test registration, merged search and cross-base links."""
+
+    @pytest.fixture
+    def federation(self):
+        """Provide a federation of two channels and a season archive."""
+        channel, season, empty = KnowledgeBase(), KnowledgeBase(), KnowledgeBase()
+        self.guide = channel.create_node("Fleet guide", "How the fleet moves")
+        self.notes = channel.create_node("Notes", "fleet", tags=["ops"])
+        self.old = season.create_node("Fleet fleet", "Archived", tags=["ops"])
+        self.recap = season.create_node(
+            "Recap", "...", links=[self.guide, f"channel:{self.notes}", "missing"]
+        )
+        touch(channel, self.guide, 1)
+        touch(channel, self.notes, 2)
+        touch(season, self.old, 0)
+        with Federation(max_workers=2) as federation:
+            federation.register("channel", channel)
+            federation.register("season", season)
+            federation.register("empty", empty)
+            yield federation
+
+    def test_registration(self, federation):
+        """Test names and duplicate or invalid registrations."""
+        assert list(federation) == ["channel", "season", "empty"]
+        with pytest.raises(ValueError):
+            federation.register("channel", KnowledgeBase())
+        with pytest.raises(ValueError):
+            federation.register("a:b", KnowledgeBase())
+        assert federation.unregister("empty")
+        assert not federation.unregister("empty")
+        assert len(federation) == 2
+
+    def test_ranked_merge(self, federation):
+        """Test that hits from all bases are merged by score and recency."""
+        hits = federation.search("FLEET")
+        assert [(h.base, h.node.id, h.score) for h in hits] == [
+            ("season", self.old, 4.0),
+            ("channel", self.guide, 3.0),
+            ("channel", self.notes, 1.0),
+        ]
+        assert [h.node.id for h in federation.search("fleet", limit=2)] == [
+            self.old,
+            self.guide,
+        ]
+        assert federation.search("nothing") == []
+
+    def test_tags(self, federation):
+        """Test tag filters with and without text."""
+        hits = federation.search(tags=["OPS"])
+        assert [h.node.id for h in hits] == [self.notes, self.old]
+        hits = federation.search("archived", tags=["ops"])
+        assert [h.reference for h in hits] == [f"season:{self.old}"]
+
+    def test_links(self, federation):
+        """Test resolving qualified and bare references across bases."""
+        links = federation.resolve_links("season", self.recap)
+        assert links[self.guide].base == "channel"
+        assert links[f"channel:{self.notes}"].node.id == self.notes
+        assert links["missing"] is None
+        assert federation.get(f"season:{self.guide}") is None
+        assert federation.get(self.old).base == "season"
+        assert federation.resolve_links("season", "nope") == {}
+        assert federation.broken_links() == {"season": {self.recap: ["missing"]}}
+
+    def test_file_backed_bases(self, tmp_path):
+        """Test bases loaded from their own storage files."""
+        for name in ("a", "b"):
+            kb = KnowledgeBase(storage=JSONStorage(tmp_path / f"{name}.json"))
+            kb.create_node(f"Plan {name}", "shared text")
+        with Federation() as federation:
+            for name in ("a", "b"):
+                storage = JSONStorage(tmp_path / f"{name}.json")
+                federation.register(name, KnowledgeBase(storage=storage))
+            hits = federation.search("shared")
+        assert sorted(h.node.title for h in hits) == ["Plan a", "Plan b"]
@@ -0,0 +1,115 @@
+"""Tests for typo-tolerant fuzzy search."""
+
+import pytest
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.models.fuzzy import edit_distance, trigrams
+
+
+class TestFuzzyHelpers:
+    """Test trigram and edit distance helpers."""
+
+    def test_trigrams_are_padded(self):
+        """Test that short terms still produce trigrams."""
+        assert trigrams("星空") == {"  星", " 星空", "星空 "}
+
+    def test_edit_distance(self):
+        """Test plain and bounded edit distance."""
+        assert edit_distance("kitten", "sitting") == 3
+        assert edit_distance("python", "python") == 0
+        assert edit_distance("kitten", "sitting", max_distance=1) == 2
+        assert edit_distance("a", "abcdef", max_distance=2) == 3
+
+
+class TestFuzzySearch:
+    """Test fuzzy search over titles and tags."""
+
+    @pytest.fixture
+    def knowledge_base(self):
+        """Provide a KnowledgeBase with sample data."""
+        kb = KnowledgeBase()
+        self.python_id = kb.create_node(
+            title="Python Programming", content="...", tags=["python"]
+        )
+        self.ml_id = kb.create_node(
+            title="Machine Learning Basics", content="...", tags=["machine-learning"]
+        )
+        self.star_id = kb.create_node(
+            title="星空観測ガイド", content="...", tags=["星空", "観測"]
+        )
+        return kb
+
+    def test_misspelled_title_word(self, knowledge_base):
+        """Test that a typo in a title word still finds the node."""
+        results = knowledge_base.fuzzy_search("pyhton")
+
+        assert results[0].node.id == self.python_id
+        assert results[0].term == "python"
+        assert 0 < results[0].score < 1
+
+    def test_exact_match_scores_highest(self, knowledge_base):
+        """Test that an exact term match has similarity 1."""
+        results = knowledge_base.fuzzy_search("Machine")
+
+        assert results[0].node.id == self.ml_id
+        assert results[0].score == 1.0
+
+    def test_exact_title_scores_highest(self, knowledge_base):
+        """Test that a whole title matches as one term."""
+        results = knowledge_base.fuzzy_search("machine  learning BASICS")
+
+        assert results[0].node.id == self.ml_id
+        assert (results[0].term, results[0].score) == ("machine learning basics", 1)
+
+    def test_japanese_tag(self, knowledge_base):
+        """Test fuzzy matching of Japanese tags and titles."""
+        results = knowledge_base.fuzzy_search("星空観測ガイト")
+
+        assert results[0].node.id == self.star_id
+
+    def test_no_match(self, knowledge_base):
+        """Test that unrelated queries return nothing."""
+        assert knowledge_base.fuzzy_search("zzzzqqq") == []
+        assert knowledge_base.fuzzy_search("") == []
+
+    def test_results_are_ranked_and_unique(self, knowledge_base):
+        """Test ranking and that each node is reported once."""
+        knowledge_base.create_node(title="Pythons", content="...")
+
+        results = knowledge_base.fuzzy_search("python", limit=10)
+
+        scores = [match.score for match in results]
+        assert scores == sorted(scores, reverse=True)
+        ids = [match.node.id for match in results]
+        assert len(ids) == len(set(ids))
+        assert ids[0] == self.python_id
+
+    def test_limit(self, knowledge_base):
+        """Test that limit caps the number of results."""
+        for i in range(5):
+            knowledge_base.create_node(title=f"python {i}", content="...")
+
+        assert len(knowledge_base.fuzzy_search("python", limit=3)) == 3
+
+    def test_max_edits(self, knowledge_base):
+        """Test filtering candidates by edit distance."""
+        assert knowledge_base.fuzzy_search("pyhton", max_edits=1) == []
+        assert knowledge_base.fuzzy_search("pyhton", max_edits=2)[0].term == "python"
+
+    def test_index_follows_changes(self, knowledge_base):
+        """Test that the index is maintained after it is first built."""
+        knowledge_base.fuzzy_search("python")
+
+        knowledge_base.update_node(self.python_id, title="Rust Programming", tags=[])
+        new_id = knowledge_base.create_node(title="Strategy Guide", content="...")
+
+        assert knowledge_base.fuzzy_search("pyton") == []
+        assert knowledge_base.fuzzy_search("rusty")[0].node.id == self.python_id
+        assert knowledge_base.fuzzy_search("stratgy")[0].node.id == new_id
+
+        knowledge_base.delete_node(new_id)
+        assert knowledge_base.fuzzy_search("stratgy") == []
+
+    def test_invalid_threshold(self, knowledge_base):
+        """Test that thresholds outside (0, 1] are rejected."""
+        with pytest.raises(ValueError):
+            knowledge_base.fuzzy_search("python", threshold=0)
@@ -0,0 +1,123 @@
+"""Tests for integer handles and time-sortable IDs."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.models.handles import (
+    HandleTable,
+    UlidGenerator,
+    encode_ulid,
+    new_ulid,
+    ulid_timestamp,
+)
+
+
+class TestUlid:
+    """Test the ULID-style ID scheme."""
+
+    def test_encoding(self):
+        """Test the fixed-width base32 encoding."""
+        assert encode_ulid(0, 0) == "0" * 26
+        assert encode_ulid(1, 0) == "0" * 9 + "1" + "0" * 16
+        assert len(encode_ulid((1 << 48) - 1, (1 << 80) - 1)) == 26
+
+    def test_ids_sort_by_time_and_are_monotonic(self):
+        """Test ordering across and within milliseconds."""
+        generator = UlidGenerator()
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        same_ms = [generator.new(start) for _ in range(100)]
+        later = generator.new(start + timedelta(seconds=1))
+        assert same_ms == sorted(same_ms)
+        assert len(set(same_ms)) == 100
+        assert later > same_ms[-1]
+        assert ulid_timestamp(later) == start + timedelta(seconds=1)
+
+    def test_past_timestamp_is_kept(self):
+        """Test that an explicit past time is encoded even after newer IDs."""
+        generator = UlidGenerator()
+        past = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        now = generator.new()
+        earlier = generator.new(past)
+        assert ulid_timestamp(earlier) == past
+        assert earlier < now
+        assert generator.new(past) > earlier
+        assert ulid_timestamp(new_ulid(past)) == past
+
+    def test_timestamp_of_other_ids(self):
+        """Test that non-ULID IDs have no embedded time."""
+        assert ulid_timestamp("not-a-ulid") is None
+        assert ulid_timestamp("u" * 26) is None
+
+
+class TestHandleTable:
+    """Test the ID to handle table."""
+
+    def test_assign_release_reuse(self):
+        """Test that handles are dense, stable and reused."""
+        table = HandleTable()
+        assert [table.assign(i) for i in "abc"] == [0, 1, 2]
+        assert table.assign("b") == 1
+        table.release("b")
+        assert table.node_id(1) is None
+        assert "b" not in table
+        assert table.assign("d") == 1
+        assert table.node_id(1) == "d"
+        assert (len(table), table.capacity) == (3, 3)
+        assert table.node_id(5) is None
+
+
+class TestKnowledgeBaseHandles:
+    """Test handles and ID schemes through the KnowledgeBase API."""
+
+    def test_handles_follow_nodes(self):
+        """Test that every node has a handle until it is deleted."""
+        kb = KnowledgeBase()
+        first = kb.create_node(title="A", content="...")
+        second = kb.create_node(title="B", content="...")
+        handle = kb.handle_of(second)
+        assert kb.node_id_of(handle) == second
+
+        kb.update_node(second, title="B2")
+        assert kb.handle_of(second) == handle
+
+        kb.delete_node(first)
+        assert kb.handle_of(first) is None
+        third = kb.create_node(title="C", content="...")
+        assert {kb.handle_of(second), kb.handle_of(third)} == {0, 1}
+
+    def test_ulid_scheme(self):
+        """Test that ULID node IDs follow creation order."""
+        kb = KnowledgeBase(id_scheme="ulid")
+        ids = [kb.create_node(title=str(i), content="...") for i in range(20)]
+        assert ids == sorted(ids)
+        assert all(len(node_id) == 26 for node_id in ids)
+        node = kb.get_node(ids[0])
+        assert (
+            abs(ulid_timestamp(ids[0]).timestamp() - node.created_at.timestamp())
+            < 0.001
+        )
+
+        with pytest.raises(ValueError):
+            KnowledgeBase(id_scheme="sequential")
+
+    def test_link_graph(self):
+        """Test the CSR link graph snapshot."""
+        kb = KnowledgeBase()
+        a = kb.create_node(title="A", content="...")
+        b = kb.create_node(title="B", content="...")
+        c = kb.create_node(title="C", content="...", links=[a, b, "missing"])
+        kb.update_node(a, links=[c])
+
+        graph = kb.link_graph()
+        assert graph.neighbors(c) == [a, b]
+        assert graph.neighbors(a) == [c]
+        assert graph.neighbors(b) == []
+        assert list(graph.targets(kb.handle_of(c))) == [
+            kb.handle_of(a),
+            kb.handle_of(b),
+        ]
+        assert len(graph.indices) == 3
+
+        kb.delete_node(b)
+        assert graph.neighbors(c) == [a, b]
@@ -0,0 +1,124 @@
+"""Tests for match positions and snippets."""
+
+import random
+
+import pytest
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.models.normalize import OffsetMap, normalize
+
+
+class TestOffsetMap:
+    """Test mapping normalized positions back to the original text."""
+
+    def test_identity(self):
+        """Test that text normalizing character by character maps 1:1."""
+        offsets = OffsetMap("ＡＢＣ かな 漢字 Text")
+        assert [offsets.original(i) for i in range(5)] == list(range(5))
+
+    def test_random_text(self):
+        """Test that every mapped span covers the normalized span."""
+        rng = random.Random(7)
+        alphabet = "abＡｶﾞﾟｷﾞ가ßﬁ⑩é́カ漢。ヿП "
+        for fold_kana in (False, True):
+            for _ in range(500):
+                text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(20)))
+                key = normalize(text, fold_kana)
+                offsets = OffsetMap(text, fold_kana)
+                assert offsets.original(len(key)) == len(text)
+                for start in range(len(key)):
+                    for end in range(start, min(len(key), start + 3) + 1):
+                        lo = offsets.original(start)
+                        hi = offsets.original(end, end=True)
+                        assert key[start:end] in normalize(text[lo:hi], fold_kana)
+
+
+class TestSearchMatches:
+    """Test positions of text search results."""
+
+    def test_positions(self):
+        """Test title spans and the first content span in original offsets."""
+        kb = KnowledgeBase()
+        first = kb.create_node("Fleet FLEET", "ｶﾞｲﾄﾞ: the fleet guide")
+        kb.create_node("Other", "nothing")
+        second = kb.create_node("Plan", "Ｆｌｅｅｔ")
+
+        matches = kb.search_matches("fleet")
+        assert [m.node.id for m in matches] == [first, second]
+        assert matches[0].title == [(0, 5), (6, 11)]
+        assert matches[0].content == (11, 16)
+        assert (matches[1].title, matches[1].content) == ([], (0, 5))
+
+        (guide,) = kb.search_matches("ガイド")
+        assert guide.content == (0, 5)
+        assert len(kb.search_matches("fleet", limit=1)) == 1
+        assert kb.search_matches("") == []
+
+
+class TestSnippet:
+    """Test highlighted excerpts."""
+
+    @pytest.fixture
+    def kb(self):
+        """Provide a knowledge base with a long transcript."""
+        kb = KnowledgeBase()
+        content = "intro " * 50 + "the ＦＬＥＥＴ moves, fleet follows" + " outro" * 50
+        self.node_id = kb.create_node("Transcript", content)
+        return kb
+
+    def test_centered_excerpt(self, kb):
+        """Test the window around the first match and its highlights."""
+        node = kb.get_node(self.node_id)
+        snippet = kb.snippet(node, "Fleet", width=40)
+        assert len(snippet.text) == 40
+        assert node.content[snippet.start :].startswith(snippet.text)
+        assert [snippet.text[s:e] for s, e in snippet.highlights] == [
+            "ＦＬＥＥＴ",
+            "fleet",
+        ]
+        assert snippet.truncated_start and snippet.truncated_end
+        rendered = snippet.render("[", "]", "...")
+        assert "[ＦＬＥＥＴ] moves, [fleet]" in rendered
+        assert rendered.startswith("...") and rendered.endswith("...")
+
+    def test_no_match(self, kb):
+        """Test that without a match the excerpt is the start."""
+        snippet = kb.snippet(kb.get_node(self.node_id), "missing", width=12)
+        assert (snippet.text, snippet.start, snippet.highlights) == (
+            "intro intro ",
+            0,
+            [],
+        )
+        assert not snippet.truncated_start
+        with pytest.raises(ValueError):
+            kb.snippet(kb.get_node(self.node_id), "fleet", width=0)
+
+    def test_short_content(self):
+        """Test content shorter than the window."""
+        kb = KnowledgeBase()
+        node = kb.get_node(kb.create_node("A", "ｶﾞｲﾄﾞ"))
+        snippet = kb.snippet(node, "ガイ", width=80)
+        assert (snippet.text, snippet.highlights) == ("ｶﾞｲﾄﾞ", [(0, 3)])
+        assert not (snippet.truncated_start or snippet.truncated_end)
+
+    def test_offsets_cached(self, kb):
+        """Test that the position map is reused until the content changes."""
+        node = kb.get_node(self.node_id)
+        kb.snippet(node, "fleet")
+        offsets = node._search_keys.offsets
+        kb.update_node(self.node_id, tags=["x"])
+        kb.snippet(node, "fleet")
+        assert node._search_keys.offsets is offsets
+        kb.update_node(self.node_id, content="ｶﾞ fleet")
+        assert node._search_keys.offsets is None
+        assert kb.snippet(node, "fleet").highlights == [(3, 8)]
+
+    def test_compressed_and_detached(self, kb):
+        """Test compressed bodies and nodes from history."""
+        kb.enable_compression(threshold=10)
+        kb.enable_history()
+        node = kb.get_node(self.node_id)
+        assert node._search_keys.content is None
+        assert kb.snippet(node, "fleet", 40).highlights
+        kb.update_node(self.node_id, content="gone")
+        old = kb.get_node_at(self.node_id, 0)
+        assert kb.snippet(old, "fleet", 40).highlights
@@ -0,0 +1,174 @@
+"""Tests for node revision history."""
+
+from datetime import timedelta
+import random
+
+import pytest
+from star_tactics.models.history import TextDelta
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.storage import JSONStorage, parallel_load
+
+
+class TestTextDelta:
+    """Test reversible text deltas."""
+
+    @pytest.mark.parametrize(
+        "old,new",
+        [
+            ("", "abc"),
+            ("abc", ""),
+            ("作戦会議の記録", "作戦会議の最終記録"),
+            ("line 1\nline 2\nline 3\n", "line 1\nline two\nline 3\nline 4"),
+            ("a\nb\nc\nd\n", "x\nb\nc\ny\n"),
+        ],
+    )
+    def test_round_trip(self, old, new):
+        """Test that a delta converts in both directions."""
+        delta = TextDelta.between(old, new)
+        assert delta.forward(old) == new
+        assert delta.backward(new) == old
+
+    def test_local_edit_is_small(self):
+        """Test that a local edit in a long text stores only the edit."""
+        old = "".join(f"paragraph {i}\n" for i in range(1000))
+        new = old.replace("paragraph 500\n", "paragraph 500 (revised)\n")
+        assert TextDelta.between(old, new).size < 50
+
+    def test_random_edits(self):
+        """Test round trips over random multi-line edits."""
+        rng = random.Random(7)
+        words = ["fleet\n", "ring ", "dawn\n", "艦隊", "\n", "x"]
+        for _ in range(200):
+            old = "".join(rng.choices(words, k=rng.randint(0, 30)))
+            new = list(old)
+            for _ in range(rng.randint(1, 4)):
+                pos = rng.randint(0, len(new))
+                new[pos : pos + rng.randint(0, 5)] = rng.choice(words)
+            new = "".join(new)
+            delta = TextDelta.between(old, new)
+            assert delta.forward(old) == new
+            assert delta.backward(new) == old
+
+
+class TestKnowledgeBaseHistory:
+    """Test history through the KnowledgeBase API."""
+
+    @pytest.fixture
+    def knowledge_base(self):
+        """Provide a KnowledgeBase with history enabled."""
+        kb = KnowledgeBase()
+        kb.enable_history(checkpoint_interval=4)
+        return kb
+
+    def edit_many(self, kb, count):
+        """Create a node and update it ``count`` times; return its states."""
+        node_id = kb.create_node(title="Log", content="entry 0\n", tags=["log"])
+        states = [kb.get_node(node_id).to_dict()]
+        for i in range(1, count + 1):
+            node = kb.get_node(node_id)
+            if i % 3 == 0:
+                kb.update_node(node_id, title=f"Log {i}", tags=["log", str(i)])
+            else:
+                kb.update_node(node_id, content=node.content + f"entry {i}\n")
+            states.append(kb.get_node(node_id).to_dict())
+        return node_id, states
+
+    def test_every_revision_is_reconstructed(self, knowledge_base):
+        """Test reconstruction of every revision by number."""
+        node_id, states = self.edit_many(knowledge_base, 21)
+        assert len(knowledge_base.node_history(node_id)) == 22
+        for revision, state in enumerate(states):
+            node = knowledge_base.get_node_at(node_id, revision)
+            assert node.to_dict() == state
+        assert knowledge_base.get_node_at(node_id, -1).to_dict() == states[-1]
+        assert knowledge_base.get_node_at(node_id, 22) is None
+        assert knowledge_base.get_node_at("missing", 0) is None
+
+    def test_lookup_by_time(self, knowledge_base):
+        """Test finding the revision current at a point in time."""
+        node_id, states = self.edit_many(knowledge_base, 3)
+        history = knowledge_base.node_history(node_id)
+        node = knowledge_base.get_node_at(node_id, history[1].timestamp)
+        assert node.to_dict() == states[1]
+        before = history[0].timestamp - timedelta(seconds=1)
+        assert knowledge_base.get_node_at(node_id, before) is None
+
+    def test_revision_metadata(self, knowledge_base):
+        """Test changed fields, checkpoints and stored delta sizes."""
+        node_id, _ = self.edit_many(knowledge_base, 4)
+        history = knowledge_base.node_history(node_id)
+        assert [r.fields for r in history] == [
+            (),
+            ("content",),
+            ("content",),
+            ("title", "tags"),
+            ("content",),
+        ]
+        assert [r.checkpoint for r in history] == [True, False, False, False, True]
+        assert history[1].delta_size == len("entry 1\n")
+
+    def test_unchanged_updates_and_links(self, knowledge_base):
+        """Test that no-op updates are skipped and link edits recorded."""
+        a = knowledge_base.create_node(title="A", content="x")
+        b = knowledge_base.create_node(title="B", content="y")
+        knowledge_base.update_node(a, title="A")
+        assert len(knowledge_base.node_history(a)) == 1
+
+        knowledge_base.add_bidirectional_link(a, b)
+        assert knowledge_base.get_node_at(a, 0).links == []
+        assert knowledge_base.get_node_at(a, 1).links == [b]
+
+    def test_deleted_nodes_keep_history(self, knowledge_base):
+        """Test that history survives deletion."""
+        node_id, states = self.edit_many(knowledge_base, 2)
+        knowledge_base.delete_node(node_id)
+        assert knowledge_base.get_node_at(node_id, 1).to_dict() == states[1]
+
+    def test_not_enabled(self):
+        """Test errors when history is missing or enabled twice."""
+        kb = KnowledgeBase()
+        with pytest.raises(ValueError):
+            kb.get_node_at("x", 0)
+        kb.enable_history()
+        with pytest.raises(ValueError):
+            kb.enable_history()
+        with pytest.raises(ValueError):
+            KnowledgeBase().enable_history(checkpoint_interval=0)
+
+
+class TestHistoryStorage:
+    """Test persisting history."""
+
+    @pytest.mark.parametrize("loader", ["load", "parallel_load"])
+    def test_round_trip(self, tmp_path, loader):
+        """Test that revisions of live and deleted nodes survive a reload."""
+        kb = KnowledgeBase()
+        kb.enable_history(checkpoint_interval=3)
+        kept = kb.create_node(title="Kept", content="v0")
+        gone = kb.create_node(title="Gone", content="only")
+        kb.update_node(gone, content="only, edited")
+        for i in range(1, 8):
+            kb.update_node(kept, content=f"v{i}\n" * i, tags=[str(i)])
+        kb.delete_node(gone)
+        expected = {
+            node_id: [
+                kb.get_node_at(node_id, r).to_dict()
+                for r in range(len(kb.node_history(node_id)))
+            ]
+            for node_id in (kept, gone)
+        }
+
+        path = tmp_path / "kb.json"
+        JSONStorage(path).save(kb)
+        loaded = KnowledgeBase()
+        if loader == "load":
+            JSONStorage(path).load(loaded)
+        else:
+            parallel_load(path, loaded, workers=1)
+
+        for node_id, states in expected.items():
+            assert [
+                loaded.get_node_at(node_id, r).to_dict() for r in range(len(states))
+            ] == states
+        loaded.update_node(kept, title="After reload")
+        assert len(loaded.node_history(kept)) == 9
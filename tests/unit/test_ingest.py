@@ -0,0 +1,136 @@
+"""Tests for parallel bulk ingest."""
+
+import json
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.storage import JSONStorage, parallel_load
+
+
+class TestParallelLoad:
+    """Test chunked, process-parallel loading of exports."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Provide a temporary directory for testing."""
+        with TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    @pytest.fixture
+    def source_kb(self):
+        """Provide a KnowledgeBase with linked, tagged nodes."""
+        kb = KnowledgeBase()
+        previous = None
+        for i in range(60):
+            previous = kb.create_node(
+                title=f"質問 {i}",
+                content=f'Content {i}\nwith a newline and "quotes"',
+                tags=["all", f"group-{i % 4}", "Mixed-Case"],
+                links=[previous] if previous else [],
+            )
+        return kb
+
+    def assert_same(self, expected, actual):
+        """Check that two knowledge bases hold identical nodes."""
+        assert len(actual.get_all_nodes()) == len(expected.get_all_nodes())
+        for node in expected.get_all_nodes():
+            loaded = actual.get_node(node.id)
+            assert loaded is not None
+            assert (loaded.title, loaded.content, loaded.tags, loaded.links) == (
+                node.title,
+                node.content,
+                node.tags,
+                node.links,
+            )
+            assert loaded.created_at == node.created_at
+            assert loaded.updated_at == node.updated_at
+            keys, expected_keys = loaded._search_keys, node._search_keys
+            assert (keys.title, keys.content, keys.tags) == (
+                expected_keys.title,
+                expected_keys.content,
+                expected_keys.tags,
+            )
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_load_storage_file(self, temp_dir, source_kb, workers):
+        """Test loading a JSONStorage file in chunks, in and out of process."""
+        path = temp_dir / "kb.json"
+        JSONStorage(path).save(source_kb)
+
+        kb = KnowledgeBase()
+        count = parallel_load(path, kb, workers=workers, min_parallel_bytes=0)
+
+        assert count == 60
+        self.assert_same(source_kb, kb)
+        assert len(kb.search_by_tags(["group-1"])) == 15
+        assert len(kb.search_by_tags(["mixed-case", "all"])) == 60
+
+    def test_keys_from_workers_kept(self, temp_dir, source_kb):
+        """Test that search keys computed while parsing stay in use."""
+        path = temp_dir / "kb.json"
+        JSONStorage(path).save(source_kb)
+        kb = KnowledgeBase()
+        parallel_load(path, kb, workers=1, min_parallel_bytes=0)
+        node = kb.get_all_nodes()[0]
+        keys = node._search_keys
+
+        kb.update_node(node.id, links=[])
+        assert node._search_keys.tags is keys.tags
+        kb.update_node(node.id, tags=["Other"])
+        assert node._search_keys.tags == ("other",)
+
+    def test_load_jsonl(self, temp_dir, source_kb):
+        """Test loading a JSON Lines export."""
+        path = temp_dir / "kb.jsonl"
+        with open(path, "w", encoding="utf-8") as f:
+            for node in source_kb.get_all_nodes():
+                record = {
+                    "id": node.id,
+                    "title": node.title,
+                    "content": node.content,
+                    "tags": node.tags,
+                    "links": node.links,
+                    "created_at": node.created_at.isoformat(),
+                    "updated_at": node.updated_at.isoformat(),
+                }
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        kb = KnowledgeBase()
+        parallel_load(path, kb, workers=2, chunks_per_worker=3, min_parallel_bytes=0)
+
+        self.assert_same(source_kb, kb)
+
+    def test_load_compact_json_falls_back(self, temp_dir, source_kb):
+        """Test that JSON without the storage layout is still loaded."""
+        JSONStorage(temp_dir / "kb.json").save(source_kb)
+        data = json.loads((temp_dir / "kb.json").read_text(encoding="utf-8"))
+        path = temp_dir / "compact.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+
+        kb = KnowledgeBase()
+        parallel_load(path, kb, workers=2)
+
+        self.assert_same(source_kb, kb)
+
+    def test_load_empty_storage_file(self, temp_dir):
+        """Test loading a knowledge base without nodes."""
+        path = temp_dir / "empty.json"
+        JSONStorage(path).save(KnowledgeBase())
+
+        kb = KnowledgeBase()
+        assert parallel_load(path, kb, workers=2) == 0
+
+    def test_load_replaces_existing_nodes(self, temp_dir, source_kb):
+        """Test that loading replaces nodes and keeps indexes consistent."""
+        path = temp_dir / "kb.json"
+        JSONStorage(path).save(source_kb)
+        kb = KnowledgeBase()
+        kb.create_node(title="Stale", content="Stale", tags=["all"])
+
+        parallel_load(path, kb, workers=1)
+
+        assert kb.search_by_text("Stale") == []
+        assert len(kb.search_by_tags(["all"])) == 60
+        assert kb.get_all_broken_links() == {}
+        assert len(kb.get_recently_created(100)) == 60
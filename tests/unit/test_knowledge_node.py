@@ -3,6 +3,7 @@
 import pytest
 from datetime import datetime
 from star_tactics.models.knowledge_node import KnowledgeNode, KnowledgeBase
+from star_tactics.models.indexes import NodeIndex
 
 
 class TestKnowledgeNode:
@@ -153,3 +154,30 @@ class TestKnowledgeBaseCRUD:
         assert node.title == "New Title"
         assert node.content == "Original content"  # Should remain unchanged
         assert node.tags == ["tag1", "tag2"]  # Should remain unchanged
+
+    def test_indexes_see_old_and_new_state(self, knowledge_base):
+        """Test that indexes get a snapshot of the old state on update."""
+
+        class Recorder(NodeIndex):
+            def __init__(self):
+                self.updates = []
+
+            def add(self, node):
+                pass
+
+            def remove(self, node):
+                pass
+
+            def clear(self):
+                pass
+
+            def update(self, old, new):
+                self.updates.append((old.title, list(old.links), new.title))
+
+        first = knowledge_base.create_node(title="A", content="x")
+        second = knowledge_base.create_node(title="B", content="y")
+        recorder = knowledge_base._lazy_index("recorder", Recorder)
+        knowledge_base.update_node(first, title="C")
+        knowledge_base.add_bidirectional_link(first, second)
+        assert recorder.updates == [("A", [], "C"), ("C", [], "C"), ("B", [], "B")]
+        assert knowledge_base.get_node(first).links == [second]
@@ -0,0 +1,147 @@
+"""Tests for opt-in metrics and instrumentation."""
+
+import logging
+import pytest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.storage import JSONStorage
+from star_tactics.utils.metrics import Histogram, Metrics
+
+
+class TestHistogram:
+    """Test the latency histogram."""
+
+    def test_cumulative_buckets(self):
+        """Test that observations land in cumulative buckets."""
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        assert histogram.cumulative() == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+        assert histogram.count == 4
+        assert histogram.sum == pytest.approx(2.65)
+
+
+class TestKnowledgeBaseMetrics:
+    """Test instrumentation of KnowledgeBase and storage."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Provide a temporary directory for testing."""
+        with TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    def test_disabled_by_default(self):
+        """Test that a plain KnowledgeBase installs no wrappers."""
+        kb = KnowledgeBase()
+
+        assert kb.metrics is None
+        assert "get_node" not in vars(kb)
+
+    def test_crud_and_search_are_timed(self):
+        """Test that operations record counts and scanned nodes."""
+        metrics = Metrics()
+        kb = KnowledgeBase(metrics=metrics)
+
+        node_id = kb.create_node(title="Python", content="Code", tags=["py"])
+        kb.create_node(title="Other", content="Text", tags=["other"])
+        kb.get_node(node_id)
+        kb.search_by_text("code")
+        kb.search_by_tags(["py"])
+
+        assert metrics.get_histogram("create_node").count == 2
+        assert metrics.get_histogram("get_node").count == 1
+        assert metrics.get_counter("nodes_scanned", "search_by_text") == 2
+        assert metrics.get_counter("nodes_scanned", "search_by_tags") == 1
+
+    def test_link_operations_are_timed(self):
+        """Test that link management methods are instrumented."""
+        metrics = Metrics()
+        kb = KnowledgeBase(metrics=metrics)
+        a = kb.create_node(title="A", content="A")
+        b = kb.create_node(title="B", content="B")
+
+        kb.add_bidirectional_link(a, b)
+
+        assert metrics.get_histogram("add_bidirectional_link").count == 1
+
+    def test_query_counts_scanned_nodes(self):
+        """Test that lazily executed queries report scanned nodes."""
+        metrics = Metrics()
+        kb = KnowledgeBase(metrics=metrics)
+        for i in range(3):
+            kb.create_node(title=f"N{i}", content="C", tags=["t"] if i else [])
+
+        kb.query().with_tags(["t"]).all()
+
+        assert metrics.get_counter("nodes_scanned", "query") == 2
+
+    def test_storage_phases_and_bytes(self, temp_dir):
+        """Test that save and load report phases and byte counts."""
+        metrics = Metrics()
+        storage = JSONStorage(temp_dir / "kb.json")
+        kb = KnowledgeBase(storage=storage, metrics=metrics)
+        kb.create_node(title="Node", content="Content")
+
+        KnowledgeBase(storage=storage, metrics=metrics)
+
+        size = storage.filepath.stat().st_size
+        for phase in ("serialize", "write", "save", "read", "parse", "load"):
+            assert metrics.get_histogram(f"storage.{phase}").count >= 1
+        assert metrics.get_counter("bytes_written", "storage.save") == size
+        assert metrics.get_counter("bytes_read", "storage.load") == size
+
+    def test_slow_operation_log(self, caplog):
+        """Test that operations above the threshold are logged."""
+        metrics = Metrics(slow_threshold=0.0)
+        kb = KnowledgeBase(metrics=metrics)
+
+        with caplog.at_level(logging.WARNING, logger="star_tactics.utils.metrics"):
+            kb.create_node(title="Node", content="Content")
+
+        assert [slow.operation for slow in metrics.slow_log] == ["create_node"]
+        assert "create_node" in caplog.text
+
+    def test_to_dict(self):
+        """Test the plain-data export."""
+        metrics = Metrics()
+        kb = KnowledgeBase(metrics=metrics)
+        kb.search_by_text("anything")
+
+        exported = metrics.to_dict()
+        assert exported["operations"]["search_by_text"]["count"] == 1
+        assert exported["counters"]["nodes_scanned"]["search_by_text"] == 0
+        assert exported["slow_operations"] == []
+
+    def test_to_prometheus(self):
+        """Test the Prometheus text exposition format."""
+        metrics = Metrics(buckets=(0.5,))
+        metrics.observe("get_node", 0.25)
+        metrics.increment("bytes_written", "storage.save", 42)
+
+        text = metrics.to_prometheus()
+        assert "# TYPE star_tactics_operation_duration_seconds histogram" in text
+        assert (
+            "star_tactics_operation_duration_seconds_bucket"
+            '{operation="get_node",le="0.5"} 1' in text
+        )
+        assert (
+            'star_tactics_operation_duration_seconds_count{operation="get_node"} 1'
+            in text
+        )
+        assert 'star_tactics_bytes_written_total{operation="storage.save"} 42' in text
+
+    def test_reset(self):
+        """Test that reset discards recorded values."""
+        metrics = Metrics(slow_threshold=0.0)
+        metrics.observe("op", 1.0)
+        metrics.increment("c", "op")
+
+        metrics.reset()
+
+        assert metrics.to_dict() == {
+            "operations": {},
+            "counters": {},
+            "slow_operations": [],
+        }
@@ -0,0 +1,116 @@
+"""Tests for Unicode-normalized search keys."""
+
+import pytest
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.models.normalize import normalize
+from star_tactics.storage import JSONStorage, parallel_load
+from star_tactics.storage.shared import Snapshot, encode_snapshot
+
+
+class TestNormalize:
+    """Test the normalization function."""
+
+    @pytest.mark.parametrize(
+        "text,expected",
+        [
+            ("Fleet", "fleet"),
+            ("ＦＬＥＥＴ", "fleet"),
+            ("ｶﾀｶﾅ", "カタカナ"),
+            ("ｶﾞ", "ガ"),
+            ("Straße", "strasse"),
+            ("①", "1"),
+        ],
+    )
+    def test_width_and_case(self, text, expected):
+        """Test width and case folding."""
+        assert normalize(text) == expected
+
+    def test_kana_folding(self):
+        """Test optional katakana to hiragana folding."""
+        assert normalize("ｶﾀｶﾅ ヴ") == "カタカナ ヴ"
+        assert normalize("ｶﾀｶﾅ ヴ", fold_kana=True) == "かたかな ゔ"
+
+
+class TestSearchKeys:
+    """Test searching through cached keys."""
+
+    @pytest.fixture
+    def kb(self):
+        """Provide a knowledge base with mixed-width text."""
+        kb = KnowledgeBase()
+        kb.create_node("ＡＩ戦略", "ﾃｽﾄ content", tags=["Ｏｐｓ", "カタカナ"])
+        kb.create_node("Plain", "nothing here", tags=["ops"])
+        return kb
+
+    def test_text_search(self, kb):
+        """Test that text search ignores case and width."""
+        for query in ("ai戦略", "ＡＩ戦", "テスト", "ﾃｽﾄ CONTENT"):
+            assert [n.title for n in kb.search_by_text(query)] == ["ＡＩ戦略"]
+
+    def test_tag_search(self, kb):
+        """Test that tag search and counts ignore case and width."""
+        assert len(kb.search_by_tags(["OPS"])) == 2
+        assert len(kb.search_by_tags(["ｶﾀｶﾅ"])) == 1
+        assert len(kb.query().with_any_tags(["ＯＰＳ"]).all()) == 2
+        assert len(kb.query().containing("ＰＬＡＩＮ").all()) == 1
+
+    def test_kana_folding(self, kb):
+        """Test switching kana folding on an existing base."""
+        assert kb.search_by_text("てすと") == []
+        kb.set_kana_folding()
+        assert [n.title for n in kb.search_by_text("てすと")] == ["ＡＩ戦略"]
+        assert len(kb.search_by_tags(["かたかな"])) == 1
+        kb.set_kana_folding(False)
+        assert kb.search_by_text("てすと") == []
+        assert len(kb.search_by_tags(["カタカナ"])) == 1
+
+    def test_keys_reused_on_link_update(self, kb):
+        """Test that a link-only update keeps the computed keys."""
+        first, second = (n.id for n in kb.get_all_nodes())
+        keys = kb.get_node(first)._search_keys
+        kb.update_node(first, links=[second])
+        updated = kb.get_node(first)._search_keys
+        assert updated.title is keys.title
+        assert updated.content is keys.content
+        assert updated.tags is keys.tags
+        kb.update_node(first, content="ＮＥＷ")
+        assert kb.get_node(first)._search_keys.content == "new"
+        # A tag list changed in place is not mistaken for the indexed one
+        node = kb.get_node(first)
+        node.tags.append("ＮＥＷ")
+        kb.update_node(first, tags=node.tags)
+        assert node._search_keys.tags[-1] == "new"
+        assert len(kb.search_by_tags(["new"])) == 1
+
+    def test_compressed_content(self):
+        """Test that compressed bodies stay searchable without a cached key."""
+        kb = KnowledgeBase()
+        kb.enable_compression(threshold=10)
+        node_id = kb.create_node("Long", "ＷＩＤＥ " * 20)
+        assert kb.get_node(node_id)._search_keys.content is None
+        assert [n.id for n in kb.search_by_text("wide wide")] == [node_id]
+
+    def test_fuzzy_and_autocomplete(self, kb):
+        """Test that typo-tolerant search and completion normalize input."""
+        assert [m.node.title for m in kb.fuzzy_search("ＰＬＡＩＮ")] == ["Plain"]
+        assert [c.text for c in kb.autocomplete("ＯＰ", kind="tag")] == ["ops"]
+
+    def test_snapshot(self, kb):
+        """Test that snapshots match like the live base."""
+        kb.set_kana_folding()
+        snapshot = Snapshot(memoryview(b"".join(encode_snapshot(kb))))
+        assert [n.title for n in snapshot.search_by_text("ﾃｽﾄ")] == ["ＡＩ戦略"]
+        assert [n.title for n in snapshot.search_by_text("てすと")] == ["ＡＩ戦略"]
+        assert len(snapshot.search_by_tags(["ＯＰＳ"])) == 2
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_parallel_load(self, kb, tmp_path, workers):
+        """Test that tag postings built in workers use the same keys."""
+        path = tmp_path / "kb.json"
+        JSONStorage(path).save(kb)
+        loaded = KnowledgeBase()
+        loaded.set_kana_folding()
+        parallel_load(path, loaded, workers=workers, min_parallel_bytes=0)
+        assert len(loaded.search_by_tags(["ops"])) == 2
+        assert len(loaded.search_by_tags(["かたかな"])) == 1
+        assert len(loaded.search_by_text("てすと")) == 1
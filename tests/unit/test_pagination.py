@@ -0,0 +1,126 @@
+"""Tests for lazy iteration and cursor-based pagination."""
+
+import pytest
+from datetime import datetime, timedelta
+from star_tactics.models.knowledge_node import KnowledgeBase, KnowledgeNode
+
+
+class TestPagination:
+    """Test iterator variants and cursor pagination of KnowledgeBase."""
+
+    BASE = datetime(2025, 1, 1, 9, 0, 0)
+
+    @pytest.fixture
+    def knowledge_base(self):
+        """Provide a KnowledgeBase with 120 nodes created one minute apart."""
+        kb = KnowledgeBase()
+        for i in range(120):
+            kb._add_node(
+                KnowledgeNode(
+                    id=f"node-{i:03d}",
+                    title=f"Question {i}",
+                    content="even" if i % 2 == 0 else "odd",
+                    tags=["all", "fizz"] if i % 3 == 0 else ["all"],
+                    created_at=self.BASE + timedelta(minutes=i),
+                )
+            )
+        return kb
+
+    def collect(self, fetch):
+        """Follow cursors until the last page and return all pages."""
+        pages = []
+        cursor = None
+        while True:
+            page = fetch(cursor)
+            pages.append(page)
+            cursor = page.next_cursor
+            if cursor is None:
+                return pages
+
+    def test_iter_nodes_is_lazy(self, knowledge_base):
+        """Test that iter_nodes returns an iterator, not a list."""
+        iterator = knowledge_base.iter_nodes()
+
+        assert not isinstance(iterator, list)
+        assert next(iterator).id == "node-000"
+
+    def test_iter_search_variants(self, knowledge_base):
+        """Test that iterator search variants match the list versions."""
+        by_tags = list(knowledge_base.iter_search_by_tags(["fizz"]))
+        by_text = list(knowledge_base.iter_search_by_text("even"))
+
+        assert by_tags == knowledge_base.search_by_tags(["fizz"])
+        assert by_tags == [n for n in knowledge_base.iter_nodes() if "fizz" in n.tags]
+        assert by_text == knowledge_base.search_by_text("even")
+        assert len(by_tags) == 40
+        assert len(by_text) == 60
+
+    def test_page_nodes_covers_everything_once(self, knowledge_base):
+        """Test that following cursors yields every node in creation order."""
+        pages = self.collect(lambda c: knowledge_base.page_nodes(limit=50, cursor=c))
+
+        assert [len(page.items) for page in pages] == [50, 50, 20]
+        ids = [node.id for page in pages for node in page.items]
+        assert ids == [f"node-{i:03d}" for i in range(120)]
+
+    @pytest.mark.parametrize("limit", [5, 15])
+    def test_page_search_by_tags(self, knowledge_base, limit):
+        """Test pagination of an index-driven tag search.
+
+        Small pages walk the creation-time index, larger ones select from
+        the tag's candidates.
+        """
+        pages = self.collect(
+            lambda c: knowledge_base.page_search_by_tags(
+                ["fizz"], limit=limit, cursor=c
+            )
+        )
+
+        ids = [node.id for page in pages for node in page.items]
+        assert ids == [f"node-{i:03d}" for i in range(0, 120, 3)]
+
+    def test_page_search_by_text(self, knowledge_base):
+        """Test pagination of a scanning text search."""
+        pages = self.collect(
+            lambda c: knowledge_base.page_search_by_text("odd", limit=25, cursor=c)
+        )
+
+        ids = [node.id for page in pages for node in page.items]
+        assert ids == [f"node-{i:03d}" for i in range(1, 120, 2)]
+
+    def test_cursor_stable_under_inserts(self, knowledge_base):
+        """Test that inserting nodes does not shift later pages."""
+        first = knowledge_base.page_nodes(limit=10)
+        knowledge_base._add_node(
+            KnowledgeNode(
+                id="early",
+                title="Early",
+                content="Inserted before the cursor",
+                created_at=self.BASE - timedelta(days=1),
+            )
+        )
+
+        second = knowledge_base.page_nodes(limit=10, cursor=first.next_cursor)
+        assert second.items[0].id == "node-010"
+
+    def test_cursor_survives_deleted_anchor(self, knowledge_base):
+        """Test that deleting the last node of a page keeps the position."""
+        first = knowledge_base.page_nodes(limit=10)
+        knowledge_base.delete_node(first.items[-1].id)
+
+        second = knowledge_base.page_nodes(limit=10, cursor=first.next_cursor)
+        assert second.items[0].id == "node-010"
+
+    def test_last_page_has_no_cursor(self, knowledge_base):
+        """Test that an exactly filled final page ends pagination."""
+        page = knowledge_base.page_nodes(limit=120)
+
+        assert len(page.items) == 120
+        assert page.next_cursor is None
+
+    def test_invalid_page_arguments(self, knowledge_base):
+        """Test that bad sizes and cursors are rejected."""
+        with pytest.raises(ValueError):
+            knowledge_base.page_nodes(limit=0)
+        with pytest.raises(ValueError):
+            knowledge_base.page_nodes(cursor="not-a-cursor")
@@ -0,0 +1,165 @@
+"""Tests for the composable query planner."""
+
+import pytest
+from datetime import timedelta
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.models.query import Query
+
+
+class TestQuery:
+    """Test query building and execution."""
+
+    @pytest.fixture
+    def knowledge_base(self):
+        """Provide a KnowledgeBase with sample data."""
+        kb = KnowledgeBase()
+
+        self.python_id = kb.create_node(
+            title="Python Programming",
+            content="Python is a high-level programming language",
+            tags=["python", "programming"],
+        )
+        self.ml_id = kb.create_node(
+            title="Machine Learning Basics",
+            content="Introduction to machine learning with Python",
+            tags=["machine-learning", "python"],
+            links=[self.python_id],
+        )
+        self.web_id = kb.create_node(
+            title="Web Development",
+            content="Building web applications",
+            tags=["web", "programming"],
+            links=[self.python_id, "missing-node"],
+        )
+        self.star_id = kb.create_node(
+            title="星空観測ガイド",
+            content="夜空の星を観測するための基本的なガイド",
+            tags=["星空", "観測"],
+        )
+
+        return kb
+
+    def titles(self, nodes):
+        return {node.title for node in nodes}
+
+    def test_query_returns_query_builder(self, knowledge_base):
+        """Test that kb.query() starts an empty query matching all nodes."""
+        query = knowledge_base.query()
+
+        assert isinstance(query, Query)
+        assert len(query.all()) == 4
+
+    def test_tags_and(self, knowledge_base):
+        """Test AND combination of tags."""
+        results = knowledge_base.query().with_tags(["Python", "programming"]).all()
+
+        assert self.titles(results) == {"Python Programming"}
+
+    def test_tags_or(self, knowledge_base):
+        """Test OR combination of tags."""
+        results = knowledge_base.query().with_any_tags(["web", "観測"]).all()
+
+        assert self.titles(results) == {"Web Development", "星空観測ガイド"}
+
+    def test_tags_and_text(self, knowledge_base):
+        """Test combining tag and text predicates."""
+        results = (
+            knowledge_base.query().with_tags(["python"]).containing("MACHINE").all()
+        )
+
+        assert self.titles(results) == {"Machine Learning Basics"}
+
+    def test_links_to(self, knowledge_base):
+        """Test the links-to predicate."""
+        results = knowledge_base.query().links_to(self.python_id).all()
+
+        assert self.titles(results) == {"Machine Learning Basics", "Web Development"}
+
+    def test_has_broken_links(self, knowledge_base):
+        """Test the broken-links predicate follows node deletion."""
+        assert self.titles(knowledge_base.query().has_broken_links()) == {
+            "Web Development"
+        }
+
+        knowledge_base.delete_node(self.python_id)
+
+        assert self.titles(knowledge_base.query().has_broken_links()) == {
+            "Machine Learning Basics",
+            "Web Development",
+        }
+
+        knowledge_base.fix_broken_links(self.ml_id)
+        knowledge_base.fix_broken_links(self.web_id)
+
+        assert knowledge_base.query().has_broken_links().all() == []
+
+    def test_time_ranges(self, knowledge_base):
+        """Test created_at and updated_at range predicates."""
+        star = knowledge_base.get_node(self.star_id)
+        later = star.created_at + timedelta(days=1)
+
+        assert len(knowledge_base.query().created_between(end=later).all()) == 4
+        assert knowledge_base.query().created_between(start=later).all() == []
+        assert self.titles(
+            knowledge_base.query().updated_between(start=star.updated_at)
+        ) == {"星空観測ガイド"}
+
+    def test_index_reflects_updates(self, knowledge_base):
+        """Test that tag updates are visible to indexed predicates."""
+        knowledge_base.update_node(self.star_id, tags=["python"])
+
+        results = knowledge_base.query().with_tags(["python"]).all()
+        assert self.titles(results) == {
+            "Python Programming",
+            "Machine Learning Basics",
+            "星空観測ガイド",
+        }
+        assert knowledge_base.query().with_tags(["観測"]).all() == []
+
+    def test_limit_and_offset(self, knowledge_base):
+        """Test that limit and offset slice the result stream."""
+        everything = knowledge_base.query().all()
+
+        page = knowledge_base.query().offset(1).limit(2).all()
+        assert page == everything[1:3]
+        assert knowledge_base.query().limit(0).all() == []
+
+    def test_invalid_limit_and_offset(self, knowledge_base):
+        """Test that negative limit or offset is rejected."""
+        with pytest.raises(ValueError):
+            knowledge_base.query().limit(-1)
+        with pytest.raises(ValueError):
+            knowledge_base.query().offset(-1)
+
+    def test_results_are_lazy(self, knowledge_base):
+        """Test that iterating a query yields results one at a time."""
+        iterator = iter(knowledge_base.query().with_tags(["programming"]))
+
+        first = next(iterator)
+        assert first.title in {"Python Programming", "Web Development"}
+
+    def test_first(self, knowledge_base):
+        """Test first() on matching and empty queries."""
+        assert knowledge_base.query().with_tags(["web"]).first().id == self.web_id
+        assert knowledge_base.query().with_tags(["nonexistent"]).first() is None
+
+    def test_plan_orders_by_selectivity(self, knowledge_base):
+        """Test that the most selective indexed predicate drives the plan."""
+        query = (
+            knowledge_base.query()
+            .containing("python")
+            .with_any_tags(["python", "programming"])
+            .with_tags(["web"])
+        )
+
+        explain = query.explain()
+        assert explain[0].startswith("index TagsAll(['web'])")
+        assert explain[-1].startswith("filter TextContains")
+        assert query.all() == []
+
+    def test_plan_without_index_scans(self, knowledge_base):
+        """Test that text-only queries fall back to a full scan."""
+        query = knowledge_base.query().containing("ガイド")
+
+        assert query.explain()[0].startswith("scan all nodes")
+        assert [node.id for node in query] == [self.star_id]
@@ -0,0 +1,187 @@
+"""Tests for the live-stream question queue."""
+
+import random
+
+import pytest
+from star_tactics.models.events import ChangeType
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.services.questions import IndexedHeap, QuestionQueue
+
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestIndexedHeap:
+    """Test the keyed max-heap."""
+
+    def test_matches_sorted_order(self):
+        """Test random pushes, updates and removals against a dict."""
+        rng = random.Random(3)
+        heap = IndexedHeap()
+        expected: dict[str, float] = {}
+        for step in range(2000):
+            key = f"k{rng.randrange(200)}"
+            action = rng.random()
+            if action < 0.5:
+                expected[key] = rng.randrange(50)
+                heap.push(key, expected[key])
+            elif action < 0.8 and key in expected:
+                expected[key] = rng.randrange(50)
+                heap.update(key, expected[key])
+            else:
+                assert heap.remove(key) == (expected.pop(key, None) is not None)
+            if step % 100 == 0:
+                top = heap.top(10)
+                assert [p for _, p in top] == sorted(expected.values())[::-1][:10]
+                assert all(expected[k] == p for k, p in top)
+
+        assert len(heap) == len(expected)
+        popped = [heap.pop() for _ in range(len(expected))]
+        assert [p for _, p in popped] == sorted(expected.values(), reverse=True)
+        assert heap.pop() is None
+
+    def test_ties_pop_in_insertion_order(self):
+        """Test that equal priorities keep insertion order."""
+        heap = IndexedHeap()
+        for key in "abcd":
+            heap.push(key, 1.0)
+        heap.update("a", 1.0)
+        assert [heap.pop()[0] for _ in range(4)] == list("abcd")
+
+
+class TestQuestionQueue:
+    """Test asking, voting, folding and promotion."""
+
+    @pytest.fixture
+    def clock(self):
+        """Provide a controllable clock."""
+        return FakeClock()
+
+    @pytest.fixture
+    def queue(self, clock):
+        """Provide a queue over an empty knowledge base."""
+        return QuestionQueue(KnowledgeBase(), half_life=60, clock=clock)
+
+    def test_votes_and_recency(self, queue, clock):
+        """Test ordering by support decayed with age."""
+        old = queue.ask("When do we launch?")
+        queue.vote(old, 2)
+        clock.now += 60
+        new = queue.ask("Who leads the fleet?")
+        assert [q.id for q in queue.top()] == [old, new]
+        queue.vote(new)
+        clock.now += 30
+        newest = queue.ask("Where is the base?")
+        assert [q.id for q in queue.top()] == [new, old, newest]
+        assert queue.pop().id == new
+        assert len(queue) == 2
+
+    def test_duplicates_fold(self, queue):
+        """Test that exact and near repeats fold into the open question."""
+        first = queue.ask("How does the outer ring defense work?", tags=["ops"])
+        assert queue.ask("  how does the OUTER ring defense work ") == first
+        assert (
+            queue.ask("How does the outer ring defence work??", tags=["ring"]) == first
+        )
+        other = queue.ask("What is the plan for the inner ring?")
+        assert other != first
+
+        question = queue.get(first)
+        assert (question.duplicates, question.support) == (2, 3)
+        assert question.variants == ["How does the outer ring defence work??"]
+        assert question.tags == ["ops", "ring"]
+        assert queue.top(1)[0].id == first
+
+    def test_width_variants_fold_exactly(self):
+        """Test that full-width and half-width repeats share one key."""
+        queue = QuestionQueue(KnowledgeBase(), near_duplicate_threshold=None)
+        first = queue.ask("ＦＬＥＥＴ ｶﾞｲﾄﾞ?")
+        assert queue.ask("fleet ガイド") == first
+        assert queue.get(first).duplicates == 1
+
+    def test_exact_only(self):
+        """Test that near-duplicate folding can be turned off."""
+        queue = QuestionQueue(KnowledgeBase(), near_duplicate_threshold=None)
+        first = queue.ask("How does the outer ring defense work?")
+        assert queue.ask("how does the outer ring defense work") == first
+        assert queue.ask("How does the outer ring defence work?") != first
+        with pytest.raises(ValueError):
+            queue.ask(" ?? ")
+
+    def test_popped_questions_still_fold(self, queue):
+        """Test that repeats fold into a question being answered."""
+        question_id = queue.ask("Is the fleet ready?")
+        queue.pop()
+        assert queue.ask("is the fleet ready") == question_id
+        assert queue.get(question_id).duplicates == 1
+        assert len(queue) == 0
+
+    def test_promote_answered(self, queue, clock):
+        """Test batched promotion into tagged, linked nodes."""
+        kb = queue.knowledge_base
+        reference = kb.create_node("Fleet roster", "...")
+        subscription = kb.subscribe()
+        first = queue.ask("Who leads the fleet?", tags=["fleet"])
+        second = queue.ask("When do we launch?")
+        dismissed = queue.ask("Is this stream live?")
+        assert queue.answer(first, "Commander Aoi.", links=[reference])
+        assert queue.answer(second, "At dawn.")
+        assert queue.dismiss(dismissed)
+        assert not queue.answer(first, "again")
+        assert (len(queue), queue.pending_promotion) == (0, 2)
+
+        node_ids = queue.promote_answered(batch_size=1)
+        assert queue.pending_promotion == 1
+        node = kb.get_node(node_ids[0])
+        assert (node.title, node.content) == ("Who leads the fleet?", "Commander Aoi.")
+        assert (node.tags, node.links) == (["question", "fleet"], [reference])
+        assert [n.id for n in kb.search_by_tags(["question"])] == node_ids
+        events = subscription.drain()
+        assert [(e.type, e.node_id) for e in events] == [
+            (ChangeType.CREATED, node_ids[0])
+        ]
+
+        # A repeat asked after promotion is a new question linked to the old answer
+        repeat = queue.ask("who leads the fleet")
+        assert repeat != first
+        queue.answer(repeat, "Still Commander Aoi.")
+        later = queue.promote_answered()
+        assert len(later) == 2
+        assert kb.get_node(later[1]).links == [node_ids[0]]
+        assert queue.promote_answered() == []
+
+    def test_answered_questions_are_forgotten(self, queue):
+        """Test that answering and dismissing leave no per-question state."""
+        for i in range(20):
+            question_id = queue.ask(f"Question {i} about sector {i * 7}?")
+            if i % 2:
+                queue.dismiss(question_id)
+            else:
+                queue.answer(question_id, "Yes")
+        assert (len(queue), queue.pending_promotion) == (0, 10)
+        assert not (queue._questions or queue._by_key or queue._keys)
+
+    def test_promote_saves_once(self, clock):
+        """Test that a promoted batch is written with one save."""
+        saves = []
+
+        class Storage:
+            def save(self, kb):
+                saves.append(len(kb.get_all_nodes()))
+
+            def load(self, kb):
+                pass
+
+        kb = KnowledgeBase(storage=Storage())
+        queue = QuestionQueue(kb, clock=clock)
+        for i in range(5):
+            queue.answer(queue.ask(f"Question number {i} about sector {i * 7}?"), "Yes")
+        assert len(queue.promote_answered()) == 5
+        assert saves == [5]
@@ -0,0 +1,242 @@
+"""Tests for the asyncio HTTP API server."""
+
+import asyncio
+import json
+
+import pytest
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.services.server import KnowledgeServer
+from star_tactics.storage import JSONStorage
+
+
+def encode(method, path, body=None, headers=""):
+    """Encode a request."""
+    payload = json.dumps(body).encode() if body is not None else b""
+    return (
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\n{headers}"
+        f"Content-Length: {len(payload)}\r\n\r\n"
+    ).encode() + payload
+
+
+async def read_response(reader):
+    """Read one response, decoding chunked bodies."""
+    head = (await reader.readuntil(b"\r\n\r\n")).decode()
+    status = int(head.split(" ")[1])
+    headers = {
+        name.lower(): value.strip()
+        for name, _, value in (line.partition(":") for line in head.split("\r\n")[1:])
+        if name
+    }
+    if headers.get("transfer-encoding") == "chunked":
+        body = b""
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            chunk = await reader.readexactly(size + 2)
+            if size == 0:
+                break
+            body += chunk[:-2]
+    else:
+        body = await reader.readexactly(int(headers["content-length"]))
+    return status, headers, json.loads(body)
+
+
+class Client:
+    """Keep-alive connection to a running server."""
+
+    def __init__(self, server):
+        self.server = server
+
+    async def __aenter__(self):
+        self.reader, self.writer = await asyncio.open_connection(*self.server.address)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.writer.close()
+
+    async def request(self, method, path, body=None):
+        self.writer.write(encode(method, path, body))
+        status, _, data = await read_response(self.reader)
+        return status, data
+
+
+def run(knowledge_base, scenario, **options):
+    """Run a scenario against a server on a free port."""
+
+    async def main():
+        async with KnowledgeServer(knowledge_base, port=0, **options) as server:
+            return await asyncio.wait_for(scenario(server), timeout=10)
+
+    return asyncio.run(main())
+
+
+class TestKnowledgeServer:
+    """Test the HTTP API."""
+
+    @pytest.fixture
+    def knowledge_base(self, tmp_path):
+        """Provide a KnowledgeBase saved to a temporary file."""
+        return KnowledgeBase(storage=JSONStorage(tmp_path / "kb.json"))
+
+    def test_crud_and_persistence(self, knowledge_base, tmp_path):
+        """Test node CRUD and that writes reach the storage backend."""
+
+        async def scenario(server):
+            async with Client(server) as client:
+                status, node = await client.request(
+                    "POST", "/nodes", {"title": "A", "content": "x", "tags": ["t"]}
+                )
+                assert status == 201
+                node_id = node["id"]
+                status, node = await client.request(
+                    "PATCH", f"/nodes/{node_id}", {"title": "B"}
+                )
+                assert (status, node["title"], node["tags"]) == (200, "B", ["t"])
+                assert (await client.request("GET", f"/nodes/{node_id}"))[1] == node
+                status, _ = await client.request("DELETE", "/nodes/missing")
+                assert status == 404
+                return node_id
+
+        node_id = run(knowledge_base, scenario)
+        assert knowledge_base._storage is not None
+        saved = KnowledgeBase(storage=JSONStorage(tmp_path / "kb.json"))
+        assert saved.get_node(node_id).title == "B"
+
+    def test_concurrent_writes_share_saves(self, knowledge_base):
+        """Test that queued mutations are applied and saved in batches."""
+
+        async def scenario(server):
+            async def create(i):
+                async with Client(server) as client:
+                    return await client.request(
+                        "POST", "/nodes", {"title": str(i), "content": "..."}
+                    )
+
+            results = await asyncio.gather(*(create(i) for i in range(20)))
+            assert all(status == 201 for status, _ in results)
+            return server.writes, server.saves
+
+        writes, saves = run(knowledge_base, scenario)
+        assert writes == 20
+        assert saves < 20
+        assert len(knowledge_base.get_all_nodes()) == 20
+
+    def test_write_response_survives_batched_delete(self, knowledge_base):
+        """Test that an update answered after a delete in its batch still succeeds."""
+        node_ids = [
+            knowledge_base.create_node(title=str(i), content="x") for i in range(5)
+        ]
+
+        async def scenario(server):
+            async def send(method, node_id, body=None):
+                async with Client(server) as client:
+                    return await client.request(method, f"/nodes/{node_id}", body)
+
+            return await asyncio.gather(
+                *(send("PATCH", node_id, {"title": "B"}) for node_id in node_ids),
+                *(send("DELETE", node_id) for node_id in node_ids),
+            )
+
+        results = run(knowledge_base, scenario)
+        updates, deletes = results[:5], results[5:]
+        assert all(status == 200 for status, _ in deletes)
+        for status, node in updates:
+            assert status in (200, 404)
+            if status == 200:
+                assert node["title"] == "B"
+        assert knowledge_base.get_all_nodes() == []
+
+    def test_pipelining_and_errors(self, knowledge_base):
+        """Test in-order answers to pipelined requests, including errors."""
+        node_id = knowledge_base.create_node(title="A", content="x")
+
+        async def scenario(server):
+            reader, writer = await asyncio.open_connection(*server.address)
+            writer.write(
+                encode("GET", f"/nodes/{node_id}")
+                + encode("PUT", "/search")
+                + encode("PUT", f"/nodes/{node_id}", {"title": "B"})
+                + encode("GET", "/search?limit=-1")
+                + encode("POST", "/nodes", {"title": 1, "content": "x"})
+                + encode("GET", "/nowhere")
+                + encode("GET", "/stats", headers="Connection: close\r\n")
+            )
+            responses = [await read_response(reader) for _ in range(7)]
+            assert await reader.read() == b""
+            writer.close()
+            return responses
+
+        responses = run(knowledge_base, scenario)
+        statuses = [status for status, _, _ in responses]
+        assert statuses == [200, 405, 405, 400, 400, 404, 200]
+        assert responses[0][2]["title"] == "A"
+        assert responses[3][2] == {"error": "limit must be non-negative"}
+        assert responses[6][1]["connection"] == "close"
+        assert knowledge_base.get_node(node_id).title == "A"
+
+    def test_streamed_search_and_links(self, knowledge_base):
+        """Test chunked result streaming and the links endpoint."""
+        ids = [
+            knowledge_base.create_node(title=f"Node {i}", content="fleet", tags=["x"])
+            for i in range(5)
+        ]
+
+        async def scenario(server):
+            async with Client(server) as client:
+                status, _ = await client.request(
+                    "POST", "/links", {"source": ids[0], "target": ids[1]}
+                )
+                assert status == 200
+                client.writer.write(encode("GET", "/search?q=fleet&tags=x"))
+                search = await read_response(client.reader)
+                _, everything = await client.request("GET", "/nodes")
+                _, empty = await client.request("GET", "/search?q=nothing")
+                _, snippets = await client.request(
+                    "GET", "/search?q=FLEET&limit=1&snippet=3"
+                )
+                _, links = await client.request("GET", f"/nodes/{ids[0]}/links")
+                return search, everything, empty, links, snippets
+
+        search, everything, empty, links, snippets = run(
+            knowledge_base, scenario, stream_batch_size=2
+        )
+        status, headers, nodes = search
+        assert headers["transfer-encoding"] == "chunked"
+        assert sorted(node["id"] for node in nodes) == sorted(ids)
+        assert len(everything) == 5
+        assert empty == []
+        assert snippets[0]["snippet"] == {
+            "text": "fle",
+            "start": 0,
+            "highlights": [],
+            "truncated_start": False,
+            "truncated_end": True,
+        }
+        assert links == {"links": [ids[1]], "backlinks": [ids[1]], "broken": []}
+
+    def test_change_stream(self, knowledge_base):
+        """Test that the change stream replays history and follows writes."""
+        first = knowledge_base.create_node(title="A", content="x")
+        since = knowledge_base.change_seq
+
+        async def scenario(server):
+            reader, writer = await asyncio.open_connection(*server.address)
+            writer.write(encode("GET", "/changes?since=0"))
+            await reader.readuntil(b"\r\n\r\n")
+            async with Client(server) as client:
+                _, node = await client.request(
+                    "POST", "/nodes", {"title": "B", "content": "y"}
+                )
+            events = []
+            while len(events) < 2:
+                await reader.readline()
+                events.append(json.loads(await reader.readline()))
+                await reader.readline()
+            writer.close()
+            return node["id"], events
+
+        second, events = run(knowledge_base, scenario)
+        assert [(e["type"], e["node_id"]) for e in events] == [
+            ("created", first),
+            ("created", second),
+        ]
+        assert events[0]["seq"] == since
@@ -0,0 +1,134 @@
+"""Tests for shared-memory read replicas."""
+
+import multiprocessing
+
+import pytest
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.storage.shared import (
+    Snapshot,
+    SnapshotPublisher,
+    SnapshotReader,
+    encode_snapshot,
+)
+
+
+def read_in_child(name, node_id, results):
+    """Attach to a publisher from another process and report what it sees."""
+    with SnapshotReader(name) as reader:
+        snapshot = reader.current()
+        results.put(
+            (
+                snapshot.generation,
+                snapshot.get_node(node_id).title,
+                sorted(node.title for node in snapshot.search_by_tags(["ops"])),
+            )
+        )
+
+
+class TestSnapshot:
+    """Test queries against an encoded snapshot."""
+
+    @pytest.fixture
+    def knowledge_base(self):
+        """Provide a KnowledgeBase with tags, links and mixed scripts."""
+        kb = KnowledgeBase()
+        self.a = kb.create_node("Fleet Plan", "Hold the OUTER ring", tags=["Ops", "x"])
+        self.b = kb.create_node(
+            "艦隊編成", "作戦会議の記録", tags=["ops"], links=[self.a]
+        )
+        self.c = kb.create_node("Notes", "outer notes", links=[self.a, "missing"])
+        return kb
+
+    @pytest.fixture
+    def snapshot(self, knowledge_base):
+        """Provide a snapshot decoded from plain bytes."""
+        snapshot = Snapshot(memoryview(b"".join(encode_snapshot(knowledge_base, 3))))
+        yield snapshot
+        snapshot.close()
+
+    def test_nodes(self, knowledge_base, snapshot):
+        """Test lookups and iteration against the source."""
+        assert (len(snapshot), snapshot.generation) == (3, 3)
+        for node in knowledge_base.get_all_nodes():
+            assert snapshot.get_node(node.id).to_dict() == node.to_dict()
+        assert snapshot.get_node("missing") is None
+        assert "missing" not in snapshot
+        assert snapshot.node_ids() == [self.a, self.b, self.c]
+
+    def test_searches(self, knowledge_base, snapshot):
+        """Test that searches agree with the knowledge base."""
+        for tags in (["OPS"], ["ops", "x"], ["none"], []):
+            assert {n.id for n in snapshot.search_by_tags(tags)} == {
+                n.id for n in knowledge_base.search_by_tags(tags)
+            }
+        for text in ("outer", "作戦", "Plan", "zzz", ""):
+            assert [n.id for n in snapshot.search_by_text(text)] == [
+                n.id for n in knowledge_base.search_by_text(text)
+            ]
+        assert snapshot.backlinks(self.a) == [self.b, self.c]
+        assert snapshot.tags() == ["ops", "x"]
+
+    def test_compressed_content(self, knowledge_base):
+        """Test that compressed bodies are decoded by the reader."""
+        long_id = knowledge_base.create_node("Long", "transcript line\n" * 500)
+        knowledge_base.enable_compression(threshold=100)
+        snapshot = Snapshot(memoryview(b"".join(encode_snapshot(knowledge_base))))
+        assert snapshot.get_node(long_id).content == "transcript line\n" * 500
+        assert [n.id for n in snapshot.search_by_text("TRANSCRIPT")] == [long_id]
+        snapshot.close()
+
+
+class TestPublisherReader:
+    """Test publishing generations to readers."""
+
+    def test_generations_swap(self):
+        """Test that readers swap to new generations and old views stay valid."""
+        kb = KnowledgeBase()
+        node_id = kb.create_node("Before", "...")
+        with (
+            SnapshotPublisher(kb) as publisher,
+            SnapshotReader(publisher.name) as reader,
+        ):
+            old = reader.current()
+            assert old.generation == 1
+            assert not publisher.publish_if_changed()
+
+            kb.update_node(node_id, title="After")
+            assert publisher.publish_if_changed()
+            new = reader.current()
+            assert (new.generation, new.get_node(node_id).title) == (2, "After")
+            assert old.get_node(node_id).title == "Before"
+            assert not reader.refresh()
+            old.close()
+
+    def test_refresh_after_publisher_closed(self):
+        """Test that a reader keeps its snapshot once the publisher is gone."""
+        kb = KnowledgeBase()
+        node_id = kb.create_node("Kept", "...")
+        publisher = SnapshotPublisher(kb)
+        reader = SnapshotReader(publisher.name)
+        kb.update_node(node_id, title="Unseen")
+        publisher.publish()
+        publisher.close()
+
+        assert not reader.refresh()
+        assert reader.current().get_node(node_id).title == "Kept"
+        reader.close()
+
+    def test_reader_in_other_process(self):
+        """Test attaching from a separate process."""
+        kb = KnowledgeBase()
+        node_id = kb.create_node("Shared", "...", tags=["ops"])
+        kb.create_node("Other", "...", tags=["ops"])
+        with SnapshotPublisher(kb) as publisher:
+            kb.update_node(node_id, title="Shared v2")
+            publisher.publish()
+            results = multiprocessing.Queue()
+            child = multiprocessing.Process(
+                target=read_in_child, args=(publisher.name, node_id, results)
+            )
+            child.start()
+            generation, title, titles = results.get(timeout=30)
+            child.join(timeout=30)
+        assert child.exitcode == 0
+        assert (generation, title, titles) == (2, "Shared v2", ["Other", "Shared v2"])
@@ -2,6 +2,7 @@
 
 import pytest
 import json
+from datetime import datetime
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from star_tactics.storage import StorageBackend, JSONStorage
@@ -121,6 +122,23 @@ class TestJSONStorage:
             assert loaded.tags == original.tags
             assert loaded.links == original.links
 
+    def test_load_preserves_timestamps(self, json_storage):
+        """Test that saved timestamps are restored instead of reset."""
+        kb = KnowledgeBase()
+        node_id = kb.create_node(title="Old", content="Old content")
+        node = kb.get_node(node_id)
+        node.created_at = datetime(2024, 1, 1, 12, 0, 0)
+        node.updated_at = datetime(2024, 6, 1, 8, 30, 0)
+        json_storage.save(kb)
+
+        new_kb = KnowledgeBase()
+        json_storage.load(new_kb)
+
+        loaded = new_kb.get_node(node_id)
+        assert loaded.created_at == datetime(2024, 1, 1, 12, 0, 0)
+        assert loaded.updated_at == datetime(2024, 6, 1, 8, 30, 0)
+        assert new_kb.get_recently_updated(1) == [loaded]
+
     def test_load_nonexistent_file(self, json_storage):
         """Test loading from a nonexistent file creates empty knowledge base."""
         kb = KnowledgeBase()
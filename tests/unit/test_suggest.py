@@ -0,0 +1,77 @@
+"""Tests for link suggestions."""
+
+import pytest
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.models.suggest import terms
+
+
+class TestTerms:
+    """Test content term splitting."""
+
+    def test_words_and_bigrams(self):
+        """Test ASCII words and bigrams of other word runs."""
+        assert terms("the ox sees 42 stars") == {"the", "sees", "stars"}
+        assert terms("星空観測 x") == {"星空", "空観", "観測"}
+        assert terms("星") == {"星"}
+
+
+class TestSuggestLinks:
+    """Test single-node and batch suggestions."""
+
+    @pytest.fixture
+    def kb(self):
+        """Provide a knowledge base with tag, text and link signals."""
+        kb = KnowledgeBase()
+        self.plan = kb.create_node(
+            "Outer ring plan", "Flank with interceptors", tags=["ring", "common"]
+        )
+        self.ring = kb.create_node("Ring defense", "...", tags=["RING", "common"])
+        self.text = kb.create_node("Notes", "interceptors and flank", tags=["common"])
+        self.hub = kb.create_node("Hub", "...", links=[self.plan])
+        self.neighbor = kb.create_node("Neighbor", "...", links=[self.hub])
+        self.linked = kb.create_node("Linked", "...", tags=["ring"])
+        kb.update_node(self.plan, links=[self.linked])
+        for i in range(4):
+            kb.create_node(f"Other {i}", "...", tags=["common"])
+        return kb
+
+    def test_signals(self, kb):
+        """Test that each signal proposes its candidate."""
+        suggestions = {s.node_id: s for s in kb.suggest_links(self.plan)}
+        assert suggestions[self.ring].tags == ["ring", "common"]
+        # "flank" and "interceptors", but not "ring" from the title
+        assert suggestions[self.text].content == pytest.approx(2 / 3)
+        assert suggestions[self.neighbor].neighbors == 1
+        # Already linked in either direction, or the node itself
+        assert not suggestions.keys() & {self.plan, self.hub, self.linked}
+
+    def test_ranking(self, kb):
+        """Test that a rare shared tag outranks a common one."""
+        best = kb.suggest_links(self.plan, k=2)
+        assert [s.node_id for s in best] == [self.ring, self.text]
+        assert best[0].score > best[1].score
+        assert kb.suggest_links("missing") == []
+        assert kb.suggest_links(self.plan, k=0) == []
+
+    def test_common_postings_skipped(self, kb):
+        """Test that postings above max_postings yield no candidates."""
+        suggestions = kb.suggest_links(self.plan, max_postings=2)
+        assert {s.node_id for s in suggestions} == {self.ring, self.text, self.neighbor}
+        assert kb.suggest_links(self.plan, max_postings=1) == []
+
+    def test_follows_changes(self, kb):
+        """Test that the term index follows updates and deletions."""
+        kb.suggest_links(self.plan)
+        kb.update_node(self.text, content="nothing in common")
+        kb.delete_node(self.ring)
+        suggestions = {s.node_id: s for s in kb.suggest_links(self.plan)}
+        assert self.ring not in suggestions
+        assert suggestions[self.text].content == 0
+
+    def test_batch(self, kb):
+        """Test that in-process and pooled batches match single lookups."""
+        serial = kb.suggest_all_links(k=3, workers=1)
+        pooled = kb.suggest_all_links(k=3, workers=2, min_parallel_nodes=0)
+        assert serial == pooled
+        assert serial[self.plan] == kb.suggest_links(self.plan, k=3)
+        assert all(len(suggestions) <= 3 for suggestions in serial.values())
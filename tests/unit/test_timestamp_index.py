@@ -0,0 +1,101 @@
+"""Tests for timestamp-ordered queries in KnowledgeBase."""
+
+import pytest
+from datetime import datetime, timedelta
+from star_tactics.models.knowledge_node import KnowledgeBase, KnowledgeNode
+
+
+class TestTimestampIndex:
+    """Test recency and time-range queries."""
+
+    BASE = datetime(2025, 1, 1, 9, 0, 0)
+
+    @pytest.fixture
+    def knowledge_base(self):
+        """Provide a KnowledgeBase with nodes created one hour apart."""
+        kb = KnowledgeBase()
+        for hour in range(5):
+            created = self.BASE + timedelta(hours=hour)
+            kb._add_node(
+                KnowledgeNode(
+                    id=f"node-{hour}",
+                    title=f"Node {hour}",
+                    content=f"Content {hour}",
+                    created_at=created,
+                )
+            )
+        return kb
+
+    def ids(self, nodes):
+        return [node.id for node in nodes]
+
+    def test_node_accepts_timestamps(self):
+        """Test that explicit timestamps are kept and updated_at defaults."""
+        node = KnowledgeNode(title="T", content="C", created_at=self.BASE)
+
+        assert node.created_at == self.BASE
+        assert node.updated_at == self.BASE
+
+    def test_created_between(self, knowledge_base):
+        """Test inclusive creation time ranges."""
+        results = knowledge_base.get_nodes_created_between(
+            self.BASE + timedelta(hours=1), self.BASE + timedelta(hours=3)
+        )
+
+        assert self.ids(results) == ["node-1", "node-2", "node-3"]
+
+    def test_created_between_open_ended(self, knowledge_base):
+        """Test ranges without a lower or upper bound."""
+        after = knowledge_base.get_nodes_created_between(
+            start=self.BASE + timedelta(hours=3)
+        )
+        before = knowledge_base.get_nodes_created_between(
+            end=self.BASE + timedelta(minutes=30)
+        )
+
+        assert self.ids(after) == ["node-3", "node-4"]
+        assert self.ids(before) == ["node-0"]
+
+    def test_recently_created(self, knowledge_base):
+        """Test fetching the newest nodes."""
+        results = knowledge_base.get_recently_created(2)
+
+        assert self.ids(results) == ["node-4", "node-3"]
+        assert knowledge_base.get_recently_created(0) == []
+        assert len(knowledge_base.get_recently_created(100)) == 5
+
+    def test_recently_updated_follows_updates(self, knowledge_base):
+        """Test that updating a node moves it to the front."""
+        knowledge_base.update_node("node-0", title="Touched")
+
+        assert self.ids(knowledge_base.get_recently_updated(2)) == [
+            "node-0",
+            "node-4",
+        ]
+        assert self.ids(knowledge_base.get_recently_created(1)) == ["node-4"]
+
+    def test_updated_between_after_link_change(self, knowledge_base):
+        """Test that link operations refresh the updated_at index."""
+        before = datetime.now()
+        knowledge_base.add_bidirectional_link("node-1", "node-2")
+
+        results = knowledge_base.get_nodes_updated_between(start=before)
+        assert set(self.ids(results)) == {"node-1", "node-2"}
+
+    def test_deleted_nodes_leave_index(self, knowledge_base):
+        """Test that deleted nodes are not returned."""
+        knowledge_base.delete_node("node-4")
+
+        assert self.ids(knowledge_base.get_recently_created(1)) == ["node-3"]
+
+    def test_query_uses_time_index(self, knowledge_base):
+        """Test that time-range query predicates are index-driven."""
+        query = knowledge_base.query().created_between(
+            self.BASE + timedelta(hours=4), None
+        )
+
+        assert query.explain() == [
+            "index TimeRange('created_at', "
+            "datetime.datetime(2025, 1, 1, 13, 0), None) ~1"
+        ]
+        assert self.ids(query) == ["node-4"]
@@ -0,0 +1,181 @@
+"""Tests for Markdown vault sync."""
+
+import os
+
+import pytest
+from star_tactics.cli import main
+from star_tactics.models.events import ChangeType
+from star_tactics.models.knowledge_node import KnowledgeBase
+from star_tactics.storage import JSONStorage, sync_vault
+from star_tactics.storage.vault import parse_markdown
+
+
+def write(path, text, mtime=None):
+    """Write a note, optionally with a fixed modification time."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class TestParseMarkdown:
+    """Test parsing single notes."""
+
+    def test_front_matter_and_links(self):
+        """Test tags, title and wikilink targets."""
+        document = parse_markdown(
+            "---\n"
+            "title: 艦隊編成\n"
+            "tags:\n"
+            "  - ops\n"
+            "  - '#fleet'\n"
+            "aliases: [x]\n"
+            "---\n"
+            "See [[Plan]], [[ops/Roster|the roster]] and [[Plan#Phase 2]].\n"
+            "```\n[[Not a link]]\n```\n"
+        )
+        assert document.title == "艦隊編成"
+        assert document.tags == ["ops", "fleet"]
+        assert document.targets == ["Plan", "ops/Roster"]
+        assert document.content.startswith("See [[Plan]]")
+
+    @pytest.mark.parametrize(
+        "text,tags",
+        [
+            ("---\ntags: [a, 'b c']\n---\nbody", ["a", "b c"]),
+            ("---\ntags: a, b\n---\nbody", ["a", "b"]),
+            ("no front matter", []),
+            ("---\nunterminated", []),
+        ],
+    )
+    def test_tag_forms(self, text, tags):
+        """Test the supported ways of writing tags."""
+        assert parse_markdown(text).tags == tags
+
+
+class TestSyncVault:
+    """Test initial and incremental syncs."""
+
+    @pytest.fixture
+    def vault(self, tmp_path):
+        """Provide a vault with three linked notes."""
+        root = tmp_path / "vault"
+        write(root / "Plan.md", "---\ntags: [ops]\n---\nSee [[Roster]].", 1_000_000)
+        write(root / "ops" / "Roster.md", "Back to [[plan]], [[Missing]].", 1_000_000)
+        write(root / "Log.md", "[[Plan]] [[Roster]]", 1_000_000)
+        write(root / ".obsidian" / "Hidden.md", "ignored")
+        return root
+
+    def node(self, kb, title):
+        """Find a node by title."""
+        return next(node for node in kb.get_all_nodes() if node.title == title)
+
+    def test_initial_sync(self, vault):
+        """Test nodes, links, tags and timestamps of a first sync."""
+        kb = KnowledgeBase()
+        result = sync_vault(vault, kb, workers=1)
+        assert (len(result.created), result.parsed) == (3, 3)
+        plan, roster, log = (self.node(kb, t) for t in ("Plan", "Roster", "Log"))
+        assert plan.tags == ["ops"]
+        assert plan.links == [roster.id]
+        assert roster.links == [plan.id]
+        assert log.links == [plan.id, roster.id]
+        assert plan.updated_at.timestamp() == 1_000_000
+        assert (vault / ".star-tactics-manifest.json").exists()
+
+    def test_resync_applies_minimal_changes(self, vault):
+        """Test that only changed files are parsed and applied."""
+        kb = KnowledgeBase()
+        sync_vault(vault, kb, workers=1)
+        plan = self.node(kb, "Plan")
+        subscription = kb.subscribe()
+
+        result = sync_vault(vault, kb, workers=1)
+        assert (result.parsed, result.unchanged, result.updated) == (0, 3, [])
+
+        # Touched but identical: hashed, not parsed
+        os.utime(vault / "Log.md", (2_000_000, 2_000_000))
+        result = sync_vault(vault, kb, workers=1)
+        assert (result.parsed, result.unchanged) == (0, 3)
+
+        write(vault / "Plan.md", "---\ntags: [ops, v2]\n---\nSee [[Roster]].")
+        (vault / "Log.md").unlink()
+        write(vault / "Missing.md", "now exists")
+        result = sync_vault(vault, kb, workers=1)
+        missing = self.node(kb, "Missing")
+        roster = self.node(kb, "Roster")
+        assert result.created == [missing.id]
+        assert set(result.updated) == {plan.id, roster.id}
+        assert len(result.deleted) == 1
+        assert plan.tags == ["ops", "v2"]
+        # Roster was not re-read, but its dangling link now resolves
+        assert roster.links == [plan.id, missing.id]
+
+        events = [(e.type, e.node_id, e.fields) for e in subscription.drain()]
+        assert (ChangeType.UPDATED, plan.id, ("tags",)) in events
+        assert (ChangeType.UPDATED, roster.id, ("links",)) in events
+
+    def test_backdated_file(self, vault):
+        """Test that an older mtime does not move updated_at backwards."""
+        kb = KnowledgeBase()
+        kb.enable_history()
+        write(vault / "Plan.md", "first", 3_000_000)
+        sync_vault(vault, kb, workers=1)
+        plan = self.node(kb, "Plan")
+
+        write(vault / "Plan.md", "second", 1_000_000)
+        sync_vault(vault, kb, workers=1)
+        assert plan.content == "second"
+        assert plan.updated_at.timestamp() == 3_000_000
+        timestamps = [revision.timestamp for revision in kb.node_history(plan.id)]
+        assert timestamps == sorted(timestamps)
+        assert kb.get_node_at(plan.id, plan.updated_at).content == "second"
+
+    def test_rename_keeps_node(self, vault):
+        """Test that a moved file keeps its node."""
+        kb = KnowledgeBase()
+        sync_vault(vault, kb, workers=1)
+        log, plan, roster = (self.node(kb, t) for t in ("Log", "Plan", "Roster"))
+        (vault / "ops" / "Roster.md").rename(vault / "Crew.md")
+        result = sync_vault(vault, kb, workers=1)
+        assert (result.created, result.deleted, result.parsed) == ([], [], 1)
+        # Links to [[Roster]] no longer resolve
+        assert result.updated == [roster.id, log.id, plan.id]
+        assert roster.title == "Crew"
+        assert (log.links, plan.links) == ([plan.id], [])
+
+    def test_storage_saved_once(self, vault, tmp_path):
+        """Test that a sync writes storage once and leaves other nodes alone."""
+        storage = JSONStorage(tmp_path / "kb.json")
+        kb = KnowledgeBase(storage=storage)
+        own = kb.create_node("Not from the vault", "...")
+        saves = []
+        original = storage.save
+        storage.save = lambda kb: saves.append(original(kb))
+        sync_vault(vault, kb, manifest=tmp_path / "manifest.json", workers=1)
+        assert len(saves) == 1
+        assert kb.get_node(own) is not None
+        assert len(KnowledgeBase(storage=JSONStorage(tmp_path / "kb.json"))._nodes) == 4
+
+    def test_parallel_matches_serial(self, vault, tmp_path):
+        """Test parsing in worker processes."""
+        serial, parallel = KnowledgeBase(), KnowledgeBase()
+        sync_vault(vault, serial, manifest=tmp_path / "a.json", workers=1)
+        sync_vault(
+            vault,
+            parallel,
+            manifest=tmp_path / "b.json",
+            workers=2,
+            min_parallel_bytes=0,
+        )
+        assert sorted((n.title, n.content, n.tags) for n in serial.get_all_nodes()) == (
+            sorted((n.title, n.content, n.tags) for n in parallel.get_all_nodes())
+        )
+
+    def test_cli(self, vault, tmp_path, capsys):
+        """Test the sync-vault subcommand."""
+        data = tmp_path / "kb.json"
+        assert main(["--data", str(data), "sync-vault", str(vault)]) == 0
+        assert "3 created" in capsys.readouterr().err
+        assert main(["--data", str(data), "sync-vault", str(vault)]) == 0
+        assert "3 unchanged" in capsys.readouterr().err
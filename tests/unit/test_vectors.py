@@ -0,0 +1,145 @@
+"""Tests for local vector similarity search."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from star_tactics.models.knowledge_node import KnowledgeBase  # noqa: E402
+from star_tactics.models.vectors import HashingEmbedder, VectorIndex  # noqa: E402
+
+
+class TestHashingEmbedder:
+    """Test the default embedding."""
+
+    def test_rows_are_unit_length(self):
+        """Test that embeddings are normalized and deterministic."""
+        embedder = HashingEmbedder(dim=64)
+        matrix = embedder.embed(["fire dragon", "星空観測", ""])
+        assert matrix.shape == (3, 64)
+        assert matrix.dtype == np.float32
+        assert np.allclose(np.linalg.norm(matrix[:2], axis=1), 1.0)
+        assert not matrix[2].any()
+        assert np.array_equal(matrix[0], embedder.embed(["Fire  Dragon"])[0])
+
+    def test_similar_texts_score_higher(self):
+        """Test that overlapping texts have higher cosine similarity."""
+        a, b, c = HashingEmbedder().embed(
+            ["fire dragon strategy", "strategy for the fire dragon", "gold farming"]
+        )
+        assert a @ b > a @ c
+
+
+class TestFindRelated:
+    """Test related node queries."""
+
+    @pytest.fixture
+    def knowledge_base(self):
+        """Provide a KnowledgeBase with sample data."""
+        kb = KnowledgeBase()
+        self.dragon = kb.create_node(
+            title="Fire dragon strategy", content="Use ice spells in phase two."
+        )
+        self.dragon2 = kb.create_node(
+            title="Beating the fire dragon", content="Ice spells work in phase two."
+        )
+        self.farm = kb.create_node(
+            title="Gold farming route", content="Farm the desert before chapter 3."
+        )
+        self.stars = kb.create_node(
+            title="星空観測ガイド", content="冬の星座の見つけ方"
+        )
+        return kb
+
+    def test_related_by_node_id(self, knowledge_base):
+        """Test that the closest node ranks first and the node is excluded."""
+        results = knowledge_base.find_related(self.dragon, k=2)
+        assert [r.node.id for r in results][0] == self.dragon2
+        assert self.dragon not in [r.node.id for r in results]
+        assert results[0].score >= results[1].score
+
+    def test_related_by_text(self, knowledge_base):
+        """Test queries with free text, including Japanese."""
+        results = knowledge_base.find_related("冬の星座", k=1)
+        assert results[0].node.id == self.stars
+        assert knowledge_base.find_related("anything", k=0) == []
+
+    def test_index_follows_changes(self, knowledge_base):
+        """Test that the matrix stays aligned through updates and deletes."""
+        knowledge_base.find_related(self.dragon)
+        index = knowledge_base._lazy_index("vectors", VectorIndex)
+
+        knowledge_base.delete_node(self.dragon2)
+        knowledge_base.update_node(
+            self.farm, title="Dragon fire strategy", content="Ice spells, phase two"
+        )
+        knowledge_base.create_node(title="New node", content="Unrelated text")
+
+        assert len(index) == 4
+        for node_id, row in index._rows.items():
+            assert index._ids[row] == node_id
+            expected = index.embed(
+                f"{knowledge_base.get_node(node_id).title}\n"
+                f"{knowledge_base.get_node(node_id).content}"
+            )
+            assert np.allclose(index.matrix[row], expected)
+        assert knowledge_base.find_related(self.dragon, k=1)[0].node.id == self.farm
+
+    def test_search_many_matches_single_queries(self, knowledge_base):
+        """Test that batched queries agree with one-at-a-time queries."""
+        index = knowledge_base._lazy_index("vectors", VectorIndex)
+        queries = index.embedder.embed(["fire dragon", "gold desert"])
+        batched = index.search_many(queries, k=2)
+        single = [index.search(q, k=2) for q in queries]
+        assert [[i for i, _ in r] for r in batched] == [
+            [i for i, _ in r] for r in single
+        ]
+        assert np.allclose(
+            [[s for _, s in r] for r in batched], [[s for _, s in r] for r in single]
+        )
+
+    def test_custom_embedder(self):
+        """Test plugging in another embedding."""
+
+        class LengthEmbedder:
+            dim = 2
+
+            def embed(self, texts):
+                return np.array(
+                    [[1.0, 0.0] if len(t) < 10 else [0.0, 1.0] for t in texts],
+                    dtype=np.float32,
+                )
+
+        kb = KnowledgeBase()
+        kb.enable_vectors(embedder=LengthEmbedder())
+        short = kb.create_node(title="a", content="b")
+        kb.create_node(title="a much longer title", content="and content")
+        assert kb.find_related("xy", k=1)[0].node.id == short
+        with pytest.raises(ValueError):
+            kb.enable_vectors(approximate=True)
+
+
+class TestApproximateIndex:
+    """Test the random-projection LSH mode."""
+
+    def test_approximate_finds_near_duplicates(self):
+        """Test that LSH candidates include close vectors and stay current."""
+        kb = KnowledgeBase()
+        kb.enable_vectors(approximate=True)
+        ids = [
+            kb.create_node(title=f"Topic {i} about item {i * 7}", content=f"n{i}")
+            for i in range(50)
+        ]
+        target = kb.create_node(
+            title="Fire dragon strategy guide", content="ice spells phase two"
+        )
+        twin = kb.create_node(
+            title="Fire dragon strategy guide!", content="ice spells phase two"
+        )
+        results = kb.find_related(target, k=1)
+        assert results[0].node.id == twin
+
+        kb.delete_node(twin)
+        assert twin not in [r.node.id for r in kb.find_related(target, k=60)]
+        exact = kb.find_related(target, k=3, approximate=False)
+        assert len(exact) == 3
+        assert all(r.node.id in ids for r in exact)